@@ -6,6 +6,8 @@ Provides endpoints for clinical simulation, chat interactions, and performance e
 """
 
 import os
+from typing import Optional
+
 import yaml
 from flask import Flask
 from flask_cors import CORS
@@ -29,10 +31,14 @@ def _load_config():
         return {}
 
 
-def create_app() -> Flask:
+def create_app(test_config: Optional[dict] = None) -> Flask:
     """
     Application factory for SmartDoc API.
 
+    Args:
+        test_config: Flask config overrides applied after the YAML config
+            (``TESTING`` also skips the LLM warm-up)
+
     Returns:
         Flask: Configured Flask application instance
     """
@@ -77,10 +83,21 @@ def create_app() -> Flask:
 
     app.config["DATABASE"] = db_config
     app.config["SECRET_KEY"] = "smartdoc-dev-key-change-in-production"
+    if test_config:
+        app.config.update(test_config)
 
     # Initialize database
     db_init(app)
 
+    # Route LLM tasks to the admin-managed model profiles
+    from .services.llm_routing import install_route_source
+    install_route_source()
+
+    # Load models and prime prompt caches in the background; see /readyz.
+    # Test apps never warm up (and report ready)
+    from .services.warmup import get_warmup_state, start_warmup
+    start_warmup(enabled=not app.config.get("TESTING", False))
+
     # Register blueprints
     from .routes import bp as api_v1
     from .routes.auth import bp as auth_bp
@@ -104,6 +121,12 @@ def create_app() -> Flask:
         """Kubernetes-style health check endpoint."""
         return {"ok": True}
 
+    @app.get("/readyz")
+    def readyz():
+        """Readiness: 200 once the LLM warm-up has finished, 503 while it runs."""
+        state = get_warmup_state().snapshot()
+        return state, 200 if state["ready"] else 503
+
     # Static file serving for the web frontend (for production/Docker)
     # In development, the frontend is served separately
     # Check for Docker environment or production mode
@@ -7,6 +7,7 @@ import json
 from ..services.auth_service import require_auth
 from ..db import get_session
 from ..db.models import User, LLMProfile, AgentPrompt, AuditLog
+from smartdoc_core.llm.providers.routing import invalidate_routes
 from smartdoc_core.utils.logger import sys_logger
 
 bp = Blueprint("admin", __name__, url_prefix="/api/v1/admin")
@@ -233,6 +234,7 @@ def create_llm_profile():
             )
             s.add(profile)
             s.commit()
+            invalidate_routes()
 
             log_admin_action("create_llm_profile", {
                 "profile_id": profile.id,
@@ -278,6 +280,7 @@ def update_llm_profile(profile_id):
 
             if updated_fields:
                 s.commit()
+                invalidate_routes()
                 log_admin_action("update_llm_profile", {
                     "profile_id": profile_id,
                     "updated_fields": updated_fields
@@ -305,6 +308,7 @@ def delete_llm_profile(profile_id):
 
             s.delete(profile)
             s.commit()
+            invalidate_routes()
 
             return jsonify({"ok": True})
 
@@ -374,6 +378,7 @@ def create_agent_prompt():
             )
             s.add(prompt)
             s.commit()
+            invalidate_routes()
 
             log_admin_action("create_agent_prompt", {
                 "prompt_id": prompt.id,
@@ -412,6 +417,7 @@ def update_agent_prompt(prompt_id):
 
             if updated_fields:
                 s.commit()
+                invalidate_routes()
                 log_admin_action("update_agent_prompt", {
                     "prompt_id": prompt_id,
                     "updated_fields": updated_fields
@@ -439,6 +445,7 @@ def delete_agent_prompt(prompt_id):
 
             s.delete(prompt)
             s.commit()
+            invalidate_routes()
 
             return jsonify({"ok": True})
 
@@ -474,6 +481,7 @@ def toggle_prompt_status(prompt_id):
                 status_action = "deactivated"
 
             s.commit()
+            invalidate_routes()
 
             log_admin_action("toggle_prompt_status", {
                 "prompt_id": prompt_id,
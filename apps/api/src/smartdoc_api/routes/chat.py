@@ -5,8 +5,9 @@ Handles chat interactions with the full SmartDoc AI system including
 Intent-Driven Disclosure Manager and clinical evaluation.
 """
 
-from flask import request, jsonify
+from flask import Response, request, jsonify, stream_with_context
 from . import bp
+import json
 import uuid
 import os
 
@@ -44,6 +45,9 @@ def clean_response_text(text: str) -> str:
 
     return text
 from smartdoc_api.services.auth_service import require_auth
+from smartdoc_api.services.admission import (
+    AdmissionRejected, admission_control, get_admission_controller, rejection_response
+)
 
 # Import real SmartDoc components
 try:
@@ -103,8 +107,55 @@ except ImportError as e:
     clinical_evaluator = None
 
 
+def _build_message_meta(discovery_result: dict) -> dict:
+    """Extract intent classification metadata stored with the user's message."""
+    intent_classification = discovery_result.get("intent_classification", {})
+    return {
+        "intent_id": intent_classification.get("intent_id"),
+        "intent_confidence": intent_classification.get("confidence"),
+        "intent_explanation": intent_classification.get("explanation"),
+        # Which tier answered (primary, cache, fallback or a cascade tier):
+        # the intent model only trains on labels of the LLM path
+        "intent_tier": intent_classification.get("tier"),
+    }
+
+
+def _build_discovery_events(discovery_result: dict) -> list:
+    """Convert engine discoveries into frontend discovery events."""
+    discovery_events = []
+    for discovery in discovery_result["response"].get("discoveries") or []:
+        # Use the structured discovery data from LLM Discovery Processor
+        discovery_event = {
+            "category": discovery["category"],
+            "field": discovery["label"],  # Fixed label as key to prevent duplication
+            "value": discovery["summary"],  # Clean clinical summary
+            "confidence": discovery.get("confidence", 1.0),
+            "block_id": discovery["block_id"],
+        }
+        discovery_events.append(discovery_event)
+        sys_logger.log_system(
+            "debug", f"[V1] Created discovery event: {discovery_event}"
+        )
+    return discovery_events
+
+
+def _build_discovery_stats(discovery_result: dict) -> dict:
+    """Summarize session discovery progress for the frontend."""
+    session_stats = discovery_result.get("session_stats", {})
+    return {
+        "total": session_stats.get("total_blocks", 0),
+        "discovered": session_stats.get("revealed_blocks", 0),
+    }
+
+
+def _sse(event: str, data) -> str:
+    """Format a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @bp.post("/chat")
 @require_auth
+@admission_control
 def v1_chat():
     """
     Process a chat message and return AI response with full SmartDoc functionality.
@@ -131,6 +182,8 @@ def v1_chat():
         {
             "error": "string - Error description"
         }
+
+    Returns 429 with a Retry-After header when the server is overloaded.
     """
     data = request.get_json(silent=True) or {}
     message = (data.get("message") or "").strip()
@@ -158,12 +211,7 @@ def v1_chat():
 
             if discovery_result["success"]:
                 # Extract intent classification metadata for storage
-                intent_classification = discovery_result.get("intent_classification", {})
-                message_meta = {
-                    "intent_id": intent_classification.get("intent_id"),
-                    "intent_confidence": intent_classification.get("confidence"),
-                    "intent_explanation": intent_classification.get("explanation"),
-                }
+                message_meta = _build_message_meta(discovery_result)
 
                 # Log the user's message with intent metadata
                 add_message(conv_id, MessageRole.user, message, context=context, meta=message_meta)
@@ -188,24 +236,8 @@ def v1_chat():
                 }
 
                 # Process discoveries into events for the frontend
-                if (
-                    "discoveries" in discovery_result["response"]
-                    and discovery_result["response"]["discoveries"]
-                ):
-                    discovery_events = []
-                    for discovery in discovery_result["response"]["discoveries"]:
-                        # Use the structured discovery data from LLM Discovery Processor
-                        discovery_event = {
-                            "category": discovery["category"],
-                            "field": discovery["label"],  # Fixed label as key to prevent duplication
-                            "value": discovery["summary"],  # Clean clinical summary
-                            "confidence": discovery.get("confidence", 1.0),
-                            "block_id": discovery["block_id"],
-                        }
-                        discovery_events.append(discovery_event)
-                        sys_logger.log_system(
-                            "debug", f"[V1] Created discovery event: {discovery_event}"
-                        )
+                discovery_events = _build_discovery_events(discovery_result)
+                if discovery_events:
                     response_data["discovery_events"] = discovery_events
                     sys_logger.log_system(
                         "info",
@@ -214,11 +246,7 @@ def v1_chat():
 
                 # Add discovery stats from the session manager
                 if "session_stats" in discovery_result:
-                    session_stats = discovery_result["session_stats"]
-                    response_data["discovery_stats"] = {
-                        "total": session_stats.get("total_blocks", 0),
-                        "discovered": session_stats.get("revealed_blocks", 0),
-                    }
+                    response_data["discovery_stats"] = _build_discovery_stats(discovery_result)
 
                 # Add bias warning from discovery result if detected
                 if "bias_warning" in discovery_result:
@@ -230,6 +258,10 @@ def v1_chat():
                         f"[V1] Discovery bias warning sent to frontend: {discovery_result['bias_warning']['bias_type']}",
                     )
 
+                # Per-turn LLM token/latency accounting (debug mode only)
+                if "llm_metrics" in discovery_result:
+                    response_data["llm_metrics"] = discovery_result["llm_metrics"]
+
                 # Persist assistant reply + discoveries/biases
                 add_message(conv_id, MessageRole.assistant, response_text, context=context)
 
@@ -296,6 +328,132 @@ def v1_chat():
     })
 
 
+@bp.post("/chat/stream")
+@require_auth
+def v1_chat_stream():
+    """
+    Process a chat message and stream the AI response as server-sent events.
+
+    Takes the same request JSON as ``/chat``. The response is a
+    ``text/event-stream`` with the following events, in order:
+
+        token          {"text": "..."}   - reply text chunks as they are generated
+        discovery      {discovery event}  - one per discovered block
+        bias_warning   {bias warning}     - if a bias was detected
+        done           {"reply", "discovery_stats", "context", "smartdoc_engine"}
+        error          {"error": "..."}   - sent instead of done on failure
+
+    Returns 429 with a Retry-After header (before streaming) when the
+    server is overloaded.
+
+    The ``reply`` in ``done`` is the final cleaned text and should replace
+    the concatenated tokens.
+    """
+    data = request.get_json(silent=True) or {}
+    message = (data.get("message") or "").strip()
+    context = data.get("context", "anamnesis")
+    session_id = data.get("session_id", f"v1_session_{uuid.uuid4().hex[:8]}")
+
+    if not message:
+        return jsonify({"error": "message is required"}), 400
+
+    if not (SMARTDOC_AVAILABLE and intent_driven_manager):
+        return jsonify({"error": "SmartDoc engine not available for streaming"}), 503
+
+    conv_id = get_or_create_conversation_for_session(session_id, title=f"Session {session_id}")
+    ensure_session(session_id, conv_id)
+
+    def generate():
+        try:
+            sys_logger.log_system(
+                "info", f"[V1] Streaming query with SmartDoc engine: {message}"
+            )
+            discovery_result = None
+            for event, payload in intent_driven_manager.stream_doctor_query(
+                session_id, message, context
+            ):
+                if event == "token":
+                    yield _sse("token", {"text": payload})
+                else:
+                    discovery_result = payload
+
+            if not discovery_result or not discovery_result.get("success"):
+                error = (discovery_result or {}).get("error", "Unknown error")
+                sys_logger.log_system("error", f"[V1] SmartDoc streaming failed: {error}")
+                yield _sse("error", {"error": error})
+                return
+
+            add_message(
+                conv_id, MessageRole.user, message, context=context,
+                meta=_build_message_meta(discovery_result),
+            )
+            response_text = clean_response_text(discovery_result["response"]["text"])
+
+            # Trailing events: discoveries and bias warnings
+            discovery_events = _build_discovery_events(discovery_result)
+            for discovery_event in discovery_events:
+                yield _sse("discovery", discovery_event)
+
+            bias_warnings = []
+            if "bias_warning" in discovery_result:
+                bias_warnings.append(discovery_result["bias_warning"])
+                yield _sse("bias_warning", discovery_result["bias_warning"])
+
+            add_message(conv_id, MessageRole.assistant, response_text, context=context)
+            if discovery_events:
+                add_discoveries(session_id, discovery_events)
+            if bias_warnings:
+                add_biases(session_id, bias_warnings)
+
+            yield _sse("done", {
+                "reply": response_text,
+                "discovery_stats": _build_discovery_stats(discovery_result),
+                "context": context,
+                "session_id": session_id,
+                "smartdoc_engine": True,
+                **({"llm_metrics": discovery_result["llm_metrics"]} if "llm_metrics" in discovery_result else {}),
+            })
+        except Exception as e:
+            sys_logger.log_system("error", f"[V1] SmartDoc streaming error: {e}")
+            yield _sse("error", {"error": str(e)})
+
+    # Admitted last: the turn runs while the body streams and is released
+    # when the response closes, so nothing that can raise may sit in between
+    admission = get_admission_controller()
+    try:
+        admitted_at = admission.admit()
+    except AdmissionRejected as e:
+        return rejection_response(e)
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering so tokens flush immediately
+        },
+    )
+    response.call_on_close(lambda: admission.complete(admitted_at))
+    return response
+
+
+@bp.get("/chat/status")
+def v1_chat_status():
+    """Admission state (in-flight turns, estimated wait), LLM call-layer queues, intent cascade tiers and intent cache of this worker."""
+    status = {"admission": get_admission_controller().status()}
+    if SMARTDOC_AVAILABLE:
+        from smartdoc_core.llm.factory import get_default_provider, stack_stats
+        status["llm"] = stack_stats(get_default_provider())
+        classifier = getattr(intent_driven_manager, "intent_classifier", None)
+        cascade = getattr(classifier, "cascade", None)
+        if cascade is not None:
+            status["intent_cascade"] = cascade.stats()
+        intent_cache = getattr(classifier, "cache", None)
+        if intent_cache is not None:
+            status["intent_cache"] = intent_cache.stats()
+    return jsonify(status)
+
+
 @bp.get("/chat/health")
 def v1_chat_health():
     """Health check for chat functionality."""
@@ -2,6 +2,8 @@ from __future__ import annotations
 from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
 from smartdoc_core.clinical.evaluator import ClinicalEvaluator, EvaluationInputs
+from smartdoc_core.llm import llm_call
+from smartdoc_core.llm.context import BATCH
 from smartdoc_core.simulation.bias_analyzer import BiasEvaluator
 from smartdoc_core.utils.logger import sys_logger
 
@@ -356,19 +358,22 @@ def multi_seed_variance_test():
             case_context=case_context,
         )
 
-        # Run multiple evaluations with different temperatures for variance
+        # Run multiple evaluations with different temperatures for variance,
+        # generated concurrently on the LLM server's parallel slots
+        temperatures = [0.1 + (i * 0.1) for i in range(num_runs)]  # Vary temperature slightly
+        evaluator = ClinicalEvaluator(enable_validation=True)
+        # Cached responses would hide the variance being measured; the runs
+        # are scheduled behind students' chat turns and diagnosis evaluations
+        with llm_call(session_id=session_id, cache=False, priority=BATCH):
+            run_results = evaluator.evaluate_variants(inputs, temperatures)
+
         results = []
-        for i in range(num_runs):
-            evaluator = ClinicalEvaluator(
-                enable_validation=True,
-                temperature=0.1 + (i * 0.1)  # Vary temperature slightly
-            )
-            result = evaluator.evaluate(inputs)
+        for i, (temperature, result) in enumerate(zip(temperatures, run_results)):
             if result.get("success"):
                 evaluation = result.get("evaluation", {})
                 results.append({
                     "run": i + 1,
-                    "temperature": 0.1 + (i * 0.1),
+                    "temperature": temperature,
                     "diagnostic_accuracy": evaluation.get("diagnostic_accuracy", {}).get("score", 0),
                     "information_gathering": evaluation.get("information_gathering", {}).get("score", 0),
                     "cognitive_bias_awareness": evaluation.get("cognitive_bias_awareness", {}).get("score", 0)
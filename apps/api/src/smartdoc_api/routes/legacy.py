@@ -10,6 +10,8 @@ from flask import Blueprint, request, jsonify, send_from_directory
 import uuid
 import os
 
+from smartdoc_api.services.admission import admission_control
+
 # Import real SmartDoc components
 try:
     from smartdoc_core.simulation.engine import IntentDrivenDisclosureManager
@@ -81,6 +83,7 @@ _sessions = {}
 
 
 @bp.route("/get_bot_response", methods=["POST"])
+@admission_control
 def get_bot_response():
     """Legacy endpoint for bot responses - uses real SmartDoc engine when available."""
     data = request.get_json() or {}
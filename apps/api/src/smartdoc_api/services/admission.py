@@ -0,0 +1,153 @@
+"""
+Admission control for engine chat turns.
+
+Each chat turn ties up a worker thread for as long as its LLM calls take.
+When the LLM backend is saturated, accepting more turns only makes every
+request time out together, so turns are admitted while the worker's
+in-flight count and the estimated wait for a new turn stay within limits,
+and rejected with 429 + Retry-After otherwise.
+
+Estimated wait: with ``concurrency`` turns served at once and an average
+turn duration T (moving average of completed turns), a new turn behind
+``in_flight`` others waits about ``(in_flight - concurrency + 1) * T /
+concurrency``. State is per worker process.
+"""
+import math
+import threading
+import time
+from functools import wraps
+from typing import Any, Dict, Optional
+
+from smartdoc_core.config.settings import config
+
+
+class AdmissionRejected(Exception):
+    """Raised when a turn is not admitted; carries the suggested retry delay."""
+
+    def __init__(self, message: str, retry_after_s: int):
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class AdmissionController:
+    """Tracks in-flight engine turns and admits new ones within limits."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        max_in_flight: int = 16,
+        concurrency: int = 4,
+        max_wait_s: float = 20.0,
+        initial_turn_s: float = 5.0,
+        ewma_alpha: float = 0.2,
+    ):
+        self.enabled = enabled
+        self.max_in_flight = max_in_flight
+        self.concurrency = max(1, concurrency)
+        self.max_wait_s = max_wait_s
+        self.ewma_alpha = ewma_alpha
+        self._avg_turn_s = initial_turn_s
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counters = {"admitted": 0, "rejected": 0, "completed": 0}
+
+    @classmethod
+    def from_config(cls) -> "AdmissionController":
+        settings = config.admission_settings
+        return cls(
+            enabled=bool(settings.get("enabled", True)),
+            max_in_flight=int(settings.get("max_in_flight", 16)),
+            concurrency=int(settings.get("concurrency") or config.ollama_num_parallel),
+            max_wait_s=float(settings.get("max_wait_s", 20)),
+            initial_turn_s=float(settings.get("initial_turn_s", 5)),
+            ewma_alpha=float(settings.get("ewma_alpha", 0.2)),
+        )
+
+    def admit(self) -> float:
+        """
+        Admit a turn or raise AdmissionRejected.
+
+        Returns:
+            The admission time, to pass to ``complete`` when the turn ends
+        """
+        with self._lock:
+            if self.enabled:
+                wait_s = self._estimated_wait(self._in_flight)
+                if self._in_flight >= self.max_in_flight or wait_s > self.max_wait_s:
+                    self._counters["rejected"] += 1
+                    # Expect a slot once the turns ahead of a retry have drained
+                    retry_after_s = max(1, math.ceil(max(wait_s, self._avg_turn_s)))
+                    raise AdmissionRejected(
+                        f"Server busy: {self._in_flight} turns in flight, "
+                        f"estimated wait {wait_s:.1f}s",
+                        retry_after_s,
+                    )
+            self._in_flight += 1
+            self._counters["admitted"] += 1
+        return time.monotonic()
+
+    def complete(self, admitted_at: float) -> None:
+        """Mark an admitted turn as finished and update the average turn time."""
+        elapsed = time.monotonic() - admitted_at
+        with self._lock:
+            self._in_flight -= 1
+            self._counters["completed"] += 1
+            self._avg_turn_s += self.ewma_alpha * (elapsed - self._avg_turn_s)
+
+    def status(self) -> Dict[str, Any]:
+        """Return current depth, wait estimate, limits and counters."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": self._in_flight,
+                "estimated_wait_s": round(self._estimated_wait(self._in_flight), 2),
+                "avg_turn_s": round(self._avg_turn_s, 2),
+                "max_in_flight": self.max_in_flight,
+                "max_wait_s": self.max_wait_s,
+                "concurrency": self.concurrency,
+                **self._counters,
+            }
+
+    def _estimated_wait(self, in_flight: int) -> float:
+        ahead = in_flight - self.concurrency + 1
+        return max(0, ahead) * self._avg_turn_s / self.concurrency
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the worker's admission controller, built from config on first use."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController.from_config()
+    return _controller
+
+
+def rejection_response(error: AdmissionRejected):
+    """Flask response tuple for a rejected turn."""
+    return (
+        {"error": "server busy, please retry", "detail": str(error), "retry_after_s": error.retry_after_s},
+        429,
+        {"Retry-After": str(error.retry_after_s)},
+    )
+
+
+def admission_control(fn):
+    """Admit the decorated (synchronous) chat endpoint through the admission controller."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        controller = get_admission_controller()
+        try:
+            admitted_at = controller.admit()
+        except AdmissionRejected as e:
+            return rejection_response(e)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            controller.complete(admitted_at)
+    return wrapper
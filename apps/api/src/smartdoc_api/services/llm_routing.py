@@ -0,0 +1,86 @@
+"""
+Route table for per-task model routing, built from the admin LLM profiles.
+
+A task is served by, in order of precedence:
+  1. the profile named for it under ``llm.routing.tasks`` in the YAML config;
+  2. the profile linked to the task's active agent prompt;
+  3. the default profile (``is_default``), for tasks without their own.
+Only Ollama profiles are routable; others are ignored.
+"""
+from typing import Dict, List
+
+from sqlalchemy import select
+
+from smartdoc_core.config.settings import config
+from smartdoc_core.llm.context import DEFAULT, RESIDENT_PERSONA, SON_PERSONA
+from smartdoc_core.llm.providers.routing import RouteProfile, get_router
+
+from ..db import get_session
+from ..db.models import AgentPrompt, LLMProfile
+
+# Agent prompt keys that differ from the task (call site) they configure
+AGENT_TASKS = {
+    "son": SON_PERSONA,
+    "resident": RESIDENT_PERSONA,
+}
+
+
+def _to_route(profile: LLMProfile) -> RouteProfile:
+    return RouteProfile(
+        name=profile.name,
+        model=profile.model,
+        temperature=profile.temperature,
+        top_p=profile.top_p,
+        max_tokens=profile.max_tokens,
+    )
+
+
+def load_route_table() -> Dict[str, RouteProfile]:
+    """Read the task -> profile table from the database."""
+    table: Dict[str, RouteProfile] = {}
+    with get_session() as s:
+        profiles = [
+            p for p in s.execute(select(LLMProfile)).scalars().all()
+            if (p.provider or "").lower() == "ollama"
+        ]
+        by_id = {p.id: p for p in profiles}
+        by_name = {p.name: p for p in profiles}
+
+        for profile in profiles:
+            if profile.is_default:
+                table[DEFAULT] = _to_route(profile)
+
+        prompts = s.execute(
+            select(AgentPrompt).where(AgentPrompt.is_active.is_(True), AgentPrompt.profile_id.is_not(None))
+        ).scalars().all()
+        for prompt in prompts:
+            profile = by_id.get(prompt.profile_id)
+            if profile is not None:
+                table[AGENT_TASKS.get(prompt.agent_key, prompt.agent_key)] = _to_route(profile)
+
+        for task, name in (config.llm_section("routing").get("tasks") or {}).items():
+            profile = by_name.get(name)
+            if profile is not None:
+                table[task] = _to_route(profile)
+
+    return table
+
+
+def referenced_models() -> List[str]:
+    """Models the config (incl. intent cascade tiers) and the admin Ollama profiles refer to, default model first."""
+    models = [config.OLLAMA_MODEL]
+    cascade = config.intent_section("cascade")
+    for tier in (cascade.get("tiers") or []) if cascade.get("enabled", False) else []:
+        if tier.get("model") and tier["model"] not in models:
+            models.append(tier["model"])
+    with get_session() as s:
+        for profile in s.execute(select(LLMProfile)).scalars().all():
+            if (profile.provider or "").lower() == "ollama" and profile.model not in models:
+                models.append(profile.model)
+    return models
+
+
+def install_route_source() -> None:
+    """Make the process-wide router read its table from the database."""
+    get_router().set_source(load_route_table)
+
@@ -0,0 +1,59 @@
+"""
+Startup warm-up of the LLM backend and readiness state.
+
+``create_app()`` starts one background warm-up per worker process: it
+loads every model the config and the admin LLM profiles refer to and
+primes each task's prompt prefix. ``/readyz`` reports the resulting
+state; ``/healthz`` stays a plain liveness check, so a load balancer can
+keep live-but-cold instances out of rotation without restarting them.
+"""
+import threading
+from typing import Optional
+
+from smartdoc_core.config.settings import config
+from smartdoc_core.llm import get_default_provider
+from smartdoc_core.llm.warmup import DEFAULT_TASKS, DISABLED, Warmer, WarmupState, representative_calls
+
+from .llm_routing import referenced_models
+
+_state = WarmupState()
+_warmer: Optional[Warmer] = None
+_warmer_lock = threading.Lock()
+
+
+def get_warmup_state() -> WarmupState:
+    """Return this worker's warm-up state."""
+    return _state
+
+
+def start_warmup(enabled: bool = True) -> WarmupState:
+    """
+    Start the worker's warm-up from ``llm.warmup`` settings (once per process).
+
+    Args:
+        enabled: False skips the warm-up whatever the settings say (test
+            apps); like ``llm.warmup.enabled: false`` it reports ready
+    """
+    global _state, _warmer
+    with _warmer_lock:
+        if _warmer is not None or _state.status == DISABLED:
+            return _state
+        settings = config.llm_section("warmup")
+        if not enabled or not settings.get("enabled", True):
+            _state = WarmupState(status=DISABLED)
+            return _state
+
+        provider = get_default_provider()
+        tasks = settings.get("tasks") or list(DEFAULT_TASKS)
+        _warmer = Warmer(
+            provider,
+            models=referenced_models,
+            calls=lambda: representative_calls(provider, tasks),
+            state=_state,
+            timeout_s=float(settings.get("timeout_s", 600)),
+            max_tokens=int(settings.get("max_tokens", 1)),
+            retry_interval_s=float(settings.get("retry_interval_s", 15)),
+            give_up_after_s=settings.get("give_up_after_s", 900),
+            recheck_interval_s=settings.get("recheck_interval_s", 60),
+        ).start()
+        return _state
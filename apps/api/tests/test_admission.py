@@ -0,0 +1,96 @@
+"""
+Tests for admission control of engine chat turns.
+"""
+
+import pytest
+from flask import Flask, Response, stream_with_context
+
+from smartdoc_api.services import admission
+from smartdoc_api.services.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    admission_control,
+    rejection_response,
+)
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    """A small controller installed as the worker's controller."""
+    controller = AdmissionController(max_in_flight=2, concurrency=2, max_wait_s=100, initial_turn_s=3)
+    monkeypatch.setattr(admission, "_controller", controller)
+    return controller
+
+
+def test_admits_up_to_the_limit_then_rejects_with_retry_after(controller):
+    controller.admit()
+    controller.admit()
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit()
+
+    body, status, headers = rejection_response(rejected.value)
+    assert status == 429 and headers == {"Retry-After": "3"}
+    assert body["retry_after_s"] == 3
+    assert (controller.status()["in_flight"], controller.status()["rejected"]) == (2, 1)
+
+
+def test_rejects_when_the_estimated_wait_is_too_long():
+    controller = AdmissionController(max_in_flight=10, concurrency=1, max_wait_s=4, initial_turn_s=5)
+    controller.admit()  # Served immediately
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit()  # Would wait one 5s turn
+    assert rejected.value.retry_after_s == 5
+
+    disabled = AdmissionController(enabled=False, max_in_flight=0)
+    disabled.admit()
+    assert disabled.status()["in_flight"] == 1
+
+
+def test_decorator_releases_the_slot_after_a_response_or_an_exception(controller):
+    @admission_control
+    def ok():
+        assert controller.status()["in_flight"] == 1
+        return "ok"
+
+    @admission_control
+    def failing():
+        raise RuntimeError("boom")
+
+    assert ok() == "ok"
+    with pytest.raises(RuntimeError):
+        failing()
+    status = controller.status()
+    assert (status["in_flight"], status["admitted"], status["completed"]) == (0, 2, 2)
+
+    controller.admit()
+    controller.admit()
+    body, status_code, _ = ok()  # Rejected: the endpoint does not run
+    assert status_code == 429 and controller.status()["in_flight"] == 2
+
+
+def test_streamed_turn_holds_the_slot_until_the_stream_closes(controller):
+    # Same shape as /api/v1/chat/stream: admit, stream, release on close
+    app = Flask(__name__)
+
+    @app.get("/stream")
+    def stream():
+        try:
+            admitted_at = controller.admit()
+        except AdmissionRejected as e:
+            return rejection_response(e)
+
+        def generate():
+            yield "event: token\ndata: {}\n\n"
+            raise RuntimeError("engine failed mid-stream")
+
+        response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+        response.call_on_close(lambda: controller.complete(admitted_at))
+        return response
+
+    client = app.test_client()
+    response = client.get("/stream", buffered=False)
+    assert controller.status()["in_flight"] == 1
+    with pytest.raises(RuntimeError):
+        b"".join(response.response)
+    response.close()
+    assert controller.status()["in_flight"] == 0 and controller.status()["completed"] == 1
@@ -0,0 +1,21 @@
+"""
+Tests for the LLM warm-up started by the application factory.
+"""
+
+import threading
+
+from smartdoc_api import create_app
+from smartdoc_api.services import warmup
+
+
+def test_test_app_starts_no_warmup_and_reports_ready(tmp_path, monkeypatch):
+    monkeypatch.setattr(warmup, "_state", warmup.WarmupState())
+    monkeypatch.setattr(warmup, "_warmer", None)
+
+    app = create_app({"TESTING": True, "DATABASE": {"url": f"sqlite:///{tmp_path / 'test.sqlite3'}"}})
+
+    assert warmup._warmer is None
+    assert "llm-warmup" not in [thread.name for thread in threading.enumerate()]
+    response = app.test_client().get("/readyz")
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "disabled"
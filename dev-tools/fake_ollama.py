@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Fake Ollama server for load testing without a GPU.
+
+Speaks the subset of the Ollama HTTP API SmartDoc uses (/api/generate,
+/api/chat, /api/embeddings, /api/embed, /api/tags) and simulates how a
+single-GPU Ollama queues work:
+
+- ``--slots`` requests are generated in parallel (OLLAMA_NUM_PARALLEL);
+  the rest wait, and more than ``--max-queue`` waiting requests get a 503
+- latency follows token rates: prompt tokens at ``--prompt-tps``, output
+  tokens at ``--gen-tps`` (streams are paced token by token)
+- the first request for a model (or one after ``--keep-alive-s`` idle)
+  pays ``--cold-load-s``; at most ``--max-loaded`` models stay resident
+- ``--error-rate`` requests fail with a 500 and ``--timeout-rate``
+  requests hang for ``--hang-s`` so client timeouts fire
+
+Point SmartDoc at it with
+    SMARTDOC_OLLAMA_BASE_URL=http://127.0.0.1:11435
+
+Responses are deterministic filler text; when a request carries a JSON
+schema ``format`` the answer is a minimal instance of that schema, so
+structured callers (intent classifier, evaluator) parse it. Fault
+injection can be changed while running:
+
+    curl -X POST localhost:11435/_fake/config -d '{"error_rate": 0.2}'
+    curl localhost:11435/_fake/stats
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+FILLER = (
+    "She has been more tired lately and her breathing got worse over the last few days, "
+    "especially at night. She takes her pills every morning and has not changed anything recently."
+).split()
+
+# Settings that may be changed through POST /_fake/config
+TUNABLE = (
+    "prompt_tps", "gen_tps", "response_tokens", "cold_load_s", "keep_alive_s",
+    "error_rate", "timeout_rate", "hang_s", "max_queue",
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def instance_for_schema(schema: Dict[str, Any]) -> Any:
+    """Build a minimal value that validates against a JSON schema."""
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if schema.get(key):
+            return instance_for_schema(schema[key][0])
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object" or "properties" in schema:
+        return {name: instance_for_schema(sub) for name, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        items = schema.get("items") or {}
+        return [instance_for_schema(items) for _ in range(schema.get("minItems", 0))]
+    if kind == "integer":
+        return int(schema.get("minimum", 1))
+    if kind == "number":
+        low, high = schema.get("minimum", 0.0), schema.get("maximum", 1.0)
+        return round((low + high) / 2, 2) if high >= low else low
+    if kind == "boolean":
+        return False
+    if kind == "null":
+        return None
+    return "Simulated answer."
+
+
+class FakeOllama:
+    """Shared simulation state: slots, queue, resident models and counters."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.models: List[str] = args.models
+        self.slots = args.slots
+        self.max_loaded = args.max_loaded
+        self.embedding_dim = args.embedding_dim
+        self.settings: Dict[str, float] = {name: getattr(args, name) for name in TUNABLE}
+        self.rng = random.Random(args.seed)
+
+        self._slots = threading.Semaphore(args.slots)
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded: "OrderedDict[str, float]" = OrderedDict()  # model -> last used
+        self._loading: Dict[str, threading.Event] = {}  # model -> set when its cold load ends
+        self.waiting = 0
+        self.running = 0
+        self.counters = {"requests": 0, "rejected": 0, "errors": 0, "timeouts": 0, "cold_loads": 0}
+
+    # ---- Queueing ----
+    def acquire(self) -> Optional[float]:
+        """Wait for a generation slot; return seconds queued or None if rejected."""
+        with self._lock:
+            self.counters["requests"] += 1
+            if self._slots.acquire(blocking=False):
+                self.running += 1
+                return 0.0
+            if self.waiting >= self.settings["max_queue"]:
+                self.counters["rejected"] += 1
+                return None
+            self.waiting += 1
+        started = time.perf_counter()
+        self._slots.acquire()
+        with self._lock:
+            self.waiting -= 1
+            self.running += 1
+        return time.perf_counter() - started
+
+    def release(self) -> None:
+        with self._lock:
+            self.running -= 1
+        self._slots.release()
+
+    def ensure_loaded(self, model: str) -> float:
+        """
+        Load ``model`` if it is not resident; return seconds spent waiting for it.
+
+        The first request for a cold model loads it; concurrent requests for
+        the same model wait for that load, while requests for resident
+        models go ahead (the load sleeps outside the lock).
+        """
+        with self._load_lock:
+            pending = self._loading.get(model)
+            if pending is None:
+                now = time.time()
+                last_used = self._loaded.pop(model, None)
+                if last_used is not None and now - last_used <= self.settings["keep_alive_s"]:
+                    self._loaded[model] = now
+                    return 0.0
+                loading = self._loading[model] = threading.Event()
+                self.counters["cold_loads"] += 1
+
+        if pending is not None:
+            # Another request is loading this model
+            started = time.perf_counter()
+            pending.wait()
+            return time.perf_counter() - started
+
+        load_s = self.settings["cold_load_s"]
+        time.sleep(load_s)
+        with self._load_lock:
+            self._loaded[model] = time.time()
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+            del self._loading[model]
+        loading.set()
+        return load_s
+
+    def fault(self) -> Optional[str]:
+        """Draw an injected fault for this request: "error", "timeout" or None."""
+        with self._lock:
+            draw = self.rng.random()
+            if draw < self.settings["error_rate"]:
+                self.counters["errors"] += 1
+                return "error"
+            if draw < self.settings["error_rate"] + self.settings["timeout_rate"]:
+                self.counters["timeouts"] += 1
+                return "timeout"
+        return None
+
+    # ---- Content ----
+    def completion(self, prompt: str, options: Dict[str, Any], fmt: Any) -> List[str]:
+        """Return the output tokens for a request."""
+        if isinstance(fmt, dict):
+            return [json.dumps(instance_for_schema(fmt))]
+        if fmt == "json":
+            return ["{}"]
+        n = int(options.get("num_predict") or self.settings["response_tokens"])
+        if n < 0:
+            n = int(self.settings["response_tokens"])
+        start = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % len(FILLER)
+        return [("" if i == 0 else " ") + FILLER[(start + i) % len(FILLER)] for i in range(n)]
+
+    def embedding(self, text: str) -> List[float]:
+        """Deterministic unit vector derived from the text."""
+        seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], 16)
+        rng = random.Random(seed)
+        vector = [rng.gauss(0.0, 1.0) for _ in range(self.embedding_dim)]
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._load_lock:
+            loaded = list(self._loaded)
+        with self._lock:
+            return {
+                **self.counters,
+                "slots": self.slots,
+                "running": self.running,
+                "waiting": self.waiting,
+                "loaded_models": loaded,
+                "settings": dict(self.settings),
+            }
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "FakeOllama/0.1"
+    protocol_version = "HTTP/1.1"
+    sim: FakeOllama
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:  # type: ignore[attr-defined]
+            super().log_message(format, *args)
+
+    # ---- Routing ----
+    def do_GET(self) -> None:
+        if self.path == "/api/tags":
+            models = [{"name": m, "model": m, "size": 0} for m in self.sim.models]
+            self._json(200, {"models": models})
+        elif self.path == "/api/ps":
+            self._json(200, {"models": [{"name": m} for m in self.sim.stats()["loaded_models"]]})
+        elif self.path == "/_fake/stats":
+            self._json(200, self.sim.stats())
+        elif self.path == "/":
+            self._text(200, "Ollama is running")
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        try:
+            body = self._body()
+        except ValueError:
+            self._json(400, {"error": "invalid JSON body"})
+            return
+        if self.path == "/api/generate":
+            self._generate(body, chat=False)
+        elif self.path == "/api/chat":
+            self._generate(body, chat=True)
+        elif self.path in ("/api/embeddings", "/api/embed"):
+            self._embeddings(body)
+        elif self.path == "/_fake/config":
+            unknown = set(body) - set(TUNABLE)
+            if unknown:
+                self._json(400, {"error": f"unknown settings: {sorted(unknown)}"})
+                return
+            self.sim.settings.update({k: float(v) for k, v in body.items()})
+            self._json(200, self.sim.settings)
+        else:
+            self._json(404, {"error": "not found"})
+
+    # ---- Endpoints ----
+    def _generate(self, body: Dict[str, Any], chat: bool) -> None:
+        model = body.get("model") or self.sim.models[0]
+        if chat:
+            messages = body.get("messages") or []
+            prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        else:
+            prompt = body.get("prompt", "")
+        stream = body.get("stream", True)  # Ollama streams unless told otherwise
+        options = body.get("options") or {}
+
+        queued_s = self.sim.acquire()
+        if queued_s is None:
+            self._json(503, {"error": "server busy, please try again.  maximum pending requests exceeded"})
+            return
+        try:
+            fault = self.sim.fault()
+            if fault == "timeout":
+                time.sleep(self.sim.settings["hang_s"])
+            load_s = self.sim.ensure_loaded(model)
+            if fault == "error":
+                self._json(500, {"error": "simulated failure: llama runner process has terminated"})
+                return
+
+            settings = self.sim.settings
+            prompt_tokens = estimate_tokens(prompt)
+            prompt_eval_s = prompt_tokens / settings["prompt_tps"]
+            time.sleep(prompt_eval_s)
+            tokens = self.sim.completion(prompt, options, body.get("format"))
+            per_token_s = 1.0 / settings["gen_tps"]
+
+            def final(text: str, eval_s: float) -> Dict[str, Any]:
+                ns = 1_000_000_000
+                chunk = self._chunk(model, text, chat, done=True)
+                chunk.update({
+                    "done_reason": "length" if options.get("num_predict") == len(tokens) else "stop",
+                    "total_duration": int((queued_s + load_s + prompt_eval_s + eval_s) * ns),
+                    "load_duration": int(load_s * ns),
+                    "prompt_eval_count": prompt_tokens,
+                    "prompt_eval_duration": int(prompt_eval_s * ns),
+                    "eval_count": len(tokens),
+                    "eval_duration": int(eval_s * ns),
+                })
+                return chunk
+
+            if not stream:
+                eval_s = len(tokens) * per_token_s
+                time.sleep(eval_s)
+                self._json(200, final("".join(tokens), eval_s))
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            started = time.perf_counter()
+            for token in tokens:
+                time.sleep(per_token_s)
+                self._write_chunk(self._chunk(model, token, chat, done=False))
+            self._write_chunk(final("", time.perf_counter() - started))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client gave up (e.g. its timeout fired)
+        finally:
+            self.sim.release()
+
+    def _embeddings(self, body: Dict[str, Any]) -> None:
+        if self.path == "/api/embed":
+            inputs = body.get("input", "")
+            inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+            texts = inputs
+        else:
+            texts = [body.get("prompt", "")]
+
+        queued_s = self.sim.acquire()
+        if queued_s is None:
+            self._json(503, {"error": "server busy, please try again.  maximum pending requests exceeded"})
+            return
+        try:
+            self.sim.ensure_loaded(body.get("model") or self.sim.models[0])
+            time.sleep(sum(estimate_tokens(t) for t in texts) / self.sim.settings["prompt_tps"])
+            vectors = [self.sim.embedding(t) for t in texts]
+        finally:
+            self.sim.release()
+        if self.path == "/api/embed":
+            self._json(200, {"model": body.get("model"), "embeddings": vectors})
+        else:
+            self._json(200, {"embedding": vectors[0]})
+
+    # ---- Helpers ----
+    @staticmethod
+    def _chunk(model: str, text: str, chat: bool, done: bool) -> Dict[str, Any]:
+        chunk: Dict[str, Any] = {
+            "model": model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "done": done,
+        }
+        if chat:
+            chunk["message"] = {"role": "assistant", "content": text}
+        else:
+            chunk["response"] = text
+        return chunk
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+        return json.loads(raw or b"{}")
+
+    def _json(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _text(self, status: int, text: str) -> None:
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, payload: Dict[str, Any]) -> None:
+        data = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--models", nargs="+", default=["gemma3:4b-it-q4_K_M"], help="Models to advertise")
+    parser.add_argument("--slots", type=int, default=4, help="Parallel generations (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--max-queue", type=int, default=512, help="Waiting requests before 503 (OLLAMA_MAX_QUEUE)")
+    parser.add_argument("--max-loaded", type=int, default=1, help="Resident models (OLLAMA_MAX_LOADED_MODELS)")
+    parser.add_argument("--prompt-tps", type=float, default=800.0, help="Prompt evaluation tokens/s")
+    parser.add_argument("--gen-tps", type=float, default=40.0, help="Generated tokens/s per slot")
+    parser.add_argument("--response-tokens", type=int, default=60, help="Output tokens when num_predict is unset")
+    parser.add_argument("--cold-load-s", type=float, default=3.0, help="Model load time")
+    parser.add_argument("--keep-alive-s", type=float, default=300.0, help="Idle time before a model unloads")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of requests that hang")
+    parser.add_argument("--hang-s", type=float, default=120.0, help="How long hanging requests stall")
+    parser.add_argument("--embedding-dim", type=int, default=768)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for fault injection")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    Handler.sim = FakeOllama(args)
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    server.verbose = args.verbose  # type: ignore[attr-defined]
+    print(f"🧪 Fake Ollama on http://{args.host}:{args.port} "
+          f"({args.slots} slots, {args.gen_tps:g} tok/s, cold load {args.cold_load_s:g}s)")
+    print(f"   export SMARTDOC_OLLAMA_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark the keyword fallback intent classifiers under outage load.
+
+While the LLM circuit breaker is open every intent request is answered by
+keyword matching. This tool measures, per context:
+
+- the compiled rule matcher (intent.keywords) against checking the same
+  rule table rule by rule with ``any(keyword in text)`` - the previous
+  if/elif chains - and verifies both pick the same rule for every query;
+- the end-to-end ``classify_intent`` cost with a provider whose breaker
+  is open.
+
+Queries are the intent category examples, optionally repeated:
+
+    python dev-tools/fallback_keyword_benchmark.py --repeat 50
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "packages" / "core" / "src"))
+
+from smartdoc_core.intent.classifier import LLMIntentClassifier
+from smartdoc_core.intent.keywords import (
+    CONTEXT_MATCHERS,
+    CONTEXT_RULES,
+    GENERAL_MATCHER,
+    GENERAL_RULES,
+)
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.utils.exceptions import CircuitOpenError
+
+
+class OpenBreakerProvider(LLMProvider):
+    """Fails every request like a provider whose circuit breaker is open."""
+
+    model = "unavailable"
+
+    def generate(self, prompt, **kwargs):
+        raise CircuitOpenError("LLM circuit breaker is open", retry_after_s=30.0)
+
+
+def match_rule_by_rule(rules, text):
+    """The first rule with any keyword in ``text``, checking the rules in order."""
+    for rule in rules:
+        if any(keyword in text for keyword in rule.keywords):
+            return rule
+    return None
+
+
+def per_query_us(fn, queries):
+    started = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Times to run the example queries (default: 20)")
+    args = parser.parse_args()
+
+    classifier = LLMIntentClassifier(provider=OpenBreakerProvider())
+    examples = [e for details in classifier.intent_categories.values() for e in details.get("examples") or []]
+    lowered = [e.lower() for e in examples] * args.repeat
+    queries = examples * args.repeat
+
+    tables = [("general", GENERAL_RULES, GENERAL_MATCHER)]
+    tables += [(context, CONTEXT_RULES[context], CONTEXT_MATCHERS[context]) for context in CONTEXT_RULES]
+
+    print(f"{len(queries)} queries ({len(examples)} examples x {args.repeat})")
+    print(f"  {'table':<10} {'rules':>5} {'rule-by-rule us':>16} {'compiled us':>12} {'same':>5}")
+    for name, rules, matcher in tables:
+        same = all(match_rule_by_rule(rules, text) == matcher.match(text) for text in lowered[:len(examples)])
+        naive = per_query_us(lambda text: match_rule_by_rule(rules, text), lowered)
+        compiled = per_query_us(matcher.match, lowered)
+        print(f"  {name:<10} {len(rules):>5} {naive:>16.2f} {compiled:>12.2f} {'yes' if same else 'NO':>5}")
+
+    print("\nclassify_intent with the breaker open (end to end):")
+    for context in [None, *CONTEXT_RULES]:
+        cost = per_query_us(lambda query: classifier.classify_intent(query, context), queries)
+        print(f"  {context or 'general':<10} {cost:>10.1f} us/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark intent prompt construction.
+
+Compares, per context, building the classification prompt from scratch
+(filtering the intent categories and formatting every intent description
+and example, as done before prompts were compiled) with the classifier's
+compiled prompts (static prefix cached per context and intent-set
+version, only the doctor input appended), and checks both produce the
+same prompt.
+
+    python dev-tools/intent_prompt_benchmark.py --iterations 20000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "packages" / "core" / "src"))
+
+from smartdoc_core.intent.classifier import LLMIntentClassifier
+from smartdoc_core.llm.providers.base import LLMProvider
+
+QUESTION = "What medications is she taking at the moment?"
+
+
+class UnusedProvider(LLMProvider):
+    model = "unused"
+
+    def generate(self, prompt, **kwargs):
+        raise RuntimeError("the benchmark builds prompts only")
+
+
+def build_from_scratch(classifier, context, doctor_input):
+    """The prompt as built before compilation: filter intents, then format everything."""
+    builder = classifier.prompt_builder
+    if context is None:
+        return builder.build_general(doctor_input=doctor_input, intent_categories=classifier.intent_categories)
+    valid_intents = classifier._valid_intents_for_context(context)
+    filtered_intents = {
+        intent_id: details for intent_id, details in classifier.intent_categories.items() if intent_id in valid_intents
+    }
+    return builder.build_context_aware(doctor_input=doctor_input, context=context, filtered_intents=filtered_intents)
+
+
+def build_compiled(classifier, context, doctor_input):
+    return classifier._compiled_prompt(context).render(classifier.prompt_builder, doctor_input)
+
+
+def per_call_us(fn, iterations):
+    started = time.perf_counter()
+    for i in range(iterations):
+        fn(f"{QUESTION} #{i}")
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10000, help="Prompts built per measurement")
+    args = parser.parse_args()
+
+    classifier = LLMIntentClassifier(provider=UnusedProvider())
+    print(f"{len(classifier.intent_categories)} intents, {args.iterations} prompts per measurement")
+    print(f"  {'context':<10} {'chars':>6} {'from scratch us':>16} {'compiled us':>12} {'speed-up':>9} {'same':>5}")
+    for context in [None, "anamnesis", "exam", "labs"]:
+        prompt = build_compiled(classifier, context, QUESTION)
+        same = prompt == build_from_scratch(classifier, context, QUESTION)
+        scratch = per_call_us(lambda q: build_from_scratch(classifier, context, q), args.iterations)
+        compiled = per_call_us(lambda q: build_compiled(classifier, context, q), args.iterations)
+        print(
+            f"  {context or 'general':<10} {len(prompt):>6} {scratch:>16.2f} {compiled:>12.2f} "
+            f"{scratch / compiled:>8.1f}x {'yes' if same else 'NO':>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Report prompt-prefix reuse for recorded LLM traffic.
+
+Ollama re-evaluates a prompt only from the first character that differs
+from the prompt cached in the serving slot. This tool replays the prompts
+of one or more cassettes in recorded order and reports, per call site,
+how much of each prompt matches an earlier one - an estimate of the
+prompt-eval work the prefix cache saves.
+
+Record with prompts stored, e.g.
+
+    SMARTDOC_LLM_CASSETTE_MODE=record SMARTDOC_LLM_CASSETTE=data/cassettes/before.jsonl.gz \\
+        (with llm.cassette.store_prompts: true)
+
+then compare layouts by passing several cassettes:
+
+    python dev-tools/prompt_prefix_report.py data/cassettes/before.jsonl.gz data/cassettes/after.jsonl.gz
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "packages" / "core" / "src"))
+
+from smartdoc_core.config.settings import config
+from smartdoc_core.llm.prompt_layout import prefix_reuse
+from smartdoc_core.llm.providers.cassette import iter_records
+
+
+def load_prompts(path):
+    """(call site, prompt) pairs of a cassette, in recorded order."""
+    prompts = []
+    for record in iter_records(path):
+        if "prompt" in record:
+            prompts.append((record.get("call_site") or "default", record["prompt"]))
+    return prompts
+
+
+def print_report(path, prompts, slots):
+    per_site, total = prefix_reuse(prompts, slots=slots)
+    print(f"\n{path}  ({len(prompts)} prompts, {slots} slot(s))")
+    print(f"  {'call site':<20} {'calls':>6} {'avg chars':>10} {'reused':>8} {'saved tok':>10} {'eval tok':>10}")
+    for site, reuse in [*per_site.items(), ("TOTAL", total)]:
+        avg = reuse.prompt_chars / reuse.calls if reuse.calls else 0
+        print(
+            f"  {site:<20} {reuse.calls:>6} {avg:>10.0f} {reuse.reuse_ratio:>8.1%} "
+            f"{reuse.saved_tokens:>10.0f} {reuse.evaluated_tokens:>10.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cassettes", nargs="+", help="Cassettes recorded with llm.cassette.store_prompts=true")
+    parser.add_argument(
+        "--slots", type=int, default=None, help="Server parallel slots (default: ollama.num_parallel)"
+    )
+    args = parser.parse_args()
+    slots = args.slots or config.ollama_num_parallel
+
+    for path in args.cassettes:
+        prompts = load_prompts(path)
+        if not prompts:
+            print(f"\n{path}: no prompts stored (record with llm.cassette.store_prompts: true)")
+            continue
+        print_report(path, prompts, slots)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Replay recorded sessions through the engine and report throughput.
+
+Record a cassette first by running the API with
+    SMARTDOC_LLM_CASSETTE_MODE=record SMARTDOC_LLM_CASSETTE=data/cassettes/prod.jsonl.gz
+then replay the doctor queries of those sessions offline:
+
+    python dev-tools/replay_benchmark.py data/cassettes/prod.jsonl.gz queries.jsonl \
+        --reproduce-latency --sessions-in-parallel 8
+
+``queries.jsonl`` holds one {"session_id", "context", "query"} object per
+line, in the order the queries were asked. Replays must use the same case
+file, prompts and model routing as the recording, otherwise requests miss
+the cassette (reported as misses).
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "packages" / "core" / "src"))
+
+from smartdoc_core.config.settings import config
+from smartdoc_core.llm.factory import build_provider_stack
+from smartdoc_core.llm.providers.cassette import ReplayProvider
+from smartdoc_core.simulation.engine import IntentDrivenDisclosureManager
+
+
+def load_sessions(path):
+    """Group queries by session, keeping their order."""
+    sessions = OrderedDict()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                q = json.loads(line)
+                sessions.setdefault(q["session_id"], []).append(q)
+    return sessions
+
+
+def run_session(engine, session_id, queries):
+    latencies, failures = [], 0
+    for q in queries:
+        started = time.perf_counter()
+        result = engine.process_doctor_query(session_id, q["query"], q.get("context", "anamnesis"))
+        latencies.append(time.perf_counter() - started)
+        if not result.get("success"):
+            failures += 1
+    return latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cassette", help="Cassette recorded with llm.cassette.mode=record")
+    parser.add_argument("queries", help="JSON Lines file of {session_id, context, query}")
+    parser.add_argument("--reproduce-latency", action="store_true", help="Replay with recorded latencies")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier for recorded latencies")
+    parser.add_argument("--sessions-in-parallel", type=int, default=1)
+    parser.add_argument("--with-cache", action="store_true", help="Keep the LLM response cache enabled")
+    args = parser.parse_args()
+
+    config.llm_settings["cassette"] = {
+        "mode": "replay",
+        "path": args.cassette,
+        "reproduce_latency": args.reproduce_latency,
+        "latency_scale": args.latency_scale,
+    }
+    if not args.with_cache:
+        config.llm_settings["cache"] = {"enabled": False}
+
+    provider = build_provider_stack()
+    engine = IntentDrivenDisclosureManager(provider=provider, debug=False)
+    sessions = load_sessions(args.queries)
+    total_queries = sum(len(q) for q in sessions.values())
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.sessions_in_parallel)) as pool:
+        results = list(pool.map(lambda item: run_session(engine, *item), sessions.items()))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(l for session_latencies, _ in results for l in session_latencies)
+    failures = sum(f for _, f in results)
+    print(f"Sessions: {len(sessions)}  queries: {total_queries}  failures: {failures}")
+    print(f"Wall time: {elapsed:.2f}s  throughput: {total_queries / elapsed:.2f} queries/s")
+    if latencies:
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        print(f"Per-query latency: median {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+
+    replay = provider
+    while replay is not None and not isinstance(replay, ReplayProvider):
+        replay = replay.__dict__.get("inner")
+    if replay is not None:
+        stats = replay.stats()
+        print(f"Cassette: {stats['hits']} hits, {stats['misses']} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -42,9 +42,10 @@ def test_enhanced_intent_classification():
         correct_classifications = 0
         total_tests = len(test_queries)
 
-        for query, expected_intent in test_queries:
-            # Test with anamnesis context
-            result = classifier.classify_intent_with_context(query, "anamnesis")
+        # Classify all queries with anamnesis context concurrently
+        results = classifier.classify_many([query for query, _ in test_queries], "anamnesis")
+
+        for (query, expected_intent), result in zip(test_queries, results):
             classified_intent = result['intent_id']
             confidence = result['confidence']
 
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Train the local linear intent model.
+
+Builds a character n-gram softmax model from the example utterances of
+the intent categories plus the user messages stored by the API whose
+classification came from the LLM path (``meta.intent_tier``) and was
+confident enough (``meta.intent_confidence``), and writes it as a versioned artifact into the
+directory the ``linear`` cascade tier loads from (intent.cascade.tiers).
+
+    python dev-tools/train_intent_model.py --db apps/api/instance/smartdoc_dev.sqlite3
+    python dev-tools/train_intent_model.py --no-history --holdout 0.2
+
+The tier loads the newest artifact when the API starts.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "packages" / "core" / "src"))
+
+from smartdoc_core.config.settings import config
+from smartdoc_core.intent.classifier import LLMIntentClassifier
+from smartdoc_core.intent.linear import history_examples, train_linear_model, training_examples
+from smartdoc_core.llm.providers.base import LLMProvider
+
+DEFAULT_DB = "apps/api/instance/smartdoc_dev.sqlite3"
+
+
+class UnusedProvider(LLMProvider):
+    model = "unused"
+
+    def generate(self, prompt, **kwargs):
+        raise RuntimeError("training does not call the LLM")
+
+
+def load_user_messages(db_path):
+    """(content, meta) of every stored user message."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute("SELECT content, meta FROM messages WHERE role = 'user'").fetchall()
+    finally:
+        conn.close()
+
+
+def holdout_report(examples, fraction, seed, **train_kwargs):
+    """Accuracy of a model trained without a random ``fraction`` of the examples, on that fraction."""
+    shuffled = list(examples)
+    random.Random(seed).shuffle(shuffled)
+    cut = max(1, int(len(shuffled) * fraction))
+    test, train = shuffled[:cut], shuffled[cut:]
+    model = train_linear_model(train, **train_kwargs)
+    known = [e for e in test if e.intent_id in model.intent_ids]
+    top = [model.predict(e.text)[0] for e in known]
+    correct = sum(intent == e.intent_id for (intent, _), e in zip(top, known))
+    print(f"Holdout: {correct}/{len(known)} correct ({correct / max(1, len(known)):.1%})")
+    for threshold in (0.5, 0.7, 0.8, 0.9):
+        accepted = [(intent == e.intent_id) for (intent, p), e in zip(top, known) if p >= threshold]
+        if accepted:
+            print(
+                f"  p >= {threshold:.1f}: answers {len(accepted) / len(known):.1%}, "
+                f"precision {sum(accepted) / len(accepted):.1%}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"API SQLite database (default: {DEFAULT_DB})")
+    parser.add_argument("--no-history", action="store_true", help="Train on the intent examples only")
+    parser.add_argument("--min-confidence", type=float, default=0.9, help="Lowest stored confidence used as a label")
+    parser.add_argument("--out", default="data/models/intent_linear", help="Artifact directory (relative to repo root)")
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--holdout", type=float, default=0.0, help="Also report accuracy on this held-out fraction")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    classifier = LLMIntentClassifier(provider=UnusedProvider())
+    history = []
+    if not args.no_history:
+        db_path = config.resolve_path(args.db)
+        if not os.path.exists(db_path):
+            parser.error(f"database not found: {db_path} (use --no-history to train on the examples only)")
+        history = history_examples(
+            load_user_messages(db_path), classifier.intent_categories, min_confidence=args.min_confidence
+        )
+    examples = training_examples(classifier.intent_categories, history)
+    print(f"Training on {len(examples)} utterances ({len(history)} LLM history labels >= {args.min_confidence})")
+
+    if args.holdout:
+        holdout_report(examples, args.holdout, args.seed, epochs=args.epochs)
+
+    started = time.perf_counter()
+    model = train_linear_model(
+        examples,
+        epochs=args.epochs,
+        metadata={"intent_set": classifier.intent_set_id, "min_confidence": args.min_confidence},
+    )
+    path = os.path.join(config.resolve_path(args.out), f"intent-linear-{model.version}.npz")
+    model.save(path)
+    print(
+        f"Model {model.version}: {len(model.intent_ids)} intents, train accuracy {model.metadata['train_accuracy']:.1%}, "
+        f"{time.perf_counter() - started:.1f}s -> {path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ Enhanced with structured validation, rubric-based scoring, and research reliabil
 """
 
 from __future__ import annotations
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
 import json
 import re
@@ -13,8 +13,10 @@ from pydantic import ValidationError
 
 from smartdoc_core.config.settings import config
 from smartdoc_core.utils.logger import sys_logger
+from smartdoc_core.llm import get_default_provider, llm_call
+from smartdoc_core.llm.context import DEEP_BIAS, EVALUATOR, EVALUATOR_REPAIR
 from smartdoc_core.llm.providers.base import LLMProvider
-from smartdoc_core.llm.providers.ollama import OllamaProvider
+from smartdoc_core.llm.structured import StructuredOutput, json_schema_for, parse_structured
 from smartdoc_core.clinical.evaluation_schemas import (
     SimplifiedClinicalEvaluation, BiasAnalysis, ReliabilityMetrics, ResearchEvaluationOutput
 )
@@ -45,7 +47,7 @@ class ClinicalEvaluator:
         enable_reliability_tracking: bool = True,
         temperature: float = 0.1,  # Lower temperature for more consistent scoring
     ):
-        self.provider = provider or OllamaProvider(config.OLLAMA_BASE_URL, config.OLLAMA_MODEL)
+        self.provider = provider or get_default_provider()
         self.model_name = model_name or getattr(self.provider, "model", config.OLLAMA_MODEL)
         self.enable_validation = enable_validation
         self.enable_reliability_tracking = enable_reliability_tracking
@@ -70,64 +72,128 @@ class ClinicalEvaluator:
             prompt = self._build_rubric_prompt(inputs)
 
             # Generate with research-appropriate parameters
-            raw_response = self.provider.generate(
-                prompt,
-                temperature=self.temperature,  # Lower temperature for consistency
-                top_p=0.9,
-                timeout_s=150,  # More time for complex evaluation
-            ).strip()
+            with llm_call(call_site=EVALUATOR):
+                output = self._generate_structured(
+                    prompt,
+                    SimplifiedClinicalEvaluation,
+                    temperature=self.temperature,  # Lower temperature for consistency
+                    top_p=0.9,
+                    timeout_s=150,  # More time for complex evaluation
+                )
 
-            # Extract and validate JSON with robust parsing
-            evaluation_json, extraction_success = self._extract_json_robust(raw_response)
-
-            if self.enable_validation and extraction_success:
-                # Validate against Pydantic schema
-                try:
-                    validated_evaluation = SimplifiedClinicalEvaluation(**evaluation_json)
-                    evaluation_dict = validated_evaluation.dict()
-                    validation_errors = []
-                except ValidationError as ve:
-                    sys_logger.log_system("warning", f"Validation failed, using repair: {ve}")
-                    # Attempt repair with targeted prompt
-                    evaluation_dict, validation_errors = self._repair_evaluation(raw_response, evaluation_json, ve)
-            else:
-                evaluation_dict = evaluation_json if extraction_success else self._fallback_eval_payload()
-                validation_errors = [] if extraction_success else ["JSON extraction failed"]
-
-            # Build response with reliability metrics
-            response = {
-                "success": True,
-                "evaluation": evaluation_dict,
-                "raw_response": raw_response,
-                "extraction_success": extraction_success,
-                "validation_errors": validation_errors
-            }
-
-            if self.enable_reliability_tracking:
-                response["reliability_metrics"] = self._build_reliability_metrics()
-
-            return response
+            return self._evaluation_from_output(output)
 
         except Exception as e:
             sys_logger.log_system("error", f"Evaluation failed: {e}")
             return self._fallback(inputs)
 
+    def evaluate_variants(
+        self,
+        inputs: EvaluationInputs,
+        temperatures: Sequence[float],
+        max_concurrency: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate the same inputs once per temperature, generating in parallel.
+
+        Used for consistency (variance) testing. Each result has the shape
+        returned by ``evaluate``; a failed run falls back individually
+        without discarding the others.
+        """
+        quality_issues = self._check_response_quality(inputs)
+        if quality_issues:
+            return [self._low_quality_evaluation(inputs, quality_issues) for _ in temperatures]
+
+        prompt = self._build_rubric_prompt(inputs)
+        with llm_call(call_site=EVALUATOR):
+            if isinstance(self.provider, LLMProvider):
+                batch = self.provider.generate_many(
+                    [prompt] * len(temperatures),
+                    max_concurrency=max_concurrency,
+                    per_item_timeout=150,
+                    item_options=[{"temperature": t} for t in temperatures],
+                    top_p=0.9,
+                    **self._structured_options(SimplifiedClinicalEvaluation),
+                )
+                outputs = [
+                    (None, item.error) if item.error is not None
+                    else (parse_structured(item.text, SimplifiedClinicalEvaluation), None)
+                    for item in batch
+                ]
+            else:
+                outputs = []
+                for t in temperatures:
+                    try:
+                        raw = self.provider.generate(prompt, temperature=t, top_p=0.9, timeout_s=150)
+                        outputs.append((StructuredOutput(raw=raw), None))
+                    except Exception as e:
+                        outputs.append((None, e))
+
+        results = []
+        for temperature, (output, error) in zip(temperatures, outputs):
+            try:
+                if error is not None:
+                    raise error
+                result = self._evaluation_from_output(output)
+                if "reliability_metrics" in result:
+                    result["reliability_metrics"]["model_temperature"] = temperature
+            except Exception as e:
+                sys_logger.log_system("error", f"Evaluation at temperature {temperature} failed: {e}")
+                result = self._fallback(inputs)
+            results.append(result)
+        return results
+
+    def _evaluation_from_output(self, output: StructuredOutput) -> Dict[str, Any]:
+        """Validate (and repair if needed) an evaluation from a structured generation."""
+        raw_response = output.raw.strip()
+        evaluation_json, extraction_success = self._decoded_json(output)
+
+        if self.enable_validation and extraction_success:
+            # Validate against Pydantic schema (already done for parsed structured output)
+            try:
+                validated_evaluation = output.parsed if output.ok else SimplifiedClinicalEvaluation(**evaluation_json)
+                evaluation_dict = validated_evaluation.dict()
+                validation_errors = []
+            except ValidationError as ve:
+                sys_logger.log_system("warning", f"Validation failed, using repair: {ve}")
+                # Attempt repair with targeted prompt
+                evaluation_dict, validation_errors = self._repair_evaluation(raw_response, evaluation_json, ve)
+        else:
+            evaluation_dict = evaluation_json if extraction_success else self._fallback_eval_payload()
+            validation_errors = [] if extraction_success else ["JSON extraction failed"]
+
+        # Build response with reliability metrics
+        response = {
+            "success": True,
+            "evaluation": evaluation_dict,
+            "raw_response": raw_response,
+            "extraction_success": extraction_success,
+            "validation_errors": validation_errors
+        }
+
+        if self.enable_reliability_tracking:
+            response["reliability_metrics"] = self._build_reliability_metrics()
+
+        return response
+
     def deep_bias_analysis(
         self, dialogue_transcript: List[Dict[str, Any]], final_diagnosis: str
     ) -> Dict[str, Any]:
         """Enhanced bias analysis with structured validation and evidence linking."""
         try:
             prompt = self._build_evidence_based_bias_prompt(dialogue_transcript, final_diagnosis)
-            raw_response = self.provider.generate(
-                prompt, temperature=0.1, top_p=0.9, timeout_s=120  # Even lower temp for bias detection
-            ).strip()
+            with llm_call(call_site=DEEP_BIAS):
+                output = self._generate_structured(
+                    prompt, BiasAnalysis, temperature=0.1, top_p=0.9, timeout_s=120,  # Even lower temp for bias detection
+                )
+            raw_response = output.raw.strip()
 
             # Extract and validate JSON
-            bias_json, extraction_success = self._extract_json_robust(raw_response)
+            bias_json, extraction_success = self._decoded_json(output)
 
             if self.enable_validation and extraction_success:
                 try:
-                    validated_bias = BiasAnalysis(**bias_json)
+                    validated_bias = output.parsed if output.ok else BiasAnalysis(**bias_json)
                     bias_dict = validated_bias.dict()
                     validation_errors = []
                 except ValidationError as ve:
@@ -182,7 +248,11 @@ class ClinicalEvaluator:
         start_idx = response.find(self.json_start)
         end_idx = response.rfind(self.json_end)
 
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
+        if start_idx != -1 and end_idx <= start_idx:
+            # Generation stopped at the end marker, which is not returned
+            end_idx = len(response)
+
+        if start_idx != -1:
             json_content = response[start_idx + len(self.json_start):end_idx].strip()
             try:
                 return json.loads(json_content), True
@@ -249,14 +319,15 @@ VALIDATION ERRORS:
 Return ONLY the corrected JSON between {self.json_start} and {self.json_end}:"""
 
         try:
-            repair_response = self.provider.generate(
-                repair_prompt, temperature=0.1, top_p=0.8, timeout_s=60
-            ).strip()
+            with llm_call(call_site=EVALUATOR_REPAIR):
+                repair_output = self._generate_structured(
+                    repair_prompt, SimplifiedClinicalEvaluation, temperature=0.1, top_p=0.8, timeout_s=60,
+                )
 
-            repaired_json, success = self._extract_json_robust(repair_response)
+            repaired_json, success = self._decoded_json(repair_output)
             if success:
                 try:
-                    validated = SimplifiedClinicalEvaluation(**repaired_json)
+                    validated = repair_output.parsed if repair_output.ok else SimplifiedClinicalEvaluation(**repaired_json)
                     return validated.dict(), []
                 except ValidationError as ve:
                     return repaired_json, [f"Repair validation failed: {ve}"]
@@ -267,6 +338,31 @@ Return ONLY the corrected JSON between {self.json_start} and {self.json_end}:"""
         # Final fallback
         return self._fallback_eval_payload(), ["Validation failed, using fallback"]
 
+    def _generate_structured(self, prompt: str, schema_cls, **options: Any) -> StructuredOutput:
+        """
+        Generate output for ``schema_cls``.
+
+        Providers with structured-output support decode against the schema
+        and the response is parsed straight into the model, so it validates
+        first time and the repair round-trip is skipped. Other providers
+        return free text (``parsed`` None) for ``_decoded_json`` to scrape.
+        """
+        if isinstance(self.provider, LLMProvider):
+            return self.provider.generate_structured(prompt, schema_cls, **options)
+        return StructuredOutput(raw=self.provider.generate(prompt, **options))
+
+    def _structured_options(self, schema_cls) -> Dict[str, Any]:
+        """Generation options constraining batched output to ``schema_cls`` (see ``generate_many``)."""
+        if isinstance(self.provider, LLMProvider) and self.provider.supports_structured_output:
+            return {"format": json_schema_for(schema_cls)}
+        return {}
+
+    def _decoded_json(self, output: StructuredOutput) -> Tuple[Dict[str, Any], bool]:
+        """The output's JSON object as decoded by structured parsing, else scraped from the raw text."""
+        if output.data is not None:
+            return output.data, True
+        return self._extract_json_robust(output.raw.strip())
+
     def _simple_type_repairs(self, data: Dict[str, Any], validation_error: ValidationError) -> Dict[str, Any]:
         """Apply simple type conversions to fix common validation errors."""
         repaired = data.copy()
@@ -356,11 +452,25 @@ Return ONLY the corrected JSON between {self.json_start} and {self.json_end}:"""
     def _build_rubric_prompt(self, inp: EvaluationInputs) -> str:
         """Build strict, simplified evaluation prompt focused on quality assessment."""
         reflection = self._fmt_reflection(inp.metacognitive_responses)
-        ctx = inp.case_context or {}
 
         # Enhanced context formatting
         discovered_content = self._fmt_discovered_information(inp.discovered_information)
 
+        # Student-specific data goes last so every evaluation shares the rubric prefix
+        return self._rubric_prefix() + f"""STUDENT'S CLINICAL PERFORMANCE:
+
+Final Diagnosis: {inp.final_diagnosis}
+
+DISCOVERED CLINICAL INFORMATION:
+{discovered_content}
+
+Metacognitive Reflection Questions and Answers:
+{reflection}
+
+Evaluate the student's performance above and return ONLY the JSON described earlier, between {self.json_start} and {self.json_end}."""
+
+    def _rubric_prefix(self) -> str:
+        """Static part of the rubric prompt: case context, scoring criteria and output format."""
         return f"""You are a strict medical education evaluator. Score harshly - most students should score 20-60, excellent students score 70-90, perfect students score 90+.
 
 IMPORTANT: Be very strict with scoring. Poor quality responses should get very low scores (0-30).
@@ -376,16 +486,6 @@ CASE CONTEXT:
 - Common Misdiagnosis: Heart failure exacerbation (due to anchoring on preliminary CXR interpretation)
 - Case has important clinical features that should be discovered to avoid diagnostic error
 
-STUDENT'S CLINICAL PERFORMANCE:
-
-Final Diagnosis: {inp.final_diagnosis}
-
-DISCOVERED CLINICAL INFORMATION:
-{discovered_content}
-
-Metacognitive Reflection Questions and Answers:
-{reflection}
-
 EVALUATE THESE THREE AREAS (0-100 each):
 
 1. INFORMATION GATHERING (0-100):
@@ -431,7 +531,7 @@ Be especially harsh on:
 - Nonsense or joke answers
 - Responses that don't demonstrate understanding of diagnostic error prevention
 
-Return ONLY JSON:
+Return ONLY JSON in this format:
 
 {self.json_start}
 {{
@@ -453,7 +553,9 @@ Return ONLY JSON:
     "key_recommendations": ["Specific actionable advice for clinical improvement"]
   }}
 }}
-{self.json_end}"""
+{self.json_end}
+
+"""
 
     def _build_evidence_based_bias_prompt(self, dialogue: List[Dict[str, Any]], final_dx: str) -> str:
         """Build evidence-based bias analysis prompt with transcript linking."""
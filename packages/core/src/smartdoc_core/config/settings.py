@@ -1,8 +1,8 @@
 # config.py - Unified YAML-based configuration management for SmartDoc
 import os
 import yaml
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List
 
 
 @dataclass
@@ -12,6 +12,10 @@ class SmartDocConfig:
     Falls back to defaults if YAML config is not available.
     """
 
+    # Debug mode (app.debug): attach diagnostics such as LLM call metrics
+    # to engine results
+    debug: bool = False
+
     # Case Data Configuration
     case_file: str = "data/raw/cases/intent_driven_case.json"
 
@@ -19,15 +23,35 @@ class SmartDocConfig:
     ollama_base_url: str = "http://172.19.0.1:11434"
     ollama_model: str = "gemma3:4b-it-q4_K_M"
 
+    # Shared HTTP connection pool to Ollama
+    ollama_pool_connections: int = 4
+    ollama_pool_maxsize: int = 16
+    ollama_max_retries: int = 2
+    # Upper bound on concurrent async (agenerate) connections per event loop
+    ollama_async_max_connections: int = 256
+    # Parallel generation slots on the Ollama server (OLLAMA_NUM_PARALLEL)
+    ollama_num_parallel: int = 4
+    # Additional equivalent Ollama servers; when set, requests are balanced
+    # across these URLs instead of going to ollama_base_url alone
+    ollama_replicas: List[str] = field(default_factory=list)
+
+    # LLM call-layer features (cache, ...) keyed by feature name, from the
+    # `llm:` YAML section
+    llm_settings: Dict[str, Any] = field(default_factory=dict)
+
+    # API admission control for engine turns, from the `admission:` YAML section
+    admission_settings: Dict[str, Any] = field(default_factory=dict)
+
+    # Intent classification features (cascade, ...) keyed by feature name,
+    # from the `intent:` YAML section
+    intent_settings: Dict[str, Any] = field(default_factory=dict)
+
     @classmethod
     def from_yaml(cls, config_name: Optional[str] = None) -> "SmartDocConfig":
         """Create configuration from YAML files with fallbacks."""
         config_name = config_name or os.getenv("SMARTDOC_ENV", "dev")
 
-        # Navigate to repo root to find configs directory
-        # From packages/core/src/smartdoc_core/config/settings.py -> repo root
-        current_dir = os.path.dirname(__file__)
-        repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))))
+        repo_root = cls.repo_root()
         config_path = os.path.join(repo_root, "configs", f"{config_name}.yaml")
 
         # Load default config first
@@ -57,14 +81,30 @@ class SmartDocConfig:
 
         ollama_base_url = "http://172.19.0.1:11434"
         ollama_model = "gemma3:4b-it-q4_K_M"
+        pool_settings: Dict[str, Any] = {}
         if "ollama" in config_data:
             ollama_base_url = config_data["ollama"].get("base_url", ollama_base_url)
             ollama_model = config_data["ollama"].get("model", ollama_model)
+            for key in (
+                "pool_connections",
+                "pool_maxsize",
+                "max_retries",
+                "async_max_connections",
+                "num_parallel",
+            ):
+                if key in config_data["ollama"]:
+                    pool_settings[f"ollama_{key}"] = int(config_data["ollama"][key])
+            pool_settings["ollama_replicas"] = list(config_data["ollama"].get("replicas") or [])
 
         return cls(
+            debug=bool((config_data.get("app") or {}).get("debug", False)),
             case_file=case_file,
             ollama_base_url=ollama_base_url,
             ollama_model=ollama_model,
+            llm_settings=config_data.get("llm") or {},
+            admission_settings=config_data.get("admission") or {},
+            intent_settings=config_data.get("intent") or {},
+            **pool_settings,
         )
 
     @classmethod
@@ -75,11 +115,61 @@ class SmartDocConfig:
 
         # Override with environment variables if present
         config.case_file = os.getenv("SMARTDOC_CASE_FILE", config.case_file)
+        if "SMARTDOC_DEBUG" in os.environ:
+            config.debug = os.environ["SMARTDOC_DEBUG"].lower() in ("1", "true", "yes")
         config.ollama_base_url = os.getenv("SMARTDOC_OLLAMA_BASE_URL", config.ollama_base_url)
         config.ollama_model = os.getenv("SMARTDOC_OLLAMA_MODEL", config.ollama_model)
+        config.ollama_pool_maxsize = int(
+            os.getenv("SMARTDOC_OLLAMA_POOL_MAXSIZE", config.ollama_pool_maxsize)
+        )
+        config.ollama_max_retries = int(
+            os.getenv("SMARTDOC_OLLAMA_MAX_RETRIES", config.ollama_max_retries)
+        )
+        config.ollama_num_parallel = int(
+            os.getenv("SMARTDOC_OLLAMA_NUM_PARALLEL", config.ollama_num_parallel)
+        )
+        if os.getenv("SMARTDOC_OLLAMA_REPLICAS"):
+            config.ollama_replicas = [
+                url.strip() for url in os.environ["SMARTDOC_OLLAMA_REPLICAS"].split(",") if url.strip()
+            ]
+        if "SMARTDOC_LLM_CASSETTE_MODE" in os.environ:
+            config.llm_settings.setdefault("cassette", {})["mode"] = os.environ["SMARTDOC_LLM_CASSETTE_MODE"]
+        if "SMARTDOC_LLM_CASSETTE" in os.environ:
+            config.llm_settings.setdefault("cassette", {})["path"] = os.environ["SMARTDOC_LLM_CASSETTE"]
+        if "SMARTDOC_LLM_WARMUP" in os.environ:
+            config.llm_settings.setdefault("warmup", {})["enabled"] = (
+                os.environ["SMARTDOC_LLM_WARMUP"].lower() in ("1", "true", "yes")
+            )
+        if "SMARTDOC_LLM_CACHE_DB" in os.environ:
+            config.llm_settings.setdefault("cache", {})["db_path"] = os.environ["SMARTDOC_LLM_CACHE_DB"]
 
         return config
 
+    @staticmethod
+    def repo_root() -> str:
+        """Return the repository root (where the configs/ directory lives)."""
+        # From packages/core/src/smartdoc_core/config/settings.py -> repo root
+        current_dir = os.path.dirname(__file__)
+        return os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))))
+
+    def resolve_path(self, path: str) -> str:
+        """Resolve a config path relative to the repository root."""
+        if os.path.isabs(path):
+            return path
+        return os.path.normpath(os.path.join(self.repo_root(), path))
+
+    def ollama_urls(self) -> List[str]:
+        """Return the Ollama servers to use: the replica set, or the single base URL."""
+        return list(self.ollama_replicas) or [self.ollama_base_url]
+
+    def llm_section(self, name: str) -> Dict[str, Any]:
+        """Get the settings for one LLM call-layer feature (empty if not configured)."""
+        return dict(self.llm_settings.get(name) or {})
+
+    def intent_section(self, name: str) -> Dict[str, Any]:
+        """Get the settings for one intent classification feature (empty if not configured)."""
+        return dict(self.intent_settings.get(name) or {})
+
     @staticmethod
     def _deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
         """Deep merge two dictionaries."""
@@ -104,6 +194,12 @@ class SmartDocConfig:
         if not self.ollama_model:
             errors.append("ollama_model cannot be empty")
 
+        if self.ollama_pool_maxsize < 1:
+            errors.append("ollama_pool_maxsize must be at least 1")
+
+        if self.ollama_num_parallel < 1:
+            errors.append("ollama_num_parallel must be at least 1")
+
         if errors:
             raise ValueError(f"Configuration validation failed: {'; '.join(errors)}")
 
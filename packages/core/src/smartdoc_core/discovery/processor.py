@@ -9,10 +9,14 @@ import json
 from typing import Dict, Any, Optional
 from smartdoc_core.utils.logger import sys_logger
 from smartdoc_core.config.settings import config
+from smartdoc_core.discovery.types import DiscoveryLLMOut
 
 try:
     # keep optional import so we can still use the old LLM path in "hybrid" or "llm"
-    from smartdoc_core.llm.providers.ollama import OllamaProvider
+    from smartdoc_core.llm import get_default_provider, llm_call
+    from smartdoc_core.llm.context import DISCOVERY
+    from smartdoc_core.llm.providers.base import LLMProvider
+    from smartdoc_core.llm.structured import json_schema_for
     HAVE_LLM = True
 except Exception:
     HAVE_LLM = False
@@ -28,7 +32,7 @@ class DiscoveryClassifier:
 
     def __init__(self, *, provider=None, mode: Optional[str] = None, schema: Optional[Dict] = None):
         self.mode = (mode or getattr(config, "DISCOVERY_MODE", "deterministic")).lower()
-        self.provider = provider or (OllamaProvider(config.OLLAMA_BASE_URL, config.OLLAMA_MODEL) if HAVE_LLM else None)
+        self.provider = provider or (get_default_provider() if HAVE_LLM else None)
         self.schema = schema or {}
         sys_logger.log_system("info", f"DiscoveryClassifier mode={self.mode}")
 
@@ -65,8 +69,19 @@ class DiscoveryClassifier:
         if self.mode in ("hybrid", "llm") and self.provider:
             try:
                 prompt = self._build_min_prompt(block_type, intent_id, doctor_question, patient_response, clinical_content)
-                text = self.provider.generate(prompt, temperature=0.1, top_p=0.9, timeout_s=90).strip()
-                parsed = self._parse_json(text, clinical_content, block_type, intent_id)
+                with llm_call(call_site=DISCOVERY):
+                    if isinstance(self.provider, LLMProvider):
+                        output = self.provider.generate_structured(
+                            prompt, DiscoveryLLMOut, json_schema=self._output_schema(),
+                            temperature=0.1, top_p=0.9, timeout_s=90
+                        )
+                        dto, text = output.parsed, output.raw.strip()
+                    else:
+                        dto, text = None, self.provider.generate(prompt, temperature=0.1, top_p=0.9, timeout_s=90).strip()
+                if dto is not None:
+                    parsed = self._from_dto(dto, clinical_content, intent_id)
+                else:
+                    parsed = self._parse_json(text, clinical_content, block_type, intent_id)
                 parsed["reasoning"] = "LLM classification (fallback)"
                 return parsed
             except Exception as e:
@@ -121,6 +136,23 @@ Context:
 - Content: {content}
 """
 
+    def _output_schema(self) -> Dict[str, Any]:
+        """JSON schema for DiscoveryLLMOut without ``reasoning``, which is replaced anyway."""
+        schema = json_schema_for(DiscoveryLLMOut)
+        schema["properties"].pop("reasoning", None)
+        schema["required"] = [f for f in schema.get("required", []) if f != "reasoning"]
+        return schema
+
+    def _from_dto(self, dto: DiscoveryLLMOut, content: str, intent_id: str) -> Dict[str, Any]:
+        return {
+            "label": dto.label,
+            "category": dto.category,
+            "summary": dto.summary,
+            "confidence": dto.confidence,
+            "original_content": content,
+            "intent_context": intent_id,
+        }
+
     def _parse_json(self, text: str, content: str, block_type: str, intent_id: str) -> Dict[str, Any]:
         i, j = text.find("{"), text.rfind("}") + 1
         if i >= 0 and j > 0:
@@ -4,23 +4,26 @@ Ollama LLM Provider
 Implements the LLM provider interface for Ollama local models.
 """
 
-import requests
+from typing import Optional
+from smartdoc_core.llm.providers.transport import PooledTransport, get_shared_transport
 from .base import LLMProvider
 
 
 class OllamaProvider(LLMProvider):
     """Ollama LLM provider implementation."""
 
-    def __init__(self, base_url: str, model: str):
+    def __init__(self, base_url: str, model: str, transport: Optional[PooledTransport] = None):
         """
         Initialize Ollama provider.
 
         Args:
             base_url: Ollama API base URL
             model: Model name to use
+            transport: HTTP transport (defaults to the shared pooled transport)
         """
         self.base_url = base_url.rstrip("/")
         self.model = model
+        self.transport = transport or get_shared_transport()
 
     def generate(
         self,
@@ -43,7 +46,7 @@ class OllamaProvider(LLMProvider):
 
         headers = {"Content-Type": "application/json"}
 
-        response = requests.post(
+        response = self.transport.post(
             f"{self.base_url}/api/generate",
             json=payload,
             headers=headers,
@@ -24,4 +24,4 @@ class DiscoveryLLMOut(BaseModel):
     category: str
     summary: str
     confidence: float = Field(ge=0, le=1)
-    reasoning: str
+    reasoning: Optional[str] = None  # Not requested: the classifier sets its own
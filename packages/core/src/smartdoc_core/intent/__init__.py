@@ -4,9 +4,10 @@ Intent Classification Module
 Provides LLM-based intent classification for clinical queries.
 """
 
+from .cascade import IntentCascade, IntentTier
 from .classifier import LLMIntentClassifier
 
-__all__ = ["LLMIntentClassifier"]
+__all__ = ["LLMIntentClassifier", "IntentCascade", "IntentTier"]
 
 # Convenience alias
 IntentClassifier = LLMIntentClassifier
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Intent Classification Cache
+
+Students ask the same few questions ("what brings her in", "any fever?")
+over and over. Classifications are cached by the normalized question,
+the clinical context, the model answering it and the intent-set version,
+so a repeated question is answered without an LLM call.
+
+Each context has its own LRU memory tier; an optional SQLite tier keeps
+entries across restarts. Only parsed LLM answers are stored: keyword
+fallbacks and unparseable responses are never cached.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from smartdoc_core.llm.providers.cache import MemoryTier, SQLiteTier
+from smartdoc_core.utils.logger import sys_logger
+
+GENERAL = "general"  # Context label of classifications without a context
+
+_APOSTROPHES = re.compile(r"[‘’`]")
+# Word-level expansions first ("won't", "can't"), then suffixes
+_CONTRACTIONS = [
+    (re.compile(r"\bwon't\b"), "will not"),
+    (re.compile(r"\bcan't\b"), "can not"),
+    (re.compile(r"\bshan't\b"), "shall not"),
+    (re.compile(r"\blet's\b"), "let us"),
+    (re.compile(r"\b(it|he|she|that|there|what|where|when|who|how|here)'s\b"), r"\1 is"),
+    (re.compile(r"n't\b"), " not"),
+    (re.compile(r"'re\b"), " are"),
+    (re.compile(r"'ve\b"), " have"),
+    (re.compile(r"'ll\b"), " will"),
+    (re.compile(r"'m\b"), " am"),
+    (re.compile(r"'d\b"), " would"),
+]
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Canonical form of a question for cache lookups.
+
+    Lowercases, expands simple contractions ("what's" -> "what is",
+    "doesn't" -> "does not") and drops punctuation and extra whitespace,
+    so "What's her BP?" and "what is her bp" share an entry.
+    """
+    normalized = _APOSTROPHES.sub("'", text.lower())
+    for pattern, replacement in _CONTRACTIONS:
+        normalized = pattern.sub(replacement, normalized)
+    return _NON_WORD.sub(" ", normalized).strip()
+
+
+class IntentCache:
+    """
+    Classification results keyed by (normalized text, context, model, intent set).
+
+    The memory tier is bounded per context, so the busiest context cannot
+    evict the others. Entries of a previous model or intent set are never
+    returned; the memory tiers are dropped as soon as either changes.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 2048,
+        context_max_entries: Optional[Mapping[str, int]] = None,
+        ttl_s: float = 7 * 86400,
+        min_confidence: float = 0.5,
+        db_path: Optional[str] = None,
+        max_db_entries: int = 50000,
+    ):
+        """
+        Args:
+            max_entries: Memory LRU size per context
+            context_max_entries: Per-context overrides of ``max_entries``
+            ttl_s: Time-to-live of cached classifications in seconds
+            min_confidence: Lowest confidence of a classification worth caching
+            db_path: SQLite file for the persistent tier (None disables it)
+            max_db_entries: Maximum rows kept in the persistent tier
+        """
+        self.max_entries = max_entries
+        self.context_max_entries = dict(context_max_entries or {})
+        self.ttl_s = ttl_s
+        self.min_confidence = min_confidence
+        self._memory: Dict[str, MemoryTier] = {}
+        self._disk = SQLiteTier(db_path, max_db_entries) if db_path else None
+        self._generation: Optional[Tuple[str, str]] = None  # (model, intent set) of the memory tiers
+
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "invalidations": 0, "errors": 0}
+        self._by_context: Dict[str, Dict[str, int]] = {}
+
+    def get(self, text: str, context: Optional[str], model: str, intent_set: str) -> Optional[Dict[str, Any]]:
+        """Return the cached classification of ``text``, or None."""
+        context = context or GENERAL
+        key = self._key(text, context, model, intent_set)
+        tier = self._tier(context, model, intent_set)
+        value = tier.get(key)
+        if value is not None:
+            self._count(context, "memory_hits")
+            return json.loads(value)
+
+        if self._disk:
+            try:
+                row = self._disk.get(key)
+            except sqlite3.Error as e:
+                self._count(context, "errors")
+                sys_logger.log_system("warning", f"Intent cache read failed: {e}")
+                row = None
+            if row is not None:
+                value, expires_at = row
+                tier.put(key, value, expires_at)
+                self._count(context, "disk_hits")
+                return json.loads(value)
+
+        self._count(context, "misses")
+        return None
+
+    def put(
+        self, text: str, context: Optional[str], model: str, intent_set: str, result: Mapping[str, Any]
+    ) -> None:
+        """Cache a classification of ``text`` (ignored below ``min_confidence``)."""
+        if float(result.get("confidence") or 0.0) < self.min_confidence:
+            return
+        context = context or GENERAL
+        key = self._key(text, context, model, intent_set)
+        value = json.dumps({k: result[k] for k in ("intent_id", "confidence", "explanation") if k in result})
+        expires_at = time.time() + self.ttl_s
+        self._tier(context, model, intent_set).put(key, value, expires_at)
+        self._count(context, "stores")
+        if self._disk:
+            try:
+                self._disk.put(key, model, value, expires_at)
+            except sqlite3.Error as e:
+                self._count(context, "errors")
+                sys_logger.log_system("warning", f"Intent cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and hit rates, overall and per context."""
+        with self._lock:
+            counters = dict(self._counters)
+            by_context = {context: dict(c) for context, c in self._by_context.items()}
+            memory = dict(self._memory)
+        for context, c in by_context.items():
+            lookups = c["hits"] + c["misses"]
+            c["hit_rate"] = (c["hits"] / lookups) if lookups else 0.0
+            c["entries"] = len(memory[context]) if context in memory else 0
+            c["evictions"] = memory[context].evictions if context in memory else 0
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": (hits / lookups) if lookups else 0.0,
+            "memory_entries": sum(len(tier) for tier in memory.values()),
+            "disk_enabled": self._disk is not None,
+            "by_context": by_context,
+        }
+
+    def clear(self) -> None:
+        """Drop all cached classifications from both tiers."""
+        with self._lock:
+            for tier in self._memory.values():
+                tier.clear()
+        if self._disk:
+            self._disk.clear()
+
+    # ---- Helpers ----
+    @staticmethod
+    def _key(text: str, context: str, model: str, intent_set: str) -> str:
+        return json.dumps([normalize_query(text), context, model, intent_set])
+
+    def _tier(self, context: str, model: str, intent_set: str) -> MemoryTier:
+        with self._lock:
+            if self._generation != (model, intent_set):
+                if self._generation is not None:
+                    # Model or intent definitions changed: old answers can never match again
+                    for tier in self._memory.values():
+                        tier.clear()
+                    self._counters["invalidations"] += 1
+                self._generation = (model, intent_set)
+            tier = self._memory.get(context)
+            if tier is None:
+                tier = self._memory[context] = MemoryTier(self.context_max_entries.get(context, self.max_entries))
+            return tier
+
+    def _count(self, context: str, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+            context_counters = self._by_context.setdefault(context, {"hits": 0, "misses": 0, "stores": 0})
+            if name in ("memory_hits", "disk_hits"):
+                context_counters["hits"] += 1
+            elif name in ("misses", "stores"):
+                context_counters[name] += 1
+
+
+def build_intent_cache(settings: Mapping[str, Any]) -> Optional[IntentCache]:
+    """
+    Build the cache described by ``intent.cache`` settings.
+
+    Returns:
+        The cache, or None when disabled
+    """
+    if not settings.get("enabled", False):
+        return None
+
+    # Imported here: the config module is only needed to resolve the database path
+    from smartdoc_core.config.settings import config
+
+    db_path = settings.get("db_path")
+    return IntentCache(
+        max_entries=int(settings.get("max_entries", 2048)),
+        context_max_entries={k: int(v) for k, v in (settings.get("contexts") or {}).items()},
+        ttl_s=float(settings.get("ttl_s", 7 * 86400)),
+        min_confidence=float(settings.get("min_confidence", 0.5)),
+        db_path=config.resolve_path(db_path) if db_path else None,
+        max_db_entries=int(settings.get("max_db_entries", 50000)),
+    )
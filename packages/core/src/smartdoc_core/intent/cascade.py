@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Confidence-Gated Intent Cascade
+
+Cheaper classifiers answer a context-aware query first; the query only
+escalates to the next tier (and finally to the primary LLM path) when the
+answer's confidence is below the context's threshold, its intent is not
+valid for the context, or the tier could not answer. Escalations and the
+latency of each tier are tracked so the thresholds can be tuned.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set
+
+from smartdoc_core.llm.context import INTENT_FAST
+from smartdoc_core.llm.metrics import LATENCY_BUCKETS_S, Histogram
+from smartdoc_core.utils.logger import sys_logger
+
+PRIMARY = "primary"  # Name of the final tier (the classifier's LLM path)
+# Other sources of a classification, reported under ``tier`` like the tier names
+CACHED = "cache"  # A repeated question answered from the intent cache
+FALLBACK = "fallback"  # Keyword matching or an unparseable LLM answer
+
+# Escalation reasons
+LOW_CONFIDENCE = "low_confidence"
+INVALID_INTENT = "invalid_intent"
+NO_ANSWER = "no_answer"
+ERROR = "error"
+
+
+@dataclass(frozen=True)
+class IntentQuery:
+    """
+    One classification request as seen by the cascade tiers.
+
+    Attributes:
+        doctor_input: The doctor's question or statement
+        context: Clinical context (anamnesis, exam, labs)
+        valid_intents: Intent IDs allowed in the context
+        prompt: The primary LLM prompt built for the query
+    """
+
+    doctor_input: str
+    context: Optional[str]
+    valid_intents: Optional[Set[str]]
+    prompt: str
+
+
+class IntentTier(ABC):
+    """A classifier the cascade consults before the primary LLM path."""
+
+    name: str = "tier"
+    # Whether the cascade's per-context confidence threshold applies; tiers
+    # with their own acceptance rule (e.g. a similarity margin) opt out
+    confidence_gated: bool = True
+
+    @abstractmethod
+    def classify(self, query: IntentQuery) -> Optional[Dict[str, Any]]:
+        """
+        Classify the query.
+
+        Returns:
+            A classification result (``intent_id``, ``confidence``,
+            ``explanation``, ``original_input``), or None when the tier has
+            no answer. Exceptions escalate the query like a missing answer.
+        """
+
+
+class ModelTier(IntentTier):
+    """
+    The classifier's own LLM prompt sent to a smaller, faster model.
+
+    Requests are tagged with their own call site (``intent_fast`` by
+    default), so they are budgeted, scheduled and measured separately;
+    without an explicit ``model`` the call site's routed profile picks it.
+    """
+
+    def __init__(self, classifier: Any, *, name: str = "fast", model: Optional[str] = None,
+                 call_site: str = INTENT_FAST):
+        """
+        Args:
+            classifier: LLMIntentClassifier whose provider and parsing to use
+            name: Tier name (for stats and results)
+            model: Model to send the prompt to (None = routed by call site)
+            call_site: Call site the requests are tagged with
+        """
+        self.classifier = classifier
+        self.name = name
+        self.model = model
+        self.call_site = call_site
+
+    def classify(self, query: IntentQuery) -> Optional[Dict[str, Any]]:
+        raw, dto = self.classifier._request_intent(
+            query.prompt, query.valid_intents, model=self.model, call_site=self.call_site
+        )
+        if dto is None:
+            try:
+                dto = self.classifier._dto_from_text(raw.strip())
+            except Exception:
+                return None
+        return {
+            "intent_id": dto.intent_id,
+            "confidence": dto.confidence,
+            "explanation": dto.explanation,
+            "original_input": query.doctor_input,
+        }
+
+
+class _TierStats:
+    def __init__(self):
+        self.calls = 0
+        self.accepted = 0
+        self.escalations: Dict[str, int] = {LOW_CONFIDENCE: 0, INVALID_INTENT: 0, NO_ANSWER: 0, ERROR: 0}
+        self.latency = Histogram(LATENCY_BUCKETS_S)
+
+    def snapshot(self) -> Dict[str, Any]:
+        escalated = sum(self.escalations.values())
+        return {
+            "calls": self.calls,
+            "accepted": self.accepted,
+            "escalated": escalated,
+            "escalation_rate": (escalated / self.calls) if self.calls else None,
+            "escalations": dict(self.escalations),
+            "latency_s": self.latency.snapshot(),
+        }
+
+
+class IntentCascade:
+    """
+    Ordered tiers in front of the primary LLM classification.
+
+    A tier's answer is accepted when its intent is valid for the context
+    and its confidence reaches the context's threshold; otherwise the next
+    tier is tried. The primary path always answers. Accepted results carry
+    the answering tier's name under ``tier``.
+    """
+
+    def __init__(
+        self,
+        tiers: Sequence[IntentTier],
+        *,
+        thresholds: Optional[Mapping[str, float]] = None,
+        default_threshold: float = 0.85,
+    ):
+        """
+        Args:
+            tiers: Tiers tried in order before the primary path
+            thresholds: Context -> minimum confidence to accept an answer
+            default_threshold: Threshold for contexts not listed
+        """
+        self.tiers = list(tiers)
+        self.thresholds = dict(thresholds or {})
+        self.default_threshold = default_threshold
+        self._lock = threading.Lock()
+        self._queries = 0
+        self._stats: Dict[str, _TierStats] = {}
+
+    def threshold(self, context: Optional[str]) -> float:
+        return self.thresholds.get(context or "", self.default_threshold)
+
+    def classify(self, query: IntentQuery, final: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Answer from the first tier that clears the gate, else from ``final``."""
+        with self._lock:
+            self._queries += 1
+
+        for tier in self.tiers:
+            started = time.perf_counter()
+            try:
+                result = tier.classify(query)
+                reason = self._rejection(result, query, tier.confidence_gated)
+            except Exception as e:
+                sys_logger.log_system("warning", f"Intent cascade tier '{tier.name}' failed: {e}")
+                result, reason = None, ERROR
+            self._record(tier.name, time.perf_counter() - started, reason)
+            if reason is None:
+                return {**result, "tier": tier.name}
+
+        started = time.perf_counter()
+        result = final()
+        self._record(PRIMARY, time.perf_counter() - started, None)
+        # The final path reports its own fallbacks
+        return {"tier": PRIMARY, **result}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-tier calls, escalations and latency, and the share of queries reaching the primary path."""
+        with self._lock:
+            tiers = {name: stats.snapshot() for name, stats in self._stats.items()}
+            queries = self._queries
+        primary_calls = tiers.get(PRIMARY, {}).get("calls", 0)
+        return {
+            "queries": queries,
+            "escalation_rate": (primary_calls / queries) if queries else None,
+            "thresholds": {**self.thresholds, "default": self.default_threshold},
+            "tiers": tiers,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._queries = 0
+            self._stats.clear()
+
+    def _rejection(
+        self, result: Optional[Dict[str, Any]], query: IntentQuery, confidence_gated: bool = True
+    ) -> Optional[str]:
+        """Why ``result`` must escalate (None = accept)."""
+        if result is None:
+            return NO_ANSWER
+        if query.valid_intents is not None and result.get("intent_id") not in query.valid_intents:
+            return INVALID_INTENT
+        if confidence_gated and float(result.get("confidence") or 0.0) < self.threshold(query.context):
+            return LOW_CONFIDENCE
+        return None
+
+    def _record(self, tier: str, elapsed_s: float, escalation: Optional[str]) -> None:
+        with self._lock:
+            stats = self._stats.get(tier)
+            if stats is None:
+                stats = self._stats[tier] = _TierStats()
+            stats.calls += 1
+            stats.latency.observe(elapsed_s)
+            if escalation is None:
+                stats.accepted += 1
+            else:
+                stats.escalations[escalation] += 1
+
+
+def build_cascade(classifier: Any, settings: Mapping[str, Any]) -> Optional[IntentCascade]:
+    """
+    Build the cascade described by ``intent.cascade`` settings.
+
+    Returns:
+        The cascade, or None when disabled or without tiers
+    """
+    if not settings.get("enabled", False):
+        return None
+
+    tiers: List[IntentTier] = []
+    for spec in settings.get("tiers") or []:
+        kind = spec.get("type", "model")
+        if kind == "model":
+            tiers.append(ModelTier(
+                classifier,
+                name=spec.get("name", "fast"),
+                model=spec.get("model"),
+                call_site=spec.get("call_site", INTENT_FAST),
+            ))
+        elif kind == "linear":
+            # Imported here: needs numpy, like the embedding tier
+            from smartdoc_core.config.settings import config
+            from smartdoc_core.intent.linear import LinearModelTier
+
+            tiers.append(LinearModelTier(
+                classifier,
+                config.resolve_path(spec.get("artifact", "data/models/intent_linear")),
+                name=spec.get("name", "linear"),
+            ))
+        elif kind == "embedding":
+            # Imported here: needs numpy, which only this tier requires
+            from smartdoc_core.intent.embedding import EmbeddingTier, HashingEmbedder, OllamaEmbedder
+
+            if spec.get("embedder", "hashing") == "ollama":
+                embedder = OllamaEmbedder(classifier.provider, spec["embedding_model"])
+            else:
+                embedder = HashingEmbedder(n_features=int(spec.get("n_features", 1 << 14)))
+            tiers.append(EmbeddingTier(
+                classifier,
+                embedder,
+                name=spec.get("name", "embedding"),
+                margin=float(spec.get("margin", 0.15)),
+                min_similarity=float(spec.get("min_similarity", 0.6)),
+            ))
+        else:
+            raise ValueError(f"Unknown intent.cascade tier type: {kind}")
+    if not tiers:
+        return None
+
+    return IntentCascade(
+        tiers,
+        thresholds={k: float(v) for k, v in (settings.get("thresholds") or {}).items()},
+        default_threshold=float(settings.get("default_threshold", 0.85)),
+    )
@@ -4,16 +4,71 @@ LLM-based Intent Classification Service for SmartDoc (Refactored)
 Uses configurable LLM providers to analyze doctor's input and classify clinical interview intents
 """
 
+import contextvars
+import hashlib
 import json
-import time
-from typing import Dict, Any, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Set, Tuple
 from smartdoc_core.utils.logger import sys_logger
-from smartdoc_core.config.settings import config
 
 # Reuse shared LLM providers
-from smartdoc_core.llm.providers import OllamaProvider
+from smartdoc_core.llm import get_default_provider, llm_call
+from smartdoc_core.llm.context import INTENT
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.structured import json_schema_for
 from smartdoc_core.intent.prompts.default import DefaultIntentPrompt
+from smartdoc_core.intent.cache import build_intent_cache
+from smartdoc_core.intent.cascade import CACHED, FALLBACK, PRIMARY, IntentQuery, build_cascade
+from smartdoc_core.intent.keywords import COMMON_MATCHER, CONTEXT_MATCHERS, GENERAL_MATCHER
 from smartdoc_core.intent.types import IntentLLMOut
+from smartdoc_core.utils.exceptions import CircuitOpenError
+
+
+def _freeze(value: Any) -> Any:
+    """Deep read-only copy: mappings become MappingProxyType, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Plain (JSON-serializable) copy of a ``_freeze`` result."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True)
+class _CompiledPrompt:
+    """
+    Query-independent prompt data of one context for one intent-set version.
+
+    ``prefix`` is the builder's static prompt prefix; the doctor input is
+    appended per request. Builders without prefix support (no
+    ``context_prefix``/``general_prefix``/``input_suffix``) get the
+    cached intents and build the whole prompt per request.
+    """
+
+    context: Optional[str]
+    valid_intents: Optional[Set[str]]
+    intents: Dict[str, Dict[str, Any]]
+    prefix: Optional[str]
+    version: int
+
+    def render(self, builder: Any, doctor_input: str) -> str:
+        if self.prefix is not None and hasattr(builder, "input_suffix"):
+            return self.prefix + builder.input_suffix(doctor_input)
+        if self.context is None:
+            return builder.build_general(doctor_input=doctor_input, intent_categories=self.intents)
+        return builder.build_context_aware(
+            doctor_input=doctor_input, context=self.context, filtered_intents=self.intents
+        )
 
 
 class LLMIntentClassifier:
@@ -28,7 +83,9 @@ class LLMIntentClassifier:
         self,
         provider=None,
         prompt_builder=None,
-        intent_categories: Optional[Dict[str, Dict[str, Any]]] = None
+        intent_categories: Optional[Dict[str, Dict[str, Any]]] = None,
+        cascade_settings: Optional[Dict[str, Any]] = None,
+        cache_settings: Optional[Dict[str, Any]] = None
     ):
         """
         Initialize the LLM Intent Classifier.
@@ -37,23 +94,25 @@ class LLMIntentClassifier:
             provider: LLM provider instance (defaults to Ollama from config)
             prompt_builder: Prompt builder instance (defaults to DefaultIntentPrompt)
             intent_categories: Custom intent categories (defaults to built-in categories)
+            cascade_settings: ``intent.cascade`` settings; when enabled, cheaper
+                tiers answer context-aware queries first (see intent.cascade)
+            cache_settings: ``intent.cache`` settings; when enabled, repeated
+                questions are answered from cached classifications (see intent.cache)
         """
         # Use dependency injection with sensible defaults
-        self.provider = provider or OllamaProvider(config.OLLAMA_BASE_URL, config.OLLAMA_MODEL)
+        self.provider = provider or get_default_provider()
         self.prompt_builder = prompt_builder or DefaultIntentPrompt()
+
+        # Static prompt parts per context, compiled once per intent-set version
+        self.intent_version = 0
+        self._compiled_prompts: Dict[Optional[str], _CompiledPrompt] = {}
         self.intent_categories = intent_categories or self._default_intent_categories()
 
-        # Build category index for lookup
-        self.category_to_intents = {}
-        for intent_id, details in self.intent_categories.items():
-            category = details.get("category", "general")
-            if category not in self.category_to_intents:
-                self.category_to_intents[category] = []
-            self.category_to_intents[category].append(intent_id)
+        # Cheaper tiers in front of the LLM for context-aware queries (None = off)
+        self.cascade = build_cascade(self, cascade_settings or {})
 
-        # Simple circuit breaker state
-        self._fail_count = 0
-        self._open_until: float = 0.0
+        # Classifications of repeated questions (None = off)
+        self.cache = build_intent_cache(cache_settings or {})
 
         model_name = getattr(self.provider, 'model', 'unknown')
         sys_logger.log_system(
@@ -61,6 +120,35 @@ class LLMIntentClassifier:
             f"LLMIntentClassifier initialized with {len(self.intent_categories)} intents (model: {model_name})"
         )
 
+    @property
+    def intent_categories(self) -> Mapping[str, Mapping[str, Any]]:
+        """
+        Intent ID -> details, read-only (lists are tuples).
+
+        Compiled prompts, cache keys and the local model's intent set all
+        derive from the categories, so they cannot be edited in place:
+        assign a new mapping to change the intent set.
+        """
+        return self._intent_categories
+
+    @intent_categories.setter
+    def intent_categories(self, intent_categories: Mapping[str, Mapping[str, Any]]) -> None:
+        self._intent_categories = _freeze(intent_categories)
+        self.intent_version += 1
+        # Content hash, stable across processes (keys persisted cache entries)
+        self.intent_set_id = hashlib.sha256(
+            json.dumps(_thaw(self._intent_categories), sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16]
+        self._compiled_prompts = {}
+
+        # Build category index for lookup
+        self.category_to_intents = {}
+        for intent_id, details in self._intent_categories.items():
+            category = details.get("category", "general")
+            if category not in self.category_to_intents:
+                self.category_to_intents[category] = []
+            self.category_to_intents[category].append(intent_id)
+
     # ---- Public API ----
     def classify_intent(self, doctor_input: str, context: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -79,11 +167,12 @@ class LLMIntentClassifier:
         if context:
             return self.classify_intent_with_context(doctor_input, context)
 
+        cached = self._cached_result(doctor_input, None)
+        if cached is not None:
+            return cached
+
         # Build general prompt
-        prompt = self.prompt_builder.build_general(
-            doctor_input=doctor_input,
-            intent_categories=self.intent_categories
-        )
+        prompt = self._compiled_prompt(None).render(self.prompt_builder, doctor_input)
 
         return self._generate_and_parse(prompt, doctor_input, valid_intents=None)
 
@@ -101,28 +190,65 @@ class LLMIntentClassifier:
         if not doctor_input or not doctor_input.strip():
             return self._empty_input_result()
 
-        # Get valid intents for this context
-        valid_intents = self._valid_intents_for_context(context)
+        # Valid intents and prompt prefix for this context (compiled once)
+        compiled = self._compiled_prompt(context)
+        valid_intents = compiled.valid_intents
         if not valid_intents:
             # Unknown context -> use general classification
             return self.classify_intent(doctor_input)
 
-        # Filter to only include valid intents for this context
-        filtered_intents = {
-            intent_id: details
-            for intent_id, details in self.intent_categories.items()
-            if intent_id in valid_intents
-        }
+        cached = self._cached_result(doctor_input, context)
+        if cached is not None:
+            return cached
 
         # Build context-aware prompt
-        prompt = self.prompt_builder.build_context_aware(
-            doctor_input=doctor_input,
-            context=context,
-            filtered_intents=filtered_intents
-        )
+        prompt = compiled.render(self.prompt_builder, doctor_input)
+
+        if self.cascade is not None:
+            return self.cascade.classify(
+                IntentQuery(doctor_input=doctor_input, context=context, valid_intents=valid_intents, prompt=prompt),
+                final=lambda: self._generate_and_parse(
+                    prompt, doctor_input, valid_intents=valid_intents, context=context
+                ),
+            )
 
         return self._generate_and_parse(prompt, doctor_input, valid_intents=valid_intents, context=context)
 
+    def classify_many(
+        self,
+        doctor_inputs: Sequence[str],
+        context: Optional[str] = None,
+        *,
+        max_concurrency: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify several independent inputs concurrently, in input order.
+
+        Each input goes through classify_intent (cache, cascade, fallbacks), so
+        the provider stack still bounds the calls reaching the LLM.
+
+        Args:
+            doctor_inputs: The doctor's questions or statements
+            context: Clinical context shared by all inputs
+            max_concurrency: Inputs classified at once (default: provider's max_parallel)
+
+        Returns:
+            One classification result per input
+        """
+        if not doctor_inputs:
+            return []
+        workers = max(1, min(len(doctor_inputs), max_concurrency or getattr(self.provider, "max_parallel", 4)))
+        if workers == 1:
+            return [self.classify_intent(text, context) for text in doctor_inputs]
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="intent-batch") as pool:
+            futures = [
+                # Keep the caller's llm_call() context in each worker
+                pool.submit(contextvars.copy_context().run, self.classify_intent, text, context)
+                for text in doctor_inputs
+            ]
+            return [future.result() for future in futures]
+
     # ---- Core LLM processing with resilience ----
     def _generate_and_parse(
         self,
@@ -131,29 +257,23 @@ class LLMIntentClassifier:
         valid_intents: Optional[Set[str]],
         context: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Generate LLM response and parse with circuit breaker protection."""
-
-        # Check circuit breaker
-        now = time.time()
-        if now < self._open_until:
-            return self._fallback_classification_with_optional_context(
-                original_input, context, valid_intents, "circuit_breaker_open"
-            )
-
+        """Generate LLM response and parse, falling back to keyword matching on failure."""
         try:
-            # Call LLM provider
-            raw_response = self.provider.generate(
-                prompt,
-                temperature=0.1,
-                top_p=0.9,
-                timeout_s=60
-            )
-
-            # Parse and validate response
-            parsed_result = self._parse_llm_json(raw_response, original_input, valid_intents)
-
-            # Reset failure count on success
-            self._fail_count = 0
+            raw_response, dto = self._request_intent(prompt, valid_intents)
+
+            # Parse and validate response (scrape free text if not structured)
+            if dto is None:
+                try:
+                    dto = self._dto_from_text(raw_response.strip())
+                except Exception:
+                    pass  # Unparseable: _parse_llm_json falls back below
+            if dto is not None:
+                parsed_result = self._result_from_dto(dto, original_input, valid_intents)
+                # Only answers the model actually gave are cached (not parse fallbacks)
+                if self.cache is not None:
+                    self.cache.put(original_input, context, self._intent_model(), self.intent_set_id, parsed_result)
+            else:
+                parsed_result = self._parse_llm_json(raw_response, original_input, valid_intents)
 
             sys_logger.log_system(
                 "debug",
@@ -162,17 +282,55 @@ class LLMIntentClassifier:
 
             return parsed_result
 
+        except CircuitOpenError:
+            # Shared provider breaker is open: skip straight to keyword matching
+            return self._fallback_classification_with_optional_context(
+                original_input, context, valid_intents, "circuit_breaker_open"
+            )
         except Exception as e:
-            # Track failures for circuit breaker
-            self._fail_count += 1
-            if self._fail_count >= 3:
-                self._open_until = time.time() + 60  # Open circuit for 1 minute
-
             sys_logger.log_system("warning", f"LLM Intent Classification error: {e}")
             return self._fallback_classification_with_optional_context(
                 original_input, context, valid_intents, str(e)
             )
 
+    def _request_intent(
+        self,
+        prompt: str,
+        valid_intents: Optional[Set[str]],
+        *,
+        model: Optional[str] = None,
+        call_site: str = INTENT
+    ) -> Tuple[str, Optional[IntentLLMOut]]:
+        """
+        Send one classification request.
+
+        Returns:
+            The raw response and, for structured output, the parsed DTO
+            (None when the response still needs scraping)
+        """
+        options: Dict[str, Any] = {"model": model} if model else {}
+        with llm_call(call_site=call_site):
+            if isinstance(self.provider, LLMProvider):
+                # Schema-constrained output: intent_id limited to valid intents
+                output = self.provider.generate_structured(
+                    prompt,
+                    IntentLLMOut,
+                    json_schema=self._intent_output_schema(valid_intents),
+                    temperature=0.1,
+                    top_p=0.9,
+                    timeout_s=60,
+                    **options
+                )
+                return output.raw, output.parsed
+            raw_response = self.provider.generate(
+                prompt,
+                temperature=0.1,
+                top_p=0.9,
+                timeout_s=60,
+                **options
+            )
+            return raw_response, None
+
     def _parse_llm_json(
         self,
         llm_text: str,
@@ -185,42 +343,60 @@ class LLMIntentClassifier:
         if "{" not in text or "}" not in text:
             return self._fallback_parse(original_input, "no_json_found", valid_intents)
 
+        try:
+            dto = self._dto_from_text(text)
+            return self._result_from_dto(dto, original_input, valid_intents)
+
+        except Exception as e:
+            return self._fallback_parse(original_input, f"parse_error: {e}", valid_intents)
+
+    @staticmethod
+    def _dto_from_text(text: str) -> IntentLLMOut:
+        """Scrape the JSON object out of free-text LLM output (raises if there is none)."""
         # Extract JSON from response
         json_start = text.find("{")
         json_end = text.rfind("}") + 1
-        json_str = text[json_start:json_end]
+        data = json.loads(text[json_start:json_end])
 
-        try:
-            # Parse JSON
-            data = json.loads(json_str)
-
-            # Validate with Pydantic
-            dto = IntentLLMOut(**{
-                "intent_id": data.get("intent_id"),
-                "confidence": float(data.get("confidence", 0.5)),
-                "explanation": data.get("explanation") or "LLM classification"
-            })
-
-            intent_id = dto.intent_id
-            confidence = dto.confidence
-
-            # Validate intent ID exists in our categories
-            if intent_id not in self.intent_categories:
-                intent_id, confidence = self._adjust_invalid_intent(intent_id, confidence, valid_intents)
-
-            # Validate intent ID is valid for context
-            if valid_intents and intent_id not in valid_intents:
-                intent_id, confidence = self._adjust_invalid_intent(intent_id, confidence, valid_intents)
-
-            return {
-                "intent_id": intent_id,
-                "confidence": confidence,
-                "explanation": dto.explanation,
-                "original_input": original_input,
-            }
+        # Validate with Pydantic
+        return IntentLLMOut(**{
+            "intent_id": data.get("intent_id"),
+            "confidence": float(data.get("confidence", 0.5)),
+            "explanation": data.get("explanation") or "LLM classification"
+        })
 
-        except Exception as e:
-            return self._fallback_parse(original_input, f"parse_error: {e}", valid_intents)
+    def _result_from_dto(
+        self,
+        dto: IntentLLMOut,
+        original_input: str,
+        valid_intents: Optional[Set[str]]
+    ) -> Dict[str, Any]:
+        """Build the classification result from validated LLM output."""
+        intent_id = dto.intent_id
+        confidence = dto.confidence
+
+        # Validate intent ID exists in our categories
+        if intent_id not in self.intent_categories:
+            intent_id, confidence = self._adjust_invalid_intent(intent_id, confidence, valid_intents)
+
+        # Validate intent ID is valid for context
+        if valid_intents and intent_id not in valid_intents:
+            intent_id, confidence = self._adjust_invalid_intent(intent_id, confidence, valid_intents)
+
+        return {
+            "intent_id": intent_id,
+            "confidence": confidence,
+            "explanation": dto.explanation,
+            "original_input": original_input,
+            "tier": PRIMARY,
+        }
+
+    def _intent_output_schema(self, valid_intents: Optional[Set[str]]) -> Dict[str, Any]:
+        """JSON schema for IntentLLMOut with intent_id restricted to known intents."""
+        schema = json_schema_for(IntentLLMOut)
+        allowed = valid_intents or set(self.intent_categories)
+        schema["properties"]["intent_id"]["enum"] = sorted(allowed)
+        return schema
 
     def _adjust_invalid_intent(
         self,
@@ -259,6 +435,7 @@ class LLMIntentClassifier:
             "confidence": 0.3,
             "explanation": f"Could not parse LLM response ({reason})",
             "original_input": original_input,
+            "tier": FALLBACK,
         }
 
     def _fallback_classification_with_optional_context(
@@ -275,6 +452,51 @@ class LLMIntentClassifier:
         return self._fallback_classification(doctor_input, error_msg)
 
     # ---- Helper methods ----
+    def _cached_result(self, doctor_input: str, context: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Cached classification of a repeated question, or None."""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(doctor_input, context, self._intent_model(), self.intent_set_id)
+        if cached is None:
+            return None
+        return {**cached, "original_input": doctor_input, "cached": True, "tier": CACHED}
+
+    def _intent_model(self) -> str:
+        """The model answering intent requests: the routed profile's, else the provider's."""
+        router = getattr(self.provider, "router", None) if isinstance(self.provider, LLMProvider) else None
+        profile = router.route(INTENT) if router is not None else None
+        return profile.model if profile is not None else str(getattr(self.provider, "model", "unknown"))
+
+    def _compiled_prompt(self, context: Optional[str]) -> "_CompiledPrompt":
+        """
+        Static prompt data for a context (None = general prompt).
+
+        Compiled on first use and kept until ``intent_categories`` is
+        replaced, which bumps ``intent_version`` (the categories are
+        read-only, so there are no in-place changes to miss).
+        """
+        compiled = self._compiled_prompts.get(context)
+        if compiled is None:
+            compiled = self._compiled_prompts[context] = self._compile_prompt(context)
+        return compiled
+
+    def _compile_prompt(self, context: Optional[str]) -> "_CompiledPrompt":
+        builder = self.prompt_builder
+        if context is None:
+            prefix = builder.general_prefix(self.intent_categories) if hasattr(builder, "general_prefix") else None
+            return _CompiledPrompt(None, None, self.intent_categories, prefix, self.intent_version)
+
+        valid_intents = self._valid_intents_for_context(context)
+        filtered_intents = {
+            intent_id: details
+            for intent_id, details in self.intent_categories.items()
+            if intent_id in valid_intents
+        }
+        prefix = None
+        if valid_intents and hasattr(builder, "context_prefix"):
+            prefix = builder.context_prefix(context, filtered_intents)
+        return _CompiledPrompt(context, valid_intents, filtered_intents, prefix, self.intent_version)
+
     def _valid_intents_for_context(self, context: str) -> Set[str]:
         """Get valid intent IDs for the given clinical context."""
 
@@ -691,70 +913,9 @@ class LLMIntentClassifier:
         """
         Fallback classification using simple keyword matching when LLM is unavailable.
         """
-        input_lower = doctor_input.lower()
-
-        # Simple keyword-based classification using specific intent IDs
-        intent_id = "clarification"  # Default
-
-        if any(
-            word in input_lower
-            for word in ["what brings", "main problem", "chief complaint", "why here"]
-        ):
-            intent_id = "hpi_chief_complaint"
-        elif any(word in input_lower for word in ["age", "old", "elderly", "years"]):
-            intent_id = "profile_age"
-        elif any(
-            word in input_lower
-            for word in ["complete medication", "medication reconciliation", "previous hospitalizations", "hospital records", "biologics", "infliximab", "tnf"]
-        ):
-            intent_id = "meds_full_reconciliation_query"
-        elif any(
-            word in input_lower
-            for word in ["arthritis", "rheumatoid", "ra medications", "arthritis medications"]
-        ):
-            intent_id = "meds_ra_specific_initial_query"
-        elif any(
-            word in input_lower
-            for word in ["medications", "meds", "taking", "prescriptions"]
-        ):
-            intent_id = "meds_current_known"
-        elif any(
-            word in input_lower
-            for word in ["heart", "cardiovascular", "pulse", "cardiac"]
-        ):
-            intent_id = "exam_cardiovascular"
-        elif any(
-            word in input_lower
-            for word in ["lungs", "breathing", "respiratory", "chest sounds"]
-        ):
-            intent_id = "exam_respiratory"
-        elif any(
-            word in input_lower
-            for word in ["blood pressure", "vital signs", "temperature", "bp"]
-        ):
-            intent_id = "exam_vital"
-        elif any(
-            word in input_lower for word in ["when", "start", "duration", "how long"]
-        ):
-            intent_id = "hpi_onset_duration_primary"
-        elif any(
-            word in input_lower for word in ["symptoms", "other", "associated", "feel"]
-        ):
-            intent_id = "hpi_associated_symptoms_general"
-        elif any(
-            word in input_lower
-            for word in ["medical history", "past", "previous", "pmh", "surgical", "surgery", "surgeries", "procedure", "procedures", "operation", "operations"]
-        ):
-            intent_id = "pmh_general"
-        elif any(
-            word in input_lower for word in ["examine", "physical", "check", "look at"]
-        ):
-            intent_id = "exam_general_appearance"
-        elif any(
-            word in input_lower
-            for word in ["hello", "hi", "good morning", "good afternoon"]
-        ):
-            intent_id = "general_greeting"
+        # Keyword rules in priority order (see intent.keywords)
+        rule = GENERAL_MATCHER.match(doctor_input.lower())
+        intent_id = rule.intent_id if rule else "clarification"
 
         # Build simplified response for intent-driven discovery
         result = {
@@ -762,6 +923,7 @@ class LLMIntentClassifier:
             "confidence": 0.6 if intent_id != "clarification" else 0.3,
             "explanation": f"Keyword-based fallback (LLM error: {error_msg})",
             "error": error_msg,
+            "tier": FALLBACK,
         }
 
         return result
@@ -774,149 +936,18 @@ class LLMIntentClassifier:
         """
         input_lower = doctor_input.lower()
 
-        # Context-specific keyword mappings
+        # Context-specific keyword rules; a matched intent not valid here is a clarification
         intent_id = "clarification"  # Default
-
-        if context == "anamnesis":
-            # History-taking keywords
-            if any(
-                word in input_lower
-                for word in [
-                    "what brings",
-                    "main problem",
-                    "chief complaint",
-                    "why here",
-                ]
-            ):
-                intent_id = (
-                    "hpi_chief_complaint"
-                    if "hpi_chief_complaint" in valid_intents
-                    else "clarification"
-                )
-            elif any(
-                word in input_lower for word in ["age", "old", "elderly", "years"]
-            ):
-                intent_id = (
-                    "profile_age" if "profile_age" in valid_intents else "clarification"
-                )
-            elif any(
-                word in input_lower
-                for word in ["complete medication", "medication reconciliation", "previous hospitalizations", "hospital records", "biologics", "infliximab", "tnf"]
-            ):
-                intent_id = (
-                    "meds_full_reconciliation_query"
-                    if "meds_full_reconciliation_query" in valid_intents
-                    else "clarification"
-                )
-            elif any(
-                word in input_lower
-                for word in ["arthritis", "rheumatoid", "ra medications", "arthritis medications", " ra ", "ra?", "ra.", "for ra"]
-            ):
-                intent_id = (
-                    "meds_ra_specific_initial_query"
-                    if "meds_ra_specific_initial_query" in valid_intents
-                    else "clarification"
-                )
-            elif any(
-                word in input_lower
-                for word in ["medications", "meds", "taking", "prescriptions"]
-            ):
-                intent_id = (
-                    "meds_current_known"
-                    if "meds_current_known" in valid_intents
-                    else "clarification"
-                )
-            elif any(
-                word in input_lower
-                for word in ["when", "start", "duration", "how long"]
-            ):
-                intent_id = (
-                    "hpi_onset_duration_primary"
-                    if "hpi_onset_duration_primary" in valid_intents
-                    else "clarification"
-                )
-            elif any(
-                word in input_lower
-                for word in ["medical history", "past", "previous", "pmh", "surgical", "surgery", "surgeries", "procedure", "procedures", "operation", "operations"]
-            ):
-                intent_id = (
-                    "pmh_general" if "pmh_general" in valid_intents else "clarification"
-                )
-
-        elif context == "exam":
-            # Physical examination keywords
-            if any(
-                word in input_lower
-                for word in ["heart", "cardiovascular", "pulse", "cardiac"]
-            ):
-                intent_id = (
-                    "exam_cardiovascular"
-                    if "exam_cardiovascular" in valid_intents
-                    else "clarification"
-                )
-            elif any(
-                word in input_lower
-                for word in ["lungs", "breathing", "respiratory", "chest sounds"]
-            ):
-                intent_id = (
-                    "exam_respiratory"
-                    if "exam_respiratory" in valid_intents
-                    else "clarification"
-                )
-            elif any(
-                word in input_lower
-                for word in ["blood pressure", "vital signs", "temperature", "bp"]
-            ):
-                intent_id = (
-                    "exam_vital" if "exam_vital" in valid_intents else "clarification"
-                )
-            elif any(
-                word in input_lower
-                for word in ["examine", "physical", "check", "look at"]
-            ):
-                intent_id = (
-                    "exam_general_appearance"
-                    if "exam_general_appearance" in valid_intents
-                    else "clarification"
-                )
-
-        elif context == "labs":
-            # Laboratory and imaging keywords
-            if any(
-                word in input_lower
-                for word in ["blood work", "cbc", "complete blood count"]
-            ):
-                intent_id = (
-                    "labs_general" if "labs_general" in valid_intents else "clarification"
-                )
-            elif any(
-                word in input_lower for word in ["chest x-ray", "cxr", "chest xray"]
-            ):
-                intent_id = (
-                    "imaging_chest_xray"
-                    if "imaging_chest_xray" in valid_intents
-                    else "clarification"
-                )
-            elif any(
-                word in input_lower for word in ["imaging", "radiology", "scan"]
-            ):
-                intent_id = (
-                    "imaging_general"
-                    if "imaging_general" in valid_intents
-                    else "clarification"
-                )
+        matcher = CONTEXT_MATCHERS.get(context)
+        rule = matcher.match(input_lower) if matcher else None
+        if rule is not None and rule.intent_id in valid_intents:
+            intent_id = rule.intent_id
 
         # General keywords applicable to all contexts
         if intent_id == "clarification":
-            if any(
-                word in input_lower
-                for word in ["hello", "hi", "good morning", "good afternoon"]
-            ):
-                intent_id = (
-                    "general_greeting"
-                    if "general_greeting" in valid_intents
-                    else "clarification"
-                )
+            rule = COMMON_MATCHER.match(input_lower)
+            if rule is not None and rule.intent_id in valid_intents:
+                intent_id = rule.intent_id
 
         # Ensure the selected intent is valid for this context
         if intent_id not in valid_intents:
@@ -933,6 +964,7 @@ class LLMIntentClassifier:
             "explanation": f"Context-aware keyword-based fallback for {context} (LLM error: {error_msg})",
             "error": error_msg,
             "context": context,
+            "tier": FALLBACK,
         }
 
         return result
@@ -940,8 +972,9 @@ class LLMIntentClassifier:
     # ---- Utility methods ----
     def get_intent_info(self, intent_id: str) -> Optional[Dict[str, Any]]:
         """Get information about a specific intent category."""
-        return self.intent_categories.get(intent_id)
+        details = self.intent_categories.get(intent_id)
+        return _thaw(details) if details is not None else None
 
     def list_all_intents(self) -> Dict[str, Dict[str, Any]]:
-        """Get all available intent categories."""
-        return self.intent_categories.copy()
+        """Get all available intent categories (a modifiable copy)."""
+        return _thaw(self.intent_categories)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Embedding Nearest-Neighbour Intent Classification
+
+Embeds every labelled example utterance of the intent categories once
+into a NumPy matrix and answers a query with a single matrix-vector
+product: the best cosine similarity per intent, restricted to the intents
+valid in the context. A query whose best intent clearly beats the
+runner-up is answered without a generative LLM call.
+
+Embeddings come from a built-in hashing vectorizer (character n-grams,
+no model or training needed) or from an Ollama embedding model.
+"""
+
+import re
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from smartdoc_core.intent.cascade import IntentQuery, IntentTier
+from smartdoc_core.utils.logger import sys_logger
+
+try:
+    import numpy as np
+
+    HAVE_NUMPY = True
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+    HAVE_NUMPY = False
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse punctuation and whitespace to single spaces."""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def char_ngrams(text: str, ngram_range: Tuple[int, int] = (3, 5)) -> List[str]:
+    """Word-boundary-padded character n-grams of normalized ``text``, plus its words."""
+    normalized = normalize_text(text)
+    padded = f" {normalized} "
+    low, high = ngram_range
+    grams = [padded[i:i + n] for n in range(low, high + 1) for i in range(len(padded) - n + 1)]
+    grams.extend(f"w:{word}" for word in normalized.split())
+    return grams
+
+
+def hashed_features(
+    text: str, n_features: int, ngram_range: Tuple[int, int] = (3, 5)
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Sparse hashed n-gram vector of ``text``: (bucket indices, values).
+
+    Each n-gram is hashed (CRC32, stable across processes) into one of
+    ``n_features`` buckets; counts are log-scaled and L2-normalized.
+    """
+    buckets = [zlib.crc32(gram.encode("utf-8")) % n_features for gram in char_ngrams(text, ngram_range)]
+    indices, counts = np.unique(np.asarray(buckets, dtype=np.intp), return_counts=True)
+    values = np.log1p(counts.astype(np.float32))
+    norm = np.linalg.norm(values)
+    return indices, (values / norm if norm else values)
+
+
+class HashingEmbedder:
+    """
+    Character n-gram hashing vectorizer.
+
+    Dense rows of ``hashed_features``. Needs no model and embeds a query
+    in microseconds, at the cost of only matching surface forms (spelling
+    variants, shared words).
+    """
+
+    def __init__(self, n_features: int = 1 << 14, ngram_range: Tuple[int, int] = (3, 5)):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.name = f"hashing:{n_features}"
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            indices, values = hashed_features(text, self.n_features, self.ngram_range)
+            matrix[row, indices] = values
+        return matrix
+
+
+class OllamaEmbedder:
+    """Embeddings from an Ollama embedding model via the provider's ``embed``."""
+
+    def __init__(self, provider: Any, model: str, timeout_s: float = 30.0):
+        """
+        Args:
+            provider: Provider (stack) exposing ``embed(texts, model, timeout_s)``
+            model: Embedding model, e.g. "nomic-embed-text"
+            timeout_s: Per-request timeout
+        """
+        self.provider = provider
+        self.model = model
+        self.timeout_s = timeout_s
+        self.name = f"ollama:{model}"
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        vectors = self.provider.embed(list(texts), self.model, self.timeout_s)
+        return _normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+
+class IntentVectorIndex:
+    """
+    Example embeddings grouped by intent.
+
+    Rows are stored intent by intent, so the best similarity per intent
+    is one ``np.maximum.reduceat`` over the similarity vector.
+    """
+
+    def __init__(self, embedder: Any, intent_categories: Dict[str, Dict[str, Any]]):
+        """
+        Args:
+            embedder: Object with ``embed(texts) -> (n, d) L2-normalized array``
+            intent_categories: Intent ID -> details with an ``examples`` list
+        """
+        self.embedder = embedder
+        texts: List[str] = []
+        self.intent_ids: List[str] = []
+        starts: List[int] = []
+        for intent_id, details in intent_categories.items():
+            examples = [e for e in details.get("examples") or [] if e and e.strip()]
+            if not examples:
+                continue
+            self.intent_ids.append(intent_id)
+            starts.append(len(texts))
+            texts.extend(examples)
+        self.size = len(texts)
+        self._starts = np.asarray(starts, dtype=np.intp)
+        self._position = {intent_id: i for i, intent_id in enumerate(self.intent_ids)}
+        self.matrix = embedder.embed(texts) if texts else np.zeros((0, 0), dtype=np.float32)
+
+    def scores(self, text: str, valid_intents: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """Best example similarity per (valid) intent, highest first."""
+        if not self.size:
+            return []
+        query = self.embedder.embed([text])[0]
+        nonzero = np.flatnonzero(query)
+        if len(nonzero) * 8 < len(query):
+            # Sparse (hashed) query: only its non-zero columns contribute
+            similarities = self.matrix[:, nonzero] @ query[nonzero]
+        else:
+            similarities = self.matrix @ query
+        per_intent = np.maximum.reduceat(similarities, self._starts)
+        if valid_intents is None:
+            candidates = range(len(self.intent_ids))
+        else:
+            candidates = [self._position[i] for i in valid_intents if i in self._position]
+        ranked = sorted(candidates, key=lambda i: per_intent[i], reverse=True)
+        return [(self.intent_ids[i], float(per_intent[i])) for i in ranked]
+
+
+class EmbeddingTier(IntentTier):
+    """
+    Cascade tier answering from the nearest labelled examples.
+
+    Accepts its top intent only when the similarity is at least
+    ``min_similarity`` and beats the runner-up intent by ``margin``;
+    the reported confidence is that similarity. The index is built when
+    the tier is created and rebuilt if the classifier's intent categories
+    are replaced; if building fails (e.g. the embedding model is not
+    reachable yet) it is retried on the next query.
+    """
+
+    name = "embedding"
+    confidence_gated = False
+
+    def __init__(
+        self,
+        classifier: Any,
+        embedder: Any,
+        *,
+        name: str = "embedding",
+        margin: float = 0.15,
+        min_similarity: float = 0.6,
+    ):
+        """
+        Args:
+            classifier: LLMIntentClassifier whose intent categories to index
+            embedder: HashingEmbedder, OllamaEmbedder or compatible
+            name: Tier name (for stats and results)
+            margin: Required similarity lead of the top intent over the next
+            min_similarity: Required similarity of the top intent
+        """
+        if not HAVE_NUMPY:
+            raise RuntimeError("numpy is required for the embedding intent tier")
+        self.classifier = classifier
+        self.embedder = embedder
+        self.name = name
+        self.margin = margin
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._index: Optional[IntentVectorIndex] = None
+        self._indexed_categories: Optional[Dict[str, Dict[str, Any]]] = None
+        try:
+            self.index()
+        except Exception as e:
+            sys_logger.log_system("warning", f"Intent vector index not built yet ({embedder.name}): {e}")
+
+    def index(self) -> IntentVectorIndex:
+        """Return the index, (re)building it for the classifier's current intent categories."""
+        categories = self.classifier.intent_categories
+        with self._lock:
+            if self._index is None or self._indexed_categories is not categories:
+                self._index = IntentVectorIndex(self.embedder, categories)
+                self._indexed_categories = categories
+                sys_logger.log_system(
+                    "info",
+                    f"Intent vector index built: {self._index.size} examples, "
+                    f"{len(self._index.intent_ids)} intents ({self.embedder.name})",
+                )
+            return self._index
+
+    def classify(self, query: IntentQuery) -> Optional[Dict[str, Any]]:
+        ranked = self.index().scores(query.doctor_input, query.valid_intents)
+        if not ranked:
+            return None
+        (intent_id, best), runner_up = ranked[0], (ranked[1][1] if len(ranked) > 1 else 0.0)
+        if best < self.min_similarity or best - runner_up < self.margin:
+            return None
+        return {
+            "intent_id": intent_id,
+            "confidence": round(best, 4),
+            "explanation": f"Nearest labelled examples (similarity {best:.2f}, margin {best - runner_up:.2f})",
+            "original_input": query.doctor_input,
+        }
+
+
+def _normalize_rows(matrix: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Keyword Rules for the Fallback Intent Classifiers
+
+The keyword fallback answers every intent request while the LLM is
+unavailable (e.g. the circuit breaker is open), so it must stay cheap.
+Rules are plain data - an intent and the substrings that select it - in
+priority order; each rule table is compiled once into a single regular
+expression that finds the highest-priority rule with a keyword anywhere
+in the input in one scan.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    """
+    Selects ``intent_id`` when any keyword occurs in the lowercased input.
+
+    Keywords match as plain substrings (``"hi"`` also matches "this").
+    """
+
+    intent_id: str
+    keywords: Tuple[str, ...]
+
+
+class KeywordMatcher:
+    """
+    Ordered keyword rules compiled into one alternation regex.
+
+    ``match`` returns the first rule (in table order) with any keyword
+    in the text - the decision of checking the rules one by one. The
+    alternation is wrapped in a lookahead so overlapping keywords are all
+    seen, and lists keywords by rule priority so that at any position the
+    highest-priority keyword starting there wins.
+    """
+
+    def __init__(self, rules: Sequence[KeywordRule]):
+        self.rules = tuple(rules)
+        self._priority: Dict[str, int] = {}
+        for index, rule in enumerate(self.rules):
+            for keyword in rule.keywords:
+                self._priority.setdefault(keyword, index)
+        alternatives = sorted(self._priority, key=self._priority.__getitem__)
+        self._pattern = (
+            re.compile("(?=(" + "|".join(map(re.escape, alternatives)) + "))") if alternatives else None
+        )
+
+    def match(self, text: str) -> Optional[KeywordRule]:
+        """Return the highest-priority rule with a keyword in ``text`` (already lowercased)."""
+        if self._pattern is None:
+            return None
+        best = None
+        for found in self._pattern.finditer(text):
+            index = self._priority[found.group(1)]
+            if best is None or index < best:
+                best = index
+                if index == 0:
+                    break
+        return None if best is None else self.rules[best]
+
+
+CHIEF_COMPLAINT = KeywordRule("hpi_chief_complaint", ("what brings", "main problem", "chief complaint", "why here"))
+AGE = KeywordRule("profile_age", ("age", "old", "elderly", "years"))
+MEDS_RECONCILIATION = KeywordRule(
+    "meds_full_reconciliation_query",
+    (
+        "complete medication", "medication reconciliation", "previous hospitalizations",
+        "hospital records", "biologics", "infliximab", "tnf",
+    ),
+)
+MEDS_RA = KeywordRule(
+    "meds_ra_specific_initial_query", ("arthritis", "rheumatoid", "ra medications", "arthritis medications")
+)
+MEDS_CURRENT = KeywordRule("meds_current_known", ("medications", "meds", "taking", "prescriptions"))
+EXAM_CARDIOVASCULAR = KeywordRule("exam_cardiovascular", ("heart", "cardiovascular", "pulse", "cardiac"))
+EXAM_RESPIRATORY = KeywordRule("exam_respiratory", ("lungs", "breathing", "respiratory", "chest sounds"))
+EXAM_VITAL = KeywordRule("exam_vital", ("blood pressure", "vital signs", "temperature", "bp"))
+ONSET_DURATION = KeywordRule("hpi_onset_duration_primary", ("when", "start", "duration", "how long"))
+ASSOCIATED_SYMPTOMS = KeywordRule("hpi_associated_symptoms_general", ("symptoms", "other", "associated", "feel"))
+PMH = KeywordRule(
+    "pmh_general",
+    (
+        "medical history", "past", "previous", "pmh", "surgical", "surgery", "surgeries",
+        "procedure", "procedures", "operation", "operations",
+    ),
+)
+EXAM_GENERAL = KeywordRule("exam_general_appearance", ("examine", "physical", "check", "look at"))
+GREETING = KeywordRule("general_greeting", ("hello", "hi", "good morning", "good afternoon"))
+
+# Without a context: one table over all intents
+GENERAL_RULES: Tuple[KeywordRule, ...] = (
+    CHIEF_COMPLAINT,
+    AGE,
+    MEDS_RECONCILIATION,
+    MEDS_RA,
+    MEDS_CURRENT,
+    EXAM_CARDIOVASCULAR,
+    EXAM_RESPIRATORY,
+    EXAM_VITAL,
+    ONSET_DURATION,
+    ASSOCIATED_SYMPTOMS,
+    PMH,
+    EXAM_GENERAL,
+    GREETING,
+)
+
+# Per clinical context; an input matching none of them falls back to COMMON_RULES
+CONTEXT_RULES: Dict[str, Tuple[KeywordRule, ...]] = {
+    "anamnesis": (
+        CHIEF_COMPLAINT,
+        AGE,
+        MEDS_RECONCILIATION,
+        KeywordRule(MEDS_RA.intent_id, MEDS_RA.keywords + (" ra ", "ra?", "ra.", "for ra")),
+        MEDS_CURRENT,
+        ONSET_DURATION,
+        PMH,
+    ),
+    "exam": (
+        EXAM_CARDIOVASCULAR,
+        EXAM_RESPIRATORY,
+        EXAM_VITAL,
+        EXAM_GENERAL,
+    ),
+    "labs": (
+        KeywordRule("labs_general", ("blood work", "cbc", "complete blood count")),
+        KeywordRule("imaging_chest_xray", ("chest x-ray", "cxr", "chest xray")),
+        KeywordRule("imaging_general", ("imaging", "radiology", "scan")),
+    ),
+}
+
+# Applicable in every context
+COMMON_RULES: Tuple[KeywordRule, ...] = (GREETING,)
+
+GENERAL_MATCHER = KeywordMatcher(GENERAL_RULES)
+CONTEXT_MATCHERS: Dict[str, KeywordMatcher] = {context: KeywordMatcher(rules) for context, rules in CONTEXT_RULES.items()}
+COMMON_MATCHER = KeywordMatcher(COMMON_RULES)
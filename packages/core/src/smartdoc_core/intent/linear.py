@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Locally Trained Linear Intent Model
+
+A multinomial logistic regression over hashed character n-grams (the
+features of the embedding tier), trained on CPU with NumPy from the
+labelled examples of the intent categories plus high-confidence labels of
+past doctor questions. The trained model is saved as a versioned ``.npz``
+artifact and answers a query in well under a millisecond, so it can run
+as the first cascade tier.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from smartdoc_core.intent.cascade import CACHED, PRIMARY, IntentQuery, IntentTier
+from smartdoc_core.intent.embedding import HAVE_NUMPY, hashed_features, normalize_text, np
+from smartdoc_core.utils.logger import sys_logger
+
+ARTIFACT_FORMAT = 1  # Bumped when the artifact layout changes; older formats are rejected
+
+# Intents never learned: not real classifications
+_UNLEARNED_INTENTS = {"empty_input"}
+# Sources of labels the LLM itself gave. Answers of the cheaper tiers (this
+# model included) and keyword fallbacks are never learned from, so the
+# model does not train on its own output.
+_LEARNED_TIERS = {PRIMARY, CACHED}
+
+
+@dataclass(frozen=True)
+class LabelledExample:
+    """
+    One training utterance.
+
+    Attributes:
+        text: The doctor's question
+        intent_id: Its intent
+        source: Where the label comes from ("examples" or "history")
+    """
+
+    text: str
+    intent_id: str
+    source: str = "examples"
+
+
+def history_examples(
+    rows: Iterable[Tuple[str, Optional[str]]],
+    intent_categories: Mapping[str, Any],
+    *,
+    min_confidence: float = 0.9,
+) -> List[LabelledExample]:
+    """
+    Labelled examples from stored user messages.
+
+    Args:
+        rows: (content, meta JSON) of user messages; ``meta`` carries the
+            ``intent_id``, ``intent_confidence`` and ``intent_tier``
+            assigned when the message was classified
+        intent_categories: Known intents; labels of other intents are skipped
+        min_confidence: Lowest classification confidence used as a label
+
+    Returns:
+        Examples labelled by the LLM path (``intent_tier`` primary or cache)
+        with enough confidence; messages stored without a tier are skipped
+    """
+    examples = []
+    for content, meta in rows:
+        try:
+            data = json.loads(meta) if meta else {}
+        except (TypeError, ValueError):
+            continue
+        intent_id = data.get("intent_id")
+        confidence = data.get("intent_confidence")
+        if not content or not content.strip() or intent_id not in intent_categories:
+            continue
+        if intent_id in _UNLEARNED_INTENTS or data.get("intent_tier") not in _LEARNED_TIERS:
+            continue
+        if confidence is None or float(confidence) < min_confidence:
+            continue
+        examples.append(LabelledExample(content, intent_id, "history"))
+    return examples
+
+
+def training_examples(
+    intent_categories: Mapping[str, Mapping[str, Any]],
+    history: Sequence[LabelledExample] = (),
+) -> List[LabelledExample]:
+    """The categories' example utterances plus ``history``, without duplicate (text, intent) pairs."""
+    examples = []
+    seen = set()
+    candidates = [
+        LabelledExample(text, intent_id)
+        for intent_id, details in intent_categories.items()
+        for text in details.get("examples") or []
+    ]
+    for example in [*candidates, *history]:
+        key = (normalize_text(example.text), example.intent_id)
+        if key[0] and key not in seen:
+            seen.add(key)
+            examples.append(example)
+    return examples
+
+
+class LinearIntentModel:
+    """
+    Softmax regression over hashed character n-grams.
+
+    ``weights`` is (n_features, n_intents); a query's logits are the
+    weighted sum of the rows of its hashed n-grams plus ``bias``.
+    """
+
+    def __init__(
+        self,
+        weights: "np.ndarray",
+        bias: "np.ndarray",
+        intent_ids: Sequence[str],
+        *,
+        ngram_range: Tuple[int, int] = (3, 5),
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        if not HAVE_NUMPY:
+            raise RuntimeError("numpy is required for the linear intent model")
+        self.weights = weights
+        self.bias = bias
+        self.intent_ids = list(intent_ids)
+        self.n_features = weights.shape[0]
+        self.ngram_range = tuple(ngram_range)
+        self.metadata = dict(metadata or {})
+        self._position = {intent_id: i for i, intent_id in enumerate(self.intent_ids)}
+
+    @property
+    def version(self) -> str:
+        return str(self.metadata.get("version", "unversioned"))
+
+    def predict(self, text: str, valid_intents: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """Probabilities of the (valid) intents for ``text``, highest first."""
+        indices, values = hashed_features(text, self.n_features, self.ngram_range)
+        logits = values @ self.weights[indices] + self.bias
+        if valid_intents is None:
+            candidates = np.arange(len(self.intent_ids))
+        else:
+            candidates = np.asarray(
+                [self._position[i] for i in valid_intents if i in self._position], dtype=np.intp
+            )
+            if not len(candidates):
+                return []
+        probabilities = _softmax(logits[candidates])
+        order = np.argsort(-probabilities)
+        return [(self.intent_ids[candidates[i]], float(probabilities[i])) for i in order]
+
+    def save(self, path: str) -> None:
+        """Write the model as a compressed ``.npz`` artifact."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        metadata = {**self.metadata, "format": ARTIFACT_FORMAT, "ngram_range": list(self.ngram_range)}
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                weights=self.weights,
+                bias=self.bias,
+                intent_ids=np.asarray(self.intent_ids),
+                metadata=np.asarray(json.dumps(metadata)),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "LinearIntentModel":
+        """Read an artifact written by ``save`` (raises ValueError for other formats)."""
+        if not HAVE_NUMPY:
+            raise RuntimeError("numpy is required for the linear intent model")
+        with np.load(path, allow_pickle=False) as artifact:
+            metadata = json.loads(str(artifact["metadata"]))
+            if metadata.get("format") != ARTIFACT_FORMAT:
+                raise ValueError(f"Unsupported intent model format {metadata.get('format')} in {path}")
+            return cls(
+                artifact["weights"],
+                artifact["bias"],
+                [str(i) for i in artifact["intent_ids"]],
+                ngram_range=tuple(metadata["ngram_range"]),
+                metadata=metadata,
+            )
+
+
+def train_linear_model(
+    examples: Sequence[LabelledExample],
+    *,
+    n_features: int = 1 << 14,
+    ngram_range: Tuple[int, int] = (3, 5),
+    epochs: int = 100,
+    learning_rate: float = 0.1,
+    l2: float = 1e-4,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> LinearIntentModel:
+    """
+    Fit a softmax regression to ``examples`` (full-batch Adam, L2-regularized).
+
+    Only the n-gram buckets present in the examples are trained; the
+    others keep zero weight. Classes are weighted inversely to their
+    frequency so a flood of history labels for a few common questions
+    does not drown out the rarer intents.
+
+    Returns:
+        The model; its metadata records the version (UTC training time),
+        the training set and the training accuracy
+    """
+    if not HAVE_NUMPY:
+        raise RuntimeError("numpy is required to train the linear intent model")
+    if not examples:
+        raise ValueError("No training examples")
+
+    started = time.perf_counter()
+    # Sparse design matrix: rows of (bucket, value) pairs, bucket ids remapped to the active ones
+    features = [hashed_features(e.text, n_features, ngram_range) for e in examples]
+    kept = [i for i, (indices, _) in enumerate(features) if len(indices)]
+    if not kept:
+        raise ValueError("No training examples with text")
+    examples = [examples[i] for i in kept]
+    features = [features[i] for i in kept]
+    lengths = np.asarray([len(indices) for indices, _ in features], dtype=np.intp)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    rows = np.repeat(np.arange(len(examples)), lengths)
+    buckets = np.concatenate([indices for indices, _ in features])
+    values = np.concatenate([v for _, v in features]).astype(np.float32)
+    active, columns = np.unique(buckets, return_inverse=True)
+    # The transposed matrix, for the weight gradient: entries ordered by column
+    by_column = np.argsort(columns, kind="stable")
+    column_starts = np.searchsorted(columns[by_column], np.arange(len(active)))
+    column_rows, column_values = rows[by_column], values[by_column]
+
+    intent_ids = sorted({e.intent_id for e in examples})
+    position = {intent_id: i for i, intent_id in enumerate(intent_ids)}
+    labels = np.asarray([position[e.intent_id] for e in examples], dtype=np.intp)
+
+    n_samples, n_classes, n_active = len(examples), len(intent_ids), len(active)
+    class_counts = np.bincount(labels, minlength=n_classes)
+    sample_weights = (n_samples / (n_classes * class_counts))[labels].astype(np.float32)
+    sample_weights /= sample_weights.sum()
+    targets = np.zeros((n_samples, n_classes), dtype=np.float32)
+    targets[np.arange(n_samples), labels] = 1.0
+
+    params = [np.zeros((n_active, n_classes), dtype=np.float32), np.zeros(n_classes, dtype=np.float32)]
+    moments = [(np.zeros_like(p), np.zeros_like(p)) for p in params]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    for step in range(1, epochs + 1):
+        weights, bias = params
+        logits = _sparse_rows_dot(starts, columns, values, weights) + bias
+        errors = (_softmax(logits) - targets) * sample_weights[:, None]
+        grad_weights = _sparse_rows_dot(column_starts, column_rows, column_values, errors) + l2 * weights
+        grads = [grad_weights, errors.sum(axis=0)]
+        for param, grad, (m, v) in zip(params, grads, moments):
+            m *= beta1
+            m += (1 - beta1) * grad
+            v *= beta2
+            v += (1 - beta2) * grad * grad
+            param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+
+    weights = np.zeros((n_features, n_classes), dtype=np.float32)
+    weights[active] = params[0]
+    predictions = np.argmax(_sparse_rows_dot(starts, columns, values, params[0]) + params[1], axis=1)
+    sources: Dict[str, int] = {}
+    for e in examples:
+        sources[e.source] = sources.get(e.source, 0) + 1
+    return LinearIntentModel(
+        weights,
+        params[1],
+        intent_ids,
+        ngram_range=ngram_range,
+        metadata={
+            "version": datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+            "examples": sources,
+            "intents": n_classes,
+            "active_features": int(n_active),
+            "train_accuracy": round(float(np.mean(predictions == labels)), 4),
+            "train_seconds": round(time.perf_counter() - started, 2),
+            "hyperparameters": {"n_features": n_features, "epochs": epochs, "learning_rate": learning_rate, "l2": l2},
+            **(metadata or {}),
+        },
+    )
+
+
+def latest_artifact(path: str) -> Optional[str]:
+    """``path`` itself if it is a file, else the newest ``.npz`` artifact in the directory (by version name)."""
+    if os.path.isfile(path):
+        return path
+    if not os.path.isdir(path):
+        return None
+    artifacts = sorted(name for name in os.listdir(path) if name.endswith(".npz"))
+    return os.path.join(path, artifacts[-1]) if artifacts else None
+
+
+class LinearModelTier(IntentTier):
+    """
+    Cascade tier answering from the locally trained linear model.
+
+    The confidence is the model's probability of its top intent among the
+    intents valid in the context, so the cascade's per-context threshold
+    decides acceptance. Without an artifact (nothing trained yet) the
+    tier has no answer and every query escalates.
+
+    A model only answers for the intent set it was trained on (its
+    ``intent_set`` metadata against the classifier's ``intent_set_id``):
+    artifacts of another set are not loaded, and if the classifier's
+    intents change after loading, every query escalates until a model
+    trained on the new set is loaded.
+    """
+
+    name = "linear"
+
+    def __init__(self, classifier: Any, artifact: str, *, name: str = "linear"):
+        """
+        Args:
+            classifier: The LLMIntentClassifier whose intent set the model must match
+            artifact: Model file, or a directory whose newest ``.npz`` is loaded
+            name: Tier name (for stats and results)
+        """
+        self.classifier = classifier
+        self.name = name
+        self.artifact = artifact
+        self.model: Optional[LinearIntentModel] = None
+        self._stale_warned: Optional[str] = None  # Intent set already warned about in classify
+        self.reload()
+
+    def reload(self) -> Optional[LinearIntentModel]:
+        """(Re)load the newest artifact; keeps the current model if that fails."""
+        path = latest_artifact(self.artifact)
+        if path is None:
+            sys_logger.log_system("warning", f"No intent model artifact at {self.artifact}; tier '{self.name}' escalates")
+            return self.model
+        try:
+            model = LinearIntentModel.load(path)
+        except Exception as e:
+            sys_logger.log_system("warning", f"Intent model artifact {path} not loaded: {e}")
+            return self.model
+        intent_set = self.classifier.intent_set_id
+        if model.metadata.get("intent_set") != intent_set:
+            sys_logger.log_system(
+                "warning",
+                f"Intent model artifact {path} not loaded: trained for intent set "
+                f"{model.metadata.get('intent_set')}, classifier uses {intent_set} (retrain the model)",
+            )
+            return self.model
+        self.model = model
+        sys_logger.log_system(
+            "info", f"Intent model {model.version} loaded: {len(model.intent_ids)} intents ({path})"
+        )
+        return model
+
+    def classify(self, query: IntentQuery) -> Optional[Dict[str, Any]]:
+        model = self.model
+        if model is None:
+            return None
+        intent_set = self.classifier.intent_set_id
+        if model.metadata.get("intent_set") != intent_set:
+            if self._stale_warned != intent_set:
+                self._stale_warned = intent_set
+                sys_logger.log_system(
+                    "warning", f"Intent model {model.version} predates intent set {intent_set}; tier '{self.name}' escalates"
+                )
+            return None
+        ranked = model.predict(query.doctor_input, query.valid_intents)
+        if not ranked:
+            return None
+        intent_id, probability = ranked[0]
+        return {
+            "intent_id": intent_id,
+            "confidence": round(probability, 4),
+            "explanation": f"Local intent model {model.version} (probability {probability:.2f})",
+            "original_input": query.doctor_input,
+        }
+
+
+def _softmax(logits: "np.ndarray") -> "np.ndarray":
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+def _sparse_rows_dot(
+    starts: "np.ndarray", columns: "np.ndarray", values: "np.ndarray", weights: "np.ndarray"
+) -> "np.ndarray":
+    """Product of ``weights`` with the sparse matrix whose (non-empty) row i is stored from ``starts[i]``."""
+    return np.add.reduceat(weights[columns] * values[:, None], starts, axis=0)
@@ -25,21 +25,13 @@ class DefaultIntentPrompt(IntentPromptBuilder):
         intent_categories: Dict[str, Dict[str, Any]]
     ) -> str:
         """Build a general intent classification prompt."""
+        return self.general_prefix(intent_categories) + self.input_suffix(doctor_input)
 
-        # Create intent descriptions for the prompt
-        intent_lines = []
-        for intent_id, details in intent_categories.items():
-            examples = details.get("examples", [])
-            example_text = ", ".join(examples[:2]) if examples else "No examples"
-            intent_lines.append(
-                f"- {intent_id}: {details.get('description', 'No description')} (e.g., {example_text})"
-            )
-
+    def general_prefix(self, intent_categories: Dict[str, Dict[str, Any]]) -> str:
+        """Static part of the general prompt: instructions, intent list and output format."""
         return f"""You are a clinical AI assistant. Classify the doctor's input into ONE of these EXACT intent IDs:
 
-{chr(10).join(intent_lines)}
-
-Doctor's input: "{doctor_input}"
+{self._intent_lines(intent_categories)}
 
 IMPORTANT: You MUST respond with one of the exact intent IDs listed above. For example:
 - If asking about chief complaint or main problem → use EXACTLY "hpi_chief_complaint"
@@ -66,16 +58,17 @@ The intent_id MUST be one of the exact IDs listed above. Do not use any other in
         filtered_intents: Dict[str, Dict[str, Any]]
     ) -> str:
         """Build a context-aware intent classification prompt."""
+        return self.context_prefix(context, filtered_intents) + self.input_suffix(doctor_input)
 
-        # Create intent descriptions for the prompt
-        intent_lines = []
-        for intent_id, details in filtered_intents.items():
-            examples = details.get("examples", [])
-            example_text = ", ".join(examples[:2]) if examples else "No examples"
-            intent_lines.append(
-                f"- {intent_id}: {details.get('description', 'No description')} (e.g., {example_text})"
-            )
+    def context_prefix(self, context: str, filtered_intents: Dict[str, Dict[str, Any]]) -> str:
+        """
+        Static part of the context-aware prompt.
 
+        Everything that does not depend on the doctor's input: phase
+        description, intent list, classification rules and output format.
+        It is identical for every query in a context, so the server can
+        reuse its evaluation across queries.
+        """
         # Context-specific instructions
         phase_descriptions = {
             "anamnesis": "CLINICAL INTERVIEW (ANAMNESIS) phase. Focus on history-taking intents including chief complaint, onset, past medical history, medications, social history, and family history.",
@@ -158,9 +151,7 @@ FALLBACK RULE:
 
 Classify the doctor's input into ONE of these EXACT intent IDs that are appropriate for the {context} context:
 
-{chr(10).join(intent_lines)}
-
-Doctor's input: "{doctor_input}"
+{self._intent_lines(filtered_intents)}
 {phase_guidance}
 Respond with ONLY a JSON object in this exact format:
 {{
@@ -170,3 +161,20 @@ Respond with ONLY a JSON object in this exact format:
 }}
 
 The intent_id MUST be one of the exact IDs listed above for the {context} context. Do not use any other intent names."""
+
+    @staticmethod
+    def input_suffix(doctor_input: str) -> str:
+        """Per-query part of the prompt, appended after the static prefix."""
+        return f'\n\nDoctor\'s input: "{doctor_input}"'
+
+    @staticmethod
+    def _intent_lines(intents: Dict[str, Dict[str, Any]]) -> str:
+        """Format intent descriptions for the prompt."""
+        intent_lines = []
+        for intent_id, details in intents.items():
+            examples = details.get("examples", [])
+            example_text = ", ".join(examples[:2]) if examples else "No examples"
+            intent_lines.append(
+                f"- {intent_id}: {details.get('description', 'No description')} (e.g., {example_text})"
+            )
+        return "\n".join(intent_lines)
@@ -7,6 +7,26 @@ that can be used across discovery, intent classification, and
 other AI-powered features in SmartDoc.
 """
 
-from .providers import LLMProvider, OllamaProvider
+from .chat import ChatHistoryStore
+from .context import LLMCallContext, current_call, llm_call
+from .factory import get_default_provider
+from .metrics import CallMetrics, collect_llm_calls, get_metrics_registry
+from .providers import AsyncLLMProvider, LLMProvider, OllamaProvider, run_sync
+from .structured import StructuredOutput, json_schema_for
 
-__all__ = ["LLMProvider", "OllamaProvider"]
+__all__ = [
+    "LLMProvider",
+    "AsyncLLMProvider",
+    "OllamaProvider",
+    "run_sync",
+    "ChatHistoryStore",
+    "LLMCallContext",
+    "current_call",
+    "llm_call",
+    "get_default_provider",
+    "CallMetrics",
+    "collect_llm_calls",
+    "get_metrics_registry",
+    "StructuredOutput",
+    "json_schema_for",
+]
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Per-Session Chat History
+
+Keeps the recent turns of each simulation session so persona responders
+can send a stable system prompt plus the running conversation to a chat
+endpoint. Consecutive requests of a session then share a long common
+prefix that the server evaluates once instead of on every turn.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+ChatMessage = Dict[str, str]
+
+
+class ChatHistoryStore:
+    """
+    Thread-safe, bounded store of (user, assistant) turns per session.
+
+    Bounds:
+        - at most ``max_turns`` turns per session; when exceeded, the oldest
+          turns are dropped down to ``max_turns // 2`` in one go, so the
+          history prefix stays unchanged (and reusable) between trims
+        - at most ``max_sessions`` sessions, least recently used evicted first
+        - sessions idle for ``idle_ttl_s`` are forgotten (matching the
+          simulation session timeout)
+    """
+
+    def __init__(
+        self,
+        *,
+        max_turns: int = 12,
+        max_sessions: int = 200,
+        idle_ttl_s: Optional[float] = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            max_turns: Turns kept per session
+            max_sessions: Sessions kept in total
+            idle_ttl_s: Idle time after which a session's history is dropped
+                (None keeps histories until evicted by ``max_sessions``)
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.max_turns = max(1, max_turns)
+        self.max_sessions = max_sessions
+        self.idle_ttl_s = idle_ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        # session_id -> (last used, turns)
+        self._sessions: "OrderedDict[str, Tuple[float, Deque[Tuple[str, str]]]]" = OrderedDict()
+
+    def messages(self, session_id: str, system: str, user: str) -> List[ChatMessage]:
+        """Build the chat request for a new turn: system prompt, history, then ``user``."""
+        messages: List[ChatMessage] = [{"role": "system", "content": system}]
+        with self._lock:
+            self._expire(self._clock())
+            entry = self._sessions.get(session_id)
+            turns = list(entry[1]) if entry else []
+        for user_text, assistant_text in turns:
+            messages.append({"role": "user", "content": user_text})
+            messages.append({"role": "assistant", "content": assistant_text})
+        messages.append({"role": "user", "content": user})
+        return messages
+
+    def append(self, session_id: str, user: str, assistant: str) -> None:
+        """Record a completed turn."""
+        now = self._clock()
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            turns = entry[1] if entry else deque()
+            turns.append((user, assistant))
+            if len(turns) > self.max_turns:
+                for _ in range(len(turns) - self.max_turns // 2):
+                    turns.popleft()
+            self._sessions[session_id] = (now, turns)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            self._expire(now)
+
+    def turns(self, session_id: str) -> int:
+        """Number of turns currently kept for a session."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return len(entry[1]) if entry else 0
+
+    def forget(self, session_id: str) -> None:
+        """Drop a session's history (e.g. when the session starts over or ends)."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _expire(self, now: float) -> None:
+        # Sessions are kept in last-used order, so expired ones are at the front
+        if self.idle_ttl_s is None:
+            return
+        while self._sessions:
+            session_id, (last_used, _) = next(iter(self._sessions.items()))
+            if now - last_used <= self.idle_ttl_s:
+                return
+            del self._sessions[session_id]
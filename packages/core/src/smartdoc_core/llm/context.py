@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+LLM Call Context
+
+Carries per-call metadata (call site, session, cache policy) from the code
+that issues an LLM request down to the provider decorators, without
+changing the ``generate`` signature every caller and test double relies on.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from typing import Iterator, Optional
+
+# ---- Call sites ----
+# Names used to tag requests for caching policy and metrics.
+INTENT = "intent"
+INTENT_FAST = "intent_fast"  # First (small-model) tier of the intent cascade
+DISCOVERY = "discovery"
+SON_PERSONA = "son_persona"
+RESIDENT_PERSONA = "resident_persona"
+PATIENT_FALLBACK = "patient_fallback"
+CLARIFICATION = "clarification"
+EVALUATOR = "evaluator"
+EVALUATOR_REPAIR = "evaluator_repair"
+DEEP_BIAS = "deep_bias"
+DEFAULT = "default"
+
+# ---- Priority classes ----
+# Scheduling classes for access to the LLM backend (see PrioritySchedulerProvider).
+INTERACTIVE = "interactive"
+EVALUATION = "evaluation"
+BATCH = "batch"
+
+
+@dataclass(frozen=True)
+class LLMCallContext:
+    """
+    Metadata describing the LLM call currently being made.
+
+    Attributes:
+        call_site: Logical origin of the call (see module constants)
+        session_id: Simulation session the call belongs to, if any
+        cache: Force caching on (True) or off (False); None defers to policy
+        priority: Scheduling class; None derives it from the call site
+    """
+
+    call_site: str = DEFAULT
+    session_id: Optional[str] = None
+    cache: Optional[bool] = None
+    priority: Optional[str] = None
+
+
+_current: ContextVar[LLMCallContext] = ContextVar("smartdoc_llm_call", default=LLMCallContext())
+
+
+def current_call() -> LLMCallContext:
+    """Return the context of the LLM call being made on this thread/task."""
+    return _current.get()
+
+
+@contextmanager
+def llm_call(**overrides) -> Iterator[LLMCallContext]:
+    """
+    Tag LLM calls made inside the block.
+
+    Fields not passed are inherited from the enclosing context, so an outer
+    ``llm_call(session_id=...)`` combines with an inner
+    ``llm_call(call_site=...)``.
+
+    Example:
+        with llm_call(call_site=CLARIFICATION, session_id=session_id):
+            provider.generate(prompt)
+    """
+    overrides = {k: v for k, v in overrides.items() if v is not None or k == "cache"}
+    previous = _current.get()
+    ctx = replace(previous, **overrides)
+    token = _current.set(ctx)
+    try:
+        yield ctx
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Generator-based callers may resume in a copied context
+            _current.set(previous)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Default LLM Provider Factory
+
+Builds the process-wide provider stack from configuration: an
+OllamaProvider wrapped by the call-layer decorators enabled in the
+``llm:`` section of the YAML config.
+"""
+
+import atexit
+import threading
+from typing import Any, Dict, Optional
+
+from smartdoc_core.config.settings import config
+from smartdoc_core.llm.context import INTERACTIVE
+from smartdoc_core.utils.logger import sys_logger
+
+from .providers.base import LLMProvider
+from .providers.breaker import CircuitBreakerProvider
+from .providers.budget import OutputBudget, OutputBudgetProvider
+from .providers.cache import CachingProvider
+from .providers.cassette import RecordingProvider, ReplayProvider
+from .providers.coalesce import CoalescingProvider
+from .providers.ollama import OllamaProvider
+from .providers.replicas import ReplicaSetProvider
+from .providers.routing import RoutingProvider, get_router
+from .providers.scheduler import PrioritySchedulerProvider
+
+_default_provider: Optional[LLMProvider] = None
+_default_lock = threading.Lock()
+
+
+def build_provider_stack(base_url: Optional[str] = None, model: Optional[str] = None) -> LLMProvider:
+    """
+    Build a decorated provider from configuration.
+
+    Args:
+        base_url: Ollama URL (defaults to the configured replica set/base URL)
+        model: Model name (defaults to config)
+
+    Returns:
+        The outermost provider of the stack
+    """
+    model = model or config.OLLAMA_MODEL
+    urls = [base_url] if base_url else config.ollama_urls()
+    provider: LLMProvider
+    if len(urls) > 1:
+        replica_settings = config.llm_section("replicas")
+        hedge_settings = replica_settings.get("hedge") or {}
+        provider = ReplicaSetProvider(
+            [OllamaProvider(url, model) for url in urls],
+            probe_interval_s=float(replica_settings.get("probe_interval_s", 10)),
+            probe_timeout_s=float(replica_settings.get("probe_timeout_s", 2)),
+            unhealthy_after=int(replica_settings.get("unhealthy_after", 3)),
+            latency_window=int(replica_settings.get("latency_window", 200)),
+            hedge_call_sites=hedge_settings.get("call_sites") or [],
+            hedge_quantile=float(hedge_settings.get("quantile", 0.95)),
+            hedge_min_samples=int(hedge_settings.get("min_samples", 20)),
+            hedge_min_delay_s=float(hedge_settings.get("min_delay_s", 0.5)),
+        )
+    else:
+        provider = OllamaProvider(urls[0], model)
+
+    # Record real upstream traffic, or serve it back without a server
+    cassette_settings = config.llm_section("cassette")
+    cassette_mode = cassette_settings.get("mode") or "off"
+    if cassette_mode != "off":
+        cassette_path = config.resolve_path(cassette_settings["path"])
+        if cassette_mode == "record":
+            provider = RecordingProvider(
+                provider, cassette_path, store_prompts=bool(cassette_settings.get("store_prompts", False))
+            )
+            atexit.register(provider.close)  # Write the gzip end marker on shutdown
+        elif cassette_mode == "replay":
+            provider = ReplayProvider(
+                cassette_path,
+                reproduce_latency=bool(cassette_settings.get("reproduce_latency", False)),
+                latency_scale=float(cassette_settings.get("latency_scale", 1.0)),
+            )
+        else:
+            raise ValueError(f"Unknown llm.cassette.mode: {cassette_mode}")
+
+    # Below coalescing/caching: one upstream outcome per shared call, and
+    # cached answers are still served while the circuit is open
+    breaker_settings = config.llm_section("breaker")
+    if breaker_settings.get("enabled", False):
+        provider = CircuitBreakerProvider(
+            provider,
+            window_s=float(breaker_settings.get("window_s", 60)),
+            min_calls=int(breaker_settings.get("min_calls", 5)),
+            error_rate=float(breaker_settings.get("error_rate", 0.5)),
+            slow_call_s=float(breaker_settings.get("slow_call_s", 30)),
+            slow_rate=float(breaker_settings.get("slow_rate", 0.8)),
+            open_s=float(breaker_settings.get("open_s", 30)),
+            slow_call_sites=breaker_settings.get("slow_call_sites") or {},
+        )
+
+    # Above the breaker (an open circuit drains the queue fast) and below
+    # coalescing/caching (shared and cached answers take no slot)
+    scheduler_settings = config.llm_section("scheduler")
+    if scheduler_settings.get("enabled", False):
+        aging_s = scheduler_settings.get("aging_s", 30)
+        provider = PrioritySchedulerProvider(
+            provider,
+            max_concurrent=scheduler_settings.get("max_concurrent") or config.ollama_num_parallel,
+            classes=scheduler_settings.get("classes") or None,
+            call_sites=scheduler_settings.get("call_sites") or {},
+            default_class=scheduler_settings.get("default_class", INTERACTIVE),
+            aging_s=float(aging_s) if aging_s is not None else None,
+            max_queue_s=float(scheduler_settings.get("max_queue_s", 120)),
+        )
+
+    coalesce_settings = config.llm_section("coalesce")
+    if coalesce_settings.get("enabled", False):
+        max_temperature = coalesce_settings.get("max_temperature")
+        provider = CoalescingProvider(
+            provider,
+            max_temperature=float(max_temperature) if max_temperature is not None else None,
+        )
+
+    cache_settings = config.llm_section("cache")
+    if cache_settings.get("enabled", False):
+        db_path = cache_settings.get("db_path")
+        provider = CachingProvider(
+            provider,
+            max_entries=int(cache_settings.get("max_entries", 1024)),
+            ttl_s=float(cache_settings.get("ttl_s", 86400)),
+            db_path=config.resolve_path(db_path) if db_path else None,
+            max_db_entries=int(cache_settings.get("max_db_entries", 50000)),
+            max_temperature=float(cache_settings.get("max_temperature", 0.3)),
+            call_sites=cache_settings.get("call_sites") or {},
+        )
+
+    # Above caching/coalescing so the limits are part of the request key;
+    # below routing so an admin profile's max_tokens takes precedence
+    budget_settings = config.llm_section("budgets")
+    if budget_settings.get("enabled", False):
+        provider = OutputBudgetProvider(
+            provider,
+            {
+                call_site: OutputBudget.from_config(settings or {})
+                for call_site, settings in (budget_settings.get("call_sites") or {}).items()
+            },
+        )
+
+    routing_settings = config.llm_section("routing")
+    if routing_settings.get("enabled", False):
+        router = get_router()
+        ttl_s = routing_settings.get("ttl_s", 30)
+        router.ttl_s = float(ttl_s) if ttl_s is not None else None
+        # Outermost, so the routed model is part of the cache/coalescing key
+        provider = RoutingProvider(
+            provider, router, apply_sampling=bool(routing_settings.get("apply_sampling", False))
+        )
+
+    return provider
+
+
+def get_default_provider() -> LLMProvider:
+    """
+    Return the shared provider used by components built without one.
+
+    Sharing a single stack means the cache and other call-layer state are
+    common to the classifier, responders and evaluator.
+    """
+    global _default_provider
+    if _default_provider is None:
+        with _default_lock:
+            if _default_provider is None:
+                _default_provider = build_provider_stack()
+                sys_logger.log_system(
+                    "info", f"Default LLM provider stack: {describe_stack(_default_provider)}"
+                )
+    return _default_provider
+
+
+def reset_default_provider() -> None:
+    """Drop the shared provider so the next call rebuilds it from config."""
+    global _default_provider
+    with _default_lock:
+        _default_provider = None
+
+
+def describe_stack(provider: LLMProvider) -> str:
+    """Describe a provider stack outermost-first, e.g. 'CachingProvider > OllamaProvider'."""
+    names = []
+    current = provider
+    while current is not None:
+        name = type(current).__name__
+        if isinstance(current, ReplicaSetProvider):
+            name += f"[{len(current.replicas)}]"
+        names.append(name)
+        current = current.__dict__.get("inner")
+    return " > ".join(names)
+
+
+def stack_stats(provider: LLMProvider) -> Dict[str, Any]:
+    """Collect ``stats()`` of every layer in a provider stack that reports them, keyed by class name."""
+    stats: Dict[str, Any] = {}
+    current = provider
+    while current is not None:
+        # Look up on the class: decorators forward unknown attributes to inner
+        if callable(getattr(type(current), "stats", None)):
+            stats[type(current).__name__] = current.stats()
+        current = current.__dict__.get("inner")
+    return stats
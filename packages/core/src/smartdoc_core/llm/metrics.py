@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+LLM Call Metrics
+
+Per-call token and latency accounting. Providers report each upstream
+generation (token counts and the server's timing breakdown); calls are
+tagged with the active call site and session and aggregated into an
+in-process registry of totals and histograms.
+"""
+
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from smartdoc_core.llm.context import current_call
+
+LATENCY_BUCKETS_S = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+@dataclass
+class CallMetrics:
+    """
+    Accounting for one upstream LLM call.
+
+    Durations reported by the server are in seconds; ``wall_s`` is the
+    client-side latency including network and queueing. ``truncated`` is
+    set when generation stopped at the ``max_tokens`` budget rather than
+    at the end of the answer or a stop sequence.
+    """
+
+    call_site: str
+    session_id: Optional[str]
+    model: Optional[str]
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    wall_s: float = 0.0
+    total_s: float = 0.0
+    load_s: float = 0.0
+    prompt_eval_s: float = 0.0
+    eval_s: float = 0.0
+    max_tokens: Optional[int] = None
+    truncated: bool = False
+    timestamp: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_ollama(
+        cls, data: Dict[str, Any], model: Optional[str], wall_s: float, max_tokens: Optional[int] = None
+    ) -> "CallMetrics":
+        """Build metrics from the final JSON object of an Ollama generate response."""
+        ctx = current_call()
+        ns = 1e-9
+        return cls(
+            call_site=ctx.call_site,
+            session_id=ctx.session_id,
+            model=data.get("model") or model,
+            prompt_tokens=int(data.get("prompt_eval_count") or 0),
+            completion_tokens=int(data.get("eval_count") or 0),
+            wall_s=wall_s,
+            total_s=(data.get("total_duration") or 0) * ns,
+            load_s=(data.get("load_duration") or 0) * ns,
+            prompt_eval_s=(data.get("prompt_eval_duration") or 0) * ns,
+            eval_s=(data.get("eval_duration") or 0) * ns,
+            max_tokens=max_tokens,
+            truncated=max_tokens is not None and data.get("done_reason") == "length",
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class Histogram:
+    """Fixed-bucket histogram (per-bucket, non-cumulative counts) with count and sum."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if empty or +Inf)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets = {str(b): n for b, n in zip(self.bounds, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": (self.sum / self.count) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": buckets,
+        }
+
+
+class _SiteStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.wall_s = 0.0
+        self.load_s = 0.0
+        self.prompt_eval_s = 0.0
+        self.eval_s = 0.0
+        self.budgeted = 0
+        self.truncated = 0
+        self.latency = Histogram(LATENCY_BUCKETS_S)
+        self.prompt_token_hist = Histogram(TOKEN_BUCKETS)
+        self.completion_token_hist = Histogram(TOKEN_BUCKETS)
+
+    def add(self, m: CallMetrics) -> None:
+        self.calls += 1
+        self.prompt_tokens += m.prompt_tokens
+        self.completion_tokens += m.completion_tokens
+        self.wall_s += m.wall_s
+        self.load_s += m.load_s
+        self.prompt_eval_s += m.prompt_eval_s
+        self.eval_s += m.eval_s
+        self.budgeted += m.max_tokens is not None
+        self.truncated += m.truncated
+        self.latency.observe(m.wall_s)
+        self.prompt_token_hist.observe(m.prompt_tokens)
+        self.completion_token_hist.observe(m.completion_tokens)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "wall_s": self.wall_s,
+            "load_s": self.load_s,
+            "prompt_eval_s": self.prompt_eval_s,
+            "eval_s": self.eval_s,
+            "budgeted_calls": self.budgeted,
+            "truncated": self.truncated,
+            "truncation_rate": (self.truncated / self.budgeted) if self.budgeted else None,
+            "latency_s": self.latency.snapshot(),
+            "prompt_tokens_hist": self.prompt_token_hist.snapshot(),
+            "completion_tokens_hist": self.completion_token_hist.snapshot(),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe aggregate of LLM call metrics.
+
+    Keeps totals and histograms per call site and per-session token/time
+    totals for the most recently active ``max_sessions`` sessions.
+    """
+
+    def __init__(self, max_sessions: int = 1000):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sites: Dict[str, _SiteStats] = {}
+        self._sessions: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+
+    def record(self, metrics: CallMetrics) -> None:
+        """Add one successful call."""
+        with self._lock:
+            self._site(metrics.call_site).add(metrics)
+            if metrics.session_id:
+                totals = self._sessions.pop(metrics.session_id, None) or {
+                    "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "wall_s": 0.0,
+                }
+                totals["calls"] += 1
+                totals["prompt_tokens"] += metrics.prompt_tokens
+                totals["completion_tokens"] += metrics.completion_tokens
+                totals["wall_s"] += metrics.wall_s
+                self._sessions[metrics.session_id] = totals
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+        collected = _collector.get()
+        if collected is not None:
+            collected.append(metrics)
+
+    def record_error(self, call_site: Optional[str] = None) -> None:
+        """Count a failed call for the active (or given) call site."""
+        with self._lock:
+            self._site(call_site or current_call().call_site).errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return totals and histograms per call site plus an overall total."""
+        with self._lock:
+            sites = {name: stats.snapshot() for name, stats in self._sites.items()}
+        total_keys = ("calls", "errors", "prompt_tokens", "completion_tokens",
+                      "wall_s", "load_s", "prompt_eval_s", "eval_s", "budgeted_calls", "truncated")
+        totals = {k: sum(s[k] for s in sites.values()) for k in total_keys}
+        totals["truncation_rate"] = (
+            totals["truncated"] / totals["budgeted_calls"] if totals["budgeted_calls"] else None
+        )
+        return {"totals": totals, "by_call_site": sites}
+
+    def session_totals(self, session_id: str) -> Optional[Dict[str, float]]:
+        """Return token/time totals for a session, if still tracked."""
+        with self._lock:
+            totals = self._sessions.get(session_id)
+            return dict(totals) if totals else None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sites.clear()
+            self._sessions.clear()
+
+    def _site(self, name: str) -> _SiteStats:
+        stats = self._sites.get(name)
+        if stats is None:
+            stats = self._sites[name] = _SiteStats()
+        return stats
+
+
+_collector: ContextVar[Optional[List[CallMetrics]]] = ContextVar("smartdoc_llm_metrics", default=None)
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide metrics registry."""
+    return _registry
+
+
+@contextmanager
+def collect_llm_calls() -> Iterator[List[CallMetrics]]:
+    """
+    Collect the metrics of every LLM call made inside the block.
+
+    Yields the list the calls are appended to. Calls answered without an
+    upstream request (cache hits, coalesced followers) are not included.
+    """
+    calls: List[CallMetrics] = []
+    token = _collector.set(calls)
+    try:
+        yield calls
+    finally:
+        try:
+            _collector.reset(token)
+        except ValueError:
+            # Exited in a different context (e.g. a generator finalized elsewhere)
+            pass
+
+
+def summarize_calls(calls: Sequence[CallMetrics]) -> Dict[str, Any]:
+    """Totals and per-call detail for a group of calls, e.g. one doctor query."""
+    return {
+        "calls": len(calls),
+        "prompt_tokens": sum(c.prompt_tokens for c in calls),
+        "completion_tokens": sum(c.completion_tokens for c in calls),
+        "wall_s": sum(c.wall_s for c in calls),
+        "prompt_eval_s": sum(c.prompt_eval_s for c in calls),
+        "eval_s": sum(c.eval_s for c in calls),
+        "load_s": sum(c.load_s for c in calls),
+        "truncated": sum(c.truncated for c in calls),
+        "per_call": [c.to_dict() for c in calls],
+    }
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Prompt Layout Analysis
+
+Measures how much of each prompt repeats the start of an earlier one.
+Ollama keeps the evaluated prompt of each parallel slot and only
+re-evaluates a new prompt from the first character that differs, so
+prompts that put static text first and per-request data last are
+evaluated mostly from cache.
+"""
+
+import os
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, Tuple
+
+# Rough characters per token for English prompt text
+CHARS_PER_TOKEN = 4.0
+
+
+def shared_prefix_length(a: str, b: str) -> int:
+    """Length of the common prefix of two prompts, in characters."""
+    return len(os.path.commonprefix([a, b]))
+
+
+@dataclass
+class PrefixReuse:
+    """Aggregate prefix reuse over a sequence of prompts."""
+
+    calls: int = 0
+    prompt_chars: int = 0
+    reused_chars: int = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of prompt characters the server would not need to evaluate again."""
+        return self.reused_chars / self.prompt_chars if self.prompt_chars else 0.0
+
+    @property
+    def evaluated_tokens(self) -> float:
+        """Estimated prompt tokens still evaluated."""
+        return (self.prompt_chars - self.reused_chars) / CHARS_PER_TOKEN
+
+    @property
+    def saved_tokens(self) -> float:
+        """Estimated prompt tokens served from the prefix cache."""
+        return self.reused_chars / CHARS_PER_TOKEN
+
+    def add(self, prompt_chars: int, reused_chars: int) -> None:
+        self.calls += 1
+        self.prompt_chars += prompt_chars
+        self.reused_chars += reused_chars
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "prompt_chars": self.prompt_chars,
+            "reused_chars": self.reused_chars,
+            "reuse_ratio": round(self.reuse_ratio, 4),
+            "saved_tokens_est": round(self.saved_tokens),
+            "evaluated_tokens_est": round(self.evaluated_tokens),
+        }
+
+
+def prefix_reuse(
+    prompts: Iterable[Tuple[str, str]],
+    *,
+    slots: int = 1,
+) -> Tuple[Dict[str, PrefixReuse], PrefixReuse]:
+    """
+    Estimate prompt-prefix cache reuse for a stream of prompts.
+
+    Each prompt reuses the longest common prefix with any of the last
+    ``slots`` prompts (one cached prompt per server slot). Results are
+    grouped by the label given with each prompt, usually its call site.
+
+    Args:
+        prompts: (label, prompt) pairs in request order
+        slots: Server parallel slots (``OLLAMA_NUM_PARALLEL``)
+
+    Returns:
+        (label -> PrefixReuse, overall PrefixReuse)
+    """
+    recent: Deque[str] = deque(maxlen=max(1, slots))
+    report: Dict[str, PrefixReuse] = OrderedDict()
+    total = PrefixReuse()
+    for label, prompt in prompts:
+        reused = max((shared_prefix_length(prompt, cached) for cached in recent), default=0)
+        report.setdefault(label, PrefixReuse()).add(len(prompt), reused)
+        total.add(len(prompt), reused)
+        recent.append(prompt)
+    return report, total
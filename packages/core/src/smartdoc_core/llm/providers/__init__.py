@@ -5,7 +5,42 @@ LLM Providers Package
 Provides different LLM provider implementations for SmartDoc.
 """
 
-from .base import LLMProvider
+from .aio import AsyncLLMProvider, run_sync
+from .base import BatchResult, DelegatingProvider, LLMProvider
+from .breaker import CircuitBreakerProvider
+from .budget import OutputBudget, OutputBudgetProvider
+from .cache import CachingProvider, MemoryTier, SQLiteTier
+from .cassette import RecordingProvider, ReplayProvider
+from .coalesce import CoalescingProvider
 from .ollama import OllamaProvider
+from .replicas import ReplicaSetProvider
+from .routing import ProfileRouter, RouteProfile, RoutingProvider, get_router, invalidate_routes
+from .scheduler import PrioritySchedulerProvider
+from .transport import PooledTransport, get_shared_transport
 
-__all__ = ["LLMProvider", "OllamaProvider"]
+__all__ = [
+    "LLMProvider",
+    "AsyncLLMProvider",
+    "DelegatingProvider",
+    "BatchResult",
+    "CachingProvider",
+    "MemoryTier",
+    "SQLiteTier",
+    "CircuitBreakerProvider",
+    "CoalescingProvider",
+    "RecordingProvider",
+    "ReplayProvider",
+    "OllamaProvider",
+    "OutputBudget",
+    "OutputBudgetProvider",
+    "PrioritySchedulerProvider",
+    "ReplicaSetProvider",
+    "RoutingProvider",
+    "ProfileRouter",
+    "RouteProfile",
+    "get_router",
+    "invalidate_routes",
+    "run_sync",
+    "PooledTransport",
+    "get_shared_transport",
+]
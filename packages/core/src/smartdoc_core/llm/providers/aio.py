@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Async Support for LLM Providers
+
+Provides the shared async HTTP client used by native ``agenerate``
+implementations, and a sync shim so blocking callers can drive
+async-native providers without managing an event loop themselves.
+"""
+
+import asyncio
+import contextvars
+import threading
+import weakref
+from abc import abstractmethod
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Optional, TypeVar
+
+from smartdoc_core.config.settings import config
+from smartdoc_core.utils.logger import sys_logger
+
+from .base import LLMProvider
+
+try:
+    import httpx
+
+    HAVE_HTTPX = True
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+    HAVE_HTTPX = False
+
+T = TypeVar("T")
+
+
+# ---- Sync shim ----
+
+class _BackgroundLoop:
+    """Event loop running forever in a daemon thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="smartdoc-llm-loop", daemon=True
+        )
+        self.thread.start()
+
+
+_background: Optional[_BackgroundLoop] = None
+_background_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _background
+    if _background is None:
+        with _background_lock:
+            if _background is None:
+                _background = _BackgroundLoop()
+    return _background.loop
+
+
+def run_sync(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    The coroutine is scheduled on a single long-lived background loop, so
+    async clients bound to that loop keep their pooled connections between
+    calls. Safe to call from any thread, including one that is itself
+    running an event loop (other than the background loop). Context
+    variables of the caller, such as the LLM call context, are visible to
+    the coroutine.
+
+    Args:
+        coro: Coroutine to run
+        timeout: Optional wall-clock limit in seconds
+
+    Returns:
+        The coroutine's result
+
+    Raises:
+        TimeoutError: If ``timeout`` elapses (the coroutine is cancelled)
+    """
+    loop = _get_background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() cannot block the background LLM loop it runs on")
+
+    future = asyncio.run_coroutine_threadsafe(
+        _in_context(contextvars.copy_context(), coro), loop
+    )
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise TimeoutError(f"Async call did not finish within {timeout}s")
+
+
+async def _in_context(ctx: contextvars.Context, coro: Awaitable[T]) -> T:
+    """Await ``coro`` with the caller's context variables applied to this task."""
+    for var, value in ctx.items():
+        var.set(value)
+    return await coro
+
+
+class AsyncLLMProvider(LLMProvider):
+    """
+    Base class for providers whose native interface is ``agenerate``.
+
+    ``generate`` is provided as a sync shim over ``agenerate`` so existing
+    blocking callers keep working unchanged.
+    """
+
+    @abstractmethod
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.1,
+        top_p: float = 0.9,
+        timeout_s: int = 60,
+        **kwargs: Any,
+    ) -> str:
+        """Generate text from the LLM asynchronously."""
+
+    def generate(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.1,
+        top_p: float = 0.9,
+        timeout_s: int = 60,
+        **kwargs: Any,
+    ) -> str:
+        """Blocking wrapper around ``agenerate``."""
+        return run_sync(
+            self.agenerate(
+                prompt, temperature=temperature, top_p=top_p, timeout_s=timeout_s, **kwargs
+            )
+        )
+
+
+# ---- Shared async HTTP client ----
+
+# One client per event loop: httpx async clients cannot be shared across loops
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+    weakref.WeakKeyDictionary()
+)
+_async_clients_lock = threading.Lock()
+
+
+def get_async_client() -> "httpx.AsyncClient":
+    """
+    Return the pooled async HTTP client for the running event loop.
+
+    Raises:
+        RuntimeError: If httpx is not installed or no loop is running
+    """
+    if not HAVE_HTTPX:
+        raise RuntimeError("httpx is required for native async LLM calls")
+
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=config.ollama_async_max_connections,
+                    max_keepalive_connections=config.ollama_pool_maxsize,
+                ),
+                # Retries only cover connect failures, never read timeouts
+                transport=httpx.AsyncHTTPTransport(retries=config.ollama_max_retries),
+            )
+            _async_clients[loop] = client
+            sys_logger.log_system(
+                "debug",
+                f"Async LLM client created (max_connections={config.ollama_async_max_connections})",
+            )
+    return client
+
+
+async def close_async_client() -> None:
+    """Close the async client bound to the running event loop, if any."""
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        client = _async_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
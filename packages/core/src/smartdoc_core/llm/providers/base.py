@@ -6,8 +6,42 @@ Defines the contract for LLM providers that can be used across
 discovery, intent classification, and other AI-powered features.
 """
 
+import asyncio
+import functools
+import hashlib
+import json
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+
+from smartdoc_core.llm.structured import StructuredOutput, json_schema_for, parse_structured
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of one prompt in a ``generate_many`` batch.
+
+    Attributes:
+        index: Position of the prompt in the input sequence
+        text: Generated text, or None if the item failed
+        error: Exception raised for this item, or None on success
+        elapsed_s: Wall-clock time spent on the item
+    """
+
+    index: int
+    text: Optional[str] = None
+    error: Optional[BaseException] = None
+    elapsed_s: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class LLMProvider(ABC):
@@ -16,10 +50,27 @@ class LLMProvider(ABC):
 
     Allows for different LLM services (Ollama, OpenAI, Claude, etc.)
     to be used interchangeably across SmartDoc components.
+
+    Providers expose both a blocking ``generate`` and a coroutine
+    ``agenerate``. Subclasses that only implement ``generate`` get an
+    ``agenerate`` that runs the blocking call in a worker thread; providers
+    with a native async client override ``agenerate`` directly.
     """
 
     model: Optional[str] = None
 
+    # Default number of requests generate_many keeps in flight
+    max_parallel: int = 4
+
+    # Whether generate() accepts a JSON schema via ``format=`` and
+    # constrains decoding to it
+    supports_structured_output: bool = False
+
+    # Whether generate() accepts ``messages=`` (a chat history ending with
+    # the current user turn) in place of the flat prompt, letting the server
+    # reuse the evaluated history prefix across turns
+    supports_chat: bool = False
+
     @abstractmethod
     def generate(
         self,
@@ -45,3 +96,260 @@ class LLMProvider(ABC):
             Exception: If the LLM request fails
         """
         pass
+
+    def generate_stream(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.1,
+        top_p: float = 0.9,
+        timeout_s: int = 60,
+        **kwargs: Any,
+    ) -> Iterator[str]:
+        """
+        Generate text from the LLM as a stream of chunks.
+
+        The default implementation yields the full ``generate`` result as a
+        single chunk; providers that support token streaming override it.
+
+        Yields:
+            Text chunks in generation order
+        """
+        yield self.generate(
+            prompt, temperature=temperature, top_p=top_p, timeout_s=timeout_s, **kwargs
+        )
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.1,
+        top_p: float = 0.9,
+        timeout_s: int = 60,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Generate text from the LLM without blocking the event loop.
+
+        The default implementation offloads ``generate`` to a worker thread.
+        Accepts the same arguments as ``generate``.
+
+        Returns:
+            Generated text response from the LLM
+        """
+        call = functools.partial(
+            self.generate,
+            prompt,
+            temperature=temperature,
+            top_p=top_p,
+            timeout_s=timeout_s,
+            **kwargs,
+        )
+        return await asyncio.to_thread(call)
+
+    def generate_structured(
+        self,
+        prompt: str,
+        schema: Type[M],
+        *,
+        json_schema: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> StructuredOutput[M]:
+        """
+        Generate output conforming to a Pydantic model.
+
+        Providers that support structured output constrain decoding to the
+        model's JSON schema, so the response is bare JSON with no prose to
+        scrape. Other providers generate unconstrained text that is parsed
+        the same way.
+
+        Args:
+            prompt: The input prompt for the LLM
+            schema: Pydantic model the output must validate against
+            json_schema: Schema to send instead of the one derived from
+                ``schema`` (e.g. with an enum narrowing a field)
+            **kwargs: Generation options passed to ``generate``
+
+        Returns:
+            StructuredOutput with the raw text and, if valid, the parsed model
+        """
+        if self.supports_structured_output:
+            kwargs["format"] = json_schema or json_schema_for(schema)
+        raw = self.generate(prompt, **kwargs)
+        return parse_structured(raw, schema)
+
+    def generate_many(
+        self,
+        prompts: Sequence[str],
+        *,
+        max_concurrency: Optional[int] = None,
+        per_item_timeout: float = 120,
+        item_options: Optional[Sequence[Dict[str, Any]]] = None,
+        **kwargs: Any,
+    ) -> List[BatchResult]:
+        """
+        Generate completions for many prompts with bounded concurrency.
+
+        Items run through ``agenerate`` on a shared event loop, so a new
+        request starts as soon as any in-flight one finishes and the
+        backend's parallel slots stay busy. A failing or timed-out item does
+        not affect the others.
+
+        Args:
+            prompts: Prompts to generate for
+            max_concurrency: Maximum requests in flight (defaults to ``max_parallel``)
+            per_item_timeout: Wall-clock limit per item in seconds
+            item_options: Optional per-item generation options (e.g.
+                ``{"temperature": 0.3}``) overriding ``kwargs``
+            **kwargs: Generation options shared by all items
+
+        Returns:
+            One BatchResult per prompt, in input order
+        """
+        from .aio import run_sync  # aio builds on this module
+
+        return run_sync(
+            self.agenerate_many(
+                prompts,
+                max_concurrency=max_concurrency,
+                per_item_timeout=per_item_timeout,
+                item_options=item_options,
+                **kwargs,
+            )
+        )
+
+    async def agenerate_many(
+        self,
+        prompts: Sequence[str],
+        *,
+        max_concurrency: Optional[int] = None,
+        per_item_timeout: float = 120,
+        item_options: Optional[Sequence[Dict[str, Any]]] = None,
+        **kwargs: Any,
+    ) -> List[BatchResult]:
+        """Async variant of ``generate_many``; same arguments and results."""
+        from smartdoc_core.utils.exceptions import LLMTimeoutError
+
+        if item_options is not None and len(item_options) != len(prompts):
+            raise ValueError("item_options must have one entry per prompt")
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or self.max_parallel))
+        kwargs.setdefault("timeout_s", per_item_timeout)
+
+        async def run_one(index: int, prompt: str) -> BatchResult:
+            options = {**kwargs, **(item_options[index] if item_options else {})}
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    text = await asyncio.wait_for(
+                        self.agenerate(prompt, **options), per_item_timeout
+                    )
+                    return BatchResult(index, text=text, elapsed_s=time.perf_counter() - started)
+                except asyncio.TimeoutError:
+                    error = LLMTimeoutError(f"Batch item {index} exceeded {per_item_timeout}s")
+                except Exception as e:
+                    error = e
+                return BatchResult(index, error=error, elapsed_s=time.perf_counter() - started)
+
+        return list(await asyncio.gather(*(run_one(i, p) for i, p in enumerate(prompts))))
+
+    async def aclose(self) -> None:
+        """Release async resources held by the provider (no-op by default)."""
+        return None
+
+    async def __aenter__(self) -> "LLMProvider":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+
+class DelegatingProvider(LLMProvider):
+    """
+    Base class for provider decorators (cache, metrics, resilience, ...).
+
+    Forwards every call, including extra generation keyword arguments, to
+    the wrapped provider. Subclasses override the methods they decorate.
+    """
+
+    def __init__(self, inner: LLMProvider):
+        """
+        Args:
+            inner: Provider being decorated
+        """
+        self.inner = inner
+
+    @property
+    def model(self) -> Optional[str]:  # type: ignore[override]
+        return getattr(self.inner, "model", None)
+
+    @model.setter
+    def model(self, value: Optional[str]) -> None:
+        self.inner.model = value
+
+    @property
+    def max_parallel(self) -> int:  # type: ignore[override]
+        return getattr(self.inner, "max_parallel", LLMProvider.max_parallel)
+
+    @property
+    def supports_structured_output(self) -> bool:  # type: ignore[override]
+        return getattr(self.inner, "supports_structured_output", False)
+
+    @property
+    def supports_chat(self) -> bool:  # type: ignore[override]
+        return getattr(self.inner, "supports_chat", False)
+
+    def generate(self, prompt: str, **kwargs: Any) -> str:
+        return self.inner.generate(prompt, **kwargs)
+
+    def generate_stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        if isinstance(self.inner, LLMProvider):
+            return self.inner.generate_stream(prompt, **kwargs)
+        return iter([self.inner.generate(prompt, **kwargs)])
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> str:
+        if isinstance(self.inner, LLMProvider):
+            return await self.inner.agenerate(prompt, **kwargs)
+        return await super().agenerate(prompt, **kwargs)
+
+    async def aclose(self) -> None:
+        if isinstance(self.inner, LLMProvider):
+            await self.inner.aclose()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not found on the decorator itself
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+
+def request_key(
+    model: Optional[str],
+    prompt: str,
+    temperature: float,
+    top_p: float,
+    options: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Content address of a generation request.
+
+    Two requests with the same key are expected to produce interchangeable
+    results. ``timeout_s`` does not affect the output and is ignored.
+
+    Args:
+        model: Model name
+        prompt: Prompt text
+        temperature: Sampling temperature
+        top_p: Nucleus sampling parameter
+        options: Extra generation options passed to ``generate``
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    extra = {
+        k: v for k, v in sorted((options or {}).items()) if v is not None and k != "timeout_s"
+    }
+    material = json.dumps(
+        [model, prompt_hash, round(float(temperature), 4), round(float(top_p), 4), extra],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker LLM Provider
+
+Stops sending requests to an LLM backend that is down or overloaded.
+The breaker sits in the shared provider stack, so the classifier,
+responders, discovery and evaluator all see the same state and fail fast
+with ``CircuitOpenError`` instead of each waiting out its own timeout.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, Mapping, Optional, Tuple
+
+from smartdoc_core.llm.context import current_call
+from smartdoc_core.utils.exceptions import CircuitOpenError
+from smartdoc_core.utils.logger import sys_logger
+
+from .base import DelegatingProvider, LLMProvider
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreakerProvider(DelegatingProvider):
+    """
+    Provider decorator implementing a rolling-window circuit breaker.
+
+    Outcomes of the calls finished in the last ``window_s`` seconds are
+    kept. Once at least ``min_calls`` are in the window, the circuit opens
+    when the share of failed calls reaches ``error_rate`` or the share of
+    slow calls reaches ``slow_rate``. A call is slow when it takes at least
+    ``slow_call_s`` (per call site overrides in ``slow_call_sites``);
+    streams are timed to their first chunk.
+
+    While open, calls raise ``CircuitOpenError`` immediately. After
+    ``open_s`` a single probe call is let through (half-open): if it
+    succeeds in time the circuit closes, otherwise it opens again. Other
+    calls keep failing fast while the probe is in flight.
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        *,
+        window_s: float = 60.0,
+        min_calls: int = 5,
+        error_rate: float = 0.5,
+        slow_call_s: float = 30.0,
+        slow_rate: float = 0.8,
+        open_s: float = 30.0,
+        slow_call_sites: Optional[Mapping[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            inner: Provider to protect
+            window_s: Length of the rolling outcome window
+            min_calls: Calls needed in the window before the circuit may open
+            error_rate: Failed-call share that opens the circuit
+            slow_call_s: Latency at which a call counts as slow
+            slow_rate: Slow-call share that opens the circuit
+            open_s: Time to stay open before probing
+            slow_call_sites: Per-call-site ``slow_call_s`` overrides
+            clock: Monotonic time source (injectable for tests)
+        """
+        super().__init__(inner)
+        self.window_s = window_s
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_s = slow_call_s
+        self.slow_rate = slow_rate
+        self.open_s = open_s
+        self.slow_call_sites = dict(slow_call_sites or {})
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()  # (finished, failed, slow)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counters = {"opened": 0, "rejected": 0, "probes": 0}
+
+    # ---- Provider interface ----
+    def generate(self, prompt: str, **kwargs: Any) -> str:
+        is_probe = self._before()
+        started = self._clock()
+        try:
+            text = self.inner.generate(prompt, **kwargs)
+        except Exception:
+            self._after(is_probe, started, failed=True)
+            raise
+        except BaseException:
+            self._abandon(is_probe)
+            raise
+        self._after(is_probe, started, failed=False)
+        return text
+
+    def generate_stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        is_probe = self._before()
+        started = self._clock()
+        first_chunk_at: Optional[float] = None
+        try:
+            for chunk in super().generate_stream(prompt, **kwargs):
+                if first_chunk_at is None:
+                    first_chunk_at = self._clock()
+                yield chunk
+        except Exception:
+            self._after(is_probe, started, failed=True)
+            raise
+        except BaseException:
+            # Consumer stopped early: judge the stream by its first chunk
+            if first_chunk_at is None:
+                self._abandon(is_probe)
+            else:
+                self._after(is_probe, started, failed=False, finished=first_chunk_at)
+            raise
+        self._after(is_probe, started, failed=False, finished=first_chunk_at)
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> str:
+        is_probe = self._before()
+        started = self._clock()
+        try:
+            text = await super().agenerate(prompt, **kwargs)
+        except Exception:
+            self._after(is_probe, started, failed=True)
+            raise
+        except BaseException:
+            # Cancelled (e.g. a lost hedge or caller timeout): no verdict
+            self._abandon(is_probe)
+            raise
+        self._after(is_probe, started, failed=False)
+        return text
+
+    # ---- Management ----
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            return self._state
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state, window outcome counts and transition counters."""
+        with self._lock:
+            self._prune(self._clock())
+            calls = len(self._outcomes)
+            return {
+                "state": self._state,
+                "window_calls": calls,
+                "window_failures": sum(1 for _, failed, _ in self._outcomes if failed),
+                "window_slow": sum(1 for _, _, slow in self._outcomes if slow),
+                "retry_after_s": self._retry_after(self._clock()),
+                **self._counters,
+            }
+
+    def reset(self) -> None:
+        """Close the circuit and forget recorded outcomes."""
+        with self._lock:
+            self._close()
+
+    # ---- State machine ----
+    def _before(self) -> bool:
+        """Admit a call or raise CircuitOpenError; return True for the half-open probe."""
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            now = self._clock()
+            if self._state == OPEN and now - self._opened_at >= self.open_s:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._counters["probes"] += 1
+                return True
+            self._counters["rejected"] += 1
+            state = self._state
+            retry_after_s = self._retry_after(now)
+        raise CircuitOpenError(
+            f"LLM circuit breaker is {state}; retry in {retry_after_s:.1f}s",
+            retry_after_s=retry_after_s,
+        )
+
+    def _after(self, is_probe: bool, started: float, *, failed: bool, finished: Optional[float] = None) -> None:
+        now = self._clock()
+        elapsed = (finished if finished is not None else now) - started
+        slow = elapsed >= self.slow_call_sites.get(current_call().call_site, self.slow_call_s)
+        with self._lock:
+            if is_probe:
+                self._probe_in_flight = False
+                if failed or slow:
+                    self._open(now, "probe failed" if failed else f"probe took {elapsed:.1f}s")
+                else:
+                    self._close()
+                    sys_logger.log_system("info", "LLM circuit breaker closed after successful probe")
+                return
+            if self._state != CLOSED:
+                return  # Started before the circuit opened
+            self._outcomes.append((now, failed, slow))
+            self._prune(now)
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for _, f, _ in self._outcomes if f)
+            slow_calls = sum(1 for _, _, s in self._outcomes if s)
+            if failures / calls >= self.error_rate:
+                self._open(now, f"{failures}/{calls} calls failed")
+            elif slow_calls / calls >= self.slow_rate:
+                self._open(now, f"{slow_calls}/{calls} calls were slow")
+
+    def _abandon(self, is_probe: bool) -> None:
+        """Release the probe slot of a call that ended without an outcome."""
+        if is_probe:
+            with self._lock:
+                self._probe_in_flight = False
+
+    def _open(self, now: float, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        self._counters["opened"] += 1
+        sys_logger.log_system("warning", f"LLM circuit breaker opened for {self.open_s:g}s: {reason}")
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._probe_in_flight = False
+        self._outcomes.clear()
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_s:
+            self._outcomes.popleft()
+
+    def _retry_after(self, now: float) -> float:
+        if self._state == CLOSED:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_s - now)
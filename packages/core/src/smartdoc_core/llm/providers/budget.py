@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Output Budget LLM Provider
+
+Per-call-site generation limits: a token budget (Ollama ``num_predict``)
+and stop sequences, so a small model asked for a short JSON object or a
+one-paragraph persona reply cannot ramble for hundreds of tokens.
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+from smartdoc_core.llm.context import current_call
+from smartdoc_core.llm.metrics import MetricsRegistry, get_metrics_registry
+
+from .base import DelegatingProvider, LLMProvider
+
+
+@dataclass(frozen=True)
+class OutputBudget:
+    """
+    Generation limits of one call site.
+
+    Attributes:
+        max_tokens: Tokens generated at most (None = no limit)
+        stop: Sequences that end generation; the sequence itself is not
+            returned, so parsers must not rely on seeing it
+    """
+
+    max_tokens: Optional[int] = None
+    stop: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_config(cls, settings: Mapping[str, Any]) -> "OutputBudget":
+        max_tokens = settings.get("max_tokens")
+        return cls(
+            max_tokens=int(max_tokens) if max_tokens is not None else None,
+            stop=[str(s) for s in settings.get("stop") or []],
+        )
+
+
+class OutputBudgetProvider(DelegatingProvider):
+    """
+    Provider decorator that applies the call site's output budget.
+
+    Budgets are defaults: a caller's explicit ``max_tokens``/``stop`` wins,
+    and so does a routed profile's ``max_tokens`` when this layer sits
+    below the router. Calls from sites without a budget pass through
+    unchanged. Placed above caching and coalescing, so the limits are part
+    of the request key.
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        budgets: Mapping[str, OutputBudget],
+        *,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """
+        Args:
+            inner: Provider to limit
+            budgets: Call site -> budget
+            registry: Metrics registry truncations are read from (default: process-wide)
+        """
+        super().__init__(inner)
+        self.budgets = dict(budgets)
+        self.registry = registry or get_metrics_registry()
+
+    def generate(self, prompt: str, **kwargs: Any) -> str:
+        return super().generate(prompt, **self._apply(kwargs))
+
+    def generate_stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        return super().generate_stream(prompt, **self._apply(kwargs))
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> str:
+        return await super().agenerate(prompt, **self._apply(kwargs))
+
+    # ---- Management ----
+    def stats(self) -> Dict[str, Any]:
+        """Return each budget with how often it truncated output so far."""
+        sites = self.registry.snapshot()["by_call_site"]
+        return {
+            call_site: {
+                **asdict(budget),
+                "budgeted_calls": sites.get(call_site, {}).get("budgeted_calls", 0),
+                "truncated": sites.get(call_site, {}).get("truncated", 0),
+                "truncation_rate": sites.get(call_site, {}).get("truncation_rate"),
+            }
+            for call_site, budget in self.budgets.items()
+        }
+
+    # ---- Helpers ----
+    def _apply(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        budget = self.budgets.get(current_call().call_site)
+        if budget is None:
+            return kwargs
+        limited = dict(kwargs)
+        if budget.max_tokens is not None:
+            limited.setdefault("max_tokens", budget.max_tokens)
+        if budget.stop:
+            limited.setdefault("stop", list(budget.stop))
+        return limited
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Caching LLM Provider
+
+Content-addressed response cache for LLM calls. Identical prompts sent
+with the same model and sampling parameters are answered from an
+in-memory LRU tier, backed by an SQLite tier that survives restarts.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from smartdoc_core.llm.context import current_call
+from smartdoc_core.utils.logger import sys_logger
+
+from .base import DelegatingProvider, LLMProvider, request_key
+
+
+class MemoryTier:
+    """Thread-safe LRU with per-entry expiry (also backs the intent cache)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str, expires_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteTier:
+    """
+    On-disk tier shared by all workers on the host.
+
+    The database is created lazily on the first write, so constructing a
+    provider or reading from an empty cache never touches the filesystem.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        now = time.time()
+        with self._lock:
+            if self._conn is None and not os.path.exists(self.path):
+                return None  # Nothing stored yet; don't create the file on a read
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT response, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row[0], row[1]
+
+    def put(self, key: str, model: Optional[str], value: str, expires_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, value, now, now, expires_at),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+            conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._conn is not None or os.path.exists(self.path):
+                conn = self._connect()
+                conn.execute("DELETE FROM llm_cache")
+                conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class CachingProvider(DelegatingProvider):
+    """
+    Provider decorator that caches responses by content.
+
+    Cache keys are derived from (model, prompt hash, temperature, top_p)
+    plus any extra generation options. Whether a call is cached is decided
+    per call:
+
+    1. ``llm_call(cache=True/False)`` forces the decision for a block;
+    2. otherwise the call site's entry in ``call_sites`` applies;
+    3. otherwise calls at ``temperature <= max_temperature`` are cached.
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        *,
+        max_entries: int = 1024,
+        ttl_s: float = 86400,
+        db_path: Optional[str] = None,
+        max_db_entries: int = 50000,
+        max_temperature: float = 0.3,
+        call_sites: Optional[Dict[str, bool]] = None,
+    ):
+        """
+        Initialize the caching provider.
+
+        Args:
+            inner: Provider to cache
+            max_entries: Size of the in-memory LRU tier (0 disables it)
+            ttl_s: Time-to-live of cached responses in seconds
+            db_path: SQLite file for the persistent tier (None disables it)
+            max_db_entries: Maximum rows kept in the persistent tier
+            max_temperature: Highest temperature cached by default
+            call_sites: Per-call-site opt-in (True) / opt-out (False)
+        """
+        super().__init__(inner)
+        self.ttl_s = ttl_s
+        self.max_temperature = max_temperature
+        self.call_sites = dict(call_sites or {})
+        self._memory = MemoryTier(max_entries)
+        self._disk = SQLiteTier(db_path, max_db_entries) if db_path else None
+
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0, "errors": 0}
+        self._by_call_site: Dict[str, Dict[str, int]] = {}
+
+    # ---- Provider interface ----
+    def generate(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.1,
+        top_p: float = 0.9,
+        timeout_s: int = 60,
+        **kwargs: Any,
+    ) -> str:
+        key = self._key_for(prompt, temperature, top_p, kwargs)
+        if key is not None:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+
+        text = self.inner.generate(
+            prompt, temperature=temperature, top_p=top_p, timeout_s=timeout_s, **kwargs
+        )
+        if key is not None:
+            self._store(key, text)
+        return text
+
+    def generate_stream(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.1,
+        top_p: float = 0.9,
+        timeout_s: int = 60,
+        **kwargs: Any,
+    ) -> Iterator[str]:
+        key = self._key_for(prompt, temperature, top_p, kwargs)
+        if key is not None:
+            cached = self._lookup(key)
+            if cached is not None:
+                yield cached
+                return
+
+        chunks = []
+        for chunk in super().generate_stream(
+            prompt, temperature=temperature, top_p=top_p, timeout_s=timeout_s, **kwargs
+        ):
+            chunks.append(chunk)
+            yield chunk
+        # Only complete generations are cached
+        if key is not None:
+            self._store(key, "".join(chunks))
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.1,
+        top_p: float = 0.9,
+        timeout_s: int = 60,
+        **kwargs: Any,
+    ) -> str:
+        key = self._key_for(prompt, temperature, top_p, kwargs)
+        if key is not None:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+
+        text = await super().agenerate(
+            prompt, temperature=temperature, top_p=top_p, timeout_s=timeout_s, **kwargs
+        )
+        if key is not None:
+            self._store(key, text)
+        return text
+
+    # ---- Management ----
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters, overall and per call site."""
+        with self._lock:
+            counters = dict(self._counters)
+            by_site = {site: dict(c) for site, c in self._by_call_site.items()}
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        return {
+            **counters,
+            "hit_rate": (hits / lookups) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_evictions": self._memory.evictions,
+            "disk_enabled": self._disk is not None,
+            "disk_evictions": self._disk.evictions if self._disk else 0,
+            "by_call_site": by_site,
+        }
+
+    def clear(self) -> None:
+        """Drop all cached responses from both tiers."""
+        self._memory.clear()
+        if self._disk:
+            self._disk.clear()
+
+    def cache_key(self, prompt: str, temperature: float = 0.1, top_p: float = 0.9, **kwargs: Any) -> str:
+        """Compute the content address of a request."""
+        return request_key(self.model, prompt, temperature, top_p, kwargs)
+
+    # ---- Helpers ----
+    def _should_cache(self, temperature: float) -> bool:
+        ctx = current_call()
+        if ctx.cache is not None:
+            return ctx.cache
+        site_policy = self.call_sites.get(ctx.call_site)
+        if site_policy is not None:
+            return bool(site_policy)
+        return temperature <= self.max_temperature
+
+    def _key_for(self, prompt: str, temperature: float, top_p: float, kwargs: Dict[str, Any]) -> Optional[str]:
+        if not self._should_cache(temperature):
+            self._count("bypassed")
+            return None
+        return self.cache_key(prompt, temperature, top_p, **kwargs)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        value = self._memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        if self._disk:
+            try:
+                row = self._disk.get(key)
+            except sqlite3.Error as e:
+                self._count("errors")
+                sys_logger.log_system("warning", f"LLM cache read failed: {e}")
+                row = None
+            if row is not None:
+                value, expires_at = row
+                self._memory.put(key, value, expires_at)
+                self._count("disk_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def _store(self, key: str, value: str) -> None:
+        if not value:
+            return  # Never cache empty generations
+        expires_at = time.time() + self.ttl_s
+        self._memory.put(key, value, expires_at)
+        if self._disk:
+            try:
+                self._disk.put(key, self.model, value, expires_at)
+            except sqlite3.Error as e:
+                self._count("errors")
+                sys_logger.log_system("warning", f"LLM cache write failed: {e}")
+
+    def _count(self, name: str) -> None:
+        site = current_call().call_site
+        with self._lock:
+            self._counters[name] += 1
+            site_counters = self._by_call_site.setdefault(
+                site, {"hits": 0, "misses": 0, "bypassed": 0}
+            )
+            if name in ("memory_hits", "disk_hits"):
+                site_counters["hits"] += 1
+            elif name in ("misses", "bypassed"):
+                site_counters[name] += 1
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Cassette LLM Providers
+
+Record/replay of LLM traffic for deterministic offline runs. A recording
+provider appends every upstream call (request key, response, timing) to a
+cassette file; a replay provider answers from that file, optionally with
+the recorded latencies, so real sessions can be pushed through the engine
+without an Ollama server.
+
+Cassettes are JSON Lines (gzip-compressed when the path ends in ``.gz``):
+a header line followed by one line per call.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import IO, Any, Deque, Dict, Iterator, List, Optional
+
+from smartdoc_core.llm.context import current_call
+from smartdoc_core.utils.exceptions import CassetteMissError, NLGError
+from smartdoc_core.utils.logger import sys_logger
+
+from .base import DelegatingProvider, LLMProvider, request_key
+
+CASSETTE_VERSION = 1
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a cassette in recorded order, header records included.
+
+    A cassette whose recorder was killed (gzip stream without its end
+    marker, final line written halfway) ends at its last complete record.
+    """
+    truncated = False
+    with _open(path, "r") as handle:
+        try:
+            for line in handle:
+                complete = line.endswith("\n")
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if complete:
+                        raise
+                    truncated = True  # Final line written halfway
+                    break
+                yield record
+        except EOFError:
+            truncated = True  # Compressed stream without its end marker
+    if truncated:
+        sys_logger.log_system("warning", f"LLM cassette {path} is truncated; using the records before the cut")
+
+
+class RecordingProvider(DelegatingProvider):
+    """
+    Provider decorator that records every call to a cassette.
+
+    Prompts are stored only as part of the content-addressed request key
+    unless ``store_prompts`` is set, so cassettes of real sessions do not
+    carry student input verbatim.
+    """
+
+    def __init__(self, inner: LLMProvider, path: str, *, store_prompts: bool = False):
+        """
+        Args:
+            inner: Provider whose traffic is recorded
+            path: Cassette file (appended to if it exists)
+            store_prompts: Also store the prompt text of each call
+        """
+        super().__init__(inner)
+        self.path = path
+        self.store_prompts = store_prompts
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def generate(self, prompt: str, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        try:
+            text = self.inner.generate(prompt, **kwargs)
+        except Exception as e:
+            self._write(prompt, kwargs, started, error=e)
+            raise
+        self._write(prompt, kwargs, started, response=text)
+        return text
+
+    def generate_stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        started = time.perf_counter()
+        chunks: List[List[Any]] = []
+        try:
+            for chunk in super().generate_stream(prompt, **kwargs):
+                chunks.append([round(time.perf_counter() - started, 4), chunk])
+                yield chunk
+        except Exception as e:
+            self._write(prompt, kwargs, started, error=e)
+            raise
+        # Only complete streams are recorded
+        self._write(prompt, kwargs, started, response="".join(c for _, c in chunks), chunks=chunks)
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        try:
+            text = await super().agenerate(prompt, **kwargs)
+        except Exception as e:
+            self._write(prompt, kwargs, started, error=e)
+            raise
+        self._write(prompt, kwargs, started, response=text)
+        return text
+
+    def close(self) -> None:
+        """Flush and close the cassette file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write(
+        self,
+        prompt: str,
+        kwargs: Dict[str, Any],
+        started: float,
+        response: Optional[str] = None,
+        chunks: Optional[List[List[Any]]] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        ctx = current_call()
+        options = {k: v for k, v in kwargs.items() if k not in ("temperature", "top_p")}
+        entry: Dict[str, Any] = {
+            "key": request_key(
+                self.model, prompt, kwargs.get("temperature", 0.1), kwargs.get("top_p", 0.9), options
+            ),
+            "call_site": ctx.call_site,
+            "session_id": ctx.session_id,
+            "elapsed_s": round(time.perf_counter() - started, 4),
+        }
+        if error is not None:
+            entry["error"] = f"{type(error).__name__}: {error}"
+        else:
+            entry["response"] = response
+        if chunks is not None:
+            entry["chunks"] = chunks
+        if self.store_prompts:
+            entry["prompt"] = prompt
+
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                self._file = self._open_for_append()
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+    def _open_for_append(self) -> IO[str]:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        handle = _open(self.path, "a")
+        if is_new:
+            header = {
+                "cassette": CASSETTE_VERSION,
+                "model": self.model,
+                "created": time.time(),
+                # Capabilities change the requests callers make, hence the keys
+                "structured_output": self.supports_structured_output,
+                "chat": self.supports_chat,
+            }
+            handle.write(json.dumps(header) + "\n")
+        return handle
+
+
+class ReplayProvider(LLMProvider):
+    """
+    Provider that answers from a recorded cassette.
+
+    Requests are matched by content address (model, prompt, sampling and
+    generation options). Repeated recordings of the same request are
+    served in recorded order, cycling once exhausted. Recorded failures
+    are replayed as ``NLGError``.
+
+    With ``reproduce_latency`` each answer is delayed by its recorded
+    latency times ``latency_scale`` (streams reproduce per-chunk timing),
+    so replays keep the production latency distribution.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        reproduce_latency: bool = False,
+        latency_scale: float = 1.0,
+        fallback: Optional[LLMProvider] = None,
+    ):
+        """
+        Args:
+            path: Cassette file to serve from
+            reproduce_latency: Sleep for the recorded latency of each call
+            latency_scale: Multiplier applied to recorded latencies
+            fallback: Provider for requests missing from the cassette
+                (None raises CassetteMissError)
+        """
+        self.path = path
+        self.reproduce_latency = reproduce_latency
+        self.latency_scale = latency_scale
+        self.fallback = fallback
+        self._entries: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+
+        # Request keys include the model and depend on the capabilities
+        # callers see, so report the recorded ones
+        header = self._load()
+        self.model = header.get("model")
+        self.supports_structured_output = bool(header.get("structured_output", False))
+        self.supports_chat = bool(header.get("chat", False))
+
+    # ---- Provider interface ----
+    def generate(self, prompt: str, **kwargs: Any) -> str:
+        entry = self._lookup(prompt, kwargs)
+        if entry is None:
+            return self._fallback().generate(prompt, **kwargs)
+        if self.reproduce_latency:
+            time.sleep(entry["elapsed_s"] * self.latency_scale)
+        return self._result(entry)
+
+    def generate_stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        entry = self._lookup(prompt, kwargs)
+        if entry is None:
+            yield from self._fallback().generate_stream(prompt, **kwargs)
+            return
+        chunks = entry.get("chunks")
+        if not chunks or "error" in entry:
+            # Recorded as a plain generation: replay it as a single chunk
+            if self.reproduce_latency:
+                time.sleep(entry["elapsed_s"] * self.latency_scale)
+            yield self._result(entry)
+            return
+        started = time.perf_counter()
+        for offset_s, chunk in chunks:
+            if self.reproduce_latency:
+                delay = offset_s * self.latency_scale - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield chunk
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> str:
+        entry = self._lookup(prompt, kwargs)
+        if entry is None:
+            return await self._fallback().agenerate(prompt, **kwargs)
+        if self.reproduce_latency:
+            await asyncio.sleep(entry["elapsed_s"] * self.latency_scale)
+        return self._result(entry)
+
+    # ---- Management ----
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the number of recorded requests."""
+        with self._lock:
+            return {**self._counters, "requests": len(self._entries)}
+
+    # ---- Helpers ----
+    def _load(self) -> Dict[str, Any]:
+        header: Dict[str, Any] = {}
+        for record in iter_records(self.path):
+            if "cassette" in record:
+                header = header or record  # Appended sessions repeat the header
+                continue
+            self._entries[record["key"]].append(record)
+        return header
+
+    def _lookup(self, prompt: str, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        options = {k: v for k, v in kwargs.items() if k not in ("temperature", "top_p")}
+        key = request_key(self.model, prompt, kwargs.get("temperature", 0.1), kwargs.get("top_p", 0.9), options)
+        with self._lock:
+            recorded = self._entries.get(key)
+            if not recorded:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            entry = recorded[0]
+            recorded.rotate(-1)  # Next identical request gets the next recording
+            return entry
+
+    def _fallback(self) -> LLMProvider:
+        if self.fallback is None:
+            raise CassetteMissError(f"Request not found in cassette {self.path}")
+        return self.fallback
+
+    @staticmethod
+    def _result(entry: Dict[str, Any]) -> str:
+        if "error" in entry:
+            raise NLGError(f"Replayed failure: {entry['error']}")
+        return entry["response"]
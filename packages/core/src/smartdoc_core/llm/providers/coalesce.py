@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Coalescing LLM Provider
+
+Single-flight layer: concurrent identical requests share one upstream
+call instead of each occupying a GPU slot.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional, Tuple
+
+from smartdoc_core.utils.exceptions import LLMTimeoutError
+
+from .base import DelegatingProvider, LLMProvider, request_key
+
+
+class CoalescingProvider(DelegatingProvider):
+    """
+    Provider decorator that coalesces identical in-flight requests.
+
+    The first caller for a request key (the leader) performs the upstream
+    call; callers arriving while it is in flight (followers) wait for the
+    leader's result instead. Each caller keeps its own semantics:
+
+    - an upstream error is raised in every waiting caller;
+    - each follower waits at most its own ``timeout_s`` and then raises
+      ``LLMTimeoutError``, without affecting the leader or other followers.
+
+    Streaming calls are passed through unchanged.
+    """
+
+    def __init__(self, inner: LLMProvider, *, max_temperature: Optional[float] = None):
+        """
+        Initialize the coalescing provider.
+
+        Args:
+            inner: Provider to protect
+            max_temperature: Only coalesce calls at or below this temperature
+                (None coalesces every call)
+        """
+        super().__init__(inner)
+        self.max_temperature = max_temperature
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._counters = {"leaders": 0, "coalesced": 0, "follower_timeouts": 0}
+
+    # ---- Provider interface ----
+    def generate(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.1,
+        top_p: float = 0.9,
+        timeout_s: int = 60,
+        **kwargs: Any,
+    ) -> str:
+        if not self._should_coalesce(temperature):
+            return self.inner.generate(
+                prompt, temperature=temperature, top_p=top_p, timeout_s=timeout_s, **kwargs
+            )
+
+        key = request_key(self.model, prompt, temperature, top_p, kwargs)
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return self._wait(future, timeout_s)
+
+        try:
+            result = self.inner.generate(
+                prompt, temperature=temperature, top_p=top_p, timeout_s=timeout_s, **kwargs
+            )
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.1,
+        top_p: float = 0.9,
+        timeout_s: int = 60,
+        **kwargs: Any,
+    ) -> str:
+        if not self._should_coalesce(temperature):
+            return await super().agenerate(
+                prompt, temperature=temperature, top_p=top_p, timeout_s=timeout_s, **kwargs
+            )
+
+        key = request_key(self.model, prompt, temperature, top_p, kwargs)
+        future, is_leader = self._join(key)
+        if not is_leader:
+            try:
+                # shield() keeps a follower's timeout/cancellation from
+                # cancelling the shared future other callers wait on
+                return await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(future)), timeout_s
+                )
+            except asyncio.TimeoutError:
+                self._count("follower_timeouts")
+                raise LLMTimeoutError(f"Coalesced LLM call exceeded {timeout_s}s")
+
+        try:
+            result = await super().agenerate(
+                prompt, temperature=temperature, top_p=top_p, timeout_s=timeout_s, **kwargs
+            )
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    # ---- Management ----
+    def stats(self) -> Dict[str, Any]:
+        """Return leader/follower counters and the number of in-flight keys."""
+        with self._lock:
+            return {**self._counters, "in_flight": len(self._in_flight)}
+
+    # ---- Helpers ----
+    def _should_coalesce(self, temperature: float) -> bool:
+        return self.max_temperature is None or temperature <= self.max_temperature
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._counters["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self._counters["leaders"] += 1
+            return future, True
+
+    def _finish(
+        self,
+        key: str,
+        future: Future,
+        result: Optional[str] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _wait(self, future: Future, timeout_s: float) -> str:
+        try:
+            return future.result(timeout=timeout_s)
+        except FutureTimeoutError:
+            self._count("follower_timeouts")
+            raise LLMTimeoutError(f"Coalesced LLM call exceeded {timeout_s}s")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
@@ -5,9 +5,17 @@ Ollama LLM Provider Implementation
 Provides integration with Ollama for local LLM inference.
 """
 
+import json
+import time
+from typing import Any, Dict, Iterator, List, Optional, Union
+
 import requests
-from typing import Optional
+
+from smartdoc_core.config.settings import config
+from smartdoc_core.llm.metrics import CallMetrics, get_metrics_registry
+from .aio import HAVE_HTTPX, close_async_client, get_async_client
 from .base import LLMProvider
+from .transport import PooledTransport, get_shared_transport
 
 
 class OllamaProvider(LLMProvider):
@@ -16,18 +24,31 @@ class OllamaProvider(LLMProvider):
 
     Connects to a local Ollama instance to generate text using
     various open-source models like Llama, Gemma, etc.
+
+    All instances share one pooled keep-alive transport by default, so the
+    classifier, responders and evaluator reuse the same warm connections.
+    ``agenerate`` uses a pooled async client (httpx) when available, so a
+    single worker can keep many requests in flight without parking threads.
+    ``generate_many`` defaults to one request per server parallel slot
+    (``ollama.num_parallel``, matching OLLAMA_NUM_PARALLEL).
     """
 
-    def __init__(self, base_url: str, model: str):
+    supports_structured_output = True
+    supports_chat = True
+
+    def __init__(self, base_url: str, model: str, transport: Optional[PooledTransport] = None):
         """
         Initialize the Ollama provider.
 
         Args:
             base_url: URL of the Ollama API server
             model: Name of the model to use (e.g., "gemma3:4b-it-q4_K_M")
+            transport: HTTP transport (defaults to the process-wide pooled transport)
         """
         self.base_url = base_url.rstrip("/")
         self.model = model
+        self.transport = transport or get_shared_transport()
+        self.max_parallel = config.ollama_num_parallel
 
     def generate(
         self,
@@ -35,7 +56,12 @@ class OllamaProvider(LLMProvider):
         *,
         temperature: float = 0.1,
         top_p: float = 0.9,
-        timeout_s: int = 120
+        timeout_s: int = 120,
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        messages: Optional[List[Dict[str, str]]] = None
     ) -> str:
         """
         Generate text using Ollama API.
@@ -45,6 +71,12 @@ class OllamaProvider(LLMProvider):
             temperature: Sampling temperature
             top_p: Nucleus sampling parameter
             timeout_s: Request timeout in seconds
+            format: "json" or a JSON schema to constrain the output to
+            model: Model to use for this call instead of ``self.model``
+            max_tokens: Maximum tokens to generate (Ollama ``num_predict``)
+            stop: Sequences that end generation (not included in the output)
+            messages: Chat history ending with the current user turn; when
+                given the call goes to /api/chat and ``prompt`` is unused
 
         Returns:
             Generated text response
@@ -52,23 +84,235 @@ class OllamaProvider(LLMProvider):
         Raises:
             requests.HTTPError: If the API request fails
             requests.Timeout: If the request times out
+            requests.ConnectionError: If the server stays unreachable after retries
+        """
+        started = time.perf_counter()
+        try:
+            response = self.transport.post(
+                self._endpoint(messages),
+                json=self._build_payload(
+                    prompt, temperature, top_p, format=format, model=model, max_tokens=max_tokens,
+                    stop=stop, messages=messages
+                ),
+                timeout=timeout_s
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            get_metrics_registry().record_error()
+            raise
+
+        self._record_metrics(data, model, started, max_tokens)
+        return self._text(data)
+
+    def generate_stream(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.1,
+        top_p: float = 0.9,
+        timeout_s: int = 120,
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        messages: Optional[List[Dict[str, str]]] = None
+    ) -> Iterator[str]:
+        """
+        Stream generated tokens from the Ollama API as they are produced.
+
+        ``timeout_s`` bounds the wait for each chunk (time-to-first-token and
+        gaps between tokens), not the whole generation.
+
+        Yields:
+            Text chunks in generation order
+
+        Raises:
+            requests.HTTPError: If the API request fails
+            requests.Timeout: If no chunk arrives within the timeout
         """
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,
+        started = time.perf_counter()
+        response = self.transport.post(
+            self._endpoint(messages),
+            json=self._build_payload(
+                prompt, temperature, top_p, stream=True, format=format, model=model, max_tokens=max_tokens,
+                stop=stop, messages=messages
+            ),
+            timeout=timeout_s,
+            stream=True
+        )
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                chunk = self._text(data)
+                if chunk:
+                    yield chunk
+                if data.get("done"):
+                    # The final chunk carries the token counts and timings
+                    self._record_metrics(data, model, started, max_tokens)
+                    break
+        except Exception:
+            get_metrics_registry().record_error()
+            raise
+        finally:
+            # Return the connection to the pool even if the consumer stops early
+            response.close()
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        temperature: float = 0.1,
+        top_p: float = 0.9,
+        timeout_s: int = 120,
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        messages: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """
+        Generate text using Ollama API without blocking the event loop.
+
+        Falls back to running ``generate`` in a worker thread when httpx
+        is not installed.
+
+        Raises:
+            httpx.HTTPStatusError: If the API request fails
+            httpx.TimeoutException: If the request times out
+            httpx.ConnectError: If the server stays unreachable after retries
+        """
+        if not HAVE_HTTPX:
+            return await super().agenerate(
+                prompt, temperature=temperature, top_p=top_p, timeout_s=timeout_s,
+                format=format, model=model, max_tokens=max_tokens, stop=stop, messages=messages
+            )
+
+        client = get_async_client()
+        started = time.perf_counter()
+        try:
+            response = await client.post(
+                self._endpoint(messages),
+                json=self._build_payload(
+                    prompt, temperature, top_p, format=format, model=model, max_tokens=max_tokens,
+                    stop=stop, messages=messages
+                ),
+                timeout=timeout_s
+            )
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            get_metrics_registry().record_error()
+            raise
+
+        self._record_metrics(data, model, started, max_tokens)
+        return self._text(data)
+
+    async def aclose(self) -> None:
+        """Close the async client bound to the current event loop."""
+        if HAVE_HTTPX:
+            await close_async_client()
+
+    def _build_payload(
+        self,
+        prompt: str,
+        temperature: float,
+        top_p: float,
+        stream: bool = False,
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+    ) -> Dict[str, Any]:
+        """Build the /api/generate (or, with ``messages``, /api/chat) request body."""
+        payload: Dict[str, Any] = {
+            "model": model or self.model,
+            "stream": stream,
             "options": {
                 "temperature": temperature,
                 "top_p": top_p
             },
         }
+        if messages is not None:
+            payload["messages"] = messages
+        else:
+            payload["prompt"] = prompt
+        if max_tokens is not None:
+            payload["options"]["num_predict"] = max_tokens
+        if stop:
+            payload["options"]["stop"] = list(stop)
+        if format is not None:
+            # "json" or a JSON schema; Ollama constrains decoding to it
+            payload["format"] = format
+        return payload
+
+    def _endpoint(self, messages: Optional[List[Dict[str, str]]]) -> str:
+        return f"{self.base_url}/api/chat" if messages is not None else f"{self.base_url}/api/generate"
+
+    @staticmethod
+    def _text(data: Dict[str, Any]) -> str:
+        """Generated text of a generate or chat response (or stream chunk)."""
+        if "message" in data:
+            return (data.get("message") or {}).get("content", "")
+        return data.get("response", "")
+
+    def _record_metrics(
+        self, data: Dict[str, Any], model: Optional[str], started: float, max_tokens: Optional[int] = None
+    ) -> None:
+        """Report token counts, server timings and budget truncation of a finished generation."""
+        get_metrics_registry().record(
+            CallMetrics.from_ollama(data, model or self.model, time.perf_counter() - started, max_tokens)
+        )
+
+    def ping(self, timeout_s: float = 2.0) -> bool:
+        """Return True if the server answers its model listing endpoint."""
+        try:
+            response = self.transport.get(f"{self.base_url}/api/tags", timeout=timeout_s)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def load_model(self, model: Optional[str] = None, timeout_s: float = 600.0) -> None:
+        """
+        Load a model into server memory without generating.
 
-        response = requests.post(
+        Raises:
+            requests.HTTPError: If the server cannot load the model
+            requests.Timeout: If loading takes longer than ``timeout_s``
+        """
+        response = self.transport.post(
             f"{self.base_url}/api/generate",
-            json=payload,
+            json={"model": model or self.model, "stream": False},
             timeout=timeout_s
         )
         response.raise_for_status()
 
-        data = response.json()
-        return data.get("response", "")
+    def embed(self, texts: List[str], model: Optional[str] = None, timeout_s: float = 30.0) -> List[List[float]]:
+        """
+        Embed texts in one request (``/api/embed``, the batched form of ``/api/embeddings``).
+
+        Raises:
+            requests.HTTPError: If the server cannot embed with the model
+            requests.Timeout: If the request times out
+        """
+        response = self.transport.post(
+            f"{self.base_url}/api/embed",
+            json={"model": model or self.model, "input": list(texts)},
+            timeout=timeout_s
+        )
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+    def loaded_models(self, timeout_s: float = 2.0) -> List[str]:
+        """Return the models currently loaded in server memory."""
+        response = self.transport.get(f"{self.base_url}/api/ps", timeout=timeout_s)
+        response.raise_for_status()
+        return [m.get("name") or m.get("model", "") for m in response.json().get("models", [])]
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Report occupancy of the underlying connection pool."""
+        return self.transport.stats()
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Replica Set LLM Provider
+
+Spreads generation across several Ollama servers: least-outstanding
+replica selection, background health probes, failover on connection
+errors and optional hedged requests for latency-sensitive call sites.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import requests
+
+from smartdoc_core.llm.context import current_call
+from smartdoc_core.utils.logger import sys_logger
+
+from .aio import HAVE_HTTPX
+from .base import LLMProvider
+
+if HAVE_HTTPX:
+    import httpx
+
+    _CONNECTION_ERRORS: tuple = (requests.ConnectionError, httpx.ConnectError)
+else:
+    _CONNECTION_ERRORS = (requests.ConnectionError,)
+
+
+class _Replica:
+    """Book-keeping for one backend server."""
+
+    def __init__(self, name: str, provider: LLMProvider):
+        self.name = name
+        self.provider = provider
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.errors = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "outstanding": self.outstanding,
+            "healthy": self.healthy,
+            "consecutive_failures": self.consecutive_failures,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+class _LatencyWindow:
+    """Rolling window of successful call latencies for one call site."""
+
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class ReplicaSetProvider(LLMProvider):
+    """
+    Provider that load-balances over equivalent replicas.
+
+    - Each call goes to the healthy replica with the fewest outstanding
+      requests (ties rotate), so a slow box is not handed more work.
+    - A replica is taken out of rotation after ``unhealthy_after``
+      consecutive connection errors and brought back when a background
+      probe succeeds. If every replica is unhealthy all are tried anyway.
+    - A call that fails with a connection error is retried once on
+      another replica.
+    - For call sites listed in ``hedge_call_sites`` a duplicate request is
+      sent to a second replica once the first has been running longer than
+      the site's observed ``hedge_quantile`` latency; the first answer wins.
+      Hedging starts after ``hedge_min_samples`` latencies were observed.
+
+    Streaming calls are balanced but never hedged.
+    """
+
+    def __init__(
+        self,
+        replicas: Sequence[LLMProvider],
+        *,
+        names: Optional[Sequence[str]] = None,
+        probe_interval_s: float = 10.0,
+        probe_timeout_s: float = 2.0,
+        unhealthy_after: int = 3,
+        hedge_call_sites: Iterable[str] = (),
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        hedge_min_delay_s: float = 0.5,
+        latency_window: int = 200,
+    ):
+        """
+        Initialize the replica set.
+
+        Args:
+            replicas: Providers for each server, all serving the same model
+            names: Labels used in stats (defaults to each provider's base_url)
+            probe_interval_s: Seconds between health probes (0 disables probing)
+            probe_timeout_s: Timeout of a single health probe
+            unhealthy_after: Consecutive connection errors before a replica
+                is taken out of rotation
+            hedge_call_sites: Call sites whose requests may be hedged
+            hedge_quantile: Latency quantile used as the hedging deadline
+            hedge_min_samples: Observed latencies required before hedging
+            hedge_min_delay_s: Lower bound on the hedging deadline
+            latency_window: Latencies kept per call site
+        """
+        if not replicas:
+            raise ValueError("ReplicaSetProvider needs at least one replica")
+        names = list(names) if names is not None else [
+            getattr(p, "base_url", f"replica-{i}") for i, p in enumerate(replicas)
+        ]
+        self._replicas = [_Replica(n, p) for n, p in zip(names, replicas)]
+        self.probe_interval_s = probe_interval_s
+        self.probe_timeout_s = probe_timeout_s
+        self.unhealthy_after = unhealthy_after
+        self.hedge_call_sites = set(hedge_call_sites)
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay_s = hedge_min_delay_s
+        self.latency_window = latency_window
+
+        self._lock = threading.Lock()
+        self._rotation = itertools.count()
+        self._latencies: Dict[str, _LatencyWindow] = {}
+        self._counters = {"hedged": 0, "hedge_wins": 0, "failovers": 0, "probes": 0}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._probe_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ---- Provider attributes ----
+    @property
+    def replicas(self) -> List[LLMProvider]:
+        return [r.provider for r in self._replicas]
+
+    @property
+    def model(self) -> Optional[str]:  # type: ignore[override]
+        return getattr(self._replicas[0].provider, "model", None)
+
+    @model.setter
+    def model(self, value: Optional[str]) -> None:
+        for replica in self._replicas:
+            replica.provider.model = value
+
+    @property
+    def max_parallel(self) -> int:  # type: ignore[override]
+        return sum(getattr(r.provider, "max_parallel", LLMProvider.max_parallel) for r in self._replicas)
+
+    @property
+    def supports_structured_output(self) -> bool:  # type: ignore[override]
+        return all(getattr(r.provider, "supports_structured_output", False) for r in self._replicas)
+
+    @property
+    def supports_chat(self) -> bool:  # type: ignore[override]
+        return all(getattr(r.provider, "supports_chat", False) for r in self._replicas)
+
+    # ---- Provider interface ----
+    def generate(self, prompt: str, **kwargs: Any) -> str:
+        self._ensure_probing()
+        deadline = self._hedge_deadline()
+        primary = self._acquire()
+
+        if deadline is None or len(self._replicas) < 2:
+            try:
+                return self._invoke(primary, prompt, kwargs)
+            except _CONNECTION_ERRORS:
+                fallback = self._acquire(exclude=(primary,))
+                if fallback is None:
+                    raise
+                self._count("failovers")
+                return self._invoke(fallback, prompt, kwargs)
+
+        first = self._submit(primary, prompt, kwargs)
+        done, _ = wait([first], timeout=deadline)
+        if done and not self._needs_second(first):
+            return first.result()
+
+        secondary = self._acquire(exclude=(primary,))
+        if secondary is None:
+            return first.result()
+        self._count("hedged" if not done else "failovers")
+        second = self._submit(secondary, prompt, kwargs)
+
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future.exception() is None:
+                    if future is second and not done:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = error or future.exception()
+        raise error  # type: ignore[misc]
+
+    def generate_stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        self._ensure_probing()
+        replica = self._acquire()
+        started = time.monotonic()
+        try:
+            yield from replica.provider.generate_stream(prompt, **kwargs)
+        except Exception as e:
+            self._record_failure(replica, e)
+            raise
+        else:
+            self._record_success(replica, time.monotonic() - started)
+        finally:
+            self._release(replica)
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> str:
+        self._ensure_probing()
+        deadline = self._hedge_deadline()
+        primary = self._acquire()
+        first = asyncio.ensure_future(self._ainvoke(primary, prompt, kwargs))
+
+        done, _ = await asyncio.wait({first}, timeout=deadline)
+        if done and not self._needs_second(first):
+            return first.result()
+
+        secondary = self._acquire(exclude=(primary,))
+        if secondary is None:
+            return await first
+        self._count("hedged" if not done else "failovers")
+        second = asyncio.ensure_future(self._ainvoke(secondary, prompt, kwargs))
+
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    if task.exception() is None:
+                        if task is second and not done:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = error or task.exception()
+            raise error  # type: ignore[misc]
+        finally:
+            for task in pending:
+                task.cancel()  # The losing request is abandoned, freeing its slot
+
+    async def aclose(self) -> None:
+        for replica in self._replicas:
+            await replica.provider.aclose()
+
+    # ---- Management ----
+    def probe_once(self) -> Dict[str, bool]:
+        """Probe every replica now and update its health; returns name -> healthy."""
+        results = {}
+        for replica in self._replicas:
+            ping = getattr(replica.provider, "ping", None)
+            if ping is None:
+                continue
+            ok = bool(ping(self.probe_timeout_s))
+            with self._lock:
+                self._counters["probes"] += 1
+                if ok and not replica.healthy:
+                    sys_logger.log_system("info", f"LLM replica {replica.name} is healthy again")
+                elif not ok and replica.healthy:
+                    sys_logger.log_system("warning", f"LLM replica {replica.name} failed its health probe")
+                replica.healthy = ok
+                if ok:
+                    replica.consecutive_failures = 0
+            results[replica.name] = ok
+        return results
+
+    def load_model(self, model: Optional[str] = None, timeout_s: float = 600.0) -> None:
+        """Load a model on every replica (raises the first replica failure after trying all)."""
+        errors = []
+        for replica in self._replicas:
+            load = getattr(replica.provider, "load_model", None)
+            if load is None:
+                continue
+            try:
+                load(model, timeout_s)
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+
+    def embed(self, texts: List[str], model: Optional[str] = None, timeout_s: float = 30.0) -> List[List[float]]:
+        """Embed texts on the least busy healthy replica."""
+        replica = self._acquire()
+        try:
+            return replica.provider.embed(texts, model, timeout_s)
+        finally:
+            self._release(replica)
+
+    def loaded_models(self, timeout_s: float = 2.0) -> List[str]:
+        """Return the models loaded on every replica."""
+        loaded: Optional[set] = None
+        for replica in self._replicas:
+            listing = getattr(replica.provider, "loaded_models", None)
+            if listing is None:
+                continue
+            models = set(listing(timeout_s))
+            loaded = models if loaded is None else loaded & models
+        return sorted(loaded or ())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-replica load/health, hedging counters and latency quantiles per call site."""
+        with self._lock:
+            return {
+                **self._counters,
+                "replicas": {r.name: r.snapshot() for r in self._replicas},
+                "latency": {
+                    site: {
+                        "samples": len(window),
+                        "p50_s": window.quantile(0.5),
+                        "p95_s": window.quantile(0.95),
+                    }
+                    for site, window in self._latencies.items()
+                },
+            }
+
+    def close(self) -> None:
+        """Stop health probes and the hedging worker pool."""
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    # ---- Helpers ----
+    def _acquire(self, exclude: Sequence[_Replica] = ()) -> Optional[_Replica]:
+        with self._lock:
+            candidates = [r for r in self._replicas if r not in exclude]
+            if not candidates:
+                return None
+            healthy = [r for r in candidates if r.healthy]
+            if healthy:
+                candidates = healthy
+            elif exclude:
+                return None  # Don't hedge/fail over onto a replica known to be down
+            # Rotate the starting point so ties are spread evenly
+            offset = next(self._rotation) % len(candidates)
+            rotated = candidates[offset:] + candidates[:offset]
+            replica = min(rotated, key=lambda r: r.outstanding)
+            replica.outstanding += 1
+            replica.requests += 1
+            return replica
+
+    def _release(self, replica: _Replica) -> None:
+        with self._lock:
+            replica.outstanding -= 1
+
+    def _invoke(self, replica: _Replica, prompt: str, kwargs: Dict[str, Any]) -> str:
+        started = time.monotonic()
+        try:
+            text = replica.provider.generate(prompt, **kwargs)
+        except Exception as e:
+            self._record_failure(replica, e)
+            raise
+        finally:
+            self._release(replica)
+        self._record_success(replica, time.monotonic() - started)
+        return text
+
+    async def _ainvoke(self, replica: _Replica, prompt: str, kwargs: Dict[str, Any]) -> str:
+        started = time.monotonic()
+        try:
+            text = await replica.provider.agenerate(prompt, **kwargs)
+        except asyncio.CancelledError:
+            raise  # Lost a hedge race; not the replica's fault
+        except Exception as e:
+            self._record_failure(replica, e)
+            raise
+        finally:
+            self._release(replica)
+        self._record_success(replica, time.monotonic() - started)
+        return text
+
+    def _submit(self, replica: _Replica, prompt: str, kwargs: Dict[str, Any]) -> Future:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max(2, 2 * self.max_parallel), thread_name_prefix="llm-hedge"
+                    )
+        ctx = contextvars.copy_context()  # Keep the caller's llm_call() context
+        return self._executor.submit(ctx.run, self._invoke, replica, prompt, kwargs)
+
+    @staticmethod
+    def _needs_second(first: Any) -> bool:
+        """A finished first attempt still needs another replica if it could not connect."""
+        return isinstance(first.exception(), _CONNECTION_ERRORS)
+
+    def _hedge_deadline(self) -> Optional[float]:
+        site = current_call().call_site
+        if site not in self.hedge_call_sites:
+            return None
+        with self._lock:
+            window = self._latencies.get(site)
+            if window is None or len(window) < self.hedge_min_samples:
+                return None
+            return max(self.hedge_min_delay_s, window.quantile(self.hedge_quantile))
+
+    def _record_success(self, replica: _Replica, elapsed_s: float) -> None:
+        site = current_call().call_site
+        with self._lock:
+            replica.consecutive_failures = 0
+            replica.healthy = True
+            window = self._latencies.get(site)
+            if window is None:
+                window = self._latencies[site] = _LatencyWindow(self.latency_window)
+            window.add(elapsed_s)
+
+    def _record_failure(self, replica: _Replica, error: BaseException) -> None:
+        with self._lock:
+            replica.errors += 1
+            if not isinstance(error, _CONNECTION_ERRORS):
+                return
+            replica.consecutive_failures += 1
+            if replica.healthy and replica.consecutive_failures >= self.unhealthy_after:
+                replica.healthy = False
+                sys_logger.log_system(
+                    "warning", f"LLM replica {replica.name} marked unhealthy: {error}"
+                )
+
+    def _ensure_probing(self) -> None:
+        if self._probe_thread is not None or self.probe_interval_s <= 0 or len(self._replicas) < 2:
+            return
+        with self._lock:
+            if self._probe_thread is not None:
+                return
+            self._probe_thread = threading.Thread(
+                target=self._probe_loop, name="llm-replica-probe", daemon=True
+            )
+            self._probe_thread.start()
+
+    def _probe_loop(self) -> None:
+        while not self._stop.wait(self.probe_interval_s):
+            try:
+                self.probe_once()
+            except Exception as e:
+                sys_logger.log_system("warning", f"LLM replica probe failed: {e}")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
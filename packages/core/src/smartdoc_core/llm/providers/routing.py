@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Routing LLM Provider
+
+Per-task model routing: each call site (intent, discovery, personas,
+evaluator, ...) can be served by its own model profile, so cheap tasks run
+on a small fast model while evaluation keeps the large one.
+"""
+
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from smartdoc_core.llm.context import DEFAULT, EVALUATOR, EVALUATOR_REPAIR, current_call
+from smartdoc_core.utils.logger import sys_logger
+
+from .base import DelegatingProvider, LLMProvider
+
+# Call sites that share another task's profile
+TASK_ALIASES = {EVALUATOR_REPAIR: EVALUATOR}
+
+
+@dataclass(frozen=True)
+class RouteProfile:
+    """
+    Model and sampling settings a task is routed to.
+
+    Attributes:
+        name: Profile name (for stats and logs)
+        model: Model served for the task
+        temperature: Sampling temperature
+        top_p: Nucleus sampling parameter
+        max_tokens: Generation length limit, if any
+    """
+
+    name: str
+    model: str
+    temperature: float = 0.1
+    top_p: float = 0.9
+    max_tokens: Optional[int] = None
+
+
+RouteTable = Dict[str, RouteProfile]
+
+
+class ProfileRouter:
+    """
+    Cached task -> profile table.
+
+    The table is loaded from ``source`` on first use and kept in memory
+    until ``invalidate()`` is called (e.g. after an admin edits a profile)
+    or ``ttl_s`` elapses. The TTL bounds staleness in processes that did
+    not see the edit, such as other WSGI workers.
+    """
+
+    def __init__(self, source: Optional[Callable[[], RouteTable]] = None, ttl_s: Optional[float] = 30.0):
+        """
+        Args:
+            source: Callable returning the current table (None routes nothing)
+            ttl_s: Maximum age of the cached table in seconds (None = no expiry)
+        """
+        self._source = source
+        self.ttl_s = ttl_s
+        self._table: Optional[RouteTable] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counters = {"loads": 0, "load_errors": 0, "invalidations": 0}
+
+    def set_source(self, source: Optional[Callable[[], RouteTable]]) -> None:
+        """Replace the table source and drop the cached table."""
+        self._source = source
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop the cached table; the next call reloads it."""
+        with self._lock:
+            self._table = None
+            self._generation += 1
+            self._counters["invalidations"] += 1
+
+    def route(self, task: str, *, use_default: bool = True) -> Optional[RouteProfile]:
+        """Return the profile for ``task``, falling back to its alias and then (if ``use_default``) the default."""
+        table = self.table()
+        profile = table.get(task) or table.get(TASK_ALIASES.get(task, ""))
+        if profile is None and use_default:
+            profile = table.get(DEFAULT)
+        return profile
+
+    def table(self) -> RouteTable:
+        """Return the current table, loading it if missing or expired."""
+        with self._lock:
+            if self._table is not None and not self._expired():
+                return self._table
+            generation = self._generation
+            source = self._source
+
+        if source is None:
+            return {}
+
+        try:
+            table = dict(source())
+        except Exception as e:
+            sys_logger.log_system("warning", f"LLM route table load failed: {e}")
+            with self._lock:
+                self._counters["load_errors"] += 1
+                # Keep serving the previous table rather than unrouting every
+                # task, and retry only after another TTL period
+                self._table = self._table or {}
+                self._loaded_at = time.monotonic()
+                return self._table
+
+        with self._lock:
+            self._counters["loads"] += 1
+            # An invalidation during the load means the table may already be stale
+            if generation == self._generation:
+                self._table = table
+                self._loaded_at = time.monotonic()
+        return table
+
+    def stats(self) -> Dict[str, Any]:
+        """Return load counters and the cached table."""
+        with self._lock:
+            return {
+                **self._counters,
+                "cached": self._table is not None,
+                "routes": {task: asdict(p) for task, p in (self._table or {}).items()},
+            }
+
+    def _expired(self) -> bool:
+        return self.ttl_s is not None and time.monotonic() - self._loaded_at > self.ttl_s
+
+
+class RoutingProvider(DelegatingProvider):
+    """
+    Provider decorator that applies the routed profile of the call site.
+
+    The profile's model replaces the default model for the call, and so
+    does its length limit when the task (or its alias) has a profile of
+    its own; the default profile's limit is not applied, so it cannot
+    override the per-call-site output budgets below. Its temperature/top_p
+    replace the caller's only when ``apply_sampling`` is set, since
+    several callers choose sampling deliberately (e.g. variance testing
+    sweeps temperatures). Calls whose task has no profile pass through
+    unchanged.
+    """
+
+    def __init__(self, inner: LLMProvider, router: "ProfileRouter", *, apply_sampling: bool = False):
+        """
+        Args:
+            inner: Provider to route through
+            router: Task -> profile table
+            apply_sampling: Also apply the profile's temperature and top_p
+        """
+        super().__init__(inner)
+        self.router = router
+        self.apply_sampling = apply_sampling
+
+    def generate(self, prompt: str, **kwargs: Any) -> str:
+        return super().generate(prompt, **self._route(kwargs))
+
+    def generate_stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        return super().generate_stream(prompt, **self._route(kwargs))
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> str:
+        return await super().agenerate(prompt, **self._route(kwargs))
+
+    def _route(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        task = current_call().call_site
+        profile = self.router.route(task)
+        if profile is None:
+            return kwargs
+        routed = dict(kwargs)
+        routed.setdefault("model", profile.model)
+        if profile.max_tokens is not None and self.router.route(task, use_default=False) is not None:
+            routed.setdefault("max_tokens", profile.max_tokens)
+        if self.apply_sampling:
+            routed["temperature"] = profile.temperature
+            routed["top_p"] = profile.top_p
+        return routed
+
+
+_router = ProfileRouter()
+
+
+def get_router() -> ProfileRouter:
+    """Return the process-wide router used by the default provider stack."""
+    return _router
+
+
+def invalidate_routes() -> None:
+    """Drop the cached route table of the process-wide router."""
+    _router.invalidate()
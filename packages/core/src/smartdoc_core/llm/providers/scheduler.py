@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Priority Scheduling LLM Provider
+
+Orders access to the LLM backend's parallel slots by priority class, so
+interactive chat turns are not stuck behind end-of-session evaluations
+or admin-triggered variance tests.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+from smartdoc_core.llm.context import (
+    BATCH,
+    CLARIFICATION,
+    DEEP_BIAS,
+    DEFAULT,
+    DISCOVERY,
+    EVALUATOR,
+    EVALUATION,
+    EVALUATOR_REPAIR,
+    INTENT,
+    INTENT_FAST,
+    INTERACTIVE,
+    PATIENT_FALLBACK,
+    RESIDENT_PERSONA,
+    SON_PERSONA,
+    current_call,
+)
+from smartdoc_core.llm.metrics import LATENCY_BUCKETS_S, Histogram
+from smartdoc_core.utils.exceptions import LLMTimeoutError
+
+from .base import DelegatingProvider, LLMProvider
+
+DEFAULT_CLASSES: Dict[str, Dict[str, Any]] = {
+    INTERACTIVE: {"rank": 0, "max_concurrent": None},
+    EVALUATION: {"rank": 1, "max_concurrent": None},
+    BATCH: {"rank": 2, "max_concurrent": 1},
+}
+
+DEFAULT_CALL_SITE_CLASSES: Dict[str, str] = {
+    INTENT: INTERACTIVE,
+    INTENT_FAST: INTERACTIVE,
+    SON_PERSONA: INTERACTIVE,
+    RESIDENT_PERSONA: INTERACTIVE,
+    PATIENT_FALLBACK: INTERACTIVE,
+    CLARIFICATION: INTERACTIVE,
+    DISCOVERY: INTERACTIVE,
+    DEFAULT: INTERACTIVE,
+    EVALUATOR: EVALUATION,
+    EVALUATOR_REPAIR: EVALUATION,
+    DEEP_BIAS: EVALUATION,
+}
+
+
+@dataclass
+class _Ticket:
+    priority_class: str
+    rank: int
+    seq: int
+    enqueued: float
+    notify: Callable[[], None]
+    granted: bool = False
+    granted_at: float = 0.0
+
+
+@dataclass
+class _ClassStats:
+    rank: int
+    max_concurrent: Optional[int]
+    running: int = 0
+    waiting: int = 0
+    dispatched: int = 0
+    queue_timeouts: int = 0
+    queue_time: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS_S))
+
+
+class PrioritySchedulerProvider(DelegatingProvider):
+    """
+    Provider decorator that schedules calls onto a fixed number of slots.
+
+    Each call belongs to a priority class: the one set with
+    ``llm_call(priority=...)`` or else the class mapped to its call site.
+    When a slot frees up, the waiting call with the best (lowest) rank
+    whose class is under its ``max_concurrent`` cap runs next; equal
+    ranks run in arrival order.
+
+    Waiting calls age: every ``aging_s`` seconds in the queue improves a
+    call's rank by one, so batch work is not starved by a long burst of
+    evaluations. Aging never lifts a call to the top class's rank, so
+    interactive calls always go first.
+
+    A call waits in the queue at most its own ``timeout_s`` (capped at
+    ``max_queue_s``, which also bounds calls without a timeout) and then
+    raises ``LLMTimeoutError``. The time spent queued is taken off the
+    ``timeout_s`` passed upstream, so the call's total stays within it.
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        *,
+        max_concurrent: Optional[int] = None,
+        classes: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        call_sites: Optional[Mapping[str, str]] = None,
+        default_class: str = INTERACTIVE,
+        aging_s: Optional[float] = 30.0,
+        max_queue_s: float = 120.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            inner: Provider whose slots are scheduled
+            max_concurrent: Calls in flight upstream (defaults to ``inner.max_parallel``)
+            classes: Priority classes as name -> {"rank", "max_concurrent"}
+            call_sites: Call site -> class overrides (merged over the defaults)
+            default_class: Class for call sites without a mapping
+            aging_s: Queue time that improves a call's rank by one (None disables aging)
+            max_queue_s: Longest queue wait of any call, with or without ``timeout_s``
+            clock: Monotonic time source (injectable for tests)
+        """
+        super().__init__(inner)
+        self.max_concurrent = max(1, max_concurrent or self.max_parallel)
+        self.call_sites = {**DEFAULT_CALL_SITE_CLASSES, **(call_sites or {})}
+        self.default_class = default_class
+        self.aging_s = aging_s
+        self.max_queue_s = max_queue_s
+        self._clock = clock
+        self._classes = {
+            name: _ClassStats(rank=int(spec.get("rank", 0)), max_concurrent=spec.get("max_concurrent"))
+            for name, spec in (classes or DEFAULT_CLASSES).items()
+        }
+        if default_class not in self._classes:
+            raise ValueError(f"Unknown default priority class: {default_class}")
+        self._top_rank = min(c.rank for c in self._classes.values())
+        self._lock = threading.Lock()
+        self._waiting: List[_Ticket] = []
+        self._running = 0
+        self._seq = itertools.count()
+
+    # ---- Provider interface ----
+    def generate(self, prompt: str, **kwargs: Any) -> str:
+        ticket = self._acquire(kwargs.get("timeout_s"))
+        try:
+            return self.inner.generate(prompt, **self._remaining_timeout(ticket, kwargs))
+        finally:
+            self._release(ticket)
+
+    def generate_stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        ticket = self._acquire(kwargs.get("timeout_s"))
+        try:
+            yield from super().generate_stream(prompt, **self._remaining_timeout(ticket, kwargs))
+        finally:
+            self._release(ticket)
+
+    async def agenerate(self, prompt: str, **kwargs: Any) -> str:
+        ticket = await self._aacquire(kwargs.get("timeout_s"))
+        try:
+            return await super().agenerate(prompt, **self._remaining_timeout(ticket, kwargs))
+        finally:
+            self._release(ticket)
+
+    # ---- Management ----
+    def stats(self) -> Dict[str, Any]:
+        """Return slot usage plus per-class queue depth, counters and queue-time histograms."""
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "running": self._running,
+                "waiting": len(self._waiting),
+                "classes": {
+                    name: {
+                        "rank": c.rank,
+                        "max_concurrent": c.max_concurrent,
+                        "running": c.running,
+                        "waiting": c.waiting,
+                        "dispatched": c.dispatched,
+                        "queue_timeouts": c.queue_timeouts,
+                        "queue_time_s": c.queue_time.snapshot(),
+                    }
+                    for name, c in self._classes.items()
+                },
+            }
+
+    def classify(self) -> str:
+        """Return the priority class of a call made in the current context."""
+        ctx = current_call()
+        name = ctx.priority or self.call_sites.get(ctx.call_site, self.default_class)
+        return name if name in self._classes else self.default_class
+
+    # ---- Queueing ----
+    def _acquire(self, timeout_s: Optional[float]) -> _Ticket:
+        wait_s = self._queue_wait(timeout_s)
+        granted = threading.Event()
+        ticket = self._enqueue(granted.set)
+        if not ticket.granted and not granted.wait(wait_s):
+            self._abandon(ticket, wait_s)
+        return ticket
+
+    async def _aacquire(self, timeout_s: Optional[float]) -> _Ticket:
+        wait_s = self._queue_wait(timeout_s)
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def notify() -> None:
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        ticket = self._enqueue(notify)
+        if ticket.granted:
+            return ticket
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), wait_s)
+        except asyncio.TimeoutError:
+            self._abandon(ticket, wait_s)
+        except BaseException:
+            self._cancel(ticket)
+            raise
+        return ticket
+
+    def _queue_wait(self, timeout_s: Optional[float]) -> float:
+        """Longest queue wait of a call with the given ``timeout_s``."""
+        return self.max_queue_s if timeout_s is None else min(timeout_s, self.max_queue_s)
+
+    def _remaining_timeout(self, ticket: _Ticket, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Call kwargs with the time spent queued taken off ``timeout_s``."""
+        timeout_s = kwargs.get("timeout_s")
+        if timeout_s is None:
+            return kwargs
+        remaining = timeout_s - (ticket.granted_at - ticket.enqueued)
+        if remaining <= 0:
+            raise LLMTimeoutError(f"LLM call spent its {timeout_s}s timeout waiting for a {ticket.priority_class} slot")
+        return {**kwargs, "timeout_s": remaining}
+
+    def _enqueue(self, notify: Callable[[], None]) -> _Ticket:
+        name = self.classify()
+        with self._lock:
+            cls = self._classes[name]
+            ticket = _Ticket(name, cls.rank, next(self._seq), self._clock(), notify)
+            self._waiting.append(ticket)
+            cls.waiting += 1
+            self._dispatch()
+        return ticket
+
+    def _abandon(self, ticket: _Ticket, timeout_s: Optional[float]) -> None:
+        """Give up on a ticket whose queue wait timed out (unless granted meanwhile)."""
+        with self._lock:
+            if ticket.granted:
+                return
+            self._remove(ticket)
+            self._classes[ticket.priority_class].queue_timeouts += 1
+        raise LLMTimeoutError(f"LLM call waited over {timeout_s}s for a {ticket.priority_class} slot")
+
+    def _cancel(self, ticket: _Ticket) -> None:
+        with self._lock:
+            if not ticket.granted:
+                self._remove(ticket)
+                return
+        self._release(ticket)
+
+    def _remove(self, ticket: _Ticket) -> None:
+        self._waiting.remove(ticket)
+        self._classes[ticket.priority_class].waiting -= 1
+
+    def _release(self, ticket: _Ticket) -> None:
+        with self._lock:
+            self._running -= 1
+            self._classes[ticket.priority_class].running -= 1
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to the best eligible waiters (caller holds the lock)."""
+        now = self._clock()
+        while self._running < self.max_concurrent and self._waiting:
+            eligible = [t for t in self._waiting if self._has_capacity(t.priority_class)]
+            if not eligible:
+                return
+            ticket = min(eligible, key=lambda t: (self._effective_rank(t, now), t.seq))
+            self._remove(ticket)
+            cls = self._classes[ticket.priority_class]
+            cls.running += 1
+            cls.dispatched += 1
+            cls.queue_time.observe(now - ticket.enqueued)
+            self._running += 1
+            ticket.granted = True
+            ticket.granted_at = now
+            ticket.notify()
+
+    def _has_capacity(self, name: str) -> bool:
+        cls = self._classes[name]
+        return cls.max_concurrent is None or cls.running < cls.max_concurrent
+
+    def _effective_rank(self, ticket: _Ticket, now: float) -> float:
+        if not self.aging_s or ticket.rank == self._top_rank:
+            return ticket.rank
+        aged = ticket.rank - (now - ticket.enqueued) / self.aging_s
+        # Aging stops short of the top rank: interactive calls always go first
+        return max(aged, self._top_rank + 1)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Transport for LLM Providers
+
+Provides a process-wide pooled HTTP session so that every provider talking
+to Ollama reuses warm keep-alive connections instead of opening a new TCP
+connection per call.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from smartdoc_core.config.settings import config
+from smartdoc_core.utils.logger import sys_logger
+
+
+class PooledTransport:
+    """
+    Keep-alive HTTP transport with per-host connection limits.
+
+    Wraps a ``requests.Session`` mounted with a bounded keep-alive pool and
+    retries requests that fail with a connection error (e.g. a keep-alive
+    socket reset by the server). Read timeouts are never retried, so a slow
+    generation does not silently double its latency.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 16,
+        max_retries: int = 2,
+        backoff_s: float = 0.1,
+    ):
+        """
+        Initialize the pooled transport.
+
+        Args:
+            pool_connections: Number of distinct hosts to keep pools for
+            pool_maxsize: Keep-alive connections kept per host (busier hosts get
+                short-lived overflow connections)
+            max_retries: Retries on connection errors/resets
+            backoff_s: Base backoff between retries (doubles per attempt)
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0,  # Retries are handled below, only for connection errors
+            # Never block on checkout: urllib3 has no pool timeout here, so a full
+            # pool would hang callers forever. Overflow connections are opened and
+            # discarded on return; concurrency is bounded upstream by the scheduler.
+            pool_block=False,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = {}
+        self._counters = {"requests": 0, "retries": 0, "connection_errors": 0}
+
+    def post(
+        self,
+        url: str,
+        *,
+        json: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        stream: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """
+        POST through the shared pool, retrying on connection resets.
+
+        Raises:
+            requests.ConnectionError: If all connection attempts fail
+            requests.Timeout: If the server does not answer in time
+        """
+        return self.request("POST", url, json=json, timeout=timeout, stream=stream, headers=headers)
+
+    def get(self, url: str, *, timeout: Optional[float] = None) -> requests.Response:
+        """GET through the shared pool, retrying on connection resets."""
+        return self.request("GET", url, timeout=timeout)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        json: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        stream: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """Send a request through the shared pool."""
+        host = self._host_key(url)
+        self._track(host, +1)
+        try:
+            attempt = 0
+            while True:
+                try:
+                    return self.session.request(
+                        method, url, json=json, timeout=timeout, stream=stream, headers=headers
+                    )
+                except requests.ConnectionError as e:
+                    with self._lock:
+                        self._counters["connection_errors"] += 1
+                    if attempt >= self.max_retries:
+                        raise
+                    attempt += 1
+                    with self._lock:
+                        self._counters["retries"] += 1
+                    sys_logger.log_system(
+                        "debug", f"Transport retry {attempt}/{self.max_retries} for {host}: {e}"
+                    )
+                    time.sleep(self.backoff_s * (2 ** (attempt - 1)))
+        finally:
+            self._track(host, -1)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report pool occupancy and request counters.
+
+        Returns:
+            Dict with configured limits, per-host in-flight requests and the
+            idle/in-use connection counts of each urllib3 pool
+        """
+        pools: List[Dict[str, Any]] = []
+        manager = self._adapter.poolmanager
+        for key in list(manager.pools.keys()):
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            idle_slots = pool.pool.qsize() if pool.pool is not None else 0
+            pools.append({
+                "host": f"{pool.host}:{pool.port}",
+                "max_size": self.pool_maxsize,
+                "in_use": max(0, self.pool_maxsize - idle_slots),
+                "idle_slots": idle_slots,
+                "connections_opened": pool.num_connections,
+                "requests_served": pool.num_requests,
+            })
+
+        with self._lock:
+            return {
+                "pool_connections": self.pool_connections,
+                "pool_maxsize": self.pool_maxsize,
+                "in_flight": dict(self._in_flight),
+                "total_in_flight": sum(self._in_flight.values()),
+                "counters": dict(self._counters),
+                "pools": pools,
+            }
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+    # ---- Helpers ----
+    def _track(self, host: str, delta: int) -> None:
+        with self._lock:
+            if delta > 0:
+                self._counters["requests"] += 1
+            self._in_flight[host] = self._in_flight.get(host, 0) + delta
+            if self._in_flight[host] <= 0:
+                self._in_flight.pop(host, None)
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parts = urlsplit(url)
+        return parts.netloc or url
+
+
+_shared_transport: Optional[PooledTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_transport() -> PooledTransport:
+    """Return the process-wide transport, creating it from config on first use."""
+    global _shared_transport
+    if _shared_transport is None:
+        with _shared_lock:
+            if _shared_transport is None:
+                _shared_transport = PooledTransport(
+                    pool_connections=config.ollama_pool_connections,
+                    pool_maxsize=config.ollama_pool_maxsize,
+                    max_retries=config.ollama_max_retries,
+                )
+                sys_logger.log_system(
+                    "info",
+                    f"Shared LLM transport created (pool_maxsize={config.ollama_pool_maxsize}, "
+                    f"max_retries={config.ollama_max_retries})",
+                )
+    return _shared_transport
+
+
+def reset_shared_transport() -> None:
+    """Close and drop the process-wide transport (used by tests and reconfiguration)."""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is not None:
+            _shared_transport.close()
+        _shared_transport = None
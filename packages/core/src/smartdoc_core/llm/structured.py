@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Structured LLM Output
+
+Helpers for schema-constrained generation: JSON schemas derived from the
+Pydantic models callers already validate against, and parsing of the
+constrained output back into those models.
+"""
+
+import copy
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Generic, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@dataclass
+class StructuredOutput(Generic[M]):
+    """
+    Result of a structured generation.
+
+    Attributes:
+        raw: Raw text returned by the model (always set)
+        parsed: Validated model instance, or None if parsing/validation failed
+        data: Decoded JSON object, even when validation failed
+        error: Parsing or validation error, if any
+    """
+
+    raw: str
+    parsed: Optional[M] = None
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.parsed is not None
+
+
+def json_schema_for(model_cls: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Build a self-contained JSON schema for a Pydantic model.
+
+    ``$ref`` references are inlined so the schema can be handed directly to
+    a grammar-constrained backend such as Ollama's ``format`` option.
+    Returns a fresh copy that callers may modify.
+    """
+    return copy.deepcopy(_cached_schema(model_cls))
+
+
+@lru_cache(maxsize=None)
+def _cached_schema(model_cls: Type[BaseModel]) -> Dict[str, Any]:
+    schema = model_cls.model_json_schema()
+    defs = schema.pop("$defs", {})
+    return _inline_refs(schema, defs)
+
+
+def _inline_refs(node: Any, defs: Dict[str, Any]) -> Any:
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if ref and ref.startswith("#/$defs/"):
+            return _inline_refs(defs[ref[len("#/$defs/"):]], defs)
+        # Drop "title" annotations (strings), not properties named "title"
+        return {
+            k: _inline_refs(v, defs)
+            for k, v in node.items()
+            if not (k == "title" and isinstance(v, str))
+        }
+    if isinstance(node, list):
+        return [_inline_refs(v, defs) for v in node]
+    return node
+
+
+def parse_structured(raw: str, model_cls: Type[M]) -> StructuredOutput[M]:
+    """
+    Parse model output into ``model_cls``.
+
+    Constrained output is plain JSON; if the backend ignored the schema the
+    outermost ``{...}`` span is tried as well, so callers can use this for
+    unconstrained text too.
+    """
+    text = (raw or "").strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return StructuredOutput(raw=raw, error=ValueError("no JSON object in response"))
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError as e:
+            return StructuredOutput(raw=raw, error=e)
+
+    if not isinstance(data, dict):
+        return StructuredOutput(raw=raw, error=ValueError("response JSON is not an object"))
+
+    try:
+        return StructuredOutput(raw=raw, parsed=model_cls(**data), data=data)
+    except Exception as e:  # pydantic.ValidationError and field coercion errors
+        return StructuredOutput(raw=raw, data=data, error=e)
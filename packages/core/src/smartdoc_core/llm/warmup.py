@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+LLM Warm-up
+
+Loads the models an instance will use and primes the server's prompt
+cache with each task's static prompt prefix, so the first turns after a
+deploy or an Ollama restart do not pay for cold model loads. Progress is
+kept in a WarmupState that a readiness probe can report.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from smartdoc_core.llm.context import INTENT, RESIDENT_PERSONA, SON_PERSONA, llm_call
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.utils.logger import sys_logger
+
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+DEGRADED = "degraded"  # Gave up warming; serving anyway
+DISABLED = "disabled"
+
+DEFAULT_TASKS = (INTENT, SON_PERSONA, RESIDENT_PERSONA)
+
+# (task, prompt, extra generate kwargs)
+WarmupCall = Tuple[str, str, Dict[str, Any]]
+
+_SAMPLE_QUESTION = "What brings her in today?"
+
+
+class WarmupState:
+    """Thread-safe record of warm-up progress for readiness reporting."""
+
+    def __init__(self, status: str = PENDING):
+        self._lock = threading.Lock()
+        self._status = status
+        self._attempts = 0
+        self._rewarms = 0
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._error: Optional[str] = None
+
+    @property
+    def status(self) -> str:
+        with self._lock:
+            return self._status
+
+    @property
+    def ready(self) -> bool:
+        """True once traffic may be sent to this instance."""
+        return self.status in (READY, DEGRADED, DISABLED)
+
+    def begin(self) -> None:
+        with self._lock:
+            self._attempts += 1
+            if self._started_at is None:
+                self._started_at = time.time()
+            if self._status == PENDING:
+                self._status = WARMING
+            elif self._status == READY:
+                self._rewarms += 1  # Already serving: re-warm in the background
+
+    def record(self, kind: str, name: str, elapsed_s: float, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            target = self._models if kind == "model" else self._tasks
+            target[name] = {
+                "ok": error is None,
+                "elapsed_s": round(elapsed_s, 3),
+                **({"error": f"{type(error).__name__}: {error}"} if error is not None else {}),
+            }
+
+    def finish(self, ok: bool, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._error = error
+            if ok:
+                self._status = READY
+                self._finished_at = time.time()
+
+    def give_up(self, reason: str) -> None:
+        with self._lock:
+            if self._status in (PENDING, WARMING):
+                self._status = DEGRADED
+                self._error = reason
+                self._finished_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            started, finished = self._started_at, self._finished_at
+            return {
+                "status": self._status,
+                "ready": self._status in (READY, DEGRADED, DISABLED),
+                "attempts": self._attempts,
+                "rewarms": self._rewarms,
+                "duration_s": round(finished - started, 3) if started and finished else None,
+                "models": dict(self._models),
+                "tasks": dict(self._tasks),
+                "error": self._error,
+            }
+
+
+def representative_calls(provider: LLMProvider, tasks: Iterable[str] = DEFAULT_TASKS) -> List[WarmupCall]:
+    """
+    Build one realistic request per task (per context for intents).
+
+    The prompts come from the production prompt builders, so their static
+    prefixes are exactly what later requests start with. Persona prompts
+    are sent as chat messages when the provider supports chat, matching
+    how the responders call it.
+    """
+    # Imported here: these modules import the LLM package themselves
+    from smartdoc_core.intent.classifier import LLMIntentClassifier
+    from smartdoc_core.simulation.prompts.patient_default import PATIENT_SYSTEM_PROMPT, build_patient_turn
+    from smartdoc_core.simulation.prompts.resident_default import RESIDENT_SYSTEM_PROMPT, build_resident_turn
+
+    use_chat = isinstance(provider, LLMProvider) and provider.supports_chat
+    personas = {
+        SON_PERSONA: (PATIENT_SYSTEM_PROMPT, build_patient_turn),
+        RESIDENT_PERSONA: (RESIDENT_SYSTEM_PROMPT, build_resident_turn),
+    }
+    calls: List[WarmupCall] = []
+    for task in tasks:
+        if task == INTENT:
+            classifier = LLMIntentClassifier(provider=provider)
+            for context in ("anamnesis", "exam", "labs"):
+                prompt = classifier._compiled_prompt(context).render(classifier.prompt_builder, _SAMPLE_QUESTION)
+                calls.append((INTENT, prompt, {}))
+        elif task in personas:
+            system, build_turn = personas[task]
+            turn = build_turn(_SAMPLE_QUESTION, "No specific clinical data")
+            prompt = f"{system}\n\n{turn}"
+            kwargs: Dict[str, Any] = {}
+            if use_chat:
+                kwargs["messages"] = [{"role": "system", "content": system}, {"role": "user", "content": turn}]
+            calls.append((task, prompt, kwargs))
+        else:
+            sys_logger.log_system("warning", f"LLM warm-up: no representative prompt for task '{task}'")
+    return calls
+
+
+def warm_up(
+    provider: LLMProvider,
+    *,
+    models: Sequence[str],
+    calls: Sequence[WarmupCall],
+    state: WarmupState,
+    timeout_s: float = 600.0,
+    max_tokens: int = 1,
+) -> bool:
+    """
+    Run one warm-up pass: load every model, then send each representative call.
+
+    Calls go through the full provider stack under their task's call site,
+    so routing sends them to the task's model; caching is bypassed so they
+    reach the server. ``max_tokens`` stays tiny: the point is evaluating
+    the prompt prefix, not the answer.
+
+    Returns:
+        True if every model loaded and every call succeeded
+    """
+    state.begin()
+    failures: List[str] = []
+
+    load = getattr(provider, "load_model", None)
+    for model in models:
+        if load is None:
+            break  # e.g. replaying a cassette: nothing to load
+        started = time.perf_counter()
+        try:
+            load(model, timeout_s)
+            state.record("model", model, time.perf_counter() - started)
+        except Exception as e:
+            state.record("model", model, time.perf_counter() - started, e)
+            failures.append(f"model {model}: {e}")
+
+    for index, (task, prompt, kwargs) in enumerate(calls):
+        name = task if sum(1 for c in calls if c[0] == task) == 1 else f"{task}#{index}"
+        started = time.perf_counter()
+        try:
+            with llm_call(call_site=task, cache=False):
+                provider.generate(prompt, max_tokens=max_tokens, timeout_s=timeout_s, **kwargs)
+            state.record("task", name, time.perf_counter() - started)
+        except Exception as e:
+            state.record("task", name, time.perf_counter() - started, e)
+            failures.append(f"task {name}: {e}")
+
+    state.finish(not failures, "; ".join(failures) or None)
+    return not failures
+
+
+class Warmer:
+    """
+    Background warm-up loop for one process.
+
+    Retries a failed warm-up every ``retry_interval_s`` until it succeeds
+    (readiness stays false meanwhile) or ``give_up_after_s`` passes, after
+    which the instance reports ready in a degraded state rather than
+    holding traffic back forever. Once warm, it checks every
+    ``recheck_interval_s`` that the models are still loaded (they are
+    dropped when Ollama restarts) and warms up again in the background
+    without withdrawing readiness.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        *,
+        models: Callable[[], Sequence[str]],
+        calls: Callable[[], Sequence[WarmupCall]],
+        state: Optional[WarmupState] = None,
+        timeout_s: float = 600.0,
+        max_tokens: int = 1,
+        retry_interval_s: float = 15.0,
+        give_up_after_s: Optional[float] = 900.0,
+        recheck_interval_s: Optional[float] = 60.0,
+    ):
+        """
+        Args:
+            provider: Provider stack to warm up
+            models: Returns the models to load (read when each pass starts)
+            calls: Returns the representative calls to send
+            state: State to report progress into
+            timeout_s: Per-request timeout (cold loads can take minutes)
+            max_tokens: Tokens generated per representative call
+            retry_interval_s: Pause between failed passes
+            give_up_after_s: Report ready (degraded) after this long (None = never)
+            recheck_interval_s: Loaded-model check period once warm (None/0 = off)
+        """
+        self.provider = provider
+        self.models = models
+        self.calls = calls
+        self.state = state or WarmupState()
+        self.timeout_s = timeout_s
+        self.max_tokens = max_tokens
+        self.retry_interval_s = retry_interval_s
+        self.give_up_after_s = give_up_after_s
+        self.recheck_interval_s = recheck_interval_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Warmer":
+        """Start warming in a daemon thread."""
+        self._thread = threading.Thread(target=self.run, name="llm-warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        started = time.monotonic()
+        while not self._stop.is_set():
+            if self._pass():
+                sys_logger.log_system("info", f"LLM warm-up complete: {self.state.snapshot()['duration_s']}s")
+                break
+            overdue = self.give_up_after_s is not None and time.monotonic() - started >= self.give_up_after_s
+            if overdue and not self.state.ready:
+                self.state.give_up(f"warm-up still failing after {self.give_up_after_s}s")
+                sys_logger.log_system("warning", "LLM warm-up gave up; reporting ready (degraded)")
+            self._stop.wait(self.retry_interval_s)
+
+        while self.recheck_interval_s and not self._stop.wait(self.recheck_interval_s):
+            if self._models_missing():
+                sys_logger.log_system("info", "LLM models no longer loaded; warming up again")
+                self._pass()
+
+    def _pass(self) -> bool:
+        try:
+            return warm_up(
+                self.provider,
+                models=list(self.models()),
+                calls=list(self.calls()),
+                state=self.state,
+                timeout_s=self.timeout_s,
+                max_tokens=self.max_tokens,
+            )
+        except Exception as e:
+            self.state.finish(False, f"{type(e).__name__}: {e}")
+            sys_logger.log_system("warning", f"LLM warm-up failed: {e}")
+            return False
+
+    def _models_missing(self) -> bool:
+        listing = getattr(self.provider, "loaded_models", None)
+        if listing is None:
+            return False
+        try:
+            loaded = {_with_tag(m) for m in listing()}
+            return any(_with_tag(m) not in loaded for m in self.models())
+        except Exception:
+            return False  # Server unreachable: nothing to re-warm yet
+
+
+def _with_tag(model: str) -> str:
+    """Normalize ``name`` to ``name:latest`` as Ollama reports untagged models."""
+    return model if ":" in model else f"{model}:latest"
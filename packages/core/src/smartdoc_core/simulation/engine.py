@@ -22,7 +22,7 @@ with progressive information disclosure, enabling natural conver
 
 import json
 import uuid
-from typing import Dict, List, Set, Optional, Any, Tuple, Callable
+from typing import Dict, List, Set, Optional, Any, Tuple, Callable, Generator, Iterator, TypeVar
 from datetime import datetime
 
 from smartdoc_core.utils.logger import sys_logger
@@ -32,7 +32,10 @@ from smartdoc_core.simulation.session_logger import SessionLogger, create_sessio
 from smartdoc_core.simulation.types import DiscoveryEvent, InformationBlock
 from smartdoc_core.intent.classifier import LLMIntentClassifier
 from smartdoc_core.discovery.processor import DiscoveryClassifier
-from smartdoc_core.llm.providers.ollama import OllamaProvider
+from smartdoc_core.llm import get_default_provider, llm_call
+from smartdoc_core.llm.chat import ChatHistoryStore
+from smartdoc_core.llm.context import CLARIFICATION, PATIENT_FALLBACK
+from smartdoc_core.llm.metrics import collect_llm_calls, summarize_calls
 from smartdoc_core.simulation.bias_analyzer import BiasEvaluator
 from smartdoc_core.simulation.responders import (
     AnamnesisSonResponder,
@@ -40,6 +43,17 @@ from smartdoc_core.simulation.responders import (
     ExamObjectiveResponder
 )
 
+T = TypeVar("T")
+
+
+def _drain(gen: Generator[Any, None, T]) -> T:
+    """Exhaust a generator, discarding yielded chunks, and return its return value."""
+    while True:
+        try:
+            next(gen)
+        except StopIteration as stop:
+            return stop.value
+
 
 class IntentDrivenDisclosureManager:
     """
@@ -61,7 +75,8 @@ class IntentDrivenDisclosureManager:
         session_logger_factory=None,
         store: Optional[ProgressiveDisclosureStore] = None,
         on_discovery: Optional[Callable] = None,
-        on_message: Optional[Callable] = None
+        on_message: Optional[Callable] = None,
+        debug: Optional[bool] = None
     ):
         """
         Initialize the Intent-Driven Disclosure Manager with dependency injection.
@@ -77,8 +92,10 @@ class IntentDrivenDisclosureManager:
             store: Progressive disclosure store instance (defaults to new ProgressiveDisclosureStore)
             on_discovery: Optional callback for discovery events (for DB persistence)
             on_message: Optional callback for message events (for DB persistence)
+            debug: Attach per-query LLM metrics to results (defaults to config.debug)
         """
         self.case_file_path = case_file_path or config.CASE_FILE
+        self.debug = config.debug if debug is None else debug
 
         # Initialize disclosure store (state management) with dependency injection
         self.store = store or ProgressiveDisclosureStore(
@@ -91,9 +108,13 @@ class IntentDrivenDisclosureManager:
         self.session_logger_factory = session_logger_factory or create_session_logger
 
         # Initialize providers and components with dependency injection
-        self.provider = provider or OllamaProvider(config.OLLAMA_BASE_URL, config.OLLAMA_MODEL)
+        self.provider = provider or get_default_provider()
 
-        self.intent_classifier = intent_classifier or LLMIntentClassifier(provider=self.provider)
+        self.intent_classifier = intent_classifier or LLMIntentClassifier(
+            provider=self.provider,
+            cascade_settings=config.intent_section("cascade"),
+            cache_settings=config.intent_section("cache"),
+        )
 
         # Initialize modular discovery processor with dependency injection
         self.discovery_processor = discovery_processor or DiscoveryClassifier(
@@ -106,8 +127,8 @@ class IntentDrivenDisclosureManager:
 
         # Initialize responders by context with dependency injection
         self.responders = responders or {
-            "anamnesis": AnamnesisSonResponder(self.provider),
-            "labs": LabsResidentResponder(self.provider),
+            "anamnesis": AnamnesisSonResponder(self.provider, history=self._chat_history()),
+            "labs": LabsResidentResponder(self.provider, history=self._chat_history()),
             "exam": ExamObjectiveResponder(),  # No LLM needed for objective findings
         }
 
@@ -269,11 +290,33 @@ class IntentDrivenDisclosureManager:
             "Imaging": "imaging"
         }.get(block_type, "clinical_assessment")
 
+    @staticmethod
+    def _chat_history() -> Optional[ChatHistoryStore]:
+        """Build a persona's per-session chat history from ``llm.chat_history`` (None when disabled)."""
+        settings = config.llm_section("chat_history")
+        if not settings.get("enabled", True):
+            return None
+        idle_ttl_s = settings.get("idle_ttl_s", 3600)
+        return ChatHistoryStore(
+            max_turns=int(settings.get("max_turns", 12)),
+            max_sessions=int(settings.get("max_sessions", 200)),
+            idle_ttl_s=float(idle_ttl_s) if idle_ttl_s else None,
+        )
+
+    def _forget_chat_history(self, session_id: str) -> None:
+        for responder in self.responders.values():
+            history = getattr(responder, "history", None)
+            if history is not None:
+                history.forget(session_id)
+
     def start_intent_driven_session(self, session_id: Optional[str] = None) -> str:
         """Start a new intent-driven disclosure session."""
         if session_id is None:
             session_id = f"intent_session_{uuid.uuid4().hex[:8]}"
 
+        # A restarted session must not continue an earlier conversation
+        self._forget_chat_history(session_id)
+
         # Start progressive disclosure session
         pd_session = self.store.start_new_session(session_id)
 
@@ -300,6 +343,46 @@ class IntentDrivenDisclosureManager:
         Returns:
             Dictionary containing response, discovered information, and discovery notifications
         """
+        with llm_call(session_id=session_id), collect_llm_calls() as calls:
+            result = _drain(self._iter_doctor_query(session_id, user_query, context, stream=False))
+        return self._with_debug_metrics(result, calls)
+
+    def stream_doctor_query(
+        self, session_id: str, user_query: str, context: str = "anamnesis"
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Process a doctor's query, streaming the persona reply as it is generated.
+
+        Yields ``("token", str)`` events while the response text is produced,
+        followed by a single ``("result", dict)`` event carrying the same
+        dictionary ``process_doctor_query`` returns (final cleaned text,
+        discoveries, session stats and any bias warning).
+
+        Args:
+            session_id: The session ID
+            user_query: The doctor's question or statement
+            context: The clinical context ('anamnesis', 'exam', 'labs')
+        """
+        gen = self._iter_doctor_query(session_id, user_query, context, stream=True)
+        with llm_call(session_id=session_id), collect_llm_calls() as calls:
+            while True:
+                try:
+                    chunk = next(gen)
+                except StopIteration as stop:
+                    yield ("result", self._with_debug_metrics(stop.value, calls))
+                    return
+                yield ("token", chunk)
+
+    def _with_debug_metrics(self, result: Dict[str, Any], calls) -> Dict[str, Any]:
+        """In debug mode, add token/latency accounting of the query's LLM calls."""
+        if self.debug:
+            result["llm_metrics"] = summarize_calls(calls)
+        return result
+
+    def _iter_doctor_query(
+        self, session_id: str, user_query: str, context: str, stream: bool
+    ) -> Generator[str, None, Dict[str, Any]]:
+        """Shared implementation of process/stream_doctor_query; yields text chunks when streaming."""
         if session_id not in self.discovery_events:
             # Auto-start session if not exists
             self.start_intent_driven_session(session_id)
@@ -321,8 +404,8 @@ class IntentDrivenDisclosureManager:
             )
 
             # 3. Generate contextual response
-            response_result = self._generate_discovery_response_with_context(
-                session_id, intent_result, discovery_result, context
+            response_result = yield from self._iter_discovery_response_with_context(
+                session_id, intent_result, discovery_result, context, stream=stream
             )
 
             # 4. Real-time bias detection
@@ -630,7 +713,8 @@ Respond naturally as the patient's son. CRITICAL RULES:
 Your response (brief and natural):"""
 
         try:
-            response = self.provider.generate(prompt, temperature=0.3)
+            with llm_call(call_site=PATIENT_FALLBACK):
+                response = self.provider.generate(prompt, temperature=0.3)
             return self._clean_response_text(response)
         except Exception as e:
             sys_logger.log_system("warning", f"LLM fallback generation failed: {e}")
@@ -699,7 +783,8 @@ The doctor just asked: "{original_query}"
 Your response:"""
 
         try:
-            response = self.provider.generate(prompt, temperature=0.3)
+            with llm_call(call_site=CLARIFICATION):
+                response = self.provider.generate(prompt, temperature=0.3)
             return self._clean_response_text(response)
         except Exception as e:
             sys_logger.log_system("warning", f"LLM clarification generation failed: {e}")
@@ -914,11 +999,35 @@ Your response:"""
         context: str,
     ) -> Dict[str, Any]:
         """Generate response with context-appropriate responder using dependency injection."""
+        return _drain(
+            self._iter_discovery_response_with_context(
+                session_id, intent_result, discovery_result, context, stream=False
+            )
+        )
+
+    def _iter_discovery_response_with_context(
+        self,
+        session_id: str,
+        intent_result: Dict[str, Any],
+        discovery_result: Dict[str, Any],
+        context: str,
+        stream: bool = False,
+    ) -> Generator[str, None, Dict[str, Any]]:
+        """
+        Build the context-appropriate response, yielding text chunks when streaming.
+
+        Returns (via StopIteration) the response dictionary with cleaned text.
+        Only responder-generated replies are streamed token by token; fallback
+        replies are yielded as a single chunk.
+        """
         # Check if intent was filtered due to context
         if discovery_result.get("context_filtered"):
-            return self._generate_context_filtered_response(
+            response = self._generate_context_filtered_response(
                 intent_result["intent_id"], context
             )
+            if stream:
+                yield response["text"]
+            return response
 
         # Collect clinical_data consistently
         session = self.store.get_session(session_id)
@@ -1028,12 +1137,20 @@ Your response:"""
 
         # Generate response text
         if discoveries or clinical_data:  # Also generate response if we have accumulated clinical data
-            text = responder.respond(
+            respond_kwargs = dict(
                 intent_id=intent_result["intent_id"],
                 doctor_question=intent_result.get("original_input", ""),
                 clinical_data=clinical_data,
                 context=context,
             )
+            if stream:
+                chunks = []
+                for chunk in responder.respond_stream(**respond_kwargs):
+                    chunks.append(chunk)
+                    yield chunk
+                text = "".join(chunks)
+            else:
+                text = responder.respond(**respond_kwargs)
 
             # Note: Discovery events are now automatically persisted via store hooks
         else:
@@ -1044,6 +1161,8 @@ Your response:"""
                 text = self._generate_labs_fallback_response(intent_result, session)
             else:
                 text = self._generate_patient_fallback_response(intent_result, session)
+            if stream:
+                yield text
 
         response = {
             "text": self._clean_response_text(text),
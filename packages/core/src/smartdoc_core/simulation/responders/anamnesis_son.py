@@ -5,9 +5,14 @@ Implements the patient's son persona for anamnesis conversations
 in the SmartDoc simulation engine.
 """
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from .base import Responder
-from smartdoc_core.simulation.prompts.patient_default import build_patient_prompt
+from smartdoc_core.llm.context import SON_PERSONA
+from smartdoc_core.simulation.prompts.patient_default import (
+    PATIENT_SYSTEM_PROMPT,
+    build_patient_prompt,
+    build_patient_turn,
+)
 
 
 class AnamnesisSonResponder(Responder):
@@ -18,6 +23,8 @@ class AnamnesisSonResponder(Responder):
     translating for his Spanish-speaking mother in the emergency department.
     """
 
+    call_site = SON_PERSONA
+
     def build_prompt(
         self,
         *,
@@ -38,7 +45,22 @@ class AnamnesisSonResponder(Responder):
         Returns:
             Formatted prompt for LLM generation
         """
-        # Format clinical data points for the prompt
+        return build_patient_prompt(doctor_question, self._clinical_points(clinical_data))
+
+    def build_chat_turn(
+        self,
+        *,
+        intent_id: str,
+        doctor_question: str,
+        clinical_data: List[Dict],
+        context: str
+    ) -> Tuple[str, str]:
+        """Split the persona prompt into its fixed persona text and the turn text."""
+        return PATIENT_SYSTEM_PROMPT, build_patient_turn(doctor_question, self._clinical_points(clinical_data))
+
+    @staticmethod
+    def _clinical_points(clinical_data: List[Dict]) -> str:
+        """Format clinical data points for the prompt."""
         points = []
         for data in clinical_data:
             label = data.get('label', data.get('type', 'Information'))
@@ -46,6 +68,4 @@ class AnamnesisSonResponder(Responder):
             if summary:
                 points.append(f"- {label}: {summary}")
 
-        clinical_points = "\n".join(points) if points else "No specific clinical data"
-
-        return build_patient_prompt(doctor_question, clinical_points)
+        return "\n".join(points) if points else "No specific clinical data"
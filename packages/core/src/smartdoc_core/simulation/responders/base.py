@@ -6,8 +6,17 @@ in the SmartDoc simulation engine.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from smartdoc_core.llm.chat import ChatHistoryStore
+from smartdoc_core.llm.context import DEFAULT, current_call, llm_call
 from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.utils.exceptions import CircuitOpenError
+
+_QUOTE_CHARS = "\"'\u201c\u201d\u2018\u2019"
+_WHITESPACE = " \t\r\n"
+# Opening quotes a stream may drop, with the quote that closes them. ' and ’
+# also start contractions ('Cause), so a stream never drops them up front.
+_CLOSING_QUOTES = {'"': '"', "\u201c": "\u201d", "\u2018": "\u2019"}
 
 
 class Responder(ABC):
@@ -18,14 +27,25 @@ class Responder(ABC):
     using dependency injection for LLM providers and prompts.
     """
 
-    def __init__(self, provider: Optional[LLMProvider] = None):
+    # Call-site tag for LLM caching and metrics
+    call_site: str = DEFAULT
+
+    def __init__(
+        self,
+        provider: Optional[LLMProvider] = None,
+        history: Optional[ChatHistoryStore] = None
+    ):
         """
         Initialize responder with optional LLM provider.
 
         Args:
             provider: LLM provider instance for generating responses
+            history: Per-session chat history; when set and the provider
+                supports chat, turns are sent as a conversation so the
+                persona prompt and earlier turns form a reusable prefix
         """
         self.provider = provider
+        self.history = history
 
     @abstractmethod
     def build_prompt(
@@ -50,6 +70,25 @@ class Responder(ABC):
         """
         pass
 
+    def build_chat_turn(
+        self,
+        *,
+        intent_id: str,
+        doctor_question: str,
+        clinical_data: List[Dict],
+        context: str
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Split the prompt into a session-stable system prompt and the turn text.
+
+        Takes the same arguments as ``build_prompt``. Responders that return
+        None (the default) always send the flat prompt.
+
+        Returns:
+            (system prompt, user turn) or None
+        """
+        return None
+
     def respond(
         self,
         *,
@@ -80,18 +119,151 @@ class Responder(ABC):
         if not self.provider:
             return self._fallback()
 
+        chat = self._chat_request(
+            intent_id=intent_id,
+            doctor_question=doctor_question,
+            clinical_data=clinical_data,
+            context=context
+        )
+        kwargs = {"messages": chat[2]} if chat else {}
+
         # Use provider with appropriate generation parameters
-        text = self.provider.generate(prompt)
+        try:
+            with llm_call(call_site=self.call_site):
+                text = self.provider.generate(prompt, **kwargs)
+        except CircuitOpenError:
+            return self._fallback()
+
+        text = self._strip_quotes(text)
+        if chat:
+            self.history.append(chat[0], chat[1], text)
+        return text
+
+    def respond_stream(
+        self,
+        *,
+        intent_id: str,
+        doctor_question: str,
+        clinical_data: List[Dict],
+        context: str
+    ) -> Iterator[str]:
+        """
+        Generate a response as a stream of text chunks.
+
+        Takes the same arguments as ``respond``. Surrounding quotes are
+        trimmed on the fly: opening double quotes are dropped and trailing
+        quotes/whitespace are held back until more text follows. At the end
+        of the stream the held-back quotes are dropped only if they close the
+        dropped ones, otherwise they are sent. A leading ' or ’ is always
+        kept, as it may be an apostrophe; a reply wrapped in single quotes
+        therefore streams with its quotes.
+
+        Yields:
+            Response text chunks in generation order
+        """
+        prompt = self.build_prompt(
+            intent_id=intent_id,
+            doctor_question=doctor_question,
+            clinical_data=clinical_data,
+            context=context
+        )
+
+        if not self.provider:
+            yield self._fallback()
+            return
+
+        # Providers outside the LLMProvider hierarchy may only offer generate()
+        if not isinstance(self.provider, LLMProvider):
+            try:
+                with llm_call(call_site=self.call_site):
+                    text = self.provider.generate(prompt)
+            except CircuitOpenError:
+                text = self._fallback()
+            yield self._strip_quotes(text)
+            return
+
+        chat = self._chat_request(
+            intent_id=intent_id,
+            doctor_question=doctor_question,
+            clinical_data=clinical_data,
+            context=context
+        )
+        kwargs = {"messages": chat[2]} if chat else {}
+
+        started = False
+        opened: List[str] = []  # Opening quotes dropped from the stream, outermost first
+        pending = ""
+        reply: List[str] = []
+        try:
+            with llm_call(call_site=self.call_site):
+                for chunk in self.provider.generate_stream(prompt, **kwargs):
+                    while not started and chunk:
+                        if chunk[0] in _WHITESPACE:
+                            chunk = chunk[1:]
+                        elif chunk[0] in _CLOSING_QUOTES:
+                            opened.append(chunk[0])
+                            chunk = chunk[1:]
+                        else:
+                            started = True
+                    if not started:
+                        continue
+
+                    text = pending + chunk
+                    trimmed = text.rstrip(_QUOTE_CHARS + _WHITESPACE)
+                    pending = text[len(trimmed):]
+                    if trimmed:
+                        reply.append(trimmed)
+                        yield trimmed
+        except CircuitOpenError:
+            # Raised before the first chunk: nothing has been sent yet
+            yield self._fallback()
+            return
+
+        # Drop held-back quotes that close the dropped ones, send the rest
+        tail = pending.rstrip()
+        while opened and tail.endswith(_CLOSING_QUOTES[opened[0]]):
+            tail = tail[:-1].rstrip()
+            opened.pop(0)
+        if tail:
+            reply.append(tail)
+            yield tail
+
+        # Only completed replies become history
+        if chat:
+            self.history.append(chat[0], chat[1], self._strip_quotes("".join(reply)))
+
+    def _chat_request(self, **prompt_args: Any) -> Optional[Tuple[str, str, List[Dict[str, str]]]]:
+        """
+        Return (session id, user turn, messages) when this turn should use chat mode.
+
+        Chat mode needs a history store, a chat-capable provider, a session
+        id in the current LLM call context and a responder that splits its
+        prompt via ``build_chat_turn``.
+        """
+        if self.history is None or not isinstance(self.provider, LLMProvider):
+            return None
+        if not self.provider.supports_chat:
+            return None
+        session_id = current_call().session_id
+        if not session_id:
+            return None
+        parts = self.build_chat_turn(**prompt_args)
+        if parts is None:
+            return None
+        system, user = parts
+        return session_id, user, self.history.messages(session_id, system, user)
 
-        # Clean up the response by removing quotes and extra whitespace
+    @staticmethod
+    def _strip_quotes(text: str) -> str:
+        """Strip whitespace and surrounding quote pairs from generated text."""
         text = text.strip()
 
         # Remove surrounding quotes if present (handle ASCII, Unicode, and mixed quotes)
         quote_pairs = [
             ('"', '"'),      # ASCII double quotes
             ("'", "'"),      # ASCII single quotes
-            ('"', '"'),      # Unicode left/right double quotes
-            (''', '''),      # Unicode left/right single quotes
+            ('“', '”'),      # Unicode left/right double quotes
+            ('‘', '’'),      # Unicode left/right single quotes
         ]
 
         # Keep removing quotes until no more surrounding pairs are found
@@ -107,5 +279,5 @@ class Responder(ABC):
         return text
 
     def _fallback(self) -> str:
-        """Default fallback response when no provider is available."""
+        """Default fallback response when no provider is available or the LLM circuit is open."""
         return "Let me tell you what I know about that."
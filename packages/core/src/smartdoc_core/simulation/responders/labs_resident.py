@@ -5,9 +5,14 @@ Implements the medical resident persona for laboratory and imaging
 contexts in the SmartDoc simulation engine.
 """
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from .base import Responder
-from smartdoc_core.simulation.prompts.resident_default import build_resident_prompt
+from smartdoc_core.llm.context import RESIDENT_PERSONA
+from smartdoc_core.simulation.prompts.resident_default import (
+    RESIDENT_SYSTEM_PROMPT,
+    build_resident_prompt,
+    build_resident_turn,
+)
 
 
 class LabsResidentResponder(Responder):
@@ -18,6 +23,8 @@ class LabsResidentResponder(Responder):
     providing laboratory and imaging results to the attending physician.
     """
 
+    call_site = RESIDENT_PERSONA
+
     def build_prompt(
         self,
         *,
@@ -38,7 +45,22 @@ class LabsResidentResponder(Responder):
         Returns:
             Formatted prompt for LLM generation
         """
-        # Format clinical data points for the prompt
+        return build_resident_prompt(doctor_question, self._clinical_points(clinical_data))
+
+    def build_chat_turn(
+        self,
+        *,
+        intent_id: str,
+        doctor_question: str,
+        clinical_data: List[Dict],
+        context: str
+    ) -> Tuple[str, str]:
+        """Split the persona prompt into its fixed persona text and the turn text."""
+        return RESIDENT_SYSTEM_PROMPT, build_resident_turn(doctor_question, self._clinical_points(clinical_data))
+
+    @staticmethod
+    def _clinical_points(clinical_data: List[Dict]) -> str:
+        """Format clinical data points for the prompt."""
         points = []
         for data in clinical_data:
             label = data.get('label', data.get('type', 'Result'))
@@ -47,6 +69,4 @@ class LabsResidentResponder(Responder):
             if content:
                 points.append(f"- {label}: {content}")
 
-        clinical_points = "\n".join(points) if points else "No specific results available"
-
-        return build_resident_prompt(doctor_question, clinical_points)
+        return "\n".join(points) if points else "No specific results available"
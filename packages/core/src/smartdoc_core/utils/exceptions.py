@@ -69,3 +69,23 @@ class LoggingError(SmartDocError):
     """Raised when logging operations fail."""
 
     pass
+
+
+class LLMTimeoutError(NLGError):
+    """Raised when an LLM call does not complete within the caller's timeout."""
+
+    pass
+
+
+class CassetteMissError(NLGError):
+    """Raised when a replayed LLM request was not recorded in the cassette."""
+
+    pass
+
+
+class CircuitOpenError(NLGError):
+    """Raised without calling the LLM while its circuit breaker is open."""
+
+    def __init__(self, message: str, retry_after_s: float = 0.0):
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
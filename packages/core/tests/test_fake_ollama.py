@@ -0,0 +1,80 @@
+"""
+Smoke test of the fake Ollama server (dev-tools/fake_ollama.py) driven by OllamaProvider.
+"""
+
+import importlib.util
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from smartdoc_core.intent.types import IntentLLMOut
+from smartdoc_core.llm.providers.ollama import OllamaProvider
+from smartdoc_core.llm.providers.transport import PooledTransport
+
+FAKE_OLLAMA = Path(__file__).resolve().parents[3] / "dev-tools" / "fake_ollama.py"
+
+
+@pytest.fixture
+def fake_ollama():
+    """A fake server on an ephemeral port: (module, simulation state, base URL)."""
+    spec = importlib.util.spec_from_file_location("fake_ollama", FAKE_OLLAMA)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    args = module.build_parser().parse_args([
+        "--models", "gemma", "embedder", "--max-loaded", "2", "--cold-load-s", "0.2",
+        "--prompt-tps", "1000000", "--gen-tps", "10000", "--response-tokens", "5", "--embedding-dim", "8",
+    ])
+    sim = module.FakeOllama(args)
+    handler = type("Handler", (module.Handler,), {"sim": sim})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.verbose = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield module, sim, f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_provider_round_trips_every_endpoint(fake_ollama):
+    _, sim, base_url = fake_ollama
+    provider = OllamaProvider(base_url, "gemma", transport=PooledTransport())
+
+    assert provider.ping()  # /api/tags
+    assert len(provider.generate("Any fever?").split()) == 5  # /api/generate
+    assert provider.generate("", messages=[{"role": "user", "content": "Any fever?"}])  # /api/chat
+    assert len("".join(provider.generate_stream("Any fever?")).split()) == 5
+    structured = provider.generate_structured("Classify: any fever?", IntentLLMOut)
+    assert structured.ok
+
+    vectors = provider.embed(["fever", "cough"], model="embedder")  # /api/embed
+    assert len(vectors) == 2 and len(vectors[0]) == 8
+    assert sorted(provider.loaded_models()) == ["embedder", "gemma"]  # /api/ps
+    assert sim.stats()["cold_loads"] == 2
+
+
+def test_cold_load_does_not_block_resident_models(fake_ollama):
+    _, sim, _ = fake_ollama
+    sim.ensure_loaded("gemma")
+
+    loads = []
+    loader = threading.Thread(target=lambda: loads.append(sim.ensure_loaded("embedder")))
+    loader.start()
+    deadline = time.time() + 2
+    while "embedder" not in sim._loading:
+        assert time.time() < deadline
+        time.sleep(0.005)
+
+    started = time.perf_counter()
+    assert sim.ensure_loaded("gemma") == 0.0
+    assert time.perf_counter() - started < 0.1  # Not held up by the load
+
+    waited = sim.ensure_loaded("embedder")  # Waits for the load in progress
+    loader.join(2)
+    assert loads == [0.2] and 0 < waited < 0.3
+    assert sim.stats()["cold_loads"] == 2
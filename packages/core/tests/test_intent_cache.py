@@ -0,0 +1,87 @@
+"""
+Tests for the normalized query -> intent classification cache.
+"""
+
+import json
+from unittest.mock import Mock
+
+from smartdoc_core.intent.cache import IntentCache, normalize_query
+from smartdoc_core.intent.classifier import LLMIntentClassifier
+
+
+def _answer(intent_id, confidence=0.9):
+    return json.dumps({"intent_id": intent_id, "confidence": confidence, "explanation": "x"})
+
+
+def _classifier(**settings):
+    provider = Mock(model="gemma")
+    provider.generate.return_value = _answer("hpi_fever")
+    return LLMIntentClassifier(provider=provider, cache_settings={"enabled": True, **settings}), provider
+
+
+def test_normalization_covers_case_punctuation_whitespace_and_contractions():
+    assert normalize_query("  What's her  BP?? ") == normalize_query("what is her bp") == "what is her bp"
+    assert normalize_query("She doesn't smoke, does she?") == "she does not smoke does she"
+    assert normalize_query("Won’t she take it?") == "will not she take it"
+    assert normalize_query("Her mother's history") == "her mother s history"
+
+
+def test_repeated_questions_skip_the_llm():
+    classifier, provider = _classifier()
+
+    first = classifier.classify_intent("Any fever?", "anamnesis")
+    again = classifier.classify_intent("any   FEVER", "anamnesis")
+    other_context = classifier.classify_intent("Any fever?", "exam")
+
+    assert provider.generate.call_count == 2  # The exam context is a separate entry
+    assert (again["intent_id"], again["cached"], again["original_input"]) == ("hpi_fever", True, "any   FEVER")
+    assert (first["tier"], again["tier"]) == ("primary", "cache")
+    assert "cached" not in first and "cached" not in other_context
+    stats = classifier.cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["hit_rate"]) == (1, 2, 1 / 3)
+    assert stats["by_context"]["anamnesis"]["hit_rate"] == 0.5
+
+
+def test_fallbacks_and_unsure_answers_are_not_cached():
+    classifier, provider = _classifier(min_confidence=0.5)
+
+    provider.generate.return_value = "no json here"
+    classifier.classify_intent("Any fever?", "anamnesis")
+    provider.generate.return_value = _answer("hpi_fever", confidence=0.4)
+    classifier.classify_intent("Any fever?", "anamnesis")
+    provider.generate.side_effect = RuntimeError("down")
+    classifier.classify_intent("Any fever?", "anamnesis")
+
+    assert provider.generate.call_count == 3
+    assert classifier.cache.stats()["stores"] == 0
+
+
+def test_model_or_intent_set_change_invalidates():
+    classifier, provider = _classifier()
+    classifier.classify_intent("Any fever?")
+
+    provider.model = "llama"
+    classifier.classify_intent("Any fever?")
+    classifier.intent_categories = {**classifier.intent_categories, "hpi_rash": {"description": "Rash"}}
+    classifier.classify_intent("Any fever?")
+
+    assert provider.generate.call_count == 3
+    stats = classifier.cache.stats()
+    assert stats["invalidations"] == 2 and stats["memory_entries"] == 1
+
+
+def test_per_context_bounds_and_persistence(tmp_path):
+    db_path = str(tmp_path / "intent_cache.sqlite3")
+    cache = IntentCache(max_entries=1, context_max_entries={"exam": 2}, db_path=db_path)
+    for question in ("a", "b"):
+        cache.put(question, "anamnesis", "gemma", "v1", {"intent_id": "hpi_fever", "confidence": 0.9})
+        cache.put(question, "exam", "gemma", "v1", {"intent_id": "exam_vital", "confidence": 0.9})
+
+    stats = cache.stats()
+    assert stats["by_context"]["anamnesis"]["entries"] == 1 and stats["by_context"]["exam"]["entries"] == 2
+
+    restarted = IntentCache(db_path=db_path)
+    assert restarted.get("A!", "anamnesis", "gemma", "v1")["intent_id"] == "hpi_fever"
+    assert restarted.get("a", "anamnesis", "gemma", "v2") is None
+    assert restarted.stats()["disk_hits"] == 1
+
@@ -0,0 +1,112 @@
+"""
+Tests for the confidence-gated intent classification cascade.
+"""
+
+import json
+
+from smartdoc_core.intent.cascade import (
+    ERROR,
+    FALLBACK,
+    INVALID_INTENT,
+    LOW_CONFIDENCE,
+    PRIMARY,
+    IntentCascade,
+    IntentQuery,
+    IntentTier,
+    build_cascade,
+)
+from smartdoc_core.intent.classifier import LLMIntentClassifier
+from smartdoc_core.llm.context import INTENT, INTENT_FAST, current_call
+from smartdoc_core.llm.providers.base import LLMProvider
+
+
+class ModelAnswers(LLMProvider):
+    """Answers per model; records (call site, model) of each request."""
+
+    def __init__(self, answers):
+        self.model = "large"
+        self.answers = answers
+        self.calls = []
+
+    def generate(self, prompt, **kwargs):
+        model = kwargs.get("model", self.model)
+        self.calls.append((current_call().call_site, model))
+        answer = self.answers[model]
+        if isinstance(answer, Exception):
+            raise answer
+        return json.dumps(answer)
+
+
+class FixedTier(IntentTier):
+    def __init__(self, name, result):
+        self.name = name
+        self.result = result
+
+    def classify(self, query):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def _answer(intent_id, confidence):
+    return {"intent_id": intent_id, "confidence": confidence, "explanation": "x"}
+
+
+def _classifier(answers):
+    provider = ModelAnswers(answers)
+    settings = {
+        "enabled": True,
+        "tiers": [{"name": "fast", "model": "small"}],
+        "default_threshold": 0.85,
+        "thresholds": {"anamnesis": 0.7},
+    }
+    return LLMIntentClassifier(provider=provider, cascade_settings=settings), provider
+
+
+def test_confident_fast_answer_skips_the_large_model():
+    classifier, provider = _classifier({"small": _answer("hpi_fever", 0.75), "large": _answer("hpi_chills", 0.9)})
+
+    result = classifier.classify_intent("Any fever?", "anamnesis")
+
+    assert (result["intent_id"], result["tier"]) == ("hpi_fever", "fast")
+    assert provider.calls == [(INTENT_FAST, "small")]
+
+
+def test_escalates_on_per_context_threshold_and_invalid_intent():
+    classifier, provider = _classifier({"small": _answer("hpi_fever", 0.75), "large": _answer("exam_vital", 0.9)})
+
+    result = classifier.classify_intent("Any fever?", "exam")  # 0.75 < default 0.85
+    assert (result["intent_id"], result["tier"]) == ("exam_vital", PRIMARY)
+    assert provider.calls == [(INTENT_FAST, "small"), (INTENT, "large")]
+
+    classifier.cascade.reset()
+    provider.answers["small"] = _answer("exam_vital", 0.99)
+    classifier.classify_intent("Vitals?", "anamnesis")  # Confident, but not an anamnesis intent
+
+    stats = classifier.cascade.stats()
+    assert stats["escalation_rate"] == 1.0
+    assert stats["tiers"]["fast"]["escalations"][INVALID_INTENT] == 1
+    assert stats["tiers"][PRIMARY]["latency_s"]["count"] == 1
+
+
+def test_tier_errors_escalate_and_are_counted():
+    cascade = IntentCascade(
+        [FixedTier("broken", RuntimeError("down")), FixedTier("unsure", _answer("hpi_fever", 0.2))],
+        default_threshold=0.5,
+    )
+    query = IntentQuery(doctor_input="q", context="anamnesis", valid_intents={"hpi_fever"}, prompt="p")
+
+    result = cascade.classify(query, final=lambda: _answer("hpi_fever", 0.9))
+
+    assert result["tier"] == PRIMARY
+    tiers = cascade.stats()["tiers"]
+    assert tiers["broken"]["escalations"][ERROR] == 1
+    assert tiers["unsure"]["escalations"][LOW_CONFIDENCE] == 1
+    assert tiers["unsure"]["escalation_rate"] == 1.0
+    fallback = cascade.classify(query, final=lambda: {**_answer("hpi_fever", 0.6), "tier": FALLBACK})
+    assert fallback["tier"] == FALLBACK  # Keyword fallbacks of the final path stay marked
+
+
+def test_disabled_cascade_is_not_built():
+    assert build_cascade(None, {}) is None
+    assert build_cascade(None, {"enabled": True, "tiers": []}) is None
@@ -0,0 +1,69 @@
+"""
+Tests for the embedding nearest-neighbour intent tier.
+"""
+
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from smartdoc_core.intent.cascade import NO_ANSWER, PRIMARY, IntentQuery
+from smartdoc_core.intent.classifier import LLMIntentClassifier
+from smartdoc_core.intent.embedding import EmbeddingTier, HashingEmbedder, IntentVectorIndex, OllamaEmbedder
+from smartdoc_core.llm.providers.ollama import OllamaProvider
+
+CATEGORIES = {
+    "meds_current_known": {"examples": ["What medications is she taking?", "Any medications?"]},
+    "hpi_fever": {"examples": ["Does she have a fever?", "Any fever?"]},
+    "exam_vital": {"examples": ["What are her vital signs?"]},
+    "clarification": {"examples": []},
+}
+
+
+def test_index_scores_best_example_per_valid_intent():
+    index = IntentVectorIndex(HashingEmbedder(), CATEGORIES)
+    assert index.size == 5 and index.intent_ids == ["meds_current_known", "hpi_fever", "exam_vital"]
+
+    ranked = index.scores("which medications is she taking", valid_intents={"meds_current_known", "hpi_fever"})
+    assert [intent for intent, _ in ranked] == ["meds_current_known", "hpi_fever"]
+    assert ranked[0][1] > 0.7 > ranked[1][1]
+
+
+def test_clear_match_skips_the_llm_and_ambiguous_queries_escalate():
+    provider = Mock()
+    provider.generate.return_value = json.dumps({"intent_id": "hpi_fever", "confidence": 0.9, "explanation": "x"})
+    classifier = LLMIntentClassifier(
+        provider=provider,
+        cascade_settings={"enabled": True, "tiers": [{"type": "embedding", "margin": 0.15, "min_similarity": 0.6}]},
+    )
+
+    result = classifier.classify_intent("What medications is she taking right now?", "anamnesis")
+    assert (result["intent_id"], result["tier"]) == ("meds_current_known", "embedding")
+    provider.generate.assert_not_called()
+
+    result = classifier.classify_intent("Has she been feverish or shivering?", "anamnesis")
+    assert result["tier"] == PRIMARY
+    assert classifier.cascade.stats()["tiers"]["embedding"]["escalations"][NO_ANSWER] == 1
+
+
+def test_index_is_rebuilt_when_intent_categories_change():
+    classifier = Mock(intent_categories=CATEGORIES)
+    tier = EmbeddingTier(classifier, HashingEmbedder())
+    query = IntentQuery(doctor_input="Any allergies?", context=None, valid_intents=None, prompt="")
+    assert tier.classify(query) is None
+
+    classifier.intent_categories = {**CATEGORIES, "allergies": {"examples": ["Any allergies?", "Allergic to anything?"]}}
+    assert tier.classify(query)["intent_id"] == "allergies"
+
+
+def test_ollama_embedder_batches_through_the_provider():
+    provider = OllamaProvider("http://ollama:11434", "gemma")
+    provider.transport = Mock()
+    provider.transport.post.return_value.json.return_value = {"embeddings": [[3.0, 4.0], [0.0, 2.0]]}
+
+    vectors = OllamaEmbedder(provider, "nomic-embed-text").embed(["a", "b"])
+
+    assert vectors.tolist() == [[pytest.approx(0.6), pytest.approx(0.8)], [0.0, 1.0]]
+    url, = provider.transport.post.call_args.args
+    assert url == "http://ollama:11434/api/embed"
+    assert provider.transport.post.call_args.kwargs["json"] == {"model": "nomic-embed-text", "input": ["a", "b"]}
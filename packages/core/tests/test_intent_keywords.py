@@ -0,0 +1,42 @@
+"""
+Tests for the compiled keyword rules of the fallback intent classifiers.
+"""
+
+from unittest.mock import Mock
+
+from smartdoc_core.intent.classifier import LLMIntentClassifier
+from smartdoc_core.intent.keywords import KeywordMatcher, KeywordRule
+
+RULES = [
+    KeywordRule("meds_ra_specific_initial_query", ("arthritis", "ra medications")),
+    KeywordRule("meds_current_known", ("medications", "meds")),
+    KeywordRule("general_greeting", ("hi",)),
+]
+
+
+def test_first_rule_in_table_order_wins_regardless_of_position():
+    matcher = KeywordMatcher(RULES)
+
+    assert matcher.match("which medications for her arthritis").intent_id == "meds_ra_specific_initial_query"
+    # "ra medications" overlaps "medications"; both are seen
+    assert matcher.match("any ra medications").intent_id == "meds_ra_specific_initial_query"
+    assert matcher.match("what is this?").intent_id == "general_greeting"  # Substring semantics
+    assert matcher.match("vitals please") is None
+    assert KeywordMatcher([]).match("anything") is None
+
+
+def test_context_fallback_keeps_its_decisions():
+    classifier = LLMIntentClassifier(provider=Mock())
+    anamnesis = classifier._valid_intents_for_context("anamnesis")
+
+    def intent(text, context=None, valid=anamnesis):
+        if context is None:
+            return classifier._fallback_classification(text, "down")["intent_id"]
+        return classifier._fallback_classification_with_context(text, context, valid, "down")["intent_id"]
+
+    assert intent("How old is she?") == "profile_age"
+    assert intent("Is she on anything for RA?", "anamnesis") == "meds_ra_specific_initial_query"
+    assert intent("Check her heart", "exam", classifier._valid_intents_for_context("exam")) == "exam_cardiovascular"
+    # Matched intent not valid in the context: clarification, then the common greeting rule
+    assert intent("Hello, how old are you?", "anamnesis", {"general_greeting", "clarification"}) == "general_greeting"
+    assert intent("Hmm", "labs", {"labs_general"}) == "labs_general"
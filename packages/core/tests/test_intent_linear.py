@@ -0,0 +1,113 @@
+"""
+Tests for the locally trained linear intent model and its cascade tier.
+"""
+
+import json
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from smartdoc_core.intent.cascade import CACHED, FALLBACK, NO_ANSWER, PRIMARY
+from smartdoc_core.intent.classifier import LLMIntentClassifier
+from smartdoc_core.intent.linear import (
+    LabelledExample,
+    LinearIntentModel,
+    history_examples,
+    train_linear_model,
+    training_examples,
+)
+
+CATEGORIES = {
+    "meds_current_known": {"examples": ["What medications is she taking?", "Any medications?"]},
+    "hpi_fever": {"examples": ["Does she have a fever?", "Any fever?"]},
+    "exam_vital": {"examples": ["What are her vital signs?", "Blood pressure?"]},
+}
+
+
+def _meta(intent_id, confidence, tier=PRIMARY):
+    return json.dumps({"intent_id": intent_id, "intent_confidence": confidence, "intent_tier": tier})
+
+
+def test_history_labels_are_filtered_and_merged_without_duplicates():
+    rows = [
+        ("Is she on any meds?", _meta("meds_current_known", 0.95)),
+        ("hmm", _meta("hpi_fever", 0.6)),
+        ("Fever?", _meta("hpi_fever", 0.99, tier=FALLBACK)),
+        ("Fever at all?", _meta("hpi_fever", 0.99, tier="linear")),  # The model's own answer
+        ("Temperature?", json.dumps({"intent_id": "hpi_fever", "intent_confidence": 0.99})),  # No tier stored
+        ("Any rash?", _meta("derm_rash", 0.99)),  # Unknown intent
+        ("Any fever?", "not json"),
+        ("", _meta("hpi_fever", 0.99)),
+        ("any FEVER", _meta("hpi_fever", 0.97, tier=CACHED)),  # Same as an example once normalized
+    ]
+    history = history_examples(rows, CATEGORIES, min_confidence=0.9)
+    assert [(e.text, e.source) for e in history] == [("Is she on any meds?", "history"), ("any FEVER", "history")]
+
+    examples = training_examples(CATEGORIES, history)
+    assert len(examples) == 7 and examples[-1] == LabelledExample("Is she on any meds?", "meds_current_known", "history")
+
+
+def test_trained_model_predicts_valid_intents_and_round_trips(tmp_path):
+    model = train_linear_model(training_examples(CATEGORIES), n_features=1 << 12, epochs=60)
+
+    assert model.predict("which medications is she taking")[0][0] == "meds_current_known"
+    ranked = model.predict("any fever", valid_intents={"hpi_fever", "exam_vital", "labs_bnp"})
+    assert [intent for intent, _ in ranked][0] == "hpi_fever" and len(ranked) == 2
+    assert sum(p for _, p in ranked) == pytest.approx(1.0)
+    assert model.metadata["examples"] == {"examples": 6} and model.metadata["train_accuracy"] == 1.0
+
+    path = str(tmp_path / f"intent-linear-{model.version}.npz")
+    model.save(path)
+    loaded = LinearIntentModel.load(path)
+    assert loaded.version == model.version and loaded.intent_ids == model.intent_ids
+    assert np.allclose([p for _, p in loaded.predict("any fever")], [p for _, p in model.predict("any fever")])
+
+    loaded.metadata["format"] = 0
+    np.savez(path, weights=loaded.weights, bias=loaded.bias, intent_ids=np.asarray(loaded.intent_ids),
+             metadata=np.asarray(json.dumps(loaded.metadata)))
+    with pytest.raises(ValueError):
+        LinearIntentModel.load(path)
+
+
+def _linear_classifier(categories, artifact):
+    provider = Mock()
+    provider.generate.return_value = json.dumps({"intent_id": "hpi_fever", "confidence": 0.9, "explanation": "x"})
+    settings = {"enabled": True, "default_threshold": 0.5, "tiers": [{"type": "linear", "artifact": artifact}]}
+    return LLMIntentClassifier(provider=provider, intent_categories=categories, cascade_settings=settings), provider
+
+
+def test_linear_tier_answers_first_and_escalates_without_a_model(tmp_path):
+    categories = {**CATEGORIES, "clarification": {"examples": []}}
+    intent_set = _linear_classifier(categories, str(tmp_path / "missing"))[0].intent_set_id
+    model = train_linear_model(
+        training_examples(categories), n_features=1 << 12, epochs=60, metadata={"intent_set": intent_set}
+    )
+    model.save(str(tmp_path / "models" / f"intent-linear-{model.version}.npz"))
+
+    trained, provider = _linear_classifier(categories, str(tmp_path / "models"))
+    result = trained.classify_intent("What medications is she taking?", "anamnesis")
+    assert (result["intent_id"], result["tier"]) == ("meds_current_known", "linear")
+    provider.generate.assert_not_called()
+
+    untrained, provider = _linear_classifier(categories, str(tmp_path / "missing"))
+    assert untrained.classify_intent("Any fever?", "anamnesis")["tier"] == PRIMARY
+    assert untrained.cascade.stats()["tiers"]["linear"]["escalations"][NO_ANSWER] == 1
+
+
+def test_linear_tier_only_answers_for_the_intent_set_it_was_trained_on(tmp_path):
+    model = train_linear_model(training_examples(CATEGORIES), n_features=1 << 12, epochs=60, metadata={"intent_set": "old"})
+    model.save(str(tmp_path / f"intent-linear-{model.version}.npz"))
+
+    classifier, _ = _linear_classifier(CATEGORIES, str(tmp_path))
+    tier = classifier.cascade.tiers[0]
+    assert tier.model is None  # Trained for another intent set: not loaded
+
+    model.metadata["intent_set"] = classifier.intent_set_id
+    model.save(str(tmp_path / f"intent-linear-{model.version}.npz"))
+    assert tier.reload() is not None
+    assert classifier.classify_intent("What medications is she taking?", "anamnesis")["tier"] == "linear"
+
+    # Intents changed after loading: the model escalates until retrained
+    classifier.intent_categories = {**CATEGORIES, "hpi_rash": {"examples": ["Any rash?"]}}
+    assert classifier.classify_intent("What medications is she taking?", "anamnesis")["tier"] == PRIMARY
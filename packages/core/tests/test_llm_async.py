@@ -0,0 +1,107 @@
+"""
+Tests for the async provider contract (agenerate) and the sync shim.
+"""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from smartdoc_core.llm.providers.aio import AsyncLLMProvider, run_sync
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.ollama import OllamaProvider
+
+
+class BlockingProvider(LLMProvider):
+    """Provider that only implements the blocking interface."""
+
+    def __init__(self):
+        self.threads = []
+
+    def generate(self, prompt, *, temperature=0.1, top_p=0.9, timeout_s=60):
+        self.threads.append(threading.current_thread().name)
+        return f"{prompt}:{temperature}"
+
+
+class EchoAsyncProvider(AsyncLLMProvider):
+    """Provider that only implements the async interface."""
+
+    def __init__(self):
+        self.closed = False
+
+    async def agenerate(self, prompt, *, temperature=0.1, top_p=0.9, timeout_s=60, **kwargs):
+        await asyncio.sleep(0)
+        return prompt.upper()
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_default_agenerate_offloads_blocking_generate():
+    provider = BlockingProvider()
+
+    async def main():
+        return await asyncio.gather(*(provider.agenerate(f"p{i}", temperature=0.5) for i in range(5)))
+
+    results = asyncio.run(main())
+
+    assert results == [f"p{i}:0.5" for i in range(5)]
+    assert threading.main_thread().name not in provider.threads
+
+
+def test_sync_shim_drives_async_provider():
+    provider = EchoAsyncProvider()
+
+    assert provider.generate("hello") == "HELLO"
+
+
+def test_sync_shim_works_inside_running_loop():
+    provider = EchoAsyncProvider()
+
+    async def main():
+        # Legacy sync code called from within a coroutine must not deadlock
+        return provider.generate("nested")
+
+    assert asyncio.run(main()) == "NESTED"
+
+
+def test_run_sync_timeout():
+    async def slow():
+        await asyncio.sleep(5)
+
+    with pytest.raises(TimeoutError):
+        run_sync(slow(), timeout=0.05)
+
+
+def test_async_context_manager_closes_provider():
+    provider = EchoAsyncProvider()
+
+    async def main():
+        async with provider as p:
+            return await p.agenerate("x")
+
+    assert asyncio.run(main()) == "X"
+    assert provider.closed
+
+
+def test_ollama_agenerate_uses_async_client():
+    httpx = pytest.importorskip("httpx")
+    seen = {}
+
+    def handler(request):
+        seen["url"] = str(request.url)
+        seen["body"] = request.content
+        return httpx.Response(200, json={"response": "async ok"})
+
+    async def main():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch("smartdoc_core.llm.providers.ollama.get_async_client", return_value=client):
+            async with OllamaProvider("http://ollama:11434", "gemma") as provider:
+                text = await provider.agenerate("Hi", temperature=0.2)
+        await client.aclose()
+        return text
+
+    assert asyncio.run(main()) == "async ok"
+    assert seen["url"] == "http://ollama:11434/api/generate"
+    assert b'"model":"gemma"' in seen["body"].replace(b" ", b"")
@@ -0,0 +1,108 @@
+"""
+Tests for batched generation (generate_many, classify_many) with bounded concurrency.
+"""
+
+import json
+import threading
+import time
+from unittest.mock import Mock
+
+from smartdoc_core.intent.classifier import LLMIntentClassifier
+from smartdoc_core.llm.context import current_call, llm_call
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.utils.exceptions import LLMTimeoutError
+
+
+class TrackingProvider(LLMProvider):
+    """Provider recording concurrency and failing on request."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.call_sites = []
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, *, temperature=0.1, top_p=0.9, timeout_s=60, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.call_sites.append(current_call().call_site)
+        try:
+            if prompt == "slow":
+                time.sleep(1)
+            time.sleep(self.delay)
+            if prompt == "boom":
+                raise ValueError("bad prompt")
+            return f"{prompt}@{temperature}"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_results_in_input_order_with_partial_failures():
+    provider = TrackingProvider()
+
+    results = provider.generate_many(["a", "boom", "c"], max_concurrency=3)
+
+    assert [r.index for r in results] == [0, 1, 2]
+    assert results[0].text == "a@0.1"
+    assert not results[1].ok and isinstance(results[1].error, ValueError)
+    assert results[2].text == "c@0.1"
+
+
+def test_concurrency_is_bounded_and_saturated():
+    provider = TrackingProvider(delay=0.05)
+
+    provider.generate_many([f"p{i}" for i in range(12)], max_concurrency=3)
+
+    assert provider.peak == 3
+
+
+def test_per_item_timeout_keeps_other_results():
+    provider = TrackingProvider(delay=0)
+
+    results = provider.generate_many(["slow", "fast"], per_item_timeout=0.2)
+
+    assert isinstance(results[0].error, LLMTimeoutError)
+    assert results[1].text == "fast@0.1"
+
+
+def test_item_options_override_shared_options():
+    provider = TrackingProvider(delay=0)
+
+    results = provider.generate_many(
+        ["q", "q"], temperature=0.1, item_options=[{}, {"temperature": 0.5}]
+    )
+
+    assert [r.text for r in results] == ["q@0.1", "q@0.5"]
+
+
+def test_call_context_reaches_batch_items():
+    provider = TrackingProvider(delay=0)
+
+    with llm_call(call_site="evaluator"):
+        provider.generate_many(["a", "b"])
+
+    assert provider.call_sites == ["evaluator", "evaluator"]
+
+
+def _intent_answer(intent_id):
+    return json.dumps({"intent_id": intent_id, "confidence": 0.9, "explanation": "x"})
+
+
+def test_classify_many_runs_concurrently_and_keeps_input_order():
+    provider = Mock(model="gemma", max_parallel=3)
+    classifier = LLMIntentClassifier(provider=provider)
+    barrier = threading.Barrier(3, timeout=5)  # Only passes if three calls are in flight
+
+    def generate(prompt, **kwargs):
+        barrier.wait()
+        return _intent_answer("meds_current_known" if "Current meds?" in prompt else "hpi_fever")
+
+    provider.generate.side_effect = generate
+    results = classifier.classify_many(["Any fever?", "Current meds?", "Fever at night?"], "anamnesis")
+
+    assert [r["intent_id"] for r in results] == ["hpi_fever", "meds_current_known", "hpi_fever"]
+    assert [r["original_input"] for r in results] == ["Any fever?", "Current meds?", "Fever at night?"]
+    assert classifier.classify_many([], "anamnesis") == []
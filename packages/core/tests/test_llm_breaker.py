@@ -0,0 +1,189 @@
+"""
+Tests for the shared LLM circuit breaker.
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from smartdoc_core.intent.classifier import LLMIntentClassifier
+from smartdoc_core.llm.context import EVALUATOR, llm_call
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreakerProvider
+from smartdoc_core.simulation.responders.anamnesis_son import AnamnesisSonResponder
+from smartdoc_core.utils.exceptions import CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ScriptedProvider(LLMProvider):
+    """Provider that fails while ``down`` is set and takes ``latency`` fake seconds."""
+
+    def __init__(self, clock):
+        self.model = "gemma3:4b"
+        self.clock = clock
+        self.down = False
+        self.latency = 0.0
+        self.calls = 0
+
+    def generate(self, prompt, **kwargs):
+        self.calls += 1
+        self.clock.now += self.latency
+        if self.down:
+            raise ConnectionError("connection refused")
+        return "ok"
+
+    def generate_stream(self, prompt, **kwargs):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("connection refused")
+        yield "o"
+        yield "k"
+
+
+def _breaker(**kwargs):
+    clock = FakeClock()
+    inner = ScriptedProvider(clock)
+    options = dict(window_s=60, min_calls=4, error_rate=0.5, slow_call_s=10, slow_rate=0.75, open_s=30)
+    options.update(kwargs)
+    return CircuitBreakerProvider(inner, clock=clock, **options), inner, clock
+
+
+def _fail(breaker, times):
+    for _ in range(times):
+        with pytest.raises(ConnectionError):
+            breaker.generate("x")
+
+
+def test_opens_on_error_rate_and_fails_fast():
+    breaker, inner, _ = _breaker()
+    breaker.generate("x")
+    breaker.generate("x")
+    inner.down = True
+    _fail(breaker, 1)
+    assert breaker.state == CLOSED  # 1/3 failed, below min_calls anyway
+    _fail(breaker, 1)
+    assert breaker.state == OPEN  # 2/4 failed
+
+    calls = inner.calls
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.generate("x")
+    assert inner.calls == calls
+    assert excinfo.value.retry_after_s == pytest.approx(30)
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_old_outcomes_leave_the_window():
+    breaker, inner, clock = _breaker()
+    inner.down = True
+    _fail(breaker, 3)
+    clock.now += 61
+    inner.down = False
+    breaker.generate("x")
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_calls"] == 1
+
+
+def test_opens_on_slow_calls_with_per_call_site_threshold():
+    breaker, inner, _ = _breaker(window_s=1000, slow_rate=0.5, slow_call_sites={EVALUATOR: 100})
+    inner.latency = 20
+
+    with llm_call(call_site=EVALUATOR):
+        for _ in range(4):
+            breaker.generate("x")  # Not slow for the evaluator
+    for _ in range(3):
+        breaker.generate("x")
+    assert breaker.state == CLOSED  # 3 slow of 7
+
+    breaker.generate("x")
+    assert breaker.state == OPEN  # 4 slow of 8
+
+
+def test_single_half_open_probe_closes_on_success():
+    breaker, inner, clock = _breaker()
+    inner.down = True
+    _fail(breaker, 4)
+    assert breaker.state == OPEN
+
+    clock.now += 31
+    inner.down = False
+    inner.latency = 1
+    results = []
+
+    def slow_probe(prompt, **kwargs):
+        # A concurrent call while the probe is in flight fails fast
+        with pytest.raises(CircuitOpenError):
+            breaker.generate("other")
+        results.append(breaker.state)
+        return "ok"
+
+    inner.generate = slow_probe
+    assert breaker.generate("probe") == "ok"
+    assert results == [HALF_OPEN]
+    assert breaker.state == CLOSED
+    assert breaker.stats()["probes"] == 1
+
+
+def test_failed_probe_reopens():
+    breaker, inner, clock = _breaker()
+    inner.down = True
+    _fail(breaker, 4)
+    clock.now += 31
+    _fail(breaker, 1)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.generate("x")
+    assert breaker.stats()["opened"] == 2
+
+
+def test_stream_and_async_calls_count():
+    breaker, inner, _ = _breaker(min_calls=2)
+    assert "".join(breaker.generate_stream("x")) == "ok"
+    inner.down = True
+    with pytest.raises(ConnectionError):
+        list(breaker.generate_stream("x"))
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(breaker.agenerate("x"))
+
+
+def test_cancelled_probe_releases_the_slot():
+    breaker, inner, clock = _breaker()
+    inner.down = True
+    _fail(breaker, 4)
+    clock.now += 31
+    inner.generate = Mock(side_effect=KeyboardInterrupt)
+
+    with pytest.raises(KeyboardInterrupt):
+        breaker.generate("probe")
+    assert breaker.state == HALF_OPEN
+
+    inner.generate = Mock(return_value="ok")
+    assert breaker.generate("probe") == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_callers_use_their_fallbacks_when_open():
+    provider = Mock(spec=LLMProvider)
+    provider.model = "gemma3:4b"
+    provider.generate_structured.side_effect = CircuitOpenError("open", retry_after_s=5)
+    provider.generate.side_effect = CircuitOpenError("open", retry_after_s=5)
+    provider.generate_stream.side_effect = CircuitOpenError("open", retry_after_s=5)
+
+    classifier = LLMIntentClassifier(provider=provider)
+    result = classifier.classify_intent("What medications is she taking?", "anamnesis")
+    assert "circuit_breaker_open" in result["explanation"]
+
+    responder = AnamnesisSonResponder(provider)
+    kwargs = dict(intent_id="meds_current_known", doctor_question="Meds?", clinical_data=[], context="anamnesis")
+    assert responder.respond(**kwargs) == responder._fallback()
+    assert list(responder.respond_stream(**kwargs)) == [responder._fallback()]
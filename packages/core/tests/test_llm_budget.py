@@ -0,0 +1,103 @@
+"""
+Tests for per-call-site output budgets, stop sequences and truncation metrics.
+"""
+
+from unittest.mock import Mock
+
+from smartdoc_core.clinical.evaluator import ClinicalEvaluator
+from smartdoc_core.llm.context import EVALUATOR, INTENT, SON_PERSONA, llm_call
+from smartdoc_core.llm.metrics import CallMetrics, MetricsRegistry, collect_llm_calls, get_metrics_registry
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.budget import OutputBudget, OutputBudgetProvider
+from smartdoc_core.llm.providers.ollama import OllamaProvider
+from smartdoc_core.llm.providers.routing import ProfileRouter, RouteProfile, RoutingProvider
+
+
+class RecordingProvider(LLMProvider):
+    def __init__(self):
+        self.model = "gemma"
+        self.calls = []
+
+    def generate(self, prompt, **kwargs):
+        self.calls.append(kwargs)
+        return "ok"
+
+
+BUDGETS = {
+    INTENT: OutputBudget(max_tokens=160),
+    SON_PERSONA: OutputBudget.from_config({"max_tokens": 200, "stop": ["\nThe doctor just asked:"]}),
+}
+
+
+def test_applies_the_call_site_budget_as_defaults():
+    inner = RecordingProvider()
+    provider = OutputBudgetProvider(inner, BUDGETS, registry=MetricsRegistry())
+
+    with llm_call(call_site=INTENT):
+        provider.generate("q")
+        provider.generate("q", max_tokens=1)  # e.g. warm-up
+    with llm_call(call_site=SON_PERSONA):
+        list(provider.generate_stream("q"))
+    provider.generate("q")  # No budget for the default call site
+
+    assert inner.calls[0] == {"max_tokens": 160}
+    assert inner.calls[1] == {"max_tokens": 1}
+    assert inner.calls[2]["stop"] == ["\nThe doctor just asked:"] and inner.calls[2]["max_tokens"] == 200
+    assert inner.calls[3] == {}
+
+
+def test_routed_profile_max_tokens_takes_precedence():
+    inner = RecordingProvider()
+    router = ProfileRouter(lambda: {INTENT: RouteProfile(name="fast", model="tiny", max_tokens=64)})
+    provider = RoutingProvider(OutputBudgetProvider(inner, BUDGETS, registry=MetricsRegistry()), router)
+
+    with llm_call(call_site=INTENT):
+        provider.generate("q")
+    assert inner.calls[0] == {"model": "tiny", "max_tokens": 64}
+
+
+def test_ollama_payload_carries_budget_and_truncation_is_counted():
+    provider = OllamaProvider("http://ollama:11434", "gemma")
+    provider.transport = Mock()
+    provider.transport.post.return_value.json.return_value = {
+        "response": '{"intent_id": "meds', "done": True, "done_reason": "length", "eval_count": 160,
+    }
+    get_metrics_registry().reset()
+
+    with llm_call(call_site=INTENT), collect_llm_calls() as calls:
+        provider.generate("q", max_tokens=160, stop=["\n\n"])
+        provider.generate("q")
+
+    options = provider.transport.post.call_args_list[0].kwargs["json"]["options"]
+    assert options["num_predict"] == 160 and options["stop"] == ["\n\n"]
+    assert [(c.max_tokens, c.truncated) for c in calls] == [(160, True), (None, False)]
+
+    get_metrics_registry().record(CallMetrics.from_ollama({"done_reason": "stop"}, "gemma", 0.1, max_tokens=160))
+    snapshot = get_metrics_registry().snapshot()
+    get_metrics_registry().reset()
+    site = snapshot["by_call_site"]["default"]
+    assert (site["budgeted_calls"], site["truncated"]) == (1, 0)
+    assert snapshot["by_call_site"][INTENT]["truncation_rate"] == 1.0  # Unbudgeted calls not in the rate
+    assert snapshot["totals"]["truncated"] == 1 and snapshot["totals"]["truncation_rate"] == 0.5
+
+
+def test_budget_stats_report_truncation_per_site():
+    registry = MetricsRegistry()
+    with llm_call(call_site=INTENT):
+        registry.record(CallMetrics.from_ollama({"done_reason": "length"}, "gemma", 0.1, max_tokens=160))
+    provider = OutputBudgetProvider(RecordingProvider(), BUDGETS, registry=registry)
+
+    stats = provider.stats()
+    assert stats[INTENT] == {
+        "max_tokens": 160, "stop": [], "budgeted_calls": 1, "truncated": 1, "truncation_rate": 1.0,
+    }
+    assert stats[SON_PERSONA]["truncated"] == 0
+
+
+def test_evaluator_extracts_json_when_stopped_at_the_end_marker():
+    evaluator = ClinicalEvaluator(provider=Mock(), enable_validation=False)
+    with llm_call(call_site=EVALUATOR):
+        parsed, ok = evaluator._extract_json_robust(
+            f'Sure.\n{evaluator.json_start}\n{{"score": 80, "note": "has {{braces}}"}}\n'
+        )
+    assert ok and parsed == {"score": 80, "note": "has {braces}"}
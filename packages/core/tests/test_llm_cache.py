@@ -0,0 +1,158 @@
+"""
+Tests for the content-addressed LLM response cache.
+"""
+
+import contextvars
+import time
+
+import pytest
+
+from smartdoc_core.llm.context import CLARIFICATION, SON_PERSONA, current_call, llm_call
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.cache import CachingProvider
+
+
+class CountingProvider(LLMProvider):
+    """Provider that returns a new answer on every call."""
+
+    model = "test-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, *, temperature=0.1, top_p=0.9, timeout_s=60, **kwargs):
+        self.calls += 1
+        return f"answer {self.calls} to {prompt}"
+
+
+@pytest.fixture
+def inner():
+    return CountingProvider()
+
+
+def test_low_temperature_calls_hit_ollama_once(inner):
+    cache = CachingProvider(inner)
+
+    first = cache.generate("What brings her in?", temperature=0.1)
+    second = cache.generate("What brings her in?", temperature=0.1)
+
+    assert first == second
+    assert inner.calls == 1
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_key_covers_model_and_sampling_parameters(inner):
+    cache = CachingProvider(inner)
+
+    cache.generate("q", temperature=0.1, top_p=0.9)
+    cache.generate("q", temperature=0.2, top_p=0.9)
+    cache.generate("q", temperature=0.1, top_p=0.8)
+    inner.model = "other-model"
+    cache.generate("q", temperature=0.1, top_p=0.9)
+
+    assert inner.calls == 4
+
+
+def test_high_temperature_is_not_cached_by_default(inner):
+    cache = CachingProvider(inner, max_temperature=0.3)
+
+    cache.generate("creative", temperature=0.8)
+    cache.generate("creative", temperature=0.8)
+
+    assert inner.calls == 2
+    assert cache.stats()["bypassed"] == 2
+
+
+def test_call_site_opt_out_and_context_override(inner):
+    cache = CachingProvider(inner, call_sites={SON_PERSONA: False})
+
+    with llm_call(call_site=SON_PERSONA):
+        cache.generate("hi")
+        cache.generate("hi")
+    assert inner.calls == 2
+
+    with llm_call(call_site=CLARIFICATION, cache=False):
+        cache.generate("unclear")
+        cache.generate("unclear")
+    assert inner.calls == 4
+
+    stats = cache.stats()
+    assert stats["by_call_site"][SON_PERSONA]["bypassed"] == 2
+
+
+def test_generator_resumed_in_another_context_keeps_the_outer_context():
+    def reply():
+        with llm_call(call_site=CLARIFICATION):
+            yield
+
+    with llm_call(session_id="s1", cache=False):
+        stream = reply()
+        contextvars.copy_context().run(next, stream)  # Started in a copied context
+        stream.close()  # Its llm_call exits here, where its token is foreign
+
+        assert (current_call().session_id, current_call().cache) == ("s1", False)
+
+
+def test_ttl_expiry(inner):
+    cache = CachingProvider(inner, ttl_s=0.01)
+
+    cache.generate("q")
+    time.sleep(0.02)
+    cache.generate("q")
+
+    assert inner.calls == 2
+
+
+def test_memory_lru_eviction(inner):
+    cache = CachingProvider(inner, max_entries=2)
+
+    for prompt in ("a", "b", "c"):
+        cache.generate(prompt)
+    cache.generate("a")  # evicted, regenerated
+
+    assert inner.calls == 4
+    assert cache.stats()["memory_evictions"] >= 1
+
+
+def test_sqlite_tier_survives_restart(inner, tmp_path):
+    db = str(tmp_path / "llm_cache.sqlite3")
+    CachingProvider(inner, db_path=db).generate("persist me")
+
+    restarted = CachingProvider(inner, db_path=db)
+    assert restarted.generate("persist me") == "answer 1 to persist me"
+    assert inner.calls == 1
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_sqlite_tier_size_eviction(inner, tmp_path):
+    db = str(tmp_path / "llm_cache.sqlite3")
+    cache = CachingProvider(inner, db_path=db, max_entries=0, max_db_entries=2)
+
+    for prompt in ("a", "b", "c"):
+        cache.generate(prompt)
+
+    assert cache.stats()["disk_evictions"] == 1
+    cache.generate("a")
+    assert inner.calls == 4
+
+
+def test_read_does_not_create_database(inner, tmp_path):
+    db = tmp_path / "missing" / "llm_cache.sqlite3"
+    cache = CachingProvider(inner, db_path=str(db), max_entries=0)
+
+    cache._lookup(cache.cache_key("q"))
+
+    assert not db.exists()
+
+
+def test_stream_is_cached_once_complete(inner):
+    cache = CachingProvider(inner)
+
+    streamed = "".join(cache.generate_stream("stream me"))
+    again = cache.generate("stream me")
+
+    assert streamed == again
+    assert inner.calls == 1
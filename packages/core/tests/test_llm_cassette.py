@@ -0,0 +1,169 @@
+"""
+Tests for record/replay cassette providers.
+"""
+
+import asyncio
+import json
+import os
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from smartdoc_core.llm.context import INTENT, llm_call
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.cassette import RecordingProvider, ReplayProvider
+from smartdoc_core.simulation.engine import IntentDrivenDisclosureManager
+from smartdoc_core.utils.exceptions import CassetteMissError, NLGError
+
+CASE_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "data", "raw", "cases", "intent_driven_case.json"
+)
+
+
+class ScriptedProvider(LLMProvider):
+    """Provider answering with a counter so repeated prompts differ."""
+
+    def __init__(self, delay=0.0):
+        self.model = "gemma3:4b"
+        self.delay = delay
+        self.calls = 0
+
+    def generate(self, prompt, *, temperature=0.1, top_p=0.9, timeout_s=60, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if prompt == "boom":
+            raise RuntimeError("upstream down")
+        return f"{prompt}#{self.calls}"
+
+    def generate_stream(self, prompt, **kwargs):
+        for chunk in ("Hel", "lo"):
+            time.sleep(self.delay)
+            yield chunk
+
+
+def test_round_trip_in_recorded_order(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    recorder = RecordingProvider(ScriptedProvider(), path)
+    with llm_call(call_site=INTENT, session_id="s1"):
+        recorded = [recorder.generate("a"), recorder.generate("a"), recorder.generate("b", temperature=0.5)]
+    recorder.close()
+
+    replay = ReplayProvider(path)
+    assert replay.model == "gemma3:4b"
+    assert [replay.generate("a"), replay.generate("a"), replay.generate("b", temperature=0.5)] == recorded
+    assert replay.generate("a") == recorded[0]  # Cycles once exhausted
+
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[0]["cassette"] == 1
+    assert lines[1]["call_site"] == INTENT and lines[1]["session_id"] == "s1"
+    assert "prompt" not in lines[1]
+
+
+def test_gzip_cassette_and_async_replay(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    recorder = RecordingProvider(ScriptedProvider(), path, store_prompts=True)
+    text = recorder.generate("hello")
+    recorder.close()
+
+    replay = ReplayProvider(path)
+    assert asyncio.run(replay.agenerate("hello")) == text
+
+
+def test_cassette_of_a_killed_recorder_replays_its_complete_records(tmp_path):
+    path = str(tmp_path / "killed.jsonl.gz")
+    # Never closed, as when the worker is killed: no gzip end marker
+    recorder = RecordingProvider(ScriptedProvider(), path)
+    recorder.generate("a")
+    recorder.generate("b")
+
+    replay = ReplayProvider(path)
+    assert [replay.generate("a"), replay.generate("b")] == ["a#1", "b#2"]
+    recorder.close()
+
+    plain = tmp_path / "cut.jsonl"
+    recorder = RecordingProvider(ScriptedProvider(), str(plain))
+    recorder.generate("a")
+    recorder.close()
+    with open(plain, "a") as f:
+        f.write('{"key": "half-writ')  # Killed mid-line
+    assert ReplayProvider(str(plain)).generate("a") == "a#1"
+
+
+def test_miss_raises_or_uses_fallback(tmp_path):
+    path = str(tmp_path / "c.jsonl")
+    recorder = RecordingProvider(ScriptedProvider(), path)
+    recorder.generate("known")
+    recorder.close()
+
+    with pytest.raises(CassetteMissError):
+        ReplayProvider(path).generate("unknown")
+
+    fallback = Mock()
+    fallback.generate.return_value = "live"
+    replay = ReplayProvider(path, fallback=fallback)
+    assert replay.generate("unknown") == "live"
+    assert replay.stats()["misses"] == 1
+
+
+def test_recorded_errors_are_replayed(tmp_path):
+    path = str(tmp_path / "c.jsonl")
+    recorder = RecordingProvider(ScriptedProvider(), path)
+    with pytest.raises(RuntimeError):
+        recorder.generate("boom")
+    recorder.close()
+
+    with pytest.raises(NLGError, match="upstream down"):
+        ReplayProvider(path).generate("boom")
+
+
+def test_reproduces_recorded_latency(tmp_path):
+    path = str(tmp_path / "c.jsonl")
+    recorder = RecordingProvider(ScriptedProvider(delay=0.1), path)
+    recorder.generate("slow")
+    assert "".join(recorder.generate_stream("stream")) == "Hello"
+    recorder.close()
+
+    fast = ReplayProvider(path)
+    started = time.perf_counter()
+    fast.generate("slow")
+    assert time.perf_counter() - started < 0.05
+
+    timed = ReplayProvider(path, reproduce_latency=True)
+    started = time.perf_counter()
+    timed.generate("slow")
+    assert time.perf_counter() - started >= 0.09
+
+    started = time.perf_counter()
+    assert list(timed.generate_stream("stream")) == ["Hel", "lo"]
+    assert time.perf_counter() - started >= 0.18
+
+    halved = ReplayProvider(path, reproduce_latency=True, latency_scale=0.5)
+    started = time.perf_counter()
+    halved.generate("slow")
+    assert time.perf_counter() - started < 0.09
+
+
+def test_engine_session_replays_identically(tmp_path):
+    path = str(tmp_path / "engine.jsonl")
+    classifier = Mock()
+    classifier.classify_intent.return_value = {
+        "intent_id": "hpi_chief_complaint",
+        "confidence": 0.9,
+        "original_input": "What brings her in?",
+    }
+
+    recorder = RecordingProvider(ScriptedProvider(), path)
+    live = IntentDrivenDisclosureManager(
+        case_file_path=CASE_FILE, provider=recorder, intent_classifier=classifier, debug=False
+    )
+    expected = live.process_doctor_query("rec", "What brings her in?")
+    recorder.close()
+
+    replayed = IntentDrivenDisclosureManager(
+        case_file_path=CASE_FILE, provider=ReplayProvider(path), intent_classifier=classifier, debug=False
+    )
+    result = replayed.process_doctor_query("rec", "What brings her in?")
+
+    assert result["response"]["text"] == expected["response"]["text"]
@@ -0,0 +1,125 @@
+"""
+Tests for per-session chat history reuse by persona responders.
+"""
+
+from unittest.mock import Mock
+
+from smartdoc_core.llm.chat import ChatHistoryStore
+from smartdoc_core.llm.context import llm_call
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.cassette import RecordingProvider, ReplayProvider
+from smartdoc_core.llm.providers.ollama import OllamaProvider
+from smartdoc_core.simulation.prompts.patient_default import PATIENT_SYSTEM_PROMPT, build_patient_prompt
+from smartdoc_core.simulation.responders import AnamnesisSonResponder
+
+CLINICAL_DATA = [{"label": "Medications", "summary": "Furosemide"}]
+
+
+class ChatProvider(LLMProvider):
+    """Provider recording the chat messages it receives."""
+
+    supports_chat = True
+
+    def __init__(self):
+        self.model = "gemma3:4b"
+        self.calls = []
+
+    def generate(self, prompt, **kwargs):
+        self.calls.append((prompt, kwargs.get("messages")))
+        return f'"Reply {len(self.calls)}"'
+
+    def generate_stream(self, prompt, **kwargs):
+        self.calls.append((prompt, kwargs.get("messages")))
+        yield from ('"Uh, ', "streamed", '"')
+
+
+def _ask(responder, question, stream=False):
+    args = dict(intent_id="meds_current", doctor_question=question, clinical_data=CLINICAL_DATA, context="anamnesis")
+    if stream:
+        return "".join(responder.respond_stream(**args))
+    return responder.respond(**args)
+
+
+def test_ollama_sends_messages_to_chat_endpoint():
+    provider = OllamaProvider("http://ollama:11434", "gemma")
+    provider.transport = Mock()
+    provider.transport.post.return_value.json.return_value = {"message": {"role": "assistant", "content": "Hi"}}
+    messages = [{"role": "system", "content": "Be brief"}, {"role": "user", "content": "Hello"}]
+
+    assert provider.generate("unused", messages=messages) == "Hi"
+    url, = provider.transport.post.call_args.args
+    payload = provider.transport.post.call_args.kwargs["json"]
+    assert url == "http://ollama:11434/api/chat"
+    assert payload["messages"] == messages and "prompt" not in payload
+
+    provider.transport.post.return_value.json.return_value = {"response": "plain"}
+    assert provider.generate("Hello") == "plain"
+    assert provider.transport.post.call_args.args[0] == "http://ollama:11434/api/generate"
+
+
+def test_responder_sends_history_on_later_turns():
+    provider = ChatProvider()
+    responder = AnamnesisSonResponder(provider, history=ChatHistoryStore())
+
+    with llm_call(session_id="s1"):
+        assert _ask(responder, "Any medications?") == "Reply 1"
+        assert _ask(responder, "Since when?", stream=True) == "Uh, streamed"
+        _ask(responder, "Anything else?")
+
+    first, second, third = (messages for _, messages in provider.calls)
+    assert first[0] == {"role": "system", "content": PATIENT_SYSTEM_PROMPT}
+    assert len(first) == 2 and len(second) == 4 and len(third) == 6
+    assert second[:2] == first  # Earlier turns form a stable prefix
+    assert second[2] == {"role": "assistant", "content": "Reply 1"}
+    assert third[4] == {"role": "assistant", "content": "Uh, streamed"}
+    # The flat prompt is still passed for layers that key on it
+    assert provider.calls[0][0] == build_patient_prompt("Any medications?", "- Medications: Furosemide")
+
+
+def test_flat_prompt_without_session_or_chat_support():
+    provider = ChatProvider()
+    responder = AnamnesisSonResponder(provider, history=ChatHistoryStore())
+    _ask(responder, "Any medications?")  # No session in context
+
+    plain = Mock(spec=LLMProvider)
+    plain.supports_chat = False
+    plain.generate.return_value = "ok"
+    with llm_call(session_id="s1"):
+        _ask(AnamnesisSonResponder(plain, history=ChatHistoryStore()), "Any medications?")
+
+    assert provider.calls[0][1] is None
+    assert "messages" not in plain.generate.call_args.kwargs
+
+
+def test_history_trims_in_chunks_and_expires():
+    now = [0.0]
+    store = ChatHistoryStore(max_turns=4, max_sessions=2, idle_ttl_s=100, clock=lambda: now[0])
+    for i in range(4):
+        store.append("s1", f"q{i}", f"a{i}")
+    assert store.turns("s1") == 4
+    store.append("s1", "q4", "a4")
+    assert store.turns("s1") == 2  # Trimmed to half at once, not one turn per call
+    assert store.messages("s1", "sys", "q5")[1]["content"] == "q3"
+
+    store.append("s2", "q", "a")
+    store.append("s3", "q", "a")
+    assert store.turns("s1") == 0  # Least recently used session evicted
+
+    now[0] = 101.0
+    assert store.messages("s2", "sys", "q") == [
+        {"role": "system", "content": "sys"},
+        {"role": "user", "content": "q"},
+    ]
+    assert len(store) == 0
+
+
+def test_replay_keeps_recorded_capabilities(tmp_path):
+    path = str(tmp_path / "chat.jsonl")
+    recorder = RecordingProvider(ChatProvider(), path)
+    messages = [{"role": "user", "content": "Hi"}]
+    text = recorder.generate("Hi", messages=messages)
+    recorder.close()
+
+    replay = ReplayProvider(path)
+    assert replay.supports_chat
+    assert replay.generate("Hi", messages=messages) == text
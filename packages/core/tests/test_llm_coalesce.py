@@ -0,0 +1,118 @@
+"""
+Tests for single-flight coalescing of identical in-flight LLM requests.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.coalesce import CoalescingProvider
+from smartdoc_core.utils.exceptions import LLMTimeoutError
+
+
+class SlowProvider(LLMProvider):
+    """Provider that blocks until released and counts upstream calls."""
+
+    model = "test-model"
+
+    def __init__(self, delay=0.2, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, *, temperature=0.1, top_p=0.9, timeout_s=60, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return f"result for {prompt}"
+
+
+def _run_concurrently(fn, n):
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        futures = [pool.submit(fn) for _ in range(n)]
+        outcomes = []
+        for f in futures:
+            try:
+                outcomes.append(f.result())
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+
+
+def test_identical_concurrent_calls_share_one_upstream_call():
+    inner = SlowProvider()
+    provider = CoalescingProvider(inner)
+
+    results = _run_concurrently(lambda: provider.generate("What brings her in?"), 8)
+
+    assert results == ["result for What brings her in?"] * 8
+    assert inner.calls == 1
+    stats = provider.stats()
+    assert stats["leaders"] == 1
+    assert stats["coalesced"] == 7
+    assert stats["in_flight"] == 0
+
+
+def test_different_requests_are_not_coalesced():
+    inner = SlowProvider(delay=0.05)
+    provider = CoalescingProvider(inner)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        a = pool.submit(provider.generate, "a")
+        b = pool.submit(provider.generate, "b", temperature=0.2)
+        assert {a.result(), b.result()} == {"result for a", "result for b"}
+
+    assert inner.calls == 2
+
+
+def test_upstream_error_reaches_every_caller():
+    inner = SlowProvider(error=ConnectionError("ollama down"))
+    provider = CoalescingProvider(inner)
+
+    outcomes = _run_concurrently(lambda: provider.generate("q"), 4)
+
+    assert all(isinstance(o, ConnectionError) for o in outcomes)
+    assert inner.calls == 1
+
+
+def test_follower_timeout_is_per_caller():
+    inner = SlowProvider(delay=0.3)
+    provider = CoalescingProvider(inner)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(provider.generate, "q", timeout_s=60)
+        time.sleep(0.05)
+        impatient = pool.submit(provider.generate, "q", timeout_s=0.05)
+
+        with pytest.raises(LLMTimeoutError):
+            impatient.result()
+        assert leader.result() == "result for q"
+
+    assert provider.stats()["follower_timeouts"] == 1
+
+
+def test_high_temperature_bypasses_coalescing_when_limited():
+    inner = SlowProvider(delay=0.05)
+    provider = CoalescingProvider(inner, max_temperature=0.3)
+
+    _run_concurrently(lambda: provider.generate("q", temperature=0.9), 3)
+
+    assert inner.calls == 3
+
+
+def test_async_callers_are_coalesced():
+    inner = SlowProvider(delay=0.1)
+    provider = CoalescingProvider(inner)
+
+    async def main():
+        return await asyncio.gather(*(provider.agenerate("async q") for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result for async q"] * 5
+    assert inner.calls == 1
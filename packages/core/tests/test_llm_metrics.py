@@ -0,0 +1,149 @@
+"""
+Tests for per-call LLM token and latency accounting.
+"""
+
+import json
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from smartdoc_core.llm.context import INTENT, SON_PERSONA, llm_call
+from smartdoc_core.llm.metrics import CallMetrics, Histogram, MetricsRegistry, collect_llm_calls, get_metrics_registry
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.ollama import OllamaProvider
+from smartdoc_core.llm.providers.transport import PooledTransport
+from smartdoc_core.simulation.engine import IntentDrivenDisclosureManager
+
+CASE_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "data", "raw", "cases", "intent_driven_case.json"
+)
+
+OLLAMA_DONE = {
+    "model": "gemma3:4b",
+    "response": "Hello",
+    "done": True,
+    "prompt_eval_count": 120,
+    "eval_count": 30,
+    "total_duration": 1_500_000_000,
+    "load_duration": 200_000_000,
+    "prompt_eval_duration": 300_000_000,
+    "eval_duration": 900_000_000,
+}
+
+
+def _response(payload):
+    response = Mock()
+    response.json.return_value = payload
+    response.raise_for_status.return_value = None
+    return response
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    get_metrics_registry().reset()
+    yield
+    get_metrics_registry().reset()
+
+
+def test_ollama_generate_records_tagged_metrics():
+    transport = PooledTransport()
+    provider = OllamaProvider("http://ollama:11434", "gemma3:4b", transport=transport)
+
+    with patch.object(transport.session, "request", return_value=_response(OLLAMA_DONE)):
+        with llm_call(call_site=INTENT, session_id="s1"), collect_llm_calls() as calls:
+            assert provider.generate("Hi") == "Hello"
+
+    [call] = calls
+    assert call.call_site == INTENT and call.session_id == "s1"
+    assert call.prompt_tokens == 120 and call.completion_tokens == 30
+    assert call.load_s == pytest.approx(0.2)
+    assert call.prompt_eval_s == pytest.approx(0.3)
+    assert call.eval_s == pytest.approx(0.9)
+
+    snapshot = get_metrics_registry().snapshot()
+    intent = snapshot["by_call_site"][INTENT]
+    assert intent["calls"] == 1 and intent["completion_tokens"] == 30
+    assert intent["prompt_tokens_hist"]["buckets"]["128"] == 1
+    assert get_metrics_registry().session_totals("s1")["prompt_tokens"] == 120
+
+
+def test_ollama_stream_records_final_chunk():
+    transport = PooledTransport()
+    provider = OllamaProvider("http://ollama:11434", "gemma3:4b", transport=transport)
+    lines = [json.dumps({"response": "Hel", "done": False}), json.dumps({**OLLAMA_DONE, "response": "lo"})]
+    response = _response(None)
+    response.iter_lines.return_value = [line.encode() for line in lines]
+
+    with patch.object(transport.session, "request", return_value=response):
+        with llm_call(call_site=SON_PERSONA), collect_llm_calls() as calls:
+            assert "".join(provider.generate_stream("Hi")) == "Hello"
+
+    assert len(calls) == 1 and calls[0].call_site == SON_PERSONA
+    assert calls[0].completion_tokens == 30
+
+
+def test_errors_are_counted_per_call_site():
+    transport = PooledTransport(max_retries=0)
+    provider = OllamaProvider("http://ollama:11434", "gemma3:4b", transport=transport)
+
+    with patch.object(transport.session, "request", side_effect=requests.ConnectionError("refused")):
+        with llm_call(call_site=INTENT), pytest.raises(requests.ConnectionError):
+            provider.generate("Hi")
+
+    assert get_metrics_registry().snapshot()["by_call_site"][INTENT]["errors"] == 1
+
+
+def test_histogram_quantiles():
+    histogram = Histogram((1, 2, 5))
+    for value in (0.5, 0.7, 1.5, 4, 10):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.quantile(0.5) == 2
+    assert histogram.quantile(0.99) is None  # Falls in the +Inf bucket
+
+
+def test_registry_bounds_tracked_sessions():
+    registry = MetricsRegistry(max_sessions=2)
+    for session in ("a", "b", "c"):
+        registry.record(CallMetrics(call_site=INTENT, session_id=session, model="m", prompt_tokens=1))
+
+    assert registry.session_totals("a") is None
+    assert registry.session_totals("c")["calls"] == 1
+
+
+class MeteredProvider(LLMProvider):
+    """Provider reporting Ollama-style metrics for each call."""
+
+    def generate(self, prompt, **kwargs):
+        get_metrics_registry().record(CallMetrics.from_ollama(OLLAMA_DONE, "gemma3:4b", 1.6))
+        return "My mother can't breathe."
+
+
+def _engine(debug):
+    classifier = Mock()
+    classifier.classify_intent.return_value = {
+        "intent_id": "hpi_chief_complaint",
+        "confidence": 0.9,
+        "original_input": "What brings her in?",
+    }
+    return IntentDrivenDisclosureManager(
+        case_file_path=CASE_FILE, provider=MeteredProvider(), intent_classifier=classifier, debug=debug
+    )
+
+
+def test_process_doctor_query_attaches_metrics_in_debug_mode():
+    result = _engine(debug=True).process_doctor_query("metrics_session", "What brings her in?")
+
+    metrics = result["llm_metrics"]
+    assert metrics["calls"] == 1
+    assert metrics["prompt_tokens"] == 120
+    assert metrics["per_call"][0]["session_id"] == "metrics_session"
+
+
+def test_no_metrics_outside_debug_mode():
+    result = _engine(debug=False).process_doctor_query("quiet_session", "What brings her in?")
+
+    assert "llm_metrics" not in result
@@ -0,0 +1,169 @@
+"""
+Tests for load balancing, health tracking and hedging across LLM replicas.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from smartdoc_core.llm.context import INTENT, llm_call
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.replicas import ReplicaSetProvider
+
+
+class FakeReplica(LLMProvider):
+    """Replica with configurable latency, failures and health."""
+
+    def __init__(self, name, delay=0.0, fail=None, alive=True):
+        self.model = "gemma"
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.alive = alive
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, *, temperature=0.1, top_p=0.9, timeout_s=60, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.fail is not None:
+            raise self.fail
+        return f"{self.name}:{prompt}"
+
+    async def agenerate(self, prompt, **kwargs):
+        with self._lock:
+            self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail is not None:
+            raise self.fail
+        return f"{self.name}:{prompt}"
+
+    def ping(self, timeout_s=2.0):
+        return self.alive
+
+
+def _replica_set(*replicas, **kwargs):
+    kwargs.setdefault("probe_interval_s", 0)
+    return ReplicaSetProvider(list(replicas), names=[r.name for r in replicas], **kwargs)
+
+
+def test_picks_replica_with_fewest_outstanding_requests():
+    slow, fast = FakeReplica("a", delay=0.3), FakeReplica("b")
+    provider = _replica_set(slow, fast)
+
+    worker = threading.Thread(target=provider.generate, args=("first",))
+    worker.start()
+    time.sleep(0.05)  # One request is now outstanding on one replica
+    busy = "a" if provider.stats()["replicas"]["a"]["outstanding"] else "b"
+    answer = provider.generate("second")
+    worker.join()
+
+    assert not answer.startswith(busy)
+    assert provider.stats()["replicas"]["a"]["outstanding"] == 0
+
+
+def test_spreads_idle_load_evenly():
+    a, b = FakeReplica("a"), FakeReplica("b")
+    provider = _replica_set(a, b)
+
+    for i in range(10):
+        provider.generate(str(i))
+
+    assert a.calls == 5 and b.calls == 5
+
+
+def test_fails_over_and_marks_unhealthy_after_connection_errors():
+    down = FakeReplica("down", fail=requests.ConnectionError("refused"), alive=False)
+    up = FakeReplica("up")
+    provider = _replica_set(down, up, unhealthy_after=2)
+
+    answers = [provider.generate(str(i)) for i in range(6)]
+
+    assert all(a.startswith("up:") for a in answers)
+    stats = provider.stats()
+    assert stats["replicas"]["down"]["healthy"] is False
+    assert down.calls == 2  # Out of rotation once unhealthy
+    assert stats["failovers"] == 2
+
+
+def test_probe_restores_replica():
+    flaky = FakeReplica("flaky", fail=requests.ConnectionError("refused"), alive=False)
+    provider = _replica_set(flaky, FakeReplica("ok"), unhealthy_after=1)
+    provider.generate("x")
+    provider.generate("y")
+    assert provider.stats()["replicas"]["flaky"]["healthy"] is False
+
+    flaky.fail, flaky.alive = None, True
+    assert provider.probe_once() == {"flaky": True, "ok": True}
+    assert provider.stats()["replicas"]["flaky"]["healthy"] is True
+
+
+def test_application_errors_do_not_fail_over():
+    broken = FakeReplica("a", fail=ValueError("bad request"))
+    provider = _replica_set(broken, FakeReplica("b"))
+
+    with pytest.raises(ValueError):
+        for _ in range(2):
+            provider.generate("x")
+
+    assert provider.stats()["replicas"]["a"]["healthy"] is True
+
+
+def test_hedges_slow_call_for_configured_call_site():
+    slow, fast = FakeReplica("slow", delay=0.2), FakeReplica("fast", delay=0.01)
+    provider = _replica_set(
+        slow, fast, hedge_call_sites=[INTENT], hedge_min_samples=3, hedge_min_delay_s=0.02
+    )
+    with llm_call(call_site=INTENT):
+        for _ in range(4):
+            provider.generate("warm")  # Fills the latency window
+        slow.delay = 1.0
+        fast.delay = 0.01
+        # Force the next primary onto the slow replica
+        provider._replicas[1].outstanding += 1
+        started = time.monotonic()
+        answer = provider.generate("q")
+        elapsed = time.monotonic() - started
+        provider._replicas[1].outstanding -= 1
+
+    assert answer == "fast:q"
+    assert elapsed < 0.8
+    stats = provider.stats()
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    provider.close()
+
+
+def test_no_hedging_for_other_call_sites():
+    slow, fast = FakeReplica("slow", delay=0.05), FakeReplica("fast", delay=0.05)
+    provider = _replica_set(slow, fast, hedge_call_sites=[INTENT], hedge_min_samples=1)
+
+    for _ in range(5):
+        provider.generate("x")
+
+    assert provider.stats()["hedged"] == 0
+
+
+def test_async_hedge_cancels_loser():
+    slow, fast = FakeReplica("slow", delay=0.01), FakeReplica("fast", delay=0.01)
+    provider = _replica_set(
+        slow, fast, hedge_call_sites=[INTENT], hedge_min_samples=2, hedge_min_delay_s=0.02
+    )
+
+    async def scenario():
+        with llm_call(call_site=INTENT):
+            for _ in range(3):
+                await provider.agenerate("warm")
+            slow.delay = 5.0
+            provider._replicas[1].outstanding += 1
+            answer = await asyncio.wait_for(provider.agenerate("q"), 2)
+            provider._replicas[1].outstanding -= 1
+            return answer
+
+    assert asyncio.run(scenario()) == "fast:q"
+    stats = provider.stats()
+    assert stats["hedge_wins"] == 1
+    assert all(r["outstanding"] == 0 for r in stats["replicas"].values())
@@ -0,0 +1,120 @@
+"""
+Tests for per-task model routing.
+"""
+
+from smartdoc_core.llm.context import DEFAULT, EVALUATOR, EVALUATOR_REPAIR, INTENT, llm_call
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.budget import OutputBudget, OutputBudgetProvider
+from smartdoc_core.llm.providers.routing import ProfileRouter, RouteProfile, RoutingProvider
+
+
+class RecordingProvider(LLMProvider):
+    def __init__(self):
+        self.model = "large"
+        self.calls = []
+
+    def generate(self, prompt, *, temperature=0.1, top_p=0.9, timeout_s=60, **kwargs):
+        self.calls.append({"temperature": temperature, "top_p": top_p, **kwargs})
+        return kwargs.get("model", self.model)
+
+
+FAST = RouteProfile(name="fast", model="tiny", temperature=0.0, top_p=0.5, max_tokens=64)
+BIG = RouteProfile(name="big", model="large-eval")
+
+
+def _counting_source(table):
+    loads = []
+
+    def source():
+        loads.append(1)
+        return table
+
+    return source, loads
+
+
+def test_routes_by_call_site_with_alias_and_default():
+    source, _ = _counting_source({INTENT: FAST, EVALUATOR: BIG})
+    inner = RecordingProvider()
+    provider = RoutingProvider(inner, ProfileRouter(source))
+
+    with llm_call(call_site=INTENT):
+        assert provider.generate("q") == "tiny"
+    with llm_call(call_site=EVALUATOR_REPAIR):
+        assert provider.generate("q") == "large-eval"
+    assert provider.generate("q") == "large"  # No default profile: unchanged
+
+    assert inner.calls[0]["max_tokens"] == 64
+    assert inner.calls[0]["temperature"] == 0.1  # Caller sampling kept by default
+    assert "model" not in inner.calls[2]
+
+
+def test_default_profile_and_sampling_override():
+    source, _ = _counting_source({DEFAULT: FAST})
+    inner = RecordingProvider()
+    provider = RoutingProvider(inner, ProfileRouter(source), apply_sampling=True)
+
+    assert provider.generate("q", temperature=0.7) == "tiny"
+    assert inner.calls[0]["temperature"] == 0.0
+    assert inner.calls[0]["top_p"] == 0.5
+
+
+def test_default_profile_length_limit_does_not_override_call_site_budgets():
+    source, _ = _counting_source({DEFAULT: FAST, INTENT: BIG})
+    inner = RecordingProvider()
+    budgets = {
+        EVALUATOR: OutputBudget(max_tokens=1536),
+        EVALUATOR_REPAIR: OutputBudget(max_tokens=1536),
+        INTENT: OutputBudget(max_tokens=128),
+    }
+    provider = RoutingProvider(OutputBudgetProvider(inner, budgets), ProfileRouter(source))
+
+    with llm_call(call_site=EVALUATOR):
+        assert provider.generate("q") == "tiny"  # Default profile's model
+    with llm_call(call_site=EVALUATOR_REPAIR):
+        provider.generate("q")
+    with llm_call(call_site=INTENT):
+        provider.generate("q")
+    provider.generate("q")  # Default call site: the profile is its own
+
+    assert [call["max_tokens"] for call in inner.calls] == [1536, 1536, 128, 64]
+
+
+def test_table_is_cached_until_invalidated():
+    table = {INTENT: FAST}
+    source, loads = _counting_source(table)
+    router = ProfileRouter(source, ttl_s=None)
+
+    for _ in range(5):
+        router.route(INTENT)
+    assert len(loads) == 1
+
+    table[INTENT] = BIG  # An admin edit...
+    assert router.route(INTENT) is FAST
+    router.invalidate()  # ...followed by the invalidation hook
+    assert router.route(INTENT) is BIG
+    assert len(loads) == 2
+
+
+def test_table_expires_after_ttl():
+    source, loads = _counting_source({INTENT: FAST})
+    router = ProfileRouter(source, ttl_s=0)
+
+    router.route(INTENT)
+    router.route(INTENT)
+
+    assert len(loads) == 2
+
+
+def test_load_failure_keeps_previous_table():
+    calls = []
+
+    def source():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("database unavailable")
+        return {INTENT: FAST}
+
+    router = ProfileRouter(source, ttl_s=0)
+    assert router.route(INTENT) is FAST
+    assert router.route(INTENT) is FAST
+    assert router.stats()["load_errors"] == 1
@@ -0,0 +1,189 @@
+"""
+Tests for priority scheduling of LLM calls.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from smartdoc_core.llm.context import BATCH, EVALUATOR, INTENT, SON_PERSONA, llm_call
+from smartdoc_core.llm.factory import stack_stats
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.breaker import CircuitBreakerProvider
+from smartdoc_core.llm.providers.scheduler import PrioritySchedulerProvider
+from smartdoc_core.utils.exceptions import LLMTimeoutError
+
+
+class GatedProvider(LLMProvider):
+    """Provider whose calls block until released, recording start order."""
+
+    def __init__(self):
+        self.model = "gemma3:4b"
+        self.started = []
+        self.gate = threading.Semaphore(0)
+
+    def generate(self, prompt, **kwargs):
+        self.started.append(prompt)
+        self.gate.acquire()
+        return prompt
+
+    async def agenerate(self, prompt, **kwargs):
+        self.started.append(prompt)
+        await asyncio.sleep(0.01)
+        return prompt
+
+
+def _call(scheduler, prompt, call_site=INTENT, **context):
+    def run():
+        with llm_call(call_site=call_site, **context):
+            scheduler.generate(prompt)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_interactive_calls_jump_ahead_of_queued_evaluations():
+    inner = GatedProvider()
+    scheduler = PrioritySchedulerProvider(inner, max_concurrent=1)
+
+    threads = [_call(scheduler, "eval-1", EVALUATOR)]
+    _wait_for(lambda: inner.started == ["eval-1"])
+    threads += [_call(scheduler, "eval-2", EVALUATOR), _call(scheduler, "eval-3", EVALUATOR)]
+    _wait_for(lambda: scheduler.stats()["waiting"] == 2)
+    threads.append(_call(scheduler, "chat", SON_PERSONA))
+    _wait_for(lambda: scheduler.stats()["waiting"] == 3)
+
+    for _ in range(4):
+        inner.gate.release()
+    for thread in threads:
+        thread.join(2)
+
+    assert inner.started == ["eval-1", "chat", "eval-2", "eval-3"]
+    stats = scheduler.stats()["classes"]
+    assert stats["interactive"]["dispatched"] == 1
+    assert stats["evaluation"]["queue_time_s"]["count"] == 3
+
+
+def test_class_cap_keeps_slots_free_for_chat():
+    inner = GatedProvider()
+    classes = {"interactive": {"rank": 0}, "evaluation": {"rank": 1, "max_concurrent": 1}}
+    scheduler = PrioritySchedulerProvider(inner, max_concurrent=2, classes=classes)
+
+    threads = [_call(scheduler, "eval-1", EVALUATOR), _call(scheduler, "eval-2", EVALUATOR)]
+    _wait_for(lambda: scheduler.stats()["waiting"] == 1 and len(inner.started) == 1)
+    threads.append(_call(scheduler, "chat", INTENT))
+    _wait_for(lambda: len(inner.started) == 2)
+
+    assert inner.started[1] == "chat"
+    for _ in range(3):
+        inner.gate.release()
+    for thread in threads:
+        thread.join(2)
+
+
+def test_aging_lets_batch_work_overtake_newer_evaluations():
+    now = [0.0]
+    scheduler = PrioritySchedulerProvider(GatedProvider(), max_concurrent=1, aging_s=10, clock=lambda: now[0])
+    tickets = []
+
+    with llm_call(call_site=EVALUATOR):
+        tickets.append(scheduler._enqueue(lambda: None))  # Takes the slot
+    with llm_call(priority=BATCH):
+        batch = scheduler._enqueue(lambda: None)
+    now[0] = 15.0
+    with llm_call(call_site=EVALUATOR):
+        late_eval = scheduler._enqueue(lambda: None)
+    with llm_call(call_site=INTENT):
+        chat = scheduler._enqueue(lambda: None)
+
+    scheduler._release(tickets[0])
+    assert chat.granted  # Aging never overtakes interactive work
+    scheduler._release(chat)
+    assert batch.granted and not late_eval.granted  # Rank 2 aged to 1, and it arrived first
+
+
+def test_queue_wait_is_bounded_by_the_call_timeout():
+    inner = GatedProvider()
+    scheduler = PrioritySchedulerProvider(inner, max_concurrent=1)
+    thread = _call(scheduler, "slow")
+    _wait_for(lambda: inner.started == ["slow"])
+
+    with pytest.raises(LLMTimeoutError):
+        scheduler.generate("queued", timeout_s=0.05)
+    assert scheduler.stats()["classes"]["interactive"]["queue_timeouts"] == 1
+    assert scheduler.stats()["waiting"] == 0
+
+    inner.gate.release()
+    thread.join(2)
+
+
+def test_calls_without_a_timeout_wait_at_most_max_queue_s():
+    inner = GatedProvider()
+    scheduler = PrioritySchedulerProvider(inner, max_concurrent=1, max_queue_s=0.05)
+    thread = _call(scheduler, "slow")
+    _wait_for(lambda: inner.started == ["slow"])
+
+    with pytest.raises(LLMTimeoutError):
+        scheduler.generate("queued")  # Persona responders pass no timeout_s
+    assert scheduler.stats()["classes"]["interactive"]["queue_timeouts"] == 1
+
+    inner.gate.release()
+    thread.join(2)
+
+
+def test_queue_time_is_taken_off_the_upstream_timeout():
+    now = [0.0]
+    timeouts = []
+
+    class RecordingProvider(LLMProvider):
+        model = "gemma3:4b"
+
+        def generate(self, prompt, **kwargs):
+            timeouts.append(kwargs.get("timeout_s"))
+            return prompt
+
+    scheduler = PrioritySchedulerProvider(RecordingProvider(), max_concurrent=1, clock=lambda: now[0])
+    with llm_call(call_site=INTENT):
+        running = scheduler._enqueue(lambda: None)
+    thread = threading.Thread(target=lambda: scheduler.generate("queued", timeout_s=10))
+    thread.start()
+    _wait_for(lambda: scheduler.stats()["waiting"] == 1)
+
+    now[0] = 4.0
+    scheduler._release(running)
+    thread.join(2)
+    scheduler.generate("immediate")
+
+    assert timeouts == [6.0, None]
+
+
+def test_async_batches_respect_the_slot_limit():
+    inner = GatedProvider()
+    scheduler = PrioritySchedulerProvider(inner, max_concurrent=2)
+
+    results = scheduler.generate_many([f"p{i}" for i in range(6)], max_concurrency=6)
+
+    assert [r.text for r in results] == [f"p{i}" for i in range(6)]
+    stats = scheduler.stats()
+    assert stats["running"] == 0
+    assert stats["classes"]["interactive"]["dispatched"] == 6
+    assert stats["classes"]["interactive"]["queue_time_s"]["count"] == 6
+
+
+def test_stack_stats_reports_each_layer():
+    stack = PrioritySchedulerProvider(CircuitBreakerProvider(GatedProvider()), max_concurrent=2)
+
+    stats = stack_stats(stack)
+    assert stats["PrioritySchedulerProvider"]["waiting"] == 0
+    assert stats["CircuitBreakerProvider"]["state"] == "closed"
+    assert "GatedProvider" not in stats
@@ -0,0 +1,186 @@
+"""
+Tests for schema-constrained (structured) LLM output.
+"""
+
+import json
+from unittest.mock import Mock, patch
+
+from smartdoc_core.clinical.evaluation_schemas import SimplifiedClinicalEvaluation
+from smartdoc_core.clinical.evaluator import ClinicalEvaluator, EvaluationInputs
+from smartdoc_core.intent.classifier import IntentLLMOut, LLMIntentClassifier
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.ollama import OllamaProvider
+from smartdoc_core.llm.providers.transport import PooledTransport
+from smartdoc_core.llm.structured import json_schema_for, parse_structured
+
+
+RA_INTENT = json.dumps({
+    "intent_id": "meds_ra_specific_initial_query",
+    "confidence": 0.92,
+    "explanation": "RA medication question",
+})
+
+
+class SchemaProvider(LLMProvider):
+    """Provider returning a canned response and recording options."""
+
+    supports_structured_output = True
+
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def generate(self, prompt, *, temperature=0.1, top_p=0.9, timeout_s=60, **kwargs):
+        self.calls.append(kwargs)
+        return self.response
+
+
+def _valid_evaluation():
+    dim = {"score": 80, "analysis": "Thorough and well reasoned."}
+    return {
+        "information_gathering": dim,
+        "diagnostic_accuracy": dim,
+        "cognitive_bias_awareness": dim,
+        "comprehensive_feedback": {
+            "strengths": "Systematic history taking.",
+            "areas_for_improvement": "Review medication lists earlier.",
+            "key_recommendations": ["Reconcile medications"],
+        },
+    }
+
+
+def test_schema_is_self_contained():
+    schema = json_schema_for(SimplifiedClinicalEvaluation)
+
+    assert "$ref" not in json.dumps(schema)
+    assert "$defs" not in schema
+    dim = schema["properties"]["information_gathering"]
+    assert dim["properties"]["score"]["maximum"] == 100
+
+
+def test_schema_copies_are_independent():
+    schema = json_schema_for(IntentLLMOut)
+    schema["properties"]["intent_id"]["enum"] = ["x"]
+
+    assert "enum" not in json_schema_for(IntentLLMOut)["properties"]["intent_id"]
+
+
+def test_parse_structured_valid_and_invalid():
+    ok = parse_structured(RA_INTENT, IntentLLMOut)
+    assert ok.ok and ok.parsed.intent_id == "meds_ra_specific_initial_query"
+
+    wrapped = parse_structured('Sure: {"intent_id": "a", "confidence": 0.5, "explanation": "x"} done', IntentLLMOut)
+    assert wrapped.ok
+
+    invalid = parse_structured('{"intent_id": "a", "confidence": 7}', IntentLLMOut)
+    assert not invalid.ok
+    assert invalid.data == {"intent_id": "a", "confidence": 7}
+    assert invalid.error is not None
+
+    garbage = parse_structured("no json here", IntentLLMOut)
+    assert not garbage.ok and garbage.data is None
+
+
+def test_ollama_payload_includes_format():
+    transport = PooledTransport()
+    provider = OllamaProvider("http://ollama:11434", "gemma", transport=transport)
+    response = Mock()
+    response.json.return_value = {"response": "{}"}
+    response.raise_for_status.return_value = None
+    schema = json_schema_for(IntentLLMOut)
+
+    with patch.object(transport.session, "request", return_value=response) as req:
+        provider.generate("Hello", format=schema)
+        assert req.call_args.kwargs["json"]["format"] == schema
+
+        provider.generate("Hello")
+        assert "format" not in req.call_args.kwargs["json"]
+
+
+def test_generate_structured_sends_schema_only_when_supported():
+    supported = SchemaProvider('{"intent_id": "a", "confidence": 0.8, "explanation": "x"}')
+    out = supported.generate_structured("p", IntentLLMOut)
+    assert out.ok
+    assert supported.calls[0]["format"]["required"] == ["intent_id", "confidence", "explanation"]
+
+    unsupported = SchemaProvider('{"intent_id": "a", "confidence": 0.8, "explanation": "x"}')
+    unsupported.supports_structured_output = False
+    assert unsupported.generate_structured("p", IntentLLMOut).ok
+    assert "format" not in unsupported.calls[0]
+
+
+def test_classifier_restricts_intents_and_uses_parsed_output():
+    provider = SchemaProvider(RA_INTENT)
+    classifier = LLMIntentClassifier(provider=provider)
+
+    result = classifier.classify_intent("Is he taking anything for his arthritis?", "anamnesis")
+
+    assert result["intent_id"] == "meds_ra_specific_initial_query"
+    assert result["confidence"] == 0.92
+    enum = provider.calls[0]["format"]["properties"]["intent_id"]["enum"]
+    assert enum == sorted(classifier._valid_intents_for_context("anamnesis"))
+
+
+def test_classifier_falls_back_for_plain_providers():
+    provider = Mock()
+    provider.generate.return_value = f"Answer: {RA_INTENT}"
+    classifier = LLMIntentClassifier(provider=provider)
+
+    result = classifier.classify_intent("Is he taking anything for his arthritis?", "anamnesis")
+
+    assert result["intent_id"] == "meds_ra_specific_initial_query"
+    assert "format" not in provider.generate.call_args.kwargs
+
+
+def test_evaluator_constrains_output_and_skips_repair():
+    provider = SchemaProvider(json.dumps(_valid_evaluation()))
+    evaluator = ClinicalEvaluator(provider=provider)
+    inputs = EvaluationInputs(
+        dialogue_transcript=[{"role": "doctor", "content": "What medications does he take for his joints?"}] * 3,
+        detected_biases=[],
+        metacognitive_responses={"reflection": "I considered drug-induced causes early on."},
+        final_diagnosis="Drug-induced interstitial lung disease",
+        case_context={},
+    )
+
+    result = evaluator.evaluate(inputs)
+
+    assert result["validation_errors"] == []
+    assert result["evaluation"]["information_gathering"]["score"] == 80
+    assert len(provider.calls) == 1
+    assert "information_gathering" in provider.calls[0]["format"]["properties"]
+
+
+def test_bias_analysis_uses_the_parsed_structured_output():
+    detail = {"detected": False, "confidence": 80, "evidence": "Broad history", "explanation": "Considered alternatives early."}
+    analysis = {"anchoring_bias": detail, "confirmation_bias": detail, "premature_closure": detail,
+                "overall_reasoning_quality": 75}
+    provider = SchemaProvider(json.dumps(analysis))
+
+    result = ClinicalEvaluator(provider=provider).deep_bias_analysis([{"role": "doctor", "content": "Any fever?"}], "ILD")
+
+    assert result["success"] and result["validation_errors"] == []
+    assert result["bias_analysis"]["key_insights"] == []  # Defaults filled in by the schema model
+    assert "anchoring_bias" in provider.calls[0]["format"]["properties"]
+
+
+def test_discovery_fallback_uses_structured_output():
+    from smartdoc_core.discovery.processor import DiscoveryClassifier
+
+    answer = {"label": "Dyspnea", "category": "presenting_symptoms", "summary": "Short of breath.",
+              "confidence": 0.8}
+    provider = SchemaProvider(json.dumps(answer))
+    classifier = DiscoveryClassifier(provider=provider, mode="llm")
+
+    result = classifier.process_discovery(block_id="b1", block_type="History", clinical_content="SOB", intent_id="hpi")
+
+    assert (result["label"], result["confidence"]) == ("Dyspnea", 0.8)
+    assert provider.calls[0]["format"]["required"] == ["label", "category", "summary", "confidence"]
+    assert "reasoning" not in provider.calls[0]["format"]["properties"]  # Prose the classifier discards
+
+    plain = Mock()
+    plain.generate.return_value = f"Sure: {json.dumps(answer)}"
+    result = DiscoveryClassifier(provider=plain, mode="llm").process_discovery(
+        block_id="b1", block_type="History", clinical_content="SOB", intent_id="hpi"
+    )
+    assert result["label"] == "Dyspnea" and "format" not in plain.generate.call_args.kwargs
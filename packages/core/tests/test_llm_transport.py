@@ -0,0 +1,124 @@
+"""
+Tests for the shared pooled HTTP transport used by the Ollama providers.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from smartdoc_core.llm.providers.ollama import OllamaProvider
+from smartdoc_core.llm.providers.transport import PooledTransport, get_shared_transport
+
+
+def _ok_response(payload):
+    response = Mock()
+    response.json.return_value = payload
+    response.raise_for_status.return_value = None
+    return response
+
+
+def test_providers_share_process_wide_transport():
+    """Every provider created without an explicit transport uses the same pool."""
+    a = OllamaProvider("http://localhost:11434", "model-a")
+    b = OllamaProvider("http://localhost:11434/", "model-b")
+
+    assert a.transport is b.transport
+    assert a.transport is get_shared_transport()
+
+
+def test_generate_goes_through_pooled_session():
+    transport = PooledTransport(pool_maxsize=2)
+    provider = OllamaProvider("http://ollama:11434", "gemma", transport=transport)
+
+    with patch.object(transport.session, "request", return_value=_ok_response({"response": "hi"})) as req:
+        assert provider.generate("Hello") == "hi"
+
+    method, url = req.call_args.args
+    assert method == "POST"
+    assert url == "http://ollama:11434/api/generate"
+    assert req.call_args.kwargs["json"]["model"] == "gemma"
+
+
+def test_retries_connection_reset_then_succeeds():
+    transport = PooledTransport(max_retries=2, backoff_s=0)
+    side_effect = [requests.ConnectionError("Connection reset by peer"), _ok_response({"response": "ok"})]
+
+    with patch.object(transport.session, "request", side_effect=side_effect) as req:
+        response = transport.post("http://ollama:11434/api/generate", json={})
+
+    assert response.json() == {"response": "ok"}
+    assert req.call_count == 2
+    stats = transport.stats()
+    assert stats["counters"]["retries"] == 1
+    assert stats["total_in_flight"] == 0
+
+
+def test_read_timeout_is_not_retried():
+    transport = PooledTransport(max_retries=3, backoff_s=0)
+
+    with patch.object(transport.session, "request", side_effect=requests.ReadTimeout("slow")) as req:
+        with pytest.raises(requests.Timeout):
+            transport.post("http://ollama:11434/api/generate", json={})
+
+    assert req.call_count == 1
+
+
+def test_gives_up_after_max_retries():
+    transport = PooledTransport(max_retries=1, backoff_s=0)
+
+    with patch.object(transport.session, "request", side_effect=requests.ConnectionError("refused")) as req:
+        with pytest.raises(requests.ConnectionError):
+            transport.post("http://ollama:11434/api/generate", json={})
+
+    assert req.call_count == 2
+
+
+def test_stats_report_pool_occupancy():
+    transport = PooledTransport(pool_connections=2, pool_maxsize=8)
+    # Create a pool for the host without sending any traffic
+    transport._adapter.poolmanager.connection_from_url("http://ollama:11434")
+
+    stats = transport.stats()
+
+    assert stats["pool_maxsize"] == 8
+    assert stats["total_in_flight"] == 0
+    assert stats["pools"][0]["host"] == "ollama:11434"
+    assert stats["pools"][0]["in_use"] == 0
+    assert stats["pools"][0]["idle_slots"] == 8
+
+
+def test_more_concurrent_calls_than_the_pool_size_do_not_block():
+    calls = 6
+    barrier = threading.Barrier(calls, timeout=5)  # Only passes if every call is in flight at once
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            barrier.wait()
+            body = b'{"response": "ok"}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    transport = PooledTransport(pool_maxsize=2)
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/generate"
+    try:
+        with ThreadPoolExecutor(calls) as pool:
+            responses = list(pool.map(lambda _: transport.post(url, json={}, timeout=10), range(calls)))
+    finally:
+        server.shutdown()
+        server.server_close()
+        transport.close()
+
+    assert [r.json()["response"] for r in responses] == ["ok"] * calls
+    assert transport.stats()["total_in_flight"] == 0
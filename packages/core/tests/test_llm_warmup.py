@@ -0,0 +1,133 @@
+"""
+Tests for LLM warm-up and readiness state.
+"""
+
+import time
+from unittest.mock import Mock
+
+from smartdoc_core.llm.context import INTENT, SON_PERSONA, current_call
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.ollama import OllamaProvider
+from smartdoc_core.llm.warmup import (
+    DEGRADED,
+    READY,
+    Warmer,
+    WarmupState,
+    representative_calls,
+    warm_up,
+)
+
+
+class WarmableProvider(LLMProvider):
+    """Provider recording model loads and primed calls; fails the first ``failures`` loads."""
+
+    supports_chat = True
+
+    def __init__(self, failures=0):
+        self.model = "gemma3:4b"
+        self.failures = failures
+        self.loaded = []
+        self.calls = []
+
+    def load_model(self, model=None, timeout_s=600):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("ollama not up yet")
+        self.loaded.append(model)
+
+    def loaded_models(self, timeout_s=2):
+        return [m if ":" in m else f"{m}:latest" for m in self.loaded]
+
+    def generate(self, prompt, **kwargs):
+        ctx = current_call()
+        self.calls.append((ctx.call_site, ctx.cache, kwargs))
+        return "ok"
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_warm_up_loads_models_and_primes_each_task():
+    provider = WarmableProvider()
+    state = WarmupState()
+    calls = [(INTENT, "intent prompt", {}), (SON_PERSONA, "son prompt", {"messages": []})]
+
+    assert warm_up(provider, models=["gemma3:4b", "qwen3:1.7b"], calls=calls, state=state)
+
+    assert provider.loaded == ["gemma3:4b", "qwen3:1.7b"]
+    assert [(site, cache) for site, cache, _ in provider.calls] == [(INTENT, False), (SON_PERSONA, False)]
+    assert provider.calls[1][2] == {"max_tokens": 1, "timeout_s": 600.0, "messages": []}
+    snapshot = state.snapshot()
+    assert snapshot["status"] == READY and snapshot["ready"]
+    assert snapshot["models"]["qwen3:1.7b"]["ok"] and snapshot["tasks"][SON_PERSONA]["ok"]
+
+
+def test_warmer_retries_until_the_backend_is_up():
+    provider = WarmableProvider(failures=2)
+    warmer = Warmer(
+        provider, models=lambda: ["gemma3:4b"], calls=lambda: [], retry_interval_s=0.01, recheck_interval_s=None
+    )
+    assert warmer.state.status != READY and not warmer.state.ready
+
+    warmer.run()
+
+    snapshot = warmer.state.snapshot()
+    assert snapshot["status"] == READY and snapshot["attempts"] == 3
+    assert snapshot["error"] is None
+
+
+def test_warmer_reports_degraded_after_giving_up():
+    provider = WarmableProvider(failures=1000)
+    warmer = Warmer(
+        provider, models=lambda: ["gemma3:4b"], calls=lambda: [],
+        retry_interval_s=0.01, give_up_after_s=0.0, recheck_interval_s=None,
+    ).start()
+
+    _wait_for(lambda: warmer.state.ready)
+    warmer.stop()
+    snapshot = warmer.state.snapshot()
+    assert snapshot["status"] == DEGRADED
+    assert "ollama not up yet" in str(snapshot["models"]["gemma3:4b"]["error"])
+
+
+def test_rewarms_when_models_were_unloaded_without_withdrawing_readiness():
+    provider = WarmableProvider()
+    warmer = Warmer(
+        provider, models=lambda: ["gemma3:4b"], calls=lambda: [], recheck_interval_s=0.01
+    ).start()
+    _wait_for(lambda: warmer.state.status == READY)
+
+    provider.loaded.clear()  # Ollama restarted
+    _wait_for(lambda: warmer.state.snapshot()["rewarms"] == 1)
+    warmer.stop()
+    assert warmer.state.ready and provider.loaded
+
+
+def test_representative_calls_use_production_prompts():
+    provider = WarmableProvider()
+    calls = representative_calls(provider, [INTENT, SON_PERSONA])
+
+    intents = [prompt for task, prompt, _ in calls if task == INTENT]
+    assert len(intents) == 3  # One per context
+    assert all('Doctor\'s input: "What brings her in today?"' in p for p in intents)
+    (_, son_prompt, kwargs), = [c for c in calls if c[0] == SON_PERSONA]
+    assert kwargs["messages"][0]["role"] == "system"
+    assert son_prompt.startswith(kwargs["messages"][0]["content"])
+
+
+def test_ollama_load_model_and_loaded_models():
+    provider = OllamaProvider("http://ollama:11434", "gemma")
+    provider.transport = Mock()
+    provider.transport.get.return_value.json.return_value = {"models": [{"name": "gemma:latest"}]}
+
+    provider.load_model(timeout_s=5)
+    assert provider.loaded_models() == ["gemma:latest"]
+
+    url, = provider.transport.post.call_args.args
+    assert url == "http://ollama:11434/api/generate"
+    assert provider.transport.post.call_args.kwargs["json"] == {"model": "gemma", "stream": False}
+    assert provider.transport.get.call_args.args[0] == "http://ollama:11434/api/ps"
@@ -0,0 +1,119 @@
+"""
+Tests for prefix-stable prompt layout: per-request data goes last.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from smartdoc_core.clinical.evaluator import ClinicalEvaluator, EvaluationInputs
+from smartdoc_core.intent.classifier import LLMIntentClassifier
+from smartdoc_core.intent.prompts import DefaultIntentPrompt
+from smartdoc_core.llm.prompt_layout import prefix_reuse, shared_prefix_length
+from smartdoc_core.simulation.prompts.patient_default import PATIENT_SYSTEM_PROMPT, build_patient_prompt
+from smartdoc_core.simulation.prompts.resident_default import RESIDENT_SYSTEM_PROMPT, build_resident_prompt
+
+INTENTS = {
+    "meds_current_known": {"description": "Current medications", "examples": ["What does she take?"]},
+    "clarification": {"description": "Unclear query", "examples": []},
+}
+
+
+def _first_divergence(build, *inputs):
+    """Shared prefix length of prompts built from different inputs."""
+    a, b = (build(value) for value in inputs)
+    return shared_prefix_length(a, b), a
+
+
+def test_prefix_reuse_counts_the_best_cached_slot():
+    prompts = [("intent", "static A1"), ("son", "persona Q1"), ("intent", "static A2")]
+
+    per_site, total = prefix_reuse(prompts, slots=1)
+    assert per_site["intent"].reused_chars == 0  # The son prompt evicted the intent prompt
+
+    per_site, total = prefix_reuse(prompts, slots=2)
+    assert per_site["intent"].reused_chars == len("static A")
+    assert total.calls == 3 and total.prompt_chars == sum(len(p) for _, p in prompts)
+
+
+def test_intent_prompt_ends_with_the_doctor_input():
+    builder = DefaultIntentPrompt()
+    for context in ("anamnesis", "exam", "labs"):
+        shared, prompt = _first_divergence(
+            lambda q: builder.build_context_aware(doctor_input=q, context=context, filtered_intents=INTENTS),
+            "Any medications?",
+            "What are her vitals?",
+        )
+        prefix = builder.context_prefix(context, INTENTS)
+        assert prompt.startswith(prefix) and shared >= len(prefix)
+        assert prompt.endswith('"Any medications?"')
+
+    shared, prompt = _first_divergence(
+        lambda q: builder.build_general(doctor_input=q, intent_categories=INTENTS), "a", "b"
+    )
+    assert shared == len(prompt) - len('a"')
+
+
+def test_persona_prompts_end_with_the_question():
+    points = "- Medications: Furosemide"
+    shared, prompt = _first_divergence(lambda q: build_patient_prompt(q, points), "Meds?", "Allergies?")
+    assert shared > len(PATIENT_SYSTEM_PROMPT) + len(points)
+    assert prompt.endswith('"Meds?"\n\nYour response:')
+
+    shared, _ = _first_divergence(lambda q: build_resident_prompt(q, points), "BNP?", "CXR?")
+    assert shared > len(RESIDENT_SYSTEM_PROMPT) + len(points)
+
+
+def test_rubric_prompt_puts_student_data_after_the_rubric():
+    evaluator = ClinicalEvaluator(provider=Mock(), enable_validation=False)
+
+    def build(diagnosis):
+        return evaluator._build_rubric_prompt(EvaluationInputs(
+            dialogue_transcript=[],
+            detected_biases=[],
+            metacognitive_responses={"What would you do differently?": "Ask about medications"},
+            final_diagnosis=diagnosis,
+            case_context={},
+        ))
+
+    shared, prompt = _first_divergence(build, "Heart failure", "Miliary tuberculosis")
+    prefix = evaluator._rubric_prefix()
+    assert prompt.startswith(prefix) and shared >= len(prefix)
+    assert "EVALUATE THESE THREE AREAS" in prefix and evaluator.json_end in prefix
+    assert shared / len(prompt) > 0.9
+
+
+def test_classifier_compiles_prompts_once_per_intent_set_version():
+    class CountingPrompt(DefaultIntentPrompt):
+        compiled = 0
+
+        def context_prefix(self, context, filtered_intents):
+            CountingPrompt.compiled += 1
+            return super().context_prefix(context, filtered_intents)
+
+    provider = Mock()
+    provider.generate.return_value = '{"intent_id": "meds_current_known", "confidence": 0.9, "explanation": "x"}'
+    classifier = LLMIntentClassifier(provider=provider, prompt_builder=CountingPrompt())
+
+    for question in ("Any medications?", "What does she take?"):
+        classifier.classify_intent(question, "anamnesis")
+    prompt = provider.generate.call_args.args[0]
+    assert CountingPrompt.compiled == 1
+    assert prompt == DefaultIntentPrompt().build_context_aware(
+        doctor_input="What does she take?",
+        context="anamnesis",
+        filtered_intents=classifier._compiled_prompt("anamnesis").intents,
+    )
+
+    classifier.intent_categories = {**INTENTS, "hpi_fever": {"description": "Fever", "examples": []}}
+    classifier.classify_intent("Any fever?", "anamnesis")
+    assert CountingPrompt.compiled == 2 and classifier.intent_version == 2
+    assert "- hpi_fever: Fever" in provider.generate.call_args.args[0]
+
+    # In-place edits would leave the compiled prompts and intent_set_id stale
+    intent_set = classifier.intent_set_id
+    with pytest.raises(TypeError):
+        classifier.intent_categories["hpi_rash"] = {"description": "Rash"}
+    with pytest.raises((TypeError, AttributeError)):
+        classifier.intent_categories["meds_current_known"]["examples"].append("Any pills?")
+    assert classifier.intent_set_id == intent_set and classifier.list_all_intents()["hpi_fever"]["examples"] == []
@@ -0,0 +1,118 @@
+"""
+Tests for token streaming through the provider, responder and engine layers.
+"""
+
+import json
+import os
+from unittest.mock import Mock, patch
+
+from smartdoc_core.llm.providers.base import LLMProvider
+from smartdoc_core.llm.providers.ollama import OllamaProvider
+from smartdoc_core.llm.providers.transport import PooledTransport
+from smartdoc_core.simulation.engine import IntentDrivenDisclosureManager
+from smartdoc_core.simulation.responders import AnamnesisSonResponder
+
+CASE_FILE = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "data", "raw", "cases", "intent_driven_case.json"
+)
+
+
+class ChunkProvider(LLMProvider):
+    """Provider that streams a fixed list of chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def generate(self, prompt, **kwargs):
+        return "".join(self.chunks)
+
+    def generate_stream(self, prompt, **kwargs):
+        yield from self.chunks
+
+
+def test_ollama_generate_stream_yields_chunks():
+    transport = PooledTransport()
+    provider = OllamaProvider("http://ollama:11434", "gemma", transport=transport)
+    lines = [
+        json.dumps({"response": "Hello", "done": False}).encode(),
+        b"",
+        json.dumps({"response": " there", "done": False}).encode(),
+        json.dumps({"response": "", "done": True}).encode(),
+    ]
+    response = Mock()
+    response.iter_lines.return_value = iter(lines)
+
+    with patch.object(transport.session, "request", return_value=response) as req:
+        chunks = list(provider.generate_stream("Hi"))
+
+    assert chunks == ["Hello", " there"]
+    assert req.call_args.kwargs["stream"] is True
+    assert req.call_args.kwargs["json"]["stream"] is True
+    response.close.assert_called_once()
+
+
+def test_default_generate_stream_yields_full_text():
+    class BlockingProvider(LLMProvider):
+        def generate(self, prompt, **kwargs):
+            return "whole reply"
+
+    assert list(BlockingProvider().generate_stream("x")) == ["whole reply"]
+
+
+def test_respond_stream_trims_surrounding_quotes():
+    provider = ChunkProvider(['  "', "She has", " a cough", '."', "\n"])
+    responder = AnamnesisSonResponder(provider)
+    kwargs = dict(intent_id="hpi_cough", doctor_question="Cough?", clinical_data=[], context="anamnesis")
+
+    streamed = "".join(responder.respond_stream(**kwargs))
+
+    assert streamed == "She has a cough."
+    assert streamed == responder.respond(**kwargs)
+
+
+def test_respond_stream_keeps_inner_quotes():
+    provider = ChunkProvider(['She said "', "no", '" and left.'])
+    responder = AnamnesisSonResponder(provider)
+
+    streamed = "".join(responder.respond_stream(
+        intent_id="x", doctor_question="?", clinical_data=[], context="anamnesis"
+    ))
+
+    assert streamed == 'She said "no" and left.'
+
+
+def test_respond_stream_keeps_unmatched_quotes_like_respond():
+    replies = [
+        ['The doctor told us "', 'rest', '"'],
+        ["'Cause", " she was tired", "\n"],
+        ['"\u201c', "She has a cough", "\u201d\"  "],
+        [" \u201c", "Not since Monday", ".\u201d"],
+    ]
+    for chunks in replies:
+        responder = AnamnesisSonResponder(ChunkProvider(chunks))
+        kwargs = dict(intent_id="x", doctor_question="?", clinical_data=[], context="anamnesis")
+
+        assert "".join(responder.respond_stream(**kwargs)) == responder.respond(**kwargs)
+
+
+def test_engine_streams_tokens_before_result():
+    classifier = Mock()
+    classifier.classify_intent.return_value = {
+        "intent_id": "hpi_chief_complaint",
+        "confidence": 0.9,
+        "original_input": "What brings her in?",
+    }
+    provider = ChunkProvider(['"My mother', " can't breathe", '."'])
+    engine = IntentDrivenDisclosureManager(
+        case_file_path=CASE_FILE, provider=provider, intent_classifier=classifier
+    )
+
+    events = list(engine.stream_doctor_query("stream_session", "What brings her in?"))
+
+    tokens = [payload for event, payload in events if event == "token"]
+    assert tokens == ["My mother", " can't breathe", "."]
+    event, result = events[-1]
+    assert event == "result"
+    assert result["success"] is True
+    assert result["response"]["text"] == "My mother can't breathe."
+    assert result["response"]["discoveries"]
@@ -173,6 +173,13 @@ verify_deployment() {
         log_error "❌ API health endpoint not responding"
     fi
 
+    # Test readiness (LLM warm-up finished; cold model loads can take minutes)
+    if curl -sf http://localhost:8000/readyz > /dev/null; then
+        log_step "✅ API ready (LLM models warm)"
+    else
+        log_warning "⚠️  API not ready yet - LLM warm-up still running (check /readyz)"
+    fi
+
     # Test web interface
     if curl -s http://localhost:8000 > /dev/null; then
         log_step "✅ Web interface accessible"